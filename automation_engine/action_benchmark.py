@@ -0,0 +1,179 @@
+# mon_bot_social/automation_engine/action_benchmark.py
+"""
+Benchmark hors ligne des actions (Follow, Like, Gather, ViewStory, Unfollow) sur MockWebDriver:
+chaque exécution d'action est mesurée en allers-retours WebDriver (total et par commande) et en temps réel.
+Les pauses "humaines" des actions (time.sleep aléatoires) sont réduites par `human_delay_scale` (0 = supprimées)
+pour ne mesurer que le coût du pilotage; les attentes WebDriverWait (éléments absents) restent réelles.
+Usage: python -m automation_engine.action_benchmark [Follow Like ...] [--runs N] [--latency-ms MS] [--human-delay-scale F] [--json]
+"""
+import sys
+import time
+import json
+import argparse
+import datetime
+import importlib
+import statistics
+
+from utils.logger import get_logger
+from utils.settings_schema import build_settings
+from automation_engine.event_sink import EventSink
+from automation_engine.browser_handler import BrowserHandler
+from automation_engine.task_scheduler import ACTION_CLASS_MODULES, load_action_class
+from automation_engine.mock_driver import MockWebDriver, LXML_AVAILABLE
+from automation_engine.driver_instrumentation import DriverCallRecorder, instrument_driver
+
+logger = get_logger("ActionBenchmark")
+
+QUEUE_SIZE = 50 # Utilisateurs disponibles dans les files Follow/Unfollow (un par exécution)
+TOP_CALL_SITES = 5 # Méthodes d'action les plus coûteuses en allers-retours, par scénario
+
+# Nom -> (classe d'action, options d'execute); les files Follow/Unfollow pointent vers les fixtures de profil
+SCENARIOS = {
+    "Follow": ("FollowAction", {"use_app_manager_queue": True}),
+    "Like": ("LikeAction", {"like_source": "feed", "num_likes_per_run": 3}),
+    "Gather": ("GatherAction", {"source_type": "hashtag", "targets": ["bench"], "max_items_per_target": 20,
+                                "scroll_count_per_target": 2, "gather_run_limit": 50}),
+    "ViewStory": ("ViewStoryAction", {"view_source": "feed", "num_users_to_view_on_feed": 2, "partial_view_enabled": False}),
+    "Unfollow": ("UnfollowAction", {"use_app_manager_queue": True}),
+}
+
+
+class _ScaledTime:
+    """Remplace le module `time` d'un module d'action: sleep() multiplié par `scale`, le reste délégué."""
+
+    def __init__(self, scale):
+        self.scale = scale; self.skipped_sec = 0.0
+
+    def sleep(self, seconds):
+        self.skipped_sec += seconds * (1 - self.scale)
+        if self.scale > 0: time.sleep(seconds * self.scale)
+
+    def __getattr__(self, name): return getattr(time, name)
+
+
+class BenchmarkAppManager:
+    """Interface minimale d'AppManager utilisée par les actions: files en mémoire, pas de DB, appels enregistrés."""
+
+    def __init__(self, driver, settings=None):
+        self.current_settings = dict(settings or {})
+        self.settings = build_settings(self.current_settings, version=1)
+        self.logger = logger
+        self.event_sink = EventSink()
+        self.browser_handler = BrowserHandler(self)
+        self.browser_handler.driver = driver
+        self.follow_queue = [f"bench_user_{i}" for i in range(1, QUEUE_SIZE + 1)]
+        self.unfollow_queue = [f"bench_following_{i}" for i in range(1, QUEUE_SIZE + 1)]
+        self.calls = {} # Méthode -> nombre d'appels (effets de bord de l'action)
+
+    def _record(self, name): self.calls[name] = self.calls.get(name, 0) + 1
+
+    def get_setting(self, key, default=None): return self.settings.get(key, default)
+    def is_excluded(self, item): return False
+    def is_whitelisted(self, item): return False
+    def get_next_user_for_follow(self): return self.follow_queue.pop(0) if self.follow_queue else None
+    def get_next_user_for_unfollow(self): return self.unfollow_queue.pop(0) if self.unfollow_queue else None
+    def mark_user_as_followed(self, username, success=True): self._record(f"mark_user_as_followed:{'ok' if success else 'échec'}")
+    def mark_user_as_unfollowed(self, username, success=True): self._record(f"mark_user_as_unfollowed:{'ok' if success else 'échec'}")
+    def has_liked_post(self, post_id): return False
+    def add_liked_post(self, post_id, like_count=None, comment_count=None): self._record("add_liked_post")
+    def has_viewed_story_recently(self, username, days_limit=1): return False
+    def mark_story_as_viewed(self, username): self._record("mark_story_as_viewed")
+    def update_db_following_back_status(self, username, follows_back_status): self._record("update_db_following_back_status")
+    def start_main_task(self, task_name, task_options): self._record(f"start_main_task:{task_name}"); return True
+    def record_action(self, action_type): self._record(f"record_action:{action_type}")
+
+    def get_db_followed_user_details(self, username):
+        followed_at = datetime.datetime.now() - datetime.timedelta(days=30) # Assez ancien pour passer les filtres de délai
+        return {"username": username, "followed_at_ts": followed_at.timestamp(), "follows_back": False, "status": "followed"}
+
+    def __getattr__(self, name): # Méthode d'AppManager non prévue ici: appel enregistré (visible dans le rapport), sans effet
+        if name.startswith("_"): raise AttributeError(name)
+        def _unhandled(*args, **kwargs): self._record(f"non géré:{name}"); return None
+        return _unhandled
+
+
+def _summarize(values):
+    return {"mean": statistics.fmean(values), "median": statistics.median(values), "max": max(values)} if values else None
+
+
+def run_scenario(name, runs=5, latency=0.0, human_delay_scale=0.0, settings=None):
+    """Exécute `runs` fois l'action du scénario sur un même MockWebDriver. Retourne un dict de résultats."""
+    class_name, options = SCENARIOS[name]
+    try: action_class = load_action_class(class_name)
+    except Exception as e: # Ex: sélecteurs ou module d'action invalides dans cet arbre
+        return {"scenario": name, "error": f"Import {ACTION_CLASS_MODULES[class_name]} impossible: {type(e).__name__}: {e}"}
+
+    driver = MockWebDriver(latency=latency)
+    recorder = DriverCallRecorder() # Attribue les commandes aux méthodes des actions (cf. driver_instrumentation)
+    app_manager = BenchmarkAppManager(instrument_driver(driver, recorder), settings)
+    scaled_time = _ScaledTime(human_delay_scale)
+    patched_modules = [sys.modules[action_class.__module__], importlib.import_module("automation_engine.browser_handler")]
+    original_times = [module.time for module in patched_modules]
+    per_run = []
+    try:
+        for module in patched_modules: module.time = scaled_time
+        for _ in range(runs):
+            driver.reset_counters()
+            started_at = time.perf_counter()
+            try:
+                with recorder.action_context(name): success, message = action_class(app_manager).execute(dict(options))
+            except Exception as e: success, message = False, f"Exception: {type(e).__name__}: {e}"
+            per_run.append({"wall_ms": (time.perf_counter() - started_at) * 1000, "round_trips": driver.round_trips,
+                            "commands": dict(driver.command_counts), "success": bool(success), "message": str(message)[:120]})
+    finally:
+        for module, original_time in zip(patched_modules, original_times): module.time = original_time
+
+    commands_total = {}
+    for run in per_run:
+        for command, count in run["commands"].items(): commands_total[command] = commands_total.get(command, 0) + count
+    return {
+        "scenario": name, "error": None, "runs": len(per_run),
+        "successes": sum(1 for run in per_run if run["success"]),
+        "wall_ms": _summarize([run["wall_ms"] for run in per_run]),
+        "round_trips": _summarize([run["round_trips"] for run in per_run]),
+        "commands_per_run": {command: count / len(per_run) for command, count in sorted(commands_total.items(), key=lambda kv: -kv[1])},
+        "call_sites_per_run": {site.split(" | ", 1)[-1]: group["count"] / len(per_run)
+                               for site, group in list(recorder.snapshot()["by_call_site"].items())[:TOP_CALL_SITES]},
+        "human_delay_skipped_sec": scaled_time.skipped_sec,
+        "app_manager_calls": dict(app_manager.calls),
+        "last_message": per_run[-1]["message"] if per_run else "",
+    }
+
+
+def run_benchmark(scenarios=tuple(SCENARIOS), runs=5, latency=0.0, human_delay_scale=0.0, settings=None):
+    if not LXML_AVAILABLE: logger.error("lxml absent: benchmark des actions impossible (pip install lxml)."); return {}
+    return {name: run_scenario(name, runs, latency, human_delay_scale, settings) for name in scenarios}
+
+
+def format_report(results):
+    lines = []
+    for name, result in results.items():
+        if result["error"]: lines.append(f"== {name}: ÉCHEC - {result['error']}"); continue
+        wall, trips = result["wall_ms"], result["round_trips"]
+        lines.append(f"== {name}: {result['runs']} exécutions, {result['successes']} réussies | "
+                     f"allers-retours/exécution: moy {trips['mean']:.1f}, max {trips['max']} | "
+                     f"temps: moy {wall['mean']:.1f} ms, médiane {wall['median']:.1f} ms, max {wall['max']:.1f} ms")
+        lines.append("   Commandes/exécution: " + ", ".join(f"{command}={count:.1f}" for command, count in result["commands_per_run"].items()))
+        if result["call_sites_per_run"]:
+            lines.append("   Méthodes les plus coûteuses: " + ", ".join(f"{site}={count:.1f}" for site, count in result["call_sites_per_run"].items()))
+        if result["human_delay_skipped_sec"]: lines.append(f"   Pauses humaines ignorées: {result['human_delay_skipped_sec']:.1f} s")
+        lines.append(f"   Dernier résultat: {result['last_message']}")
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    import logging
+    logging.getLogger("MonBotSocialApp").setLevel(logging.WARNING) # Navigations et messages des actions masqués
+
+    parser = argparse.ArgumentParser(description="Benchmark des actions sur MockWebDriver (fixtures HTML).")
+    parser.add_argument("scenarios", nargs="*", default=list(SCENARIOS), help=f"Parmi: {', '.join(SCENARIOS)}")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latence simulée par commande WebDriver")
+    parser.add_argument("--human-delay-scale", type=float, default=0.0, help="Facteur appliqué aux pauses des actions (1 = réel)")
+    parser.add_argument("--json", action="store_true", help="Sortie JSON brute")
+    args = parser.parse_args()
+    unknown_scenarios = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown_scenarios: parser.error(f"Scénarios inconnus: {', '.join(unknown_scenarios)}")
+
+    benchmark_results = run_benchmark(args.scenarios, args.runs, args.latency_ms / 1000, args.human_delay_scale)
+    print(json.dumps(benchmark_results, indent=2, ensure_ascii=False) if args.json else format_report(benchmark_results))
@@ -0,0 +1,252 @@
+# mon_bot_social/automation_engine/action_budget.py
+import os
+import json
+import tempfile
+import datetime
+
+from utils.logger import get_logger
+from utils.clock import system_clock
+
+BUDGET_STATE_FILE = os.path.join("data_files", "action_budgets.json")
+
+# Types d'actions budgétisés (mêmes clés que la table action_stats)
+BUDGET_ACTION_TYPES = ['follows', 'unfollows', 'likes', 'comments', 'story_views', 'dms_sent']
+
+# Tâche du TaskScheduler -> type d'action consommé (les tâches absentes ne sont pas budgétisées)
+TASK_ACTION_TYPES = {
+    "auto_follow": "follows", "follow_single_user": "follows",
+    "auto_unfollow": "unfollows",
+    "auto_like": "likes", "like_latest_post": "likes", "like_single_post": "likes",
+    "auto_comment": "comments",
+    "auto_view_stories": "story_views", "view_single_user_story": "story_views",
+    "auto_send_dm": "dms_sent",
+}
+
+PERIOD_SECONDS = {"hour": 3600, "day": 86400}
+
+
+class TokenBucket:
+    """
+    Seau à jetons: `capacity` jetons max, rechargé en continu de `capacity` par `period_sec`.
+    Avec `reset_at_ts` (quota calendaire), pas de recharge continue: remis à plein à chaque échéance.
+    """
+
+    def __init__(self, capacity, period_sec, tokens=None, last_refill_ts=None, reset_at_ts=None):
+        self.capacity = float(capacity)
+        self.period_sec = period_sec
+        self.reset_at_ts = reset_at_ts
+        self.refill_per_sec = self.capacity / period_sec if period_sec > 0 and reset_at_ts is None else 0.0
+        self.tokens = self.capacity if tokens is None else min(float(tokens), self.capacity)
+        self.last_refill_ts = last_refill_ts
+
+    def refill(self, now_ts):
+        if self.reset_at_ts is not None and now_ts >= self.reset_at_ts:
+            self.tokens = self.capacity
+            periods_elapsed = int((now_ts - self.reset_at_ts) // self.period_sec) + 1
+            self.reset_at_ts += periods_elapsed * self.period_sec
+        elif self.last_refill_ts is not None and now_ts > self.last_refill_ts:
+            self.tokens = min(self.capacity, self.tokens + (now_ts - self.last_refill_ts) * self.refill_per_sec)
+        self.last_refill_ts = now_ts if self.last_refill_ts is None else max(self.last_refill_ts, now_ts)
+
+    def try_take(self, now_ts, amount=1.0):
+        self.refill(now_ts)
+        if self.tokens >= amount: self.tokens -= amount; return True
+        return False
+
+    def give_back(self, amount=1.0):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def seconds_until_available(self, now_ts, amount=1.0):
+        self.refill(now_ts)
+        if self.tokens >= amount: return 0.0
+        if self.reset_at_ts is not None: return self.reset_at_ts - now_ts
+        if self.refill_per_sec <= 0: return None
+        return (amount - self.tokens) / self.refill_per_sec
+
+    def to_dict(self): return {"capacity": self.capacity, "tokens": self.tokens, "last_refill_ts": self.last_refill_ts, "reset_at_ts": self.reset_at_ts}
+
+
+class ActionBudgetManager:
+    """
+    Budgets horaires/journaliers par type d'action.
+    Horaire = seau à jetons (lissage), journalier = quota remis à zéro à minuit (plafond strict du volume).
+    Paramètres: budget_<type>_per_hour / budget_<type>_per_day (0 = illimité).
+    État persisté dans data_files/action_budgets.json; sans état, initialisé depuis les agrégats d'actions
+    (journalier: total du jour, horaire: actions des 60 dernières minutes).
+    """
+
+    def __init__(self, app_manager, clock=None, state_path=BUDGET_STATE_FILE, stats_provider=None, hourly_stats_provider=None):
+        self.app_manager = app_manager
+        self.logger = get_logger("ActionBudget")
+        self.clock = clock or system_clock
+        self.state_path = state_path # None = pas de persistance (simulation)
+        self.stats_provider = stats_provider or self._get_today_stats_from_db
+        self.hourly_stats_provider = hourly_stats_provider or self._get_recent_hourly_stats_from_db # {'AAAA-MM-JJ HH': {type: n}}
+        self.buckets = {} # {action_type: {"hour": TokenBucket, "day": TokenBucket}}
+        self._last_save_ts = 0.0
+        self._dirty = False
+        self.load_config(initial=True)
+
+    def _get_today_stats_from_db(self):
+        from data_layer.database import get_stats_for_period # Import tardif: évite d'ouvrir la DB pour la simulation
+        today = datetime.date.today()
+        return get_stats_for_period(today, today)
+
+    def _get_recent_hourly_stats_from_db(self):
+        from data_layer.database import get_hourly_stats_for_period
+        now = datetime.datetime.fromtimestamp(self.clock.time())
+        return get_hourly_stats_for_period((now - datetime.timedelta(hours=1)).date(), now.date())
+
+    def _used_last_hour(self, hourly_stats, action_type, now_ts):
+        """
+        Actions des 60 dernières minutes d'après les agrégats horaires (heures calendaires, heure locale):
+        heure en cours + part de l'heure précédente encore dans la fenêtre.
+        """
+        now = datetime.datetime.fromtimestamp(now_ts)
+        current_hour = now.replace(minute=0, second=0, microsecond=0)
+        previous_hour = current_hour - datetime.timedelta(hours=1)
+        fraction_in_window = 1 - (now - current_hour).total_seconds() / 3600
+        def count(hour): return (hourly_stats.get(hour.strftime("%Y-%m-%d %H")) or {}).get(action_type, 0) or 0
+        return count(current_hour) + count(previous_hour) * fraction_in_window
+
+    def _load_saved_state(self):
+        if not self.state_path or not os.path.exists(self.state_path): return {}
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f: data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception as e:
+            self.logger.error(f"Erreur lecture état budgets {self.state_path}: {e}"); return {}
+
+    def _next_midnight_ts(self, now_ts):
+        tomorrow = datetime.date.fromtimestamp(now_ts) + datetime.timedelta(days=1)
+        return datetime.datetime.combine(tomorrow, datetime.time()).timestamp()
+
+    def _new_bucket(self, period, limit, now_ts, tokens=None, last_refill_ts=None, reset_at_ts=None):
+        if period == "day":
+            return TokenBucket(limit, PERIOD_SECONDS[period], tokens=tokens, last_refill_ts=last_refill_ts or now_ts,
+                               reset_at_ts=reset_at_ts or self._next_midnight_ts(now_ts))
+        return TokenBucket(limit, PERIOD_SECONDS[period], tokens=tokens, last_refill_ts=last_refill_ts or now_ts)
+
+    def load_config(self, initial=False):
+        """(Re)construit les seaux à partir des paramètres, en conservant les jetons restants."""
+        now_ts = self.clock.time()
+        saved_state = self._load_saved_state().get("buckets", {}) if initial else {}
+        today_stats = hourly_stats = None
+        new_buckets = {}
+
+        for action_type in BUDGET_ACTION_TYPES:
+            for period in PERIOD_SECONDS:
+                limit = self.app_manager.get_setting(f"budget_{action_type}_per_{period}", 0) or 0
+                if limit <= 0: continue # Illimité
+
+                previous = self.buckets.get(action_type, {}).get(period)
+                saved = saved_state.get(action_type, {}).get(period)
+                if previous: # Changement de config: garder la consommation, borner à la nouvelle capacité
+                    previous.refill(now_ts)
+                    bucket = self._new_bucket(period, limit, now_ts, tokens=previous.tokens - previous.capacity + limit, reset_at_ts=previous.reset_at_ts)
+                elif saved: # Redémarrage: reprendre l'état persisté (recharge/remise à zéro rattrapée par refill)
+                    bucket = self._new_bucket(period, limit, now_ts, tokens=saved.get("tokens", limit) - saved.get("capacity", limit) + limit,
+                                              last_refill_ts=saved.get("last_refill_ts"), reset_at_ts=saved.get("reset_at_ts"))
+                    bucket.refill(now_ts)
+                elif period == "day": # Première fois: partir de ce qui a déjà été consommé aujourd'hui
+                    if today_stats is None:
+                        try: today_stats = self.stats_provider() or {}
+                        except Exception as e_stats: self.logger.error(f"Erreur lecture des stats du jour pour budgets: {e_stats}"); today_stats = {}
+                    used_today = today_stats.get(action_type, 0) or 0
+                    bucket = self._new_bucket(period, limit, now_ts, tokens=max(0, limit - used_today))
+                else: # Première fois: déduire les actions de la dernière heure (agrégats horaires)
+                    if hourly_stats is None:
+                        try: hourly_stats = self.hourly_stats_provider() or {}
+                        except Exception as e_stats: self.logger.error(f"Erreur lecture agrégats horaires pour budgets: {e_stats}"); hourly_stats = {}
+                    bucket = self._new_bucket(period, limit, now_ts, tokens=max(0.0, limit - self._used_last_hour(hourly_stats, action_type, now_ts)))
+                bucket.tokens = max(0.0, bucket.tokens)
+                new_buckets.setdefault(action_type, {})[period] = bucket
+
+        self.buckets = new_buckets
+        if new_buckets: self.logger.info(f"Budgets d'actions actifs: {self._describe_limits()}")
+        self._dirty = True
+
+    def _describe_limits(self):
+        return ", ".join(f"{t}=" + "/".join(f"{int(b.capacity)}/{p[0]}" for p, b in periods.items()) for t, periods in self.buckets.items())
+
+    @staticmethod
+    def action_type_for_task(task_name): return TASK_ACTION_TYPES.get(task_name)
+
+    def try_consume(self, task_name):
+        """
+        Prélève un jeton (horaire et journalier) pour la tâche.
+        Retourne (True, None) si autorisé, sinon (False, timestamp de disponibilité ou None).
+        """
+        action_type = self.action_type_for_task(task_name)
+        periods = self.buckets.get(action_type)
+        if not periods: return True, None
+
+        now_ts = self.clock.time()
+        waits = [bucket.seconds_until_available(now_ts) for bucket in periods.values()]
+        if any(w is None for w in waits): return False, None
+        wait_sec = max(waits)
+        if wait_sec > 0: return False, now_ts + wait_sec
+
+        for bucket in periods.values(): bucket.try_take(now_ts)
+        self._dirty = True; self.save_state()
+        return True, None
+
+    def refund(self, task_name):
+        """Rend le jeton d'une action qui n'a finalement rien fait (file vide, navigateur absent...)."""
+        periods = self.buckets.get(self.action_type_for_task(task_name))
+        if not periods: return
+        for bucket in periods.values(): bucket.give_back()
+        self._dirty = True; self.save_state()
+
+    def get_remaining(self):
+        """{type: {"hour": (restant, limite), "day": (restant, limite)}} pour l'UI. Types illimités absents."""
+        now_ts = self.clock.time(); remaining = {}
+        for action_type, periods in self.buckets.items():
+            for period, bucket in periods.items():
+                bucket.refill(now_ts)
+                remaining.setdefault(action_type, {})[period] = (int(bucket.tokens), int(bucket.capacity))
+        return remaining
+
+    def save_state(self, force=False):
+        """Sauvegarde l'état des seaux (au plus toutes les 30s, sauf force=True). Fichier temporaire + os.replace: jamais d'état tronqué."""
+        if not self.state_path or not self._dirty: return
+        now_ts = self.clock.time()
+        if not force and now_ts - self._last_save_ts < 30: return
+        data = {"saved_at": now_ts, "buckets": {t: {p: b.to_dict() for p, b in periods.items()} for t, periods in self.buckets.items()}}
+        directory = os.path.dirname(self.state_path) or "."
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix=".action_budgets-", suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f: json.dump(data, f, indent=2)
+                os.replace(temp_path, self.state_path)
+            except BaseException:
+                if os.path.exists(temp_path): os.remove(temp_path)
+                raise
+            self._last_save_ts = now_ts; self._dirty = False
+        except Exception as e:
+            self.logger.error(f"Erreur sauvegarde état budgets {self.state_path}: {e}")
+
+    def on_settings_updated(self):
+        self.load_config()
+        self.save_state(force=True)
+
+
+if __name__ == '__main__':
+    from utils.clock import SimulatedClock
+
+    class MockAppManager:
+        current_settings = {"budget_follows_per_hour": 10, "budget_follows_per_day": 50}
+        def get_setting(self, key, default=None): return self.current_settings.get(key, default)
+
+    clock = SimulatedClock(start_ts=0)
+    hour_key = datetime.datetime.fromtimestamp(clock.time()).strftime("%Y-%m-%d %H")
+    budgets = ActionBudgetManager(MockAppManager(), clock=clock, state_path=None, stats_provider=lambda: {"follows": 45},
+                                  hourly_stats_provider=lambda: {hour_key: {"follows": 8}})
+    print(f"Départ (8 follows dans l'heure, 45 aujourd'hui): {budgets.get_remaining()}")
+    allowed = 0
+    for _ in range(20):
+        ok, retry_ts = budgets.try_consume("auto_follow")
+        if ok: allowed += 1
+        else: print(f"Budget épuisé après {allowed} follows, prochain jeton dans {retry_ts - clock.time():.0f}s"); break
+    print(f"Restant: {budgets.get_remaining()}")
@@ -130,7 +130,7 @@ class CommentAction:
             comment_area.click(); time.sleep(0.3)
             comment_area.clear() # Peut être nécessaire
             comment_area.send_keys(comment_text)
-            self.logger.debug(f"Commentaire saisi: '{comment_text[:30]}...'")
+            self.logger.debug("Commentaire saisi: '%s...'", comment_text[:30])
             time.sleep(random.uniform(1.0, 2.0))
 
             # Trouver et cliquer sur "Post" (bouton souvent HORS du post_element, donc self.driver)
@@ -43,22 +43,19 @@ class DirectMessageAction:
         
         try:
             # Étape 1: S'assurer d'être sur le profil de l'utilisateur
-            profile_url = f"https://www.instagram.com/{username}/"
-            if not self.driver.current_url.replace("www.","").startswith(profile_url.replace("www.","")):
-                self.logger.debug(f"DM: Navigation vers profil {username}")
-                if not self.app_manager.browser_handler.navigate_to(profile_url):
-                    return False, f"Échec navigation profil {username} pour DM."
-                time.sleep(random.uniform(2.5, 4.0)) # Attente chargement profil
+            # (Réutilise la page si un Follow vient d'être fait sur ce même profil)
+            if not self.app_manager.browser_handler.ensure_on_profile(username, settle_delay=(2.5, 4.0)):
+                return False, f"Échec navigation profil {username} pour DM."
             
             # Étape 2: Cliquer sur le bouton "Message" sur le profil
-            self.logger.debug(f"DM: Recherche bouton 'Message' pour {username}")
+            self.logger.debug("DM: Recherche bouton 'Message' pour %s", username)
             message_button = WebDriverWait(self.driver, 10).until(
                  EC.element_to_be_clickable((By.XPATH, ProfilePageLocators.MESSAGE_BUTTON_XPATH))
             )
             self.driver.execute_script("arguments[0].scrollIntoViewIfNeeded(true);", message_button) # Assurer visibilité
             time.sleep(0.5)
             message_button.click()
-            self.logger.debug(f"DM: Clic sur bouton 'Message'. Attente chargement interface DM...")
+            self.logger.debug("DM: Clic sur bouton 'Message'. Attente chargement interface DM...")
             # Attente que l'interface DM (souvent une modale ou une nouvelle section) se charge.
             # C'est crucial et peut nécessiter une attente spécifique à un élément de l'interface DM.
             # Par exemple, attendre que le champ de saisie devienne visible.
@@ -77,7 +74,7 @@ class DirectMessageAction:
             time.sleep(0.3)
             message_input.clear() # Optionnel, mais bien si champ pré-rempli
             message_input.send_keys(message_to_send)
-            self.logger.debug(f"DM: Message saisi.")
+            self.logger.debug("DM: Message saisi.")
             time.sleep(random.uniform(0.8, 1.8)) # Simuler frappe
 
             # Étape 4: Trouver et cliquer sur le bouton "Envoyer"
@@ -21,6 +21,7 @@ class FollowAction:
         self.app_manager = app_manager
         self.driver = None
         self.logger = self.app_manager.logger
+        self.settings = app_manager.settings # Remplacé par TaskScheduler avant chaque exécution
 
     def _check_if_already_following_or_requested(self, timeout=2):
         """Vérifie si le bouton indique 'Following' ou 'Requested'."""
@@ -71,15 +72,16 @@ class FollowAction:
                        'has_profile_pic': True, 'follows_me': False, 'i_am_following': False}
 
         profile_url = f"https://www.instagram.com/{username}/"
-        # Vérifier si on est déjà sur la page avant de naviguer pour éviter rechargement inutile
-        # Si on navigue, l'attente est dans navigate_to
-        if not self.driver.current_url.replace("www.","").startswith(profile_url.replace("www.","")):
-            if not self.app_manager.browser_handler.navigate_to(profile_url):
-                self.logger.error(f"Échec navigation vers {profile_url} pour scraping infos.")
-                return None # Échec critique de navigation
-            time.sleep(random.uniform(2.5, 4.5)) # Pause post-navigation pour chargement dynamique
-        else:
-            self.logger.debug(f"Déjà sur le profil de {username} pour scraping.")
+        browser_handler = self.app_manager.browser_handler
+        page_key = browser_handler.profile_page_key(username)
+        # Réutiliser la page déjà chargée (et ce qui en a déjà été extrait) pour éviter rechargement inutile
+        if not browser_handler.ensure_on_profile(username, settle_delay=(2.5, 4.5)):
+            self.logger.error(f"Échec navigation vers {profile_url} pour scraping infos.")
+            return None # Échec critique de navigation
+        cached_info = browser_handler.page_state.get('follow_profile_info', logical_page=page_key)
+        if cached_info is not None:
+            self.logger.debug("Infos profil de %s déjà extraites de la page courante, réutilisation.", username)
+            return dict(cached_info)
 
         try:
             wait = WebDriverWait(self.driver, 5) # Attente par défaut pour les éléments principaux
@@ -87,8 +89,8 @@ class FollowAction:
             # Check Profil Privé (souvent visible même si la page ne charge pas complètement)
             try:
                 private_indicators = self.driver.find_elements(By.XPATH, ProfilePageLocators.PRIVATE_ACCOUNT_INDICATOR_XPATH)
-                if private_indicators: profile_info['is_private'] = True; self.logger.debug(f"{username} est privé.")
-            except Exception as e_priv: self.logger.debug(f"Erreur check profil privé pour {username}: {e_priv} (continuant).")
+                if private_indicators: profile_info['is_private'] = True; self.logger.debug("%s est privé.", username)
+            except Exception as e_priv: self.logger.debug("Erreur check profil privé pour %s: %s (continuant).", username, e_priv)
 
             # Check Photo Profil (avant de scraper le reste au cas où la page est limitée)
             try:
@@ -99,19 +101,19 @@ class FollowAction:
                                 ProfilePageLocators.DEFAULT_PROFILE_PIC_SRC_SUBSTRING_2,
                                 ProfilePageLocators.DEFAULT_PROFILE_PIC_SRC_SUBSTRING_3]
                 if pic_src and any(sub in pic_src for sub in default_subs if sub): # Si sub est non vide
-                    profile_info['has_profile_pic'] = False; self.logger.debug(f"Photo profil par défaut pour {username}.")
+                    profile_info['has_profile_pic'] = False; self.logger.debug("Photo profil par défaut pour %s.", username)
             except (TimeoutException, NoSuchElementException) as e_pic: self.logger.warning(f"Vérification photo profil {username} échouée: {e_pic}")
 
             # Check "Follows You" et "I Am Following" (si la page n'est pas privée)
             if not profile_info['is_private']:
                 try:
                     if self.driver.find_elements(By.XPATH, ProfilePageLocators.FOLLOWS_YOU_INDICATOR_XPATH):
-                        profile_info['follows_me'] = True; self.logger.debug(f"{username} suit le bot.")
+                        profile_info['follows_me'] = True; self.logger.debug("%s suit le bot.", username)
                 except: pass # Pas critique
                 try:
                     if self.driver.find_elements(By.XPATH, ProfilePageLocators.CURRENTLY_FOLLOWING_BUTTON_XPATH) or \
                        self.driver.find_elements(By.XPATH, ProfilePageLocators.REQUESTED_BUTTON_XPATH):
-                        profile_info['i_am_following'] = True; self.logger.debug(f"Le bot suit déjà {username} ou a demandé.")
+                        profile_info['i_am_following'] = True; self.logger.debug("Le bot suit déjà %s ou a demandé.", username)
                 except: pass # Pas critique
 
             # Scraper le reste seulement si public ou si on doit le faire
@@ -120,48 +122,59 @@ class FollowAction:
                 try:
                     post_count_el = wait.until(EC.visibility_of_element_located((By.XPATH, ProfilePageLocators.POST_COUNT_VALUE_XPATH)))
                     profile_info['post_count'] = self._parse_count_string(post_count_el.text or post_count_el.get_attribute("title"))
-                    self.logger.debug(f"Posts {username}: {profile_info['post_count']}")
-                except: self.logger.debug(f"Posts non trouvés pour {username}")
+                    self.logger.debug("Posts %s: %s", username, profile_info['post_count'])
+                except: self.logger.debug("Posts non trouvés pour %s", username)
                 # Followers
                 try:
                     follower_el = wait.until(EC.visibility_of_element_located((By.XPATH, ProfilePageLocators.FOLLOWERS_COUNT_VALUE_XPATH)))
                     profile_info['follower_count'] = self._parse_count_string(follower_el.get_attribute("title") or follower_el.text)
-                    self.logger.debug(f"Followers {username}: {profile_info['follower_count']}")
-                except: self.logger.debug(f"Followers non trouvés pour {username}")
+                    self.logger.debug("Followers %s: %s", username, profile_info['follower_count'])
+                except: self.logger.debug("Followers non trouvés pour %s", username)
                 # Following
                 try:
                     following_el = wait.until(EC.visibility_of_element_located((By.XPATH, ProfilePageLocators.FOLLOWING_COUNT_VALUE_XPATH)))
                     profile_info['following_count'] = self._parse_count_string(following_el.get_attribute("title") or following_el.text)
-                    self.logger.debug(f"Following {username}: {profile_info['following_count']}")
-                except: self.logger.debug(f"Following non trouvés pour {username}")
+                    self.logger.debug("Following %s: %s", username, profile_info['following_count'])
+                except: self.logger.debug("Following non trouvés pour %s", username)
                 # Bio
                 try:
                     bio_el = self.driver.find_element(By.XPATH, ProfilePageLocators.BIO_TEXT_XPATH)
                     profile_info['bio'] = bio_el.text.lower() if bio_el.text else ""
-                except: self.logger.debug(f"Bio non trouvée pour {username}")
+                except: self.logger.debug("Bio non trouvée pour %s", username)
                 # Type Profil
                 try:
                     if self.driver.find_elements(By.XPATH, ProfilePageLocators.BUSINESS_CATEGORY_TEXT_XPATH) or \
                        self.driver.find_elements(By.XPATH, ProfilePageLocators.BUSINESS_ACTION_BUTTON_XPATH):
-                        profile_info['is_business'] = True; self.logger.debug(f"Compte Pro/Créateur détecté pour {username}.")
+                        profile_info['is_business'] = True; self.logger.debug("Compte Pro/Créateur détecté pour %s.", username)
                 except: pass
                 # Story Active
                 try:
                     if self.driver.find_elements(By.XPATH, ProfilePageLocators.ACTIVE_STORY_RING_ON_PROFILE_XPATH):
-                        profile_info['has_active_story'] = True; self.logger.debug(f"Story active détectée pour {username}.")
+                        profile_info['has_active_story'] = True; self.logger.debug("Story active détectée pour %s.", username)
                 except: pass
                 # Date Dernier Post
-                if self.app_manager.get_setting("filter_max_days_last_post", 0) > 0:
-                    try:
-                        first_post_link_el = wait.until(EC.presence_of_element_located((By.XPATH, ProfilePageLocators.FIRST_POST_THUMBNAIL_ON_PROFILE_XPATH)))
-                        first_post_url = first_post_link_el.get_attribute('href')
-                        if self.app_manager.browser_handler.navigate_to(first_post_url):
-                             time.sleep(random.uniform(2,3)); ts_el = wait.until(EC.presence_of_element_located((By.XPATH, PostLocators.POST_TIMESTAMP_XPATH)))
-                             dt_str = ts_el.get_attribute('datetime'); profile_info['last_post_date'] = datetime.datetime.fromisoformat(dt_str.replace('Z','+00:00'))
-                             self.logger.debug(f"Date dernier post {username}: {profile_info['last_post_date']}")
-                             self.app_manager.browser_handler.navigate_to(profile_url); time.sleep(random.uniform(1,2)) # Retour
-                    except Exception as e_lp: self.logger.warning(f"Échec récupération date dernier post {username}: {e_lp}")
-
+                if self.settings.follow_filters.max_days_last_post > 0:
+                    if browser_handler.page_state.get('last_post_date', logical_page=page_key) is not None: # Déjà récupérée (ex: par Unfollow); un échec (None) est retenté
+                        profile_info['last_post_date'] = browser_handler.page_state.get('last_post_date', logical_page=page_key)
+                    else:
+                        try:
+                            first_post_link_el = wait.until(EC.presence_of_element_located((By.XPATH, ProfilePageLocators.FIRST_POST_THUMBNAIL_ON_PROFILE_XPATH)))
+                            first_post_url = first_post_link_el.get_attribute('href')
+                            if browser_handler.navigate_to(first_post_url):
+                                 time.sleep(random.uniform(2,3)); ts_el = wait.until(EC.presence_of_element_located((By.XPATH, PostLocators.POST_TIMESTAMP_XPATH)))
+                                 dt_str = ts_el.get_attribute('datetime'); profile_info['last_post_date'] = datetime.datetime.fromisoformat(dt_str.replace('Z','+00:00'))
+                                 self.logger.debug("Date dernier post %s: %s", username, profile_info['last_post_date'])
+                                 browser_handler.navigate_to(profile_url, logical_page=page_key); time.sleep(random.uniform(1,2)) # Retour
+                        except Exception as e_lp: self.logger.warning(f"Échec récupération date dernier post {username}: {e_lp}")
+
+            # Mémoriser l'extraction pour les étapes suivantes sur ce même profil (follow, DM, unfollow)
+            browser_handler.page_state.update({
+                'follow_profile_info': dict(profile_info),
+                'is_private': profile_info['is_private'], 'follows_me': profile_info['follows_me'],
+                'i_am_following': profile_info['i_am_following'],
+                'follower_count': profile_info['follower_count'], 'following_count': profile_info['following_count'],
+                'last_post_date': profile_info['last_post_date'],
+            }, logical_page=page_key)
             return profile_info
         except Exception as e_global:
             self.logger.error(f"Erreur globale scraping infos {username}: {e_global}", exc_info=True)
@@ -169,24 +182,24 @@ class FollowAction:
 
 
     def _apply_user_filters(self, username, profile_info):
-        settings = self.app_manager.current_settings; logger = self.logger # Utiliser le logger de l'action
+        filters = self.settings.follow_filters; logger = self.logger # Instantané typé (valeurs validées)
         
         # 0. Whitelist / Exclusion
         if self.app_manager.is_whitelisted(username): return False, "Protégé par whitelist"
         if self.app_manager.is_excluded(username): return False, "Exclu globalement"
         
         # 1. Filtres Relation
-        if settings.get("filter_skip_followers", False) and profile_info.get('follows_me'):
+        if filters.skip_followers and profile_info.get('follows_me'):
              return False, "Vous suit déjà"
-        if settings.get("filter_skip_following", True) and profile_info.get('i_am_following'):
+        if filters.skip_following and profile_info.get('i_am_following'):
              return False, "Déjà suivi par le bot"
 
         # 2. Filtres basiques Profil
-        if settings.get("filter_skip_no_profile_pic", True) and not profile_info.get('has_profile_pic'):
+        if filters.skip_no_profile_pic and not profile_info.get('has_profile_pic'):
              return False, "Pas de photo de profil personnalisée"
-        if settings.get("filter_skip_private", False) and profile_info.get('is_private'):
+        if filters.skip_private and profile_info.get('is_private'):
              return False, "Profil privé (ignorer)"
-        if settings.get("filter_only_private", False) and not profile_info.get('is_private'):
+        if filters.only_private and not profile_info.get('is_private'):
              return False, "Profil public (seulement privés demandé)"
 
         # Si profil privé et on continue (ex: only_private=True ou skip_private=False), 
@@ -195,28 +208,28 @@ class FollowAction:
         is_private_scraped = profile_info.get('is_private', False)
         can_apply_public_filters = not is_private_scraped
         
-        if not can_apply_public_filters and settings.get("filter_only_private", False):
-            logger.debug(f"{username} est privé et 'only_private' est actif. Passe les filtres publics par défaut.")
+        if not can_apply_public_filters and filters.only_private:
+            logger.debug("%s est privé et 'only_private' est actif. Passe les filtres publics par défaut.", username)
         elif not can_apply_public_filters:
              # Cas où on suit des privés mais certains filtres publics pourraient être actifs.
              # Par prudence, on skippe si des filtres stricts sont en place.
              # Par exemple, si min_posts > 0, on ne peut pas le vérifier sur un privé.
-             if settings.get("filter_min_posts", 0) > 0 or settings.get("filter_min_followers", 0) > 0: # etc.
+             if filters.min_posts > 0 or filters.min_followers > 0: # etc.
                   logger.info(f"Filtre: {username} privé, impossible de vérifier les stats (filtres stricts actifs). Skip.")
                   return False, "Privé, stats non vérifiables"
         
         # Appliquer les filtres si le profil est public (ou si on décide qu'ils ne s'appliquent pas aux privés)
         if can_apply_public_filters:
             # Type de profil
-            pt_filter = settings.get("filter_profile_type", "Tous types")
+            pt_filter = filters.profile_type
             is_biz = profile_info.get('is_business') # True, False, ou None
             if pt_filter == "Personnel Seulement" and is_biz: return False, "Compte Pro (requis Perso)"
             if pt_filter == "Professionnel Seulement" and not is_biz: return False, "Compte Perso (requis Pro)"
             # Story Active
-            if settings.get("filter_must_have_story", False) and not profile_info.get('has_active_story'): return False, "Pas de story active (requis)"
+            if filters.must_have_story and not profile_info.get('has_active_story'): return False, "Pas de story active (requis)"
             
             # Posts
-            pc = profile_info.get('post_count'); min_p = settings.get("filter_min_posts",0); max_p = settings.get("filter_max_posts",0)
+            pc = profile_info.get('post_count'); min_p = filters.min_posts; max_p = filters.max_posts
             if pc is not None:
                 if pc < min_p: return False, f"Posts ({pc}) < Min ({min_p})"
                 if max_p > 0 and pc > max_p: return False, f"Posts ({pc}) > Max ({max_p})"
@@ -224,9 +237,9 @@ class FollowAction:
 
             # Followers / Following / Ratio
             fols = profile_info.get('follower_count'); foling = profile_info.get('following_count')
-            min_fols=settings.get("filter_min_followers",0); max_fols=settings.get("filter_max_followers",0)
-            min_foling=settings.get("filter_min_following",0); max_foling=settings.get("filter_max_following",0)
-            min_r=settings.get("filter_min_ratio",0.0); max_r=settings.get("filter_max_ratio",0.0)
+            min_fols=filters.min_followers; max_fols=filters.max_followers
+            min_foling=filters.min_following; max_foling=filters.max_following
+            min_r=filters.min_ratio; max_r=filters.max_ratio
             if fols is not None:
                 if fols < min_fols: return False, f"Followers ({fols}) < Min ({min_fols})"
                 if max_fols > 0 and fols > max_fols: return False, f"Followers ({fols}) > Max ({max_fols})"
@@ -242,20 +255,16 @@ class FollowAction:
             elif (min_r > 0 or max_r > 0) and (fols is None or foling is None): return False, "Ratio inconnu (filtre actif)"
 
             # Date dernier post
-            lpd = profile_info.get('last_post_date'); max_days_lp = settings.get("filter_max_days_last_post",0)
+            lpd = profile_info.get('last_post_date'); max_days_lp = filters.max_days_last_post
             if max_days_lp > 0 and lpd:
                 days_since_lp = (datetime.datetime.now(datetime.timezone.utc) - lpd).days
                 if days_since_lp > max_days_lp: return False, f"Dernier post > {max_days_lp} jours ({days_since_lp}j)"
             elif max_days_lp > 0 and not lpd: return False, "Date dernier post inconnue (filtre actif)"
             
             # Bio Keywords
-            bio = profile_info.get('bio',""); inc_kw_str=settings.get("filter_bio_keywords_include",""); exc_kw_str=settings.get("filter_bio_keywords_exclude","")
-            if inc_kw_str:
-                inc_kws = [kw.strip().lower() for kw in inc_kw_str.split(',') if kw.strip()]
-                if inc_kws and not any(re.search(r'\b'+re.escape(kw)+r'\b', bio) for kw in inc_kws): return False, "Bio manque mots-clés requis"
-            if exc_kw_str:
-                exc_kws = [kw.strip().lower() for kw in exc_kw_str.split(',') if kw.strip()]
-                if exc_kws and any(re.search(r'\b'+re.escape(kw)+r'\b', bio) for kw in exc_kws): return False, "Bio contient mot-clé exclu"
+            bio = profile_info.get('bio',"") # Motifs pré-compilés une fois par version des settings
+            if filters.bio_include_patterns and not any(p.search(bio) for p in filters.bio_include_patterns): return False, "Bio manque mots-clés requis"
+            if filters.bio_exclude_patterns and any(p.search(bio) for p in filters.bio_exclude_patterns): return False, "Bio contient mot-clé exclu"
 
         logger.info(f"{username} passe tous les filtres User.")
         return True, "Passe filtres"
@@ -280,11 +289,10 @@ class FollowAction:
         self.logger.info(f"FollowAction: Traitement de '{target_user_to_follow}'.")
 
         # --- Navigation & Scraping Infos Profil pour Filtres ---
-        profile_url = f"https://www.instagram.com/{target_user_to_follow}/"
-        if not self.driver.current_url.replace("www.","").startswith(profile_url.replace("www.","")):
-             if not self.app_manager.browser_handler.navigate_to(profile_url):
-                 self.app_manager.mark_user_as_followed(target_user_to_follow, success=False); return False, f"Échec navigation {target_user_to_follow}."
-             time.sleep(random.uniform(2, 4)) # Laisse le temps de charger un minimum
+        browser_handler = self.app_manager.browser_handler
+        page_key = browser_handler.profile_page_key(target_user_to_follow)
+        if not browser_handler.ensure_on_profile(target_user_to_follow, settle_delay=(2, 4)): # Laisse le temps de charger un minimum
+             self.app_manager.mark_user_as_followed(target_user_to_follow, success=False); return False, f"Échec navigation {target_user_to_follow}."
         
         # Check si la page est une page d'erreur
         page_title_lower = self.driver.title.lower()
@@ -330,6 +338,9 @@ class FollowAction:
                  msg = f"'{target_user_to_follow}' suivi avec succès."
                  self.logger.info(f"FollowAction: {msg}")
                  self.app_manager.mark_user_as_followed(target_user_to_follow, success=True)
+                 # L'état de relation a changé : mettre à jour la page mémorisée (le DM éventuel la réutilise)
+                 browser_handler.page_state.invalidate('follow_profile_info', logical_page=page_key)
+                 browser_handler.page_state.set('i_am_following', True, logical_page=page_key)
                  # --- Déclencher DM si configuré (ici car c'est un succès réel) ---
                  if self.app_manager.get_setting("dm_after_follow_enabled", False):
                       # ... (logique pour get dm_texts, choisir un, start_main_task("auto_send_dm") comme avant)
@@ -21,13 +21,13 @@ class GatherAction:
     def _scroll_page(self, times=1):
         """Fait défiler la page pour charger plus de contenu."""
         if not self.driver: return
-        self.logger.debug(f"Défilement de la page ({times} fois)...")
+        self.logger.debug("Défilement de la page (%s fois)...", times)
         for i in range(times):
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
             # Une pause un peu plus longue et plus variable peut être nécessaire
             # pour que le nouveau contenu (surtout les images/vidéos) se charge réellement
             time.sleep(random.uniform(2.5, 4.5)) 
-            self.logger.debug(f"Scroll {i+1}/{times} effectué.")
+            self.logger.debug("Scroll %s/%s effectué.", i+1, times)
 
     def _extract_usernames_from_visible_posts(self, source_type="hashtag"):
         """
@@ -62,7 +62,7 @@ class GatherAction:
             )
             
             post_elements = self.driver.find_elements(By.XPATH, post_container_xpath)
-            self.logger.debug(f"Extraction: Trouvé {len(post_elements)} conteneurs de posts potentiels.")
+            self.logger.debug("Extraction: Trouvé %s conteneurs de posts potentiels.", len(post_elements))
 
             for post_el in post_elements:
                 username = None
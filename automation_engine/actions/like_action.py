@@ -46,6 +46,7 @@ class LikeAction:
         self.app_manager = app_manager
         self.driver = None
         self.logger = self.app_manager.logger
+        self.settings = app_manager.settings # Remplacé par TaskScheduler avant chaque exécution
         self.liked_this_session_count = 0 # Total de likes pour CETTE exécution de la tâche Auto-Like
 
     def _get_post_id_from_element_or_url(self, post_element=None):
@@ -137,21 +138,15 @@ class LikeAction:
 
 
     def _apply_like_filters(self, post_element, post_id, post_owner=None):
-        settings = self.app_manager.current_settings; logger = self.logger
+        filters = self.settings.like_filters; logger = self.logger
         if self.app_manager.is_excluded(post_owner): return False, f"Auteur '{post_owner}' exclu"
-        if settings.get("like_filter_skip_sponsored", True) and self._is_post_sponsored(post_element):
+        if filters.skip_sponsored and self._is_post_sponsored(post_element):
              return False, "Post sponsorisé"
         
-        include_kws_str = settings.get("like_filter_caption_include", "")
-        exclude_kws_str = settings.get("like_filter_caption_exclude", "")
-        if include_kws_str or exclude_kws_str:
+        if filters.caption_include_patterns or filters.caption_exclude_patterns: # Motifs pré-compilés une fois par version des settings
              caption = self._extract_post_caption(post_element)
-             if include_kws_str:
-                 include_kws = [kw.strip().lower() for kw in include_kws_str.split(',') if kw.strip()]
-                 if include_kws and not any(re.search(r'\b'+re.escape(kw)+r'\b', caption) for kw in include_kws): return False, "Manque mot-clé requis (légende)"
-             if exclude_kws_str:
-                 exclude_kws = [kw.strip().lower() for kw in exclude_kws_str.split(',') if kw.strip()]
-                 if exclude_kws and any(re.search(r'\b'+re.escape(kw)+r'\b', caption) for kw in exclude_kws): return False, "Contient mot-clé exclu (légende)"
+             if filters.caption_include_patterns and not any(p.search(caption) for p in filters.caption_include_patterns): return False, "Manque mot-clé requis (légende)"
+             if filters.caption_exclude_patterns and any(p.search(caption) for p in filters.caption_exclude_patterns): return False, "Contient mot-clé exclu (légende)"
         # Ajouter ici filtres d'âge de post / nb de likes existants si implémentés
         return True, "Passe filtres Like"
 
@@ -221,7 +216,7 @@ class LikeAction:
                         self.app_manager.add_liked_post(post_id, like_c_before, comm_c_before)
                         liked_count_this_run += 1; self.liked_this_session_count += 1; found_actionable_post = True
                         action_results.append({'post_id': post_id, 'owner': post_owner, 'status': 'liked', 'l_count': like_c_before, 'c_count': comm_c_before})
-                        time.sleep(self.app_manager.get_setting("like_delay_min", 5)) # Utiliser le délai global ici
+                        time.sleep(self.settings.delays.ranges["like"].min_sec) # Utiliser le délai global ici
                     elif status == "already_liked": self.app_manager.add_liked_post(post_id, like_c_before, comm_c_before)
                     elif status == "blocked": return False, action_results # Arrêter immédiatement si blocage
                 except StaleElementReferenceException: continue
@@ -287,7 +282,7 @@ class LikeAction:
                 # overall_success &= success # Ne pas mettre False si juste aucun post trouvé pour un user
                 users_processed_count += 1
                 if "posts likés pour" in (results[0].get('message') if results and isinstance(results,list) and results[0].get('message') else "") : # Approximatif
-                    time.sleep(self.app_manager.get_setting("delay_between_users_like", 15))
+                    time.sleep(self.settings.delays.delay_between_users_like)
             final_summary_message = f"{len(combined_results)} likes sur {users_processed_count} profils."
         elif like_source == "location":
             location_target = options.get('location_target')
@@ -20,6 +20,7 @@ class UnfollowAction:
         self.app_manager = app_manager
         self.driver = None
         self.logger = self.app_manager.logger
+        self.settings = app_manager.settings # Remplacé par TaskScheduler avant chaque exécution
 
     def _check_if_still_following(self, timeout=2):
         """Vérifie si le bouton "Following" ou "Requested" est présent."""
@@ -53,61 +54,80 @@ class UnfollowAction:
         self.logger.info(f"Récupération infos (A:{check_activity}, Cts:{check_counts_for_ratio}, ProtFol:{check_min_followers_to_protect}) pour unfollow de {username}...")
         profile_info = {'last_post_date': None, 'follower_count': None, 'following_count': None, 'is_private': False}
         
-        settings = self.app_manager.current_settings
-        needs_activity_check = check_activity and settings.get("unfollow_inactive_days_threshold", 0) > 0
-        needs_ratio_check = check_counts_for_ratio and (settings.get("unfollow_filter_ratio_min", 0.0) > 0 or settings.get("unfollow_filter_ratio_max", 0.0) > 0)
+        filters = self.settings.unfollow_filters
+        browser_handler = self.app_manager.browser_handler
+        page_key = browser_handler.profile_page_key(username)
+        page_state = browser_handler.page_state
+        needs_activity_check = check_activity and filters.inactive_days_threshold > 0
+        needs_ratio_check = check_counts_for_ratio and (filters.ratio_min > 0 or filters.ratio_max > 0)
         needs_follower_protect_check = check_min_followers_to_protect > 0
         needs_counts_for_any_reason = needs_ratio_check or needs_follower_protect_check
 
         if not needs_activity_check and not needs_counts_for_any_reason:
-            self.logger.debug(f"Pas de scraping d'infos publiques requis pour {username} (filtres inactifs).")
+            self.logger.debug("Pas de scraping d'infos publiques requis pour %s (filtres inactifs).", username)
             # On a quand même besoin de savoir si le profil est privé pour la logique `_check_follows_you_status`
             # et pour savoir si on peut scraper la date du dernier post si `check_activity` est True mais le filtre est à 0
-            profile_url_temp = f"https://www.instagram.com/{username}/" # Pas de navigation si déjà dessus
-            if not self.driver.current_url.replace("www.","").startswith(profile_url_temp.replace("www.","")):
-                if not self.app_manager.browser_handler.navigate_to(profile_url_temp): return None
-                time.sleep(random.uniform(1.5, 2.5))
+            if not browser_handler.ensure_on_profile(username, settle_delay=(1.5, 2.5)): return None # Pas de navigation si déjà dessus
+            if page_state.has('is_private', logical_page=page_key):
+                profile_info['is_private'] = page_state.get('is_private', logical_page=page_key)
+                return profile_info
             try:
                 if self.driver.find_elements(By.XPATH, ProfilePageLocators.PRIVATE_ACCOUNT_INDICATOR_XPATH):
                     profile_info['is_private'] = True
+                page_state.set('is_private', profile_info['is_private'], logical_page=page_key)
             except: pass
             return profile_info
 
         profile_url = f"https://www.instagram.com/{username}/"
-        if not self.driver.current_url.replace("www.","").startswith(profile_url.replace("www.","")):
-            if not self.app_manager.browser_handler.navigate_to(profile_url): return None
-            time.sleep(random.uniform(2.5, 4.0))
+        if not browser_handler.ensure_on_profile(username, settle_delay=(2.5, 4.0)): return None
         
         try:
             wait = WebDriverWait(self.driver, 5)
-            if self.driver.find_elements(By.XPATH, ProfilePageLocators.PRIVATE_ACCOUNT_INDICATOR_XPATH):
-                profile_info['is_private'] = True; self.logger.info(f"Profil {username} est privé. Scraping limité pour unfollow.")
+            if page_state.has('is_private', logical_page=page_key):
+                profile_info['is_private'] = page_state.get('is_private', logical_page=page_key)
+            else:
+                profile_info['is_private'] = bool(self.driver.find_elements(By.XPATH, ProfilePageLocators.PRIVATE_ACCOUNT_INDICATOR_XPATH))
+                page_state.set('is_private', profile_info['is_private'], logical_page=page_key)
+            if profile_info['is_private']:
+                self.logger.info(f"Profil {username} est privé. Scraping limité pour unfollow.")
                 # Si privé, on ne peut pas scraper counts ou last_post_date
                 return profile_info
 
+            # Réutiliser ce qui a déjà été extrait de cette page (ex: par FollowAction)
+            if needs_counts_for_any_reason and page_state.get('follower_count', logical_page=page_key) is not None \
+               and page_state.get('following_count', logical_page=page_key) is not None:
+                profile_info['follower_count'] = page_state.get('follower_count', logical_page=page_key)
+                profile_info['following_count'] = page_state.get('following_count', logical_page=page_key)
+                needs_counts_for_any_reason = False
+            if needs_activity_check and page_state.get('last_post_date', logical_page=page_key) is not None:
+                profile_info['last_post_date'] = page_state.get('last_post_date', logical_page=page_key)
+                needs_activity_check = False
+
             # Scraper Followers/Following SI NÉCESSAIRE
             if needs_counts_for_any_reason:
                 try:
                     follower_el = wait.until(EC.visibility_of_element_located((By.XPATH, ProfilePageLocators.FOLLOWERS_COUNT_VALUE_XPATH)))
                     profile_info['follower_count'] = self._parse_count_string(follower_el.get_attribute("title") or follower_el.text)
-                    self.logger.debug(f"Scraped Followers Unfollow: {profile_info['follower_count']} for {username}")
+                    self.logger.debug("Scraped Followers Unfollow: %s for %s", profile_info['follower_count'], username)
                 except: self.logger.warning(f"Échec scrape Followers unfollow pour {username}")
                 try:
                     following_el = wait.until(EC.visibility_of_element_located((By.XPATH, ProfilePageLocators.FOLLOWING_COUNT_VALUE_XPATH)))
                     profile_info['following_count'] = self._parse_count_string(following_el.get_attribute("title") or following_el.text)
-                    self.logger.debug(f"Scraped Following Unfollow: {profile_info['following_count']} for {username}")
+                    self.logger.debug("Scraped Following Unfollow: %s for %s", profile_info['following_count'], username)
                 except: self.logger.warning(f"Échec scrape Following unfollow pour {username}")
+                page_state.update({'follower_count': profile_info['follower_count'], 'following_count': profile_info['following_count']}, logical_page=page_key)
 
             # Scraper Date Dernier Post SI NÉCESSAIRE
             if needs_activity_check:
                 try:
                     first_post_link_el = wait.until(EC.presence_of_element_located((By.XPATH, ProfilePageLocators.FIRST_POST_THUMBNAIL_ON_PROFILE_XPATH)))
                     first_post_url = first_post_link_el.get_attribute('href')
-                    if self.app_manager.browser_handler.navigate_to(first_post_url):
+                    if browser_handler.navigate_to(first_post_url):
                         time.sleep(random.uniform(2,3)); ts_el = wait.until(EC.presence_of_element_located((By.XPATH, PostLocators.POST_TIMESTAMP_XPATH)))
                         dt_str = ts_el.get_attribute('datetime'); profile_info['last_post_date'] = datetime.datetime.fromisoformat(dt_str.replace('Z','+00:00'))
-                        self.logger.debug(f"Scraped Date dernier post unfollow: {profile_info['last_post_date']} for {username}")
-                        self.app_manager.browser_handler.navigate_to(profile_url); time.sleep(random.uniform(1,2)) # Retour au profil
+                        self.logger.debug("Scraped Date dernier post unfollow: %s for %s", profile_info['last_post_date'], username)
+                        page_state.set('last_post_date', profile_info['last_post_date'], logical_page=page_key)
+                        browser_handler.navigate_to(profile_url, logical_page=page_key); time.sleep(random.uniform(1,2)) # Retour au profil
                 except Exception as e_lp: self.logger.warning(f"Échec scrape Date dernier post unfollow pour {username}: {e_lp}")
             return profile_info
         except Exception as e_global: self.logger.error(f"Erreur globale scraping infos unfollow {username}: {e_global}", exc_info=True); return None
@@ -115,20 +135,22 @@ class UnfollowAction:
 
     def _check_follows_you_status(self, username):
         """Vérifie si l'indicateur 'Follows you' est présent. S'assure d'être sur le profil."""
-        profile_url = f"https://www.instagram.com/{username}/"
-        if not self.driver.current_url.replace("www.","").startswith(profile_url.replace("www.","")):
-            if not self.app_manager.browser_handler.navigate_to(profile_url):
-                 self.logger.error(f"Échec navigation vers {username} pour vérifier 'Follows You'.")
-                 return False # Ne peut pas vérifier
-            time.sleep(random.uniform(1.5, 2.5))
+        browser_handler = self.app_manager.browser_handler
+        page_key = browser_handler.profile_page_key(username)
+        if not browser_handler.ensure_on_profile(username, settle_delay=(1.5, 2.5)):
+             self.logger.error(f"Échec navigation vers {username} pour vérifier 'Follows You'.")
+             return False # Ne peut pas vérifier
+        if browser_handler.page_state.has('follows_me', logical_page=page_key): # Déjà vérifié sur cette page
+            return bool(browser_handler.page_state.get('follows_me', logical_page=page_key))
         try:
             indicator = self.driver.find_elements(By.XPATH, ProfilePageLocators.FOLLOWS_YOU_INDICATOR_XPATH)
-            if indicator: self.logger.debug(f"'Follows you' trouvé pour {username}."); return True
-            else: self.logger.debug(f"'Follows you' NON trouvé pour {username}."); return False
+            browser_handler.page_state.set('follows_me', bool(indicator), logical_page=page_key)
+            if indicator: self.logger.debug("'Follows you' trouvé pour %s.", username); return True
+            else: self.logger.debug("'Follows you' NON trouvé pour %s.", username); return False
         except Exception as e: self.logger.warning(f"Erreur vérif 'Follows you' pour {username}: {e}. Supposer False."); return False
 
     def _apply_unfollow_filters(self, username, user_db_details):
-        settings = self.app_manager.current_settings; now_ts = time.time(); logger = self.logger
+        filters = self.settings.unfollow_filters; now_ts = time.time(); logger = self.logger
 
         if self.app_manager.is_whitelisted(username): return False, "Protégé par whitelist"
         if self.app_manager.is_excluded(username): return False, "Exclu globalement"
@@ -138,7 +160,7 @@ class UnfollowAction:
              return False, "Non trouvé en DB des suivis"
 
         # 1. Ancienneté Suivi (DB)
-        min_days_setting = settings.get("unfollow_min_days_before", 7)
+        min_days_setting = filters.min_days_before
         if min_days_setting > 0:
             followed_at_ts = user_db_details.get("followed_at_ts", 0)
             if followed_at_ts: days_followed = (now_ts - followed_at_ts) / (24*60*60)
@@ -146,11 +168,11 @@ class UnfollowAction:
             if days_followed < min_days_setting: return False, f"Suivi depuis {days_followed:.1f}j (< {min_days_setting}j)"
         
         # Récupérer les settings des filtres qui nécessitent du scraping
-        unfollow_ratio_min = settings.get("unfollow_filter_ratio_min", 0.0)
-        unfollow_ratio_max = settings.get("unfollow_filter_ratio_max", 0.0)
-        unfollow_inactive_days = settings.get("unfollow_inactive_days_threshold", 0)
-        unfollow_protect_followers = settings.get("unfollow_protect_min_followers", 0)
-        only_non_followers_setting = settings.get("unfollow_only_non_followers", True)
+        unfollow_ratio_min = filters.ratio_min
+        unfollow_ratio_max = filters.ratio_max
+        unfollow_inactive_days = filters.inactive_days_threshold
+        unfollow_protect_followers = filters.protect_min_followers
+        only_non_followers_setting = filters.only_non_followers
         
         needs_scrape_for_public_info = (unfollow_ratio_min > 0 or unfollow_ratio_max > 0 or \
                                        unfollow_inactive_days > 0 or unfollow_protect_followers > 0 or \
@@ -244,12 +266,11 @@ class UnfollowAction:
         # Si filtres OK, procéder à l'unfollow
         self.logger.info(f"UnfollowAction: Tous filtres passés pour '{target_user_to_unfollow}'. Tentative d'unfollow réel.")
         # Assurer d'être sur la page de profil AVANT les clics d'unfollow
-        profile_url = f"https://www.instagram.com/{target_user_to_unfollow}/"
-        if not self.driver.current_url.replace("www.","").startswith(profile_url.replace("www.","")):
-             if not self.app_manager.browser_handler.navigate_to(profile_url):
-                 self.logger.error(f"Échec re-navigation vers profil {target_user_to_unfollow} AVANT tentative d'unfollow.")
-                 return False, f"Échec re-navigation {target_user_to_unfollow}"
-             time.sleep(random.uniform(1,2.5))
+        browser_handler = self.app_manager.browser_handler
+        page_key = browser_handler.profile_page_key(target_user_to_unfollow)
+        if not browser_handler.ensure_on_profile(target_user_to_unfollow, settle_delay=(1, 2.5)):
+             self.logger.error(f"Échec re-navigation vers profil {target_user_to_unfollow} AVANT tentative d'unfollow.")
+             return False, f"Échec re-navigation {target_user_to_unfollow}"
         
         try:
             wait = WebDriverWait(self.driver, 10)
@@ -278,6 +299,8 @@ class UnfollowAction:
                  msg = f"Utilisateur '{target_user_to_unfollow}' désabonné avec succès."
                  self.logger.info(f"UnfollowAction: {msg}")
                  self.app_manager.mark_user_as_unfollowed(target_user_to_unfollow, success=True)
+                 browser_handler.page_state.invalidate('follow_profile_info', logical_page=page_key)
+                 browser_handler.page_state.set('i_am_following', False, logical_page=page_key)
                  return True, msg
             else:
                  msg = f"Statut bouton non changé après tentative unfollow pour {target_user_to_unfollow}. Potentiel échec ou blocage."
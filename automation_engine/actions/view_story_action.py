@@ -65,9 +65,9 @@ class ViewStoryAction:
         
         if max_segments_to_watch is None or max_segments_to_watch == 0 : # 0 = illimité
             max_segments_to_watch = float('inf') 
-            self.logger.debug(f"Visionnage de tous les segments pour {initial_username}.")
+            self.logger.debug("Visionnage de tous les segments pour %s.", initial_username)
         else:
-             self.logger.debug(f"Visionnage partiel: max {max_segments_to_watch} segments pour {initial_username}.")
+             self.logger.debug("Visionnage partiel: max %s segments pour %s.", max_segments_to_watch, initial_username)
              
         # Pause initiale pour que la première story se charge
         time.sleep(random.uniform(1.5, 3.0))
@@ -118,10 +118,8 @@ class ViewStoryAction:
 
         self.logger.info(f"Tentative de visionnage des stories de {username_to_view}.")
         
-        profile_url = f"https://www.instagram.com/{username_to_view}/"
-        if not self.driver.current_url.replace("www.","").startswith(profile_url.replace("www.","")):
-            if not self.app_manager.browser_handler.navigate_to(profile_url): return "nav_fail", f"Echec nav profil {username_to_view}"
-            time.sleep(random.uniform(2.5, 4.0))
+        if not self.app_manager.browser_handler.ensure_on_profile(username_to_view, settle_delay=(2.5, 4.0)):
+            return "nav_fail", f"Echec nav profil {username_to_view}"
         
         # Trouver et cliquer sur l'avatar avec story active
         try:
@@ -130,7 +128,7 @@ class ViewStoryAction:
                 EC.element_to_be_clickable((By.XPATH, ProfilePageLocators.ACTIVE_STORY_RING_ON_PROFILE_XPATH))
             )
             story_avatar_button.click()
-            self.logger.debug(f"Clic sur avatar story de {username_to_view}.")
+            self.logger.debug("Clic sur avatar story de %s.", username_to_view)
             time.sleep(random.uniform(1.5, 3.0)) # Laisser la story s'ouvrir
         except (TimeoutException, NoSuchElementException):
             return "no_story_found", f"Pas de story active (ou bouton non trouvé) pour {username_to_view}."
@@ -189,7 +187,7 @@ class ViewStoryAction:
                 if self.app_manager.has_viewed_story_recently(username_from_ring, skip_if_recent_days): continue
                 if self.app_manager.is_excluded(username_from_ring): continue
 
-                self.logger.debug(f"Feed: Clic sur story de {username_from_ring}.")
+                self.logger.debug("Feed: Clic sur story de %s.", username_from_ring)
                 try: ring_element.click(); time.sleep(random.uniform(1.5, 3))
                 except: self.logger.warning(f"Échec clic sur story de {username_from_ring} depuis feed."); continue
 
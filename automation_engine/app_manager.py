@@ -4,41 +4,73 @@ import os
 import datetime
 import time # For timestamps
 import random # For random user agent
+import threading
 
-from utils.config_manager import ConfigManager
-from utils.logger import get_logger
+from utils.config_manager import ConfigManager, DebouncedSettingsSaver, SettingsFileWatcher
+from utils.settings_schema import build_settings, diff_settings
+from utils.logger import get_logger, configure_activity_log, apply_log_levels
+from utils.metrics import metrics, MetricsExporter
+from utils.sampling_profiler import SamplingProfiler
 from .session_manager import SessionManager
 from .task_scheduler import TaskScheduler
+from .action_budget import ActionBudgetManager
+from .stats_cache import ActionStatsCache, period_bounds
+from .event_sink import EventSink
 from automation_engine.browser_handler import BrowserHandler
+from automation_engine.driver_instrumentation import driver_recorder
+from data_layer.bulk_io import stream_import_user_set, stream_export_user_set
+from data_layer.event_rollup import ActionEventRollupWorker
+from data_layer.maintenance import MaintenanceScheduler
+from data_layer.json_migration import JsonMigrationWorker
 from data_layer.database import (
-    record_action, get_stats_for_period,
+    record_action as record_action_db, record_task_event as record_task_event_db, get_task_outcome_stats,
+    get_stats_for_period, get_daily_stats_for_period,
     add_or_update_followed_user, remove_followed_user,
     get_followed_user_details, get_all_followed_usernames,
     add_liked_post_db, has_liked_post_db,
     add_commented_post_db, has_commented_post_db,
     add_or_update_viewed_story_user, get_last_story_view_ts,
-    update_following_back_status_db # Pour Unfollow filter
+    update_following_back_status_db, # Pour Unfollow filter
+    get_user_set_items, add_user_set_items, remove_user_set_items, clear_user_set,
+    ensure_database_initialized, start_background_index_build, USER_SET_EXCLUSION, USER_SET_WHITELIST, USER_SET_PROCESSED_FOLLOWERS
 )
 
-# Chemins vers les fichiers JSON (pour listes non encore en DB ou comme fallback/import)
-EXCLUSION_FILE_PATH = os.path.join("data_files", "exclusion_list.json")
-WHITELIST_FILE_PATH = os.path.join("data_files", "whitelist.json")
+# Chemins vers les fichiers JSON (pour listes non encore en DB)
+# Exclusion, whitelist et followers traités sont dans la table user_sets (JSON/TXT = format d'import/export uniquement)
 PROXY_LIST_FILE = os.path.join("data_files", "proxy_list.json")
-PROCESSED_NEW_FOLLOWERS_FILE = os.path.join("data_files", "processed_new_followers.json")
+
+# Clés hors sections typées dont le changement impose de reconstruire un sous-système
+USER_AGENT_SETTING_KEYS = frozenset({"user_agents_list", "custom_user_agent_input"})
+COMMENT_SETTING_KEYS = frozenset({"generic_comment_texts", "context_comments_definitions"})
+METRICS_SETTING_KEYS = frozenset({"metrics_textfile_path", "metrics_http_port", "metrics_export_interval_sec"})
 
 class AppManager:
-    def __init__(self, main_window_ref=None):
+    def __init__(self, main_window_ref=None, event_sink=None):
         self.logger = get_logger("AppManager")
         self.logger.info("Initialisation de AppManager...")
         
-        self.main_window = main_window_ref # Référence à la fenêtre principale pour callbacks UI
+        self.main_window = main_window_ref # Référence à la fenêtre principale (mode GUI uniquement)
+        self.event_sink = event_sink or main_window_ref or EventSink() # Notifications UI / daemon (cf. event_sink.py)
         
         self.config_manager = ConfigManager()
-        self.current_settings = self.config_manager.load_settings() # Charger les settings globaux
+        self.current_settings = self.config_manager.load_settings() # Charger les settings globaux (+ surcharges en mémoire)
+        self._file_settings = self.current_settings # Contenu de settings.json / de l'UI, sans les surcharges
+        self.settings_overrides = {} # Surcharges non persistées (plan du daemon), réappliquées à chaque update_settings
+        self.settings_version = 1
+        self.settings = build_settings(self.current_settings, self.settings_version) # Instantané typé et validé
+        self._settings_lock = threading.RLock() # update_settings peut venir de l'UI, du saver ou du watcher
+        self.settings_saver = DebouncedSettingsSaver(self.config_manager, on_saved=self._on_settings_saved)
+        self.settings_watcher = SettingsFileWatcher(self.config_manager, on_change=self._on_settings_file_changed) # Édition externe de settings.json
 
         # Initialiser les gestionnaires principaux
         self.browser_handler = BrowserHandler(self)
         self.session_manager = SessionManager(self) # SessionManager a besoin d'AppManager pour settings
+        self.action_budget = ActionBudgetManager(self) # Budgets horaires/journaliers par type d'action
+        self.stats_cache = ActionStatsCache(loader=get_daily_stats_for_period) # Agrégats today/yesterday/7j/30j en mémoire
+        self.event_rollup = ActionEventRollupWorker(self.settings.database.action_events_retention_days,
+                                                    self.settings.database.hourly_rollup_retention_days) # Démarré par complete_startup()
+        self.db_maintenance = MaintenanceScheduler(lambda: self.settings.database, self._maintenance_idle_seconds,
+                                                   on_report=self._on_maintenance_report) # Rétention + VACUUM pendant les pauses
         self.task_scheduler = TaskScheduler(self)   # TaskScheduler aussi
 
         # Listes et états gérés par AppManager
@@ -47,18 +79,24 @@ class AppManager:
         self.processed_users_for_follow = set() # Utilisateurs traités DANS la session de tâche Follow actuelle
         self.users_to_process_for_unfollow = []
 
-        self.exclusion_list = set(); self._load_exclusion_list()
-        self.whitelist = set(); self._load_whitelist()
+        # Exclusion/whitelist/followers traités: chargés depuis la DB par complete_startup(), une fois la fenêtre affichée
+        self.exclusion_list = set(); self.whitelist = set()
         
         self.proxy_list = []; self.current_proxy_index = -1; self._load_proxy_list()
-        self.proxy_usage_enabled = self.get_setting("proxy_enabled", False)
+        self.proxy_usage_enabled = self.settings.browser.proxy_enabled
 
-        self.processed_new_followers = set(); self._load_processed_new_followers()
+        self.processed_new_followers = set()
         
         self.available_user_agents = []; self._load_available_user_agents()
         self.generic_comment_list = []; self.contextual_comment_map = {}; self._parse_comment_settings()
         
         self.active_task_names = set() # Pour suivre les tâches actives
+        self.metrics_exporter = None # Démarré par complete_startup() si un export est configuré
+        self.index_builder = None
+        self.json_migrator = JsonMigrationWorker(progress_callback=self._on_json_migration_progress) # Anciens JSON -> DB, démarré par complete_startup()
+        self.profiler = SamplingProfiler(tagger=driver_recorder.action_for_thread) # Échantillons attribués à la tâche en cours
+        self._apply_logging_settings()
+        self.startup_completed = False
 
         if not self.current_settings:
             self.logger.warning("Aucun fichier settings.json trouvé ou vide. Utilisation des valeurs par défaut.")
@@ -66,61 +104,174 @@ class AppManager:
             self.logger.info("Settings chargés avec succès.")
         self.logger.info("AppManager initialisé et prêt.")
 
+    def complete_startup(self):
+        """
+        Seconde phase du démarrage, lancée après l'affichage de la fenêtre: DB (tables; index et anciens JSON en arrière-plan), listes persistées,
+        surveillance de settings.json. Actions, Selenium et APScheduler ne sont chargés qu'à la première tâche.
+        """
+        if self.startup_completed: return
+        started_at = time.perf_counter()
+        ensure_database_initialized()
+        self.stats_cache.ensure_loaded() # Avant toute tâche: record() ne compte qu'une fois le cache chargé
+        self.index_builder = start_background_index_build() # Index des migrations construits sans bloquer le démarrage
+        self.json_migrator.start() # Sans effet si aucun ancien fichier JSON; reprend une migration interrompue
+        self._load_exclusion_list(); self._load_whitelist(); self._load_processed_new_followers()
+        self.settings_watcher.start()
+        self.event_rollup.start(); self.db_maintenance.start()
+        self.startup_completed = True
+        self._apply_metrics_settings()
+        self.logger.info(f"Démarrage différé terminé en {(time.perf_counter() - started_at) * 1000:.0f} ms "
+                         f"({len(self.exclusion_list)} exclus, {len(self.whitelist)} whitelist).")
+
     def set_main_window(self, main_window):
         self.main_window = main_window
+        self.set_event_sink(main_window)
         self.logger.debug("Référence MainWindow définie dans AppManager.")
 
-    def get_setting(self, key, default=None):
-        return self.current_settings.get(key, default)
+    def set_event_sink(self, event_sink):
+        self.event_sink = event_sink or EventSink()
 
-    def update_settings(self):
-        self.logger.info("AppManager: Rechargement des paramètres globaux...")
-        self.current_settings = self.config_manager.load_settings()
-        
-        self.proxy_usage_enabled = self.get_setting("proxy_enabled", False)
-        self._load_available_user_agents()
-        self._parse_comment_settings()
-        
-        if self.session_manager:
+    def get_setting(self, key, default=None):
+        # Clés du schéma: valeur validée avec le défaut central (le `default` local est ignoré). Autres clés: valeur brute.
+        return self.settings.get(key, default)
+
+    def update_settings(self, raw_settings=None):
+        """
+        Applique un nouveau contenu de settings.json (relu si `raw_settings` est absent), surcharges en mémoire par-dessus.
+        L'ancien et le nouvel instantané sont comparés: seuls les sous-systèmes dont les clés ont changé sont reconstruits.
+        Retourne True si quelque chose a changé.
+        """
+        with self._settings_lock:
+            if raw_settings is None:
+                self.logger.info("AppManager: Rechargement des paramètres globaux...")
+                raw_settings = self.config_manager.load_settings()
+            self._file_settings = raw_settings
+            effective_settings = {**raw_settings, **self.settings_overrides}
+            new_settings = build_settings(effective_settings, self.settings_version + 1)
+            changed_sections, changed_keys = diff_settings(self.settings, new_settings)
+            if not changed_keys:
+                self.logger.debug("AppManager: Paramètres inchangés, rien à reconstruire."); return False
+            self.current_settings = effective_settings
+            self.settings_version = new_settings.version; self.settings = new_settings
+            self._apply_settings_changes(changed_sections, changed_keys)
+        self.logger.info(f"AppManager: Paramètres v{self.settings_version} appliqués ({len(changed_keys)} clé(s), sections: {', '.join(sorted(changed_sections)) or 'aucune'}).")
+        self.event_sink.update_status("Paramètres mis à jour.")
+        return True
+
+    def _apply_settings_changes(self, changed_sections, changed_keys):
+        # Délais et filtres: lus dans self.settings à chaque action, rien à reconstruire
+        if "browser" in changed_sections: self.proxy_usage_enabled = self.settings.browser.proxy_enabled
+        if changed_keys & USER_AGENT_SETTING_KEYS: self._load_available_user_agents()
+        if changed_keys & COMMENT_SETTING_KEYS: self._parse_comment_settings()
+        if "logging" in changed_sections: self._apply_logging_settings()
+        if "database" in changed_sections: # Rétention et fréquence de maintenance relues au prochain passage
+            self.event_rollup.configure(self.settings.database.action_events_retention_days, self.settings.database.hourly_rollup_retention_days)
+        if changed_keys & METRICS_SETTING_KEYS and self.startup_completed: self._apply_metrics_settings()
+        if "session" in changed_sections and self.session_manager:
             self.session_manager.on_settings_updated(self.current_settings) # Notifier SessionManager
-        
-        self.logger.info("AppManager: Paramètres mis à jour et propagés.")
-        if self.main_window: self.main_window.update_status("Paramètres mis à jour.")
-
-
-    # --- Gestion Listes JSON (Exclusion, Whitelist, Proxy, Processed Followers) ---
-    def _load_json_list_as_set(self, file_path, list_name="liste"):
-        if os.path.exists(file_path):
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f: data = json.load(f)
-                return set(item.lower() for item in data if isinstance(item, str))
-            except Exception as e: self.logger.error(f"Erreur chargement {file_path} ({list_name}): {e}")
-        return set()
-
-    def _save_set_as_json_list(self, data_set, file_path, list_name="liste"):
-        try:
-            dir_name = os.path.dirname(file_path); #... (créer dossier si besoin)
-            if dir_name and not os.path.exists(dir_name): os.makedirs(dir_name)
-            with open(file_path, 'w', encoding='utf-8') as f: json.dump(sorted(list(data_set)), f, indent=4)
-        except Exception as e: self.logger.error(f"Erreur sauvegarde {file_path} ({list_name}): {e}")
-
-    def _load_exclusion_list(self): self.exclusion_list = self._load_json_list_as_set(EXCLUSION_FILE_PATH, "exclusion")
-    def _save_exclusion_list(self): self._save_set_as_json_list(self.exclusion_list, EXCLUSION_FILE_PATH, "exclusion")
-    def add_to_exclusion_list(self, item): #... (logique add et save)
-    def remove_from_exclusion_list(self, item): #... (logique remove et save)
-    def clear_exclusion_list(self): self.exclusion_list.clear(); self._save_exclusion_list()
+        if self.action_budget and any(key.startswith("budget_") for key in changed_keys): self.action_budget.on_settings_updated()
+
+    def save_settings(self, settings_data):
+        """
+        Paramètres édités dans l'UI: appliqués tout de suite, écrits sur disque par le saver différé (une rafale d'éditions = une écriture).
+        Les clés absentes de `settings_data` (budgets, logs... non gérés par le dialogue) sont conservées.
+        """
+        with self._settings_lock:
+            merged_settings = {**self._file_settings, **settings_data} # Les surcharges en mémoire ne sont jamais écrites
+            self.update_settings(merged_settings)
+            self.settings_saver.schedule(merged_settings)
+
+    def set_settings_overrides(self, overrides):
+        """Surcharges en mémoire (ex: plan du daemon): gardées par-dessus settings.json, y compris après un rechargement à chaud."""
+        with self._settings_lock:
+            self.settings_overrides = dict(overrides or {})
+            return self.update_settings(self._file_settings)
+
+    def _on_settings_file_changed(self, raw_settings): # Thread du watcher: appliqué sur le thread propriétaire (thread Qt)
+        self.event_sink.run_in_owner_thread(lambda: self.update_settings(raw_settings))
+
+    def _on_settings_saved(self, success): # Thread du timer de sauvegarde différée
+        if not success: self.event_sink.run_in_owner_thread(lambda: self.event_sink.update_status("Erreur lors de la sauvegarde des paramètres.", is_error=True))
+
+    def _apply_logging_settings(self):
+        # Niveaux des sinks: en passant le fichier à INFO, les logger.debug("... %s", ...) ne sont plus formatés
+        log_settings = self.settings.logging
+        apply_log_levels(console_level=log_settings.log_console_level, file_level=log_settings.log_file_level)
+        configure_activity_log(max_mb=log_settings.activity_log_max_mb, backup_count=log_settings.activity_log_backup_count,
+                               max_age_days=log_settings.activity_log_max_age_days)
+
+    def _apply_metrics_settings(self):
+        """(Re)démarre l'export des métriques selon les paramètres (fichier texte et/ou HTTP sur 127.0.0.1)."""
+        log_settings = self.settings.logging
+        if self.metrics_exporter: self.metrics_exporter.stop(); self.metrics_exporter = None
+        if not log_settings.metrics_textfile_path and not log_settings.metrics_http_port: return
+        exporter = MetricsExporter(metrics, textfile_path=log_settings.metrics_textfile_path or None,
+                                   http_port=log_settings.metrics_http_port, interval_sec=log_settings.metrics_export_interval_sec)
+        if exporter.start(): self.metrics_exporter = exporter
+
+    # --- Gestion Listes (Exclusion, Whitelist, Processed Followers en DB; Proxy en JSON) ---
+    # Ensembles persistés ligne par ligne dans user_sets: le set mémoire sert aux tests d'appartenance O(1),
+    # chaque ajout/retrait n'écrit que la ligne concernée (plus de réécriture complète du fichier).
+    @staticmethod
+    def _normalize_user_set_items(items):
+        return list(dict.fromkeys(str(item).strip().lower() for item in items if item and str(item).strip()))
+
+    def _add_items_to_user_set(self, data_set, list_name, items):
+        """Ajoute en une transaction les éléments absents. Retourne la liste des éléments ajoutés (normalisés), None si erreur DB."""
+        new_items = [item for item in self._normalize_user_set_items(items) if item not in data_set]
+        if not new_items: return []
+        data_set.update(new_items)
+        if add_user_set_items(list_name, new_items) < 0: # Échec DB: le set mémoire doit rester identique à la table
+            data_set.difference_update(new_items); self.logger.error(f"Ajout à '{list_name}' non enregistré ({len(new_items)} élément(s)).")
+            return None
+        return new_items
+
+    def _remove_items_from_user_set(self, data_set, list_name, items):
+        """Retire en une transaction les éléments présents. Retourne la liste des éléments retirés (normalisés), None si erreur DB."""
+        removed_items = [item for item in self._normalize_user_set_items(items) if item in data_set]
+        if not removed_items: return []
+        data_set.difference_update(removed_items)
+        if remove_user_set_items(list_name, removed_items) < 0:
+            data_set.update(removed_items); self.logger.error(f"Retrait de '{list_name}' non enregistré ({len(removed_items)} élément(s)).")
+            return None
+        return removed_items
+
+    def _add_to_user_set(self, data_set, list_name, item): return bool(self._add_items_to_user_set(data_set, list_name, [item]))
+    def _remove_from_user_set(self, data_set, list_name, item): return bool(self._remove_items_from_user_set(data_set, list_name, [item]))
+
+    def _clear_user_set(self, data_set, list_name):
+        data_set.clear(); clear_user_set(list_name)
+
+    def _import_user_set(self, data_set, list_name, file_path, progress_callback=None, cancel_check=None):
+        """
+        Import en flux (JSON, NDJSON, CSV, texte) par lots transactionnels.
+        Retourne (nb de nouveaux éléments ou -1 si erreur, terminé): terminé=False si l'import a été annulé par cancel_check.
+        """
+        added_count, _, completed = stream_import_user_set(list_name, file_path, known_items=data_set, progress_callback=progress_callback, cancel_check=cancel_check)
+        return added_count, completed
+
+    def _export_user_set(self, list_name, file_path):
+        return stream_export_user_set(list_name, file_path) >= 0 # Lu par lots depuis la DB, format selon l'extension
+
+    def _load_exclusion_list(self): self.exclusion_list = get_user_set_items(USER_SET_EXCLUSION)
+    def add_to_exclusion_list(self, item): return self._add_to_user_set(self.exclusion_list, USER_SET_EXCLUSION, item)
+    def remove_from_exclusion_list(self, item): return self._remove_from_user_set(self.exclusion_list, USER_SET_EXCLUSION, item)
+    def add_items_to_exclusion_list(self, items): return self._add_items_to_user_set(self.exclusion_list, USER_SET_EXCLUSION, items)
+    def remove_items_from_exclusion_list(self, items): return self._remove_items_from_user_set(self.exclusion_list, USER_SET_EXCLUSION, items)
+    def clear_exclusion_list(self): self._clear_user_set(self.exclusion_list, USER_SET_EXCLUSION)
     def is_excluded(self, item): return str(item).lower() in self.exclusion_list if item else False
-    def import_exclusion_list(self, file_path): #... (logique import et save)
-    def export_exclusion_list(self, file_path): #... (logique export)
-
-    def _load_whitelist(self): self.whitelist = self._load_json_list_as_set(WHITELIST_FILE_PATH, "whitelist")
-    def _save_whitelist(self): self._save_set_as_json_list(self.whitelist, WHITELIST_FILE_PATH, "whitelist")
-    def add_to_whitelist(self, item): #...
-    def remove_from_whitelist(self, item): #...
-    def clear_whitelist(self): self.whitelist.clear(); self._save_whitelist()
+    def import_exclusion_list(self, file_path, progress_callback=None, cancel_check=None): return self._import_user_set(self.exclusion_list, USER_SET_EXCLUSION, file_path, progress_callback, cancel_check)
+    def export_exclusion_list(self, file_path): return self._export_user_set(USER_SET_EXCLUSION, file_path)
+
+    def _load_whitelist(self): self.whitelist = get_user_set_items(USER_SET_WHITELIST)
+    def add_to_whitelist(self, item): return self._add_to_user_set(self.whitelist, USER_SET_WHITELIST, item)
+    def remove_from_whitelist(self, item): return self._remove_from_user_set(self.whitelist, USER_SET_WHITELIST, item)
+    def add_items_to_whitelist(self, items): return self._add_items_to_user_set(self.whitelist, USER_SET_WHITELIST, items)
+    def remove_items_from_whitelist(self, items): return self._remove_items_from_user_set(self.whitelist, USER_SET_WHITELIST, items)
+    def clear_whitelist(self): self._clear_user_set(self.whitelist, USER_SET_WHITELIST)
     def is_whitelisted(self, item): return str(item).lower() in self.whitelist if item else False
-    def import_whitelist(self, file_path): #...
-    def export_whitelist(self, file_path): #...
+    def import_whitelist(self, file_path, progress_callback=None, cancel_check=None): return self._import_user_set(self.whitelist, USER_SET_WHITELIST, file_path, progress_callback, cancel_check)
+    def export_whitelist(self, file_path): return self._export_user_set(USER_SET_WHITELIST, file_path)
 
     def _load_proxy_list(self): #... (comme avant, charge depuis PROXY_LIST_FILE)
     def _save_proxy_list(self): #... (comme avant)
@@ -130,11 +281,10 @@ class AppManager:
     def get_next_proxy(self): #... (comme avant)
     def get_current_proxy_for_browser(self): #... (comme avant)
 
-    def _load_processed_new_followers(self): self.processed_new_followers = self._load_json_list_as_set(PROCESSED_NEW_FOLLOWERS_FILE, "processed_followers")
-    def _save_processed_new_followers(self): self._save_set_as_json_list(self.processed_new_followers, PROCESSED_NEW_FOLLOWERS_FILE, "processed_followers")
+    def _load_processed_new_followers(self): self.processed_new_followers = get_user_set_items(USER_SET_PROCESSED_FOLLOWERS)
     def has_processed_new_follower(self, username): return username.lower() in self.processed_new_followers
     def mark_new_follower_as_processed(self, username):
-        if username: self.processed_new_followers.add(username.lower()); self._save_processed_new_followers()
+        if username: self._add_to_user_set(self.processed_new_followers, USER_SET_PROCESSED_FOLLOWERS, username)
 
     def _load_available_user_agents(self): #... (comme avant, avec defaults)
     def get_random_user_agent(self): #... (comme avant)
@@ -143,14 +293,23 @@ class AppManager:
     def get_random_generic_comment(self): #... (comme avant)
 
     # --- Gestion des Actions / Interactions avec la DB ---
+    def record_action(self, action_type):
+        """Enregistre une action en DB (attribuée à la tâche en cours sur ce thread) et met à jour le cache d'agrégats."""
+        record_action_db(action_type, task=driver_recorder.current_action())
+        self.stats_cache.record(action_type)
+
+    def record_task_event(self, task_name, outcome, duration_ms=None, target=None):
+        """Résultat d'une exécution de tâche (TaskScheduler): taux de réussite et durées par tâche."""
+        record_task_event_db(task_name, outcome, duration_ms, target)
+
     def mark_user_as_followed(self, username, success=True):
         if username:
             uname_lower = username.lower()
             if success: 
                 add_or_update_followed_user(uname_lower, status="followed_by_bot")
-                record_action('follows') 
+                self.record_action('follows') 
             self.processed_users_for_follow.add(uname_lower) 
-            if self.main_window: self.main_window.log_follow_action(username, success) # log_... à supprimer dans MainWindow
+            self.event_sink.log_follow_action(username, success)
     
     def mark_user_as_unfollowed(self, username, success=True): # ... (appelle remove_followed_user, record_action)
     def add_liked_post(self, post_id, like_count=None, comment_count=None): # ... (appelle add_liked_post_db, record_action)
@@ -166,6 +325,7 @@ class AppManager:
     # --- Démarrage / Arrêt des Tâches Principales ---
     def start_main_task(self, task_name, task_options):
         self.logger.info(f"AppManager: Demande démarrage tâche '{task_name}'...")
+        self.complete_startup() # Sans effet si déjà fait (cas normal: lancé juste après l'affichage de la fenêtre)
         if not self.current_settings: self.logger.error("Params non chargés."); return False
         if not self.browser_handler.driver and task_name not in ["manual_login_internal_command"]: # Sauf si c'est une cmd interne pour ouvrir le navigateur
             if self.get_setting("manual_login", True):
@@ -178,7 +338,7 @@ class AppManager:
             self.session_manager.start_logical_session()
         if self.session_manager.session_action_limit_reached_flag:
             self.logger.warning(f"Limite actions session atteinte, '{task_name}' non démarrée.")
-            if self.main_window: self.main_window.show_message("Limite Session", "Limite d'actions/session atteinte.", "warning")
+            self.event_sink.show_message("Limite Session", "Limite d'actions/session atteinte.", "warning")
             return False
         
         # --- Préparation options spécifiques ---
@@ -186,7 +346,7 @@ class AppManager:
         elif task_name == "auto_unfollow":
              self.users_to_process_for_unfollow = get_all_followed_usernames() # Depuis DB
              task_options['use_app_manager_queue'] = True
-             if not self.users_to_process_for_unfollow: self.logger.info("Aucun user à unfollow (DB vide)."); # ... (return False si main_window existe)
+             if not self.users_to_process_for_unfollow: self.logger.info("Aucun user à unfollow (DB vide)."); # ... (return False si une UI est connectée)
         elif task_name == "auto_like": # ... (options like_source etc.)
         elif task_name == "auto_comment": # ... (options comment_source etc.)
         elif task_name == "auto_view_stories": # ...
@@ -196,13 +356,13 @@ class AppManager:
              if not task_options.get('target_user') and task_name not in ["like_single_post"]: # like_single_post a target_post_id
                   if not task_options.get('target_post_id') and task_name == "like_single_post":
                      self.logger.error(f"Données manquantes pour tâche unique '{task_name}'."); return False
-             self.logger.debug(f"Préparation tâche unique {task_name} OK.")
+             self.logger.debug("Préparation tâche unique %s OK.", task_name)
         # ... (Gather)
 
         if self.task_scheduler:
             success = self.task_scheduler.start_task(task_name, task_options)
             if success: self.active_task_names.add(task_name)
-            if self.main_window: self.main_window.update_task_status_indicator(task_name, success) #...
+            self.event_sink.update_task_status_indicator(task_name, success)
             return success
         self.logger.error("TaskScheduler non disponible."); return False
 
@@ -222,7 +382,38 @@ class AppManager:
     def handle_new_followers(self, new_follower_usernames): # ... (déclenche like_latest_post pour chaque)
 
     # --- Utilitaires ---
-    def get_action_stats(self, period="today"): # ... (appelle get_stats_for_period)
+    def get_action_stats(self, period="today"):
+        """Stats agrégées d'une période (today, yesterday, last7days, last30days), lues depuis le cache mémoire."""
+        return self.stats_cache.get_period(period)
+    def get_task_outcome_stats(self, period="today"): return get_task_outcome_stats(*period_bounds(period)) # Réussite par tâche
+    def get_action_budget_remaining(self): return self.action_budget.get_remaining() if self.action_budget else {}
+    def get_driver_call_stats(self, top=20): return driver_recorder.snapshot(top=top) # Allers-retours WebDriver agrégés
+    def reset_driver_call_stats(self): driver_recorder.reset()
+    def dump_driver_call_stats(self, file_path):
+        if driver_recorder.dump_json(file_path): self.logger.info(f"Stats WebDriver exportées: {file_path}"); return True
+        self.logger.error(f"Échec export des stats WebDriver vers {file_path}."); return False
+    def is_profiling(self): return self.profiler.is_running()
+    def start_profiling(self): return self.profiler.start(interval_sec=self.settings.logging.profiler_interval_ms / 1000)
+    def stop_profiling(self):
+        """Arrête le profilage; retourne le fichier de piles (data_files/profiles/*.folded) ou None."""
+        profile_path = self.profiler.stop()
+        if profile_path: self.event_sink.update_status(f"Profil enregistré: {profile_path}")
+        return profile_path
+    def run_database_maintenance(self):
+        """Maintenance DB immédiate (rétention, VACUUM incrémental, checkpoint WAL, ANALYZE); retourne le rapport ou None."""
+        return self.db_maintenance.run_now()
+    def _maintenance_idle_seconds(self):
+        """Inactivité prévue: 0 si une action tourne, infinie si aucune reprise n'est planifiée (bot arrêté, hors plage sans suite)."""
+        if driver_recorder.has_running_action(): return 0.0
+        next_eligible_ts = self.session_manager.get_next_eligible_time() if self.session_manager else None
+        return float("inf") if next_eligible_ts is None else max(0.0, next_eligible_ts - time.time())
+    def is_json_migration_running(self): return self.json_migrator.is_running() # Tâches retenues par TaskScheduler jusqu'à la fin
+    def _on_json_migration_progress(self, table, bytes_done, total_bytes, items_read, items_added): # Thread JsonMigration
+        message = f"Migration JSON '{table}': {bytes_done * 100 // max(total_bytes, 1)}% ({items_read} lus, {items_added} ajoutés)"
+        self.event_sink.run_in_owner_thread(lambda: self.event_sink.update_status(message))
+    def _on_maintenance_report(self, report): # Thread DbMaintenance (MaintenanceScheduler.run_now)
+        message = f"Maintenance DB: {sum(report['deleted'].values())} ligne(s) purgée(s), {report['reclaimed_bytes'] / 1024:.0f} Ko récupérés."
+        self.event_sink.run_in_owner_thread(lambda: self.event_sink.update_status(message, is_error=bool(report.get("errors"))))
     def save_list_to_file(self, data_list, file_path): # ... (comme avant)
     def load_list_from_file(self, file_path): # ... (comme avant)
 
@@ -240,21 +431,16 @@ class AppManager:
 
     def shutdown(self):
         self.logger.info("Arrêt de AppManager et sauvegarde des données...")
-        self._save_exclusion_list(); self._save_whitelist(); self._save_proxy_list(); self._save_processed_new_followers()
+        self.settings_watcher.stop()
+        if self.metrics_exporter: self.metrics_exporter.stop() # Dernier fichier de métriques écrit
+        if self.profiler.is_running(): self.stop_profiling()
+        self.settings_saver.flush() # Paramètres encore en attente d'écriture différée
+        self._save_proxy_list() # Exclusion/whitelist/followers traités: déjà en DB à chaque modification
         if self.task_scheduler: self.task_scheduler.shutdown()
+        self.json_migrator.stop(timeout=30) # Lot en cours validé, reprise au prochain démarrage
+        if self.index_builder: self.index_builder.stop(timeout=30) # Index en cours terminé, les suivants au prochain démarrage
+        if self.startup_completed: self.event_rollup.stop(); self.db_maintenance.stop() # Derniers événements repliés, passage en cours terminé
+        if self.action_budget: self.action_budget.save_state(force=True)
         if self.session_manager: self.session_manager.end_logical_session(); # Appeler end ici aussi
         if self.browser_handler: self.browser_handler.close_browser()
-        self.logger.info("AppManager arrêté.")
-
-
-# --- Réimplémentation des fonctions de gestion de listes JSON ---
-# (Il faut s'assurer que add_to_exclusion_list, remove..., import..., export... sont bien ici)
-# Par exemple:
-    def add_to_exclusion_list(self, item):
-        item_lower = item.lower()
-        if item_lower not in self.exclusion_list:
-            self.exclusion_list.add(item_lower); self._save_exclusion_list()
-            self.logger.info(f"'{item}' ajouté à exclusion."); return True
-        return False
-    # ... et ainsi de suite pour les autres méthodes de gestion de listes.
-    # Assurez-vous qu'elles appellent _save_..._list() après modification.
\ No newline at end of file
+        self.logger.info("AppManager arrêté.")
\ No newline at end of file
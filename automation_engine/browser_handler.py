@@ -2,15 +2,13 @@
 import os
 import zipfile
 import time 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-# Import de webdriver_manager (à mettre au conditionnel si pas une dépendance dure)
-try:
-    from webdriver_manager.chrome import ChromeDriverManager
-    WEBDRIVER_MANAGER_AVAILABLE = True
-except ImportError:
-    WEBDRIVER_MANAGER_AVAILABLE = False
+import random
+from urllib.parse import urlparse
+
+from utils.metrics import metrics
+from automation_engine.driver_instrumentation import instrument_driver
+# Selenium et webdriver_manager sont importés au démarrage du navigateur (_get_chrome_options / start_browser):
+# importer ce module ne coûte rien tant qu'aucune tâche n'a besoin du navigateur.
 
 # CHEMIN CHROMEDRIVER (Fallback si webdriver_manager n'est pas utilisé ou échoue)
 # Calculer le chemin de base du projet
@@ -20,6 +18,111 @@ CHROMEDRIVER_EXECUTABLE_NAME = "chromedriver.exe" if os.name == 'nt' else "chrom
 CHROMEDRIVER_PATH_FALLBACK = os.path.join(CHROMEDRIVER_DIR, CHROMEDRIVER_EXECUTABLE_NAME)
 
 
+def _load_webdriver_manager():
+    """ChromeDriverManager si webdriver_manager est installé (dépendance optionnelle), sinon None."""
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+        return ChromeDriverManager
+    except ImportError:
+        return None
+
+# Segments d'URL qui ne sont pas des noms d'utilisateurs (pour déduire la page logique)
+NON_PROFILE_PATH_SEGMENTS = {"p", "reel", "reels", "tv", "stories", "explore", "direct", "accounts", "about", "legal"}
+# Premier segment d'URL -> type de page (label des métriques de navigation, cardinalité bornée)
+PAGE_KIND_BY_SEGMENT = {"p": "post", "reel": "post", "tv": "post", "reels": "reels", "stories": "story",
+                        "explore": "explore", "direct": "direct", "accounts": "accounts"}
+
+NAVIGATION_DURATION = metrics.histogram("bot_navigation_duration_seconds", "Durée de driver.get() par type de page", ("page",))
+NAVIGATION_ERRORS = metrics.counter("bot_navigation_errors", "Navigations en échec par type de page", ("page",))
+
+
+class PageStateTracker:
+    """
+    Mémorise la page logique courante du navigateur (ex: 'profile:john'), l'heure de chargement
+    et les données déjà extraites de chaque page, pour éviter navigations et scraping redondants
+    entre étapes successives (filtres, follow, DM...) sur un même utilisateur.
+    """
+    def __init__(self, max_data_age_sec=300, max_pages=20):
+        self.max_data_age_sec = max_data_age_sec # Au-delà, les données extraites sont considérées périmées
+        self.max_pages = max_pages # Nombre de pages dont on garde les données (profil -> post -> profil)
+        self.reset()
+
+    def reset(self):
+        self.current_page = None # Clé logique, ex: 'profile:john' ou l'URL brute
+        self.current_url = None
+        self.loaded_at = None # Timestamp Unix du dernier chargement
+        self._extracted = {} # page -> {'ts': float, 'data': dict}
+
+    @staticmethod
+    def logical_page_for_url(url):
+        """Déduit la page logique d'une URL ('profile:<username>' pour un profil, sinon l'URL normalisée)."""
+        if not url: return None
+        parsed = urlparse(url)
+        parts = [p for p in parsed.path.split('/') if p]
+        if len(parts) == 1 and parts[0].lower() not in NON_PROFILE_PATH_SEGMENTS:
+            return f"profile:{parts[0].lower()}"
+        return f"{parsed.netloc.replace('www.', '')}{parsed.path}".rstrip('/')
+
+    @staticmethod
+    def page_kind_for_url(url):
+        """Type de page ('home', 'profile', 'post', 'story', 'explore'...) pour agréger les mesures sans exploser les labels."""
+        parts = [p for p in urlparse(url or "").path.split('/') if p]
+        if not parts: return "home"
+        return PAGE_KIND_BY_SEGMENT.get(parts[0].lower(), "profile" if parts[0].lower() not in NON_PROFILE_PATH_SEGMENTS else "other")
+
+    def on_navigation(self, url, logical_page=None):
+        self.current_url = url
+        self.current_page = logical_page or self.logical_page_for_url(url)
+        self.loaded_at = time.time()
+        self._prune()
+
+    def is_on(self, logical_page, driver_url=None):
+        """True si la page logique courante correspond ET (si fournie) l'URL réelle du driver aussi."""
+        if not logical_page or self.current_page != logical_page: return False
+        if driver_url is not None and self.logical_page_for_url(driver_url) != logical_page: return False
+        return True
+
+    def _page_entry(self, logical_page, create=False):
+        page = logical_page or self.current_page
+        if not page: return None
+        entry = self._extracted.get(page)
+        if entry and time.time() - entry['ts'] > self.max_data_age_sec:
+            del self._extracted[page]; entry = None
+        if entry is None and create:
+            entry = {'ts': time.time(), 'data': {}}
+            self._extracted[page] = entry
+        return entry
+
+    def get(self, key, default=None, logical_page=None):
+        entry = self._page_entry(logical_page)
+        return entry['data'].get(key, default) if entry else default
+
+    def has(self, key, logical_page=None):
+        entry = self._page_entry(logical_page)
+        return bool(entry) and key in entry['data']
+
+    def set(self, key, value, logical_page=None):
+        entry = self._page_entry(logical_page, create=True)
+        if entry is not None: entry['data'][key] = value
+
+    def update(self, values, logical_page=None):
+        entry = self._page_entry(logical_page, create=True)
+        if entry is not None: entry['data'].update(values)
+
+    def invalidate(self, *keys, logical_page=None):
+        """Oublie certaines clés (ou toutes si aucune) des données extraites d'une page."""
+        page = logical_page or self.current_page
+        entry = self._extracted.get(page)
+        if not entry: return
+        if not keys: del self._extracted[page]; return
+        for key in keys: entry['data'].pop(key, None)
+
+    def _prune(self):
+        if len(self._extracted) <= self.max_pages: return
+        for page, _ in sorted(self._extracted.items(), key=lambda kv: kv[1]['ts'])[:len(self._extracted) - self.max_pages]:
+            del self._extracted[page]
+
+
 class BrowserHandler:
     def __init__(self, app_manager):
         self.app_manager = app_manager
@@ -27,6 +130,7 @@ class BrowserHandler:
         self.driver = None
         self.user_agent = None # User-Agent actuel du navigateur
         self.proxy_extension_path_to_clean = None # Pour nettoyer après usage
+        self.page_state = PageStateTracker() # Page logique courante + données déjà extraites
 
     def _create_proxy_extension(self, proxy_host, proxy_port, proxy_user, proxy_pass):
         """Crée une extension Chrome temporaire pour gérer l'authentification proxy."""
@@ -104,6 +208,7 @@ class BrowserHandler:
 
 
     def _get_chrome_options(self):
+        from selenium.webdriver.chrome.options import Options as ChromeOptions
         options = ChromeOptions()
         settings = self.app_manager.current_settings # Obtenir les settings à jour
         
@@ -172,7 +277,10 @@ class BrowserHandler:
         chrome_options = self._get_chrome_options() # Récupère le path de l'extension aussi
         
         try:
-            if WEBDRIVER_MANAGER_AVAILABLE and self.app_manager.get_setting("use_webdriver_manager", True): # Setting optionnel
+            from selenium import webdriver
+            from selenium.webdriver.chrome.service import Service as ChromeService
+            ChromeDriverManager = _load_webdriver_manager()
+            if ChromeDriverManager and self.app_manager.get_setting("use_webdriver_manager", True): # Setting optionnel
                  self.logger.info("Utilisation de webdriver-manager pour ChromeDriver...")
                  service = ChromeService(ChromeDriverManager().install())
             else: # Utiliser un chemin local
@@ -187,6 +295,8 @@ class BrowserHandler:
             
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
             self.logger.info("Navigateur Chrome démarré avec succès.")
+            if self.app_manager.get_setting("instrument_webdriver", True):
+                self.driver = instrument_driver(self.driver) # Commandes comptées par action/méthode (driver_recorder)
             
             # Configurer des timeouts implicites et de chargement de page
             page_load_timeout = self.app_manager.get_setting("page_load_timeout_sec", 30)
@@ -210,7 +320,7 @@ class BrowserHandler:
             if self.proxy_extension_path_to_clean and os.path.exists(self.proxy_extension_path_to_clean):
                 try:
                     os.remove(self.proxy_extension_path_to_clean)
-                    self.logger.debug(f"Fichier extension proxy temporaire supprimé: {self.proxy_extension_path_to_clean}")
+                    self.logger.debug("Fichier extension proxy temporaire supprimé: %s", self.proxy_extension_path_to_clean)
                     self.proxy_extension_path_to_clean = None
                 except OSError as e_del:
                      self.logger.warning(f"Erreur suppression extension proxy {self.proxy_extension_path_to_clean}: {e_del}")
@@ -225,6 +335,7 @@ class BrowserHandler:
                 self.logger.error(f"Erreur lors de la fermeture du navigateur: {e}")
             finally:
                 self.driver = None # Marquer comme fermé
+                self.page_state.reset()
                 # Assurer que l'extension proxy (si existante et non nettoyée) est bien nettoyée
                 if self.proxy_extension_path_to_clean and os.path.exists(self.proxy_extension_path_to_clean):
                     try: os.remove(self.proxy_extension_path_to_clean); self.logger.debug("Extension proxy nettoyée au close.")
@@ -232,21 +343,50 @@ class BrowserHandler:
         else:
             self.logger.debug("Aucun navigateur actif à fermer.")
             
-    def navigate_to(self, url):
+    def navigate_to(self, url, logical_page=None):
         if not self.driver:
             self.logger.error("Navigateur non démarré. Impossible de naviguer.")
             return False
+        page_kind = PageStateTracker.page_kind_for_url(url)
         try:
             self.logger.info(f"Navigation vers: {url}")
-            self.driver.get(url)
+            with NAVIGATION_DURATION.time(page=page_kind): self.driver.get(url)
+            self.page_state.on_navigation(url, logical_page)
             # Pas d'attente fixe ici, les actions utiliseront WebDriverWait
             return True
         except Exception as e:
+            NAVIGATION_ERRORS.inc(page=page_kind)
             self.logger.error(f"Erreur de navigation vers {url}: {e}")
+            self.page_state.reset() # État de la page inconnu après un échec
+            return False
+
+    @staticmethod
+    def profile_page_key(username):
+        return f"profile:{str(username).lower()}"
+
+    def ensure_on_profile(self, username, settle_delay=(2.5, 4.0)):
+        """
+        S'assure que le navigateur affiche le profil de `username`, en réutilisant la page déjà chargée
+        si possible. Retourne True si on est (ou a pu aller) sur le profil.
+        """
+        if not self.driver: return False
+        page_key = self.profile_page_key(username)
+        try: driver_url = self.driver.current_url
+        except Exception: driver_url = None
+        if PageStateTracker.logical_page_for_url(driver_url) == page_key:
+            if not self.page_state.is_on(page_key): self.page_state.on_navigation(driver_url, page_key) # Page chargée hors navigate_to
+            self.logger.debug("Déjà sur le profil de %s, pas de rechargement.", username)
+            return True
+        if not self.navigate_to(f"https://www.instagram.com/{username}/", logical_page=page_key):
             return False
+        if settle_delay: time.sleep(random.uniform(*settle_delay)) # Laisse le temps au contenu dynamique de charger
+        return True
 
     # Ajout d'une méthode pour gérer les alertes (si nécessaire, mais rare sur IG)
     def handle_alert(self, accept=True, timeout=5):
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException
         try:
             alert = WebDriverWait(self.driver, timeout).until(EC.alert_is_present())
             text = alert.text
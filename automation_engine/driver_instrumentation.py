@@ -0,0 +1,210 @@
+# mon_bot_social/automation_engine/driver_instrumentation.py
+"""
+Instrumentation des allers-retours WebDriver: InstrumentedDriver enveloppe le driver (et les WebElements qu'il
+renvoie) de façon transparente et enregistre chaque commande dans un DriverCallRecorder:
+type de commande, sélecteur, latence, action en cours (tâche TaskScheduler) et méthode d'origine (classe.méthode:ligne
+dans automation_engine/actions). Les agrégats sont affichés dans l'onglet Stats et exportables en JSON.
+"""
+import sys
+import json
+import time
+import threading
+import contextlib
+
+ACTION_MODULE_PREFIX = "automation_engine.actions."
+MAX_SELECTOR_LENGTH = 160
+# Attributs du driver lus localement (pas de commande HTTP): ni enregistrés ni enveloppés
+_LOCAL_ATTRIBUTES = frozenset({"session_id", "capabilities", "w3c", "command_executor", "error_handler", "caps",
+                               "switch_to", "timeouts", "file_detector", "mobile", "parent", "id"})
+
+
+def _call_site():
+    """Première frame appartenant à un module d'action: 'Classe.méthode:ligne', sinon None (appel hors action)."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        if frame.f_globals.get("__name__", "").startswith(ACTION_MODULE_PREFIX):
+            code = frame.f_code
+            return f"{getattr(code, 'co_qualname', code.co_name)}:{frame.f_lineno}"
+        frame = frame.f_back
+    return None
+
+
+def _describe_selector(command, args):
+    if not args: return ""
+    if command in ("find_element", "find_elements") and len(args) >= 2: selector = f"{args[0]}={args[1]}"
+    elif command in ("execute_script", "execute_async_script"): selector = " ".join(str(args[0]).split())
+    elif command in ("get_attribute", "get_dom_attribute", "get_property", "value_of_css_property"): selector = str(args[0])
+    else: return "" # get(url), send_keys(texte)...: valeurs trop variables pour être agrégées
+    return selector if len(selector) <= MAX_SELECTOR_LENGTH else selector[:MAX_SELECTOR_LENGTH - 1] + "…"
+
+
+class DriverCallRecorder:
+    """Agrégats thread-safe par (action, méthode d'origine, commande, sélecteur): nombre, temps total, temps max, erreurs."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local() # Action en cours, par thread (les jobs APScheduler tournent en parallèle)
+        self._actions_by_thread = {} # Même info lisible depuis un autre thread (profileur par échantillonnage)
+        self.enabled = True
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._entries = {} # (action, call_site, command, selector) -> [count, total_sec, max_sec, errors]
+            self._started_at = time.time()
+
+    @contextlib.contextmanager
+    def action_context(self, action_name):
+        """Attribue les commandes exécutées dans ce bloc (sur ce thread) à `action_name`."""
+        previous_action = getattr(self._local, "action", None); thread_ident = threading.get_ident()
+        self._local.action = action_name; self._actions_by_thread[thread_ident] = action_name
+        try: yield
+        finally:
+            self._local.action = previous_action
+            if previous_action is None: self._actions_by_thread.pop(thread_ident, None)
+            else: self._actions_by_thread[thread_ident] = previous_action
+
+    def current_action(self): return getattr(self._local, "action", None)
+    def action_for_thread(self, thread_ident): return self._actions_by_thread.get(thread_ident)
+    def has_running_action(self): return bool(self._actions_by_thread) # Une tâche exécute une action (sur n'importe quel thread)
+
+    def record(self, command, selector, latency_sec, call_site=None, failed=False):
+        key = (self.current_action() or "-", call_site or "-", command, selector or "")
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None: entry = self._entries[key] = [0, 0.0, 0.0, 0]
+            entry[0] += 1; entry[1] += latency_sec
+            if latency_sec > entry[2]: entry[2] = latency_sec
+            if failed: entry[3] += 1
+
+    def entries(self):
+        """Liste de dicts triée par temps total décroissant."""
+        with self._lock: items = list(self._entries.items())
+        rows = [{"action": action, "call_site": call_site, "command": command, "selector": selector, "count": count,
+                 "total_ms": total_sec * 1000, "avg_ms": total_sec * 1000 / count, "max_ms": max_sec * 1000, "errors": errors}
+                for (action, call_site, command, selector), (count, total_sec, max_sec, errors) in items]
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    @staticmethod
+    def _group(rows, *fields):
+        grouped = {}
+        for row in rows:
+            key = " | ".join(row[field] for field in fields)
+            group = grouped.setdefault(key, {"count": 0, "total_ms": 0.0, "errors": 0})
+            group["count"] += row["count"]; group["total_ms"] += row["total_ms"]; group["errors"] += row["errors"]
+        return dict(sorted(grouped.items(), key=lambda kv: kv[1]["total_ms"], reverse=True))
+
+    def snapshot(self, top=20):
+        """Résumé pour l'UI / le JSON: totaux, par action, par commande, par méthode d'origine, et top appels."""
+        rows = self.entries()
+        return {
+            "since": self._started_at, "duration_sec": time.time() - self._started_at,
+            "total_commands": sum(row["count"] for row in rows), "total_ms": sum(row["total_ms"] for row in rows),
+            "by_action": self._group(rows, "action"), "by_command": self._group(rows, "command"),
+            "by_call_site": self._group(rows, "action", "call_site"),
+            "top_calls": rows[:top] if top else rows,
+        }
+
+    def dump_json(self, file_path, top=0):
+        """Écrit le snapshot complet (top=0: tous les appels). Retourne True/False."""
+        try:
+            with open(file_path, 'w', encoding='utf-8') as f: json.dump(self.snapshot(top=top), f, indent=2, ensure_ascii=False)
+            return True
+        except OSError:
+            return False
+
+
+driver_recorder = DriverCallRecorder() # Instance partagée (BrowserHandler, TaskScheduler, onglet Stats)
+
+
+class _InstrumentedBase:
+    __slots__ = ("_wrapped", "_recorder")
+
+    def __init__(self, wrapped, recorder):
+        object.__setattr__(self, "_wrapped", wrapped); object.__setattr__(self, "_recorder", recorder)
+
+    def _wrap_result(self, value):
+        if isinstance(value, list): return [self._wrap_result(item) for item in value]
+        if hasattr(value, "find_element") and hasattr(value, "get_attribute") and not isinstance(value, _InstrumentedBase):
+            return InstrumentedElement(value, self._recorder) # WebElement (selenium ou mock)
+        return value
+
+    def _timed(self, command, function, args, kwargs):
+        recorder = self._recorder
+        if not recorder.enabled: return self._wrap_result(function(*args, **kwargs))
+        call_site = _call_site(); started_at = time.perf_counter(); failed = True
+        try:
+            result = function(*args, **kwargs); failed = False
+            return self._wrap_result(result)
+        finally:
+            recorder.record(command, _describe_selector(command, args), time.perf_counter() - started_at, call_site, failed)
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name in _LOCAL_ATTRIBUTES: return getattr(self._wrapped, name)
+        recorder = self._recorder
+        if not recorder.enabled: return self._wrap_result(getattr(self._wrapped, name))
+        started_at = time.perf_counter()
+        try: value = getattr(self._wrapped, name) # Propriétés (current_url, title, text...) = une commande
+        except Exception:
+            recorder.record(name, "", time.perf_counter() - started_at, _call_site(), failed=True); raise
+        if callable(value): # Méthode liée: la commande part à l'appel
+            def instrumented_call(*args, **kwargs):
+                return self._timed(name, value, tuple(_unwrap(arg) for arg in args), kwargs)
+            return instrumented_call
+        recorder.record(name, "", time.perf_counter() - started_at, _call_site())
+        return self._wrap_result(value)
+
+    def __setattr__(self, name, value): setattr(self._wrapped, name, value)
+    def __eq__(self, other): return _unwrap(other) == self._wrapped
+    def __hash__(self): return hash(self._wrapped)
+    def __repr__(self): return f"<{type(self).__name__} {self._wrapped!r}>"
+
+
+def _unwrap(value):
+    if isinstance(value, _InstrumentedBase): return value._wrapped
+    if isinstance(value, (list, tuple)): return type(value)(_unwrap(item) for item in value)
+    return value
+
+
+class InstrumentedElement(_InstrumentedBase):
+    """WebElement enveloppé: text, get_attribute, click, find_element(s) relatifs... sont enregistrés."""
+    __slots__ = ()
+
+
+class InstrumentedDriver(_InstrumentedBase):
+    """Driver enveloppé, utilisable partout à la place du driver (WebDriverWait, expected_conditions, actions)."""
+    __slots__ = ()
+
+    @property
+    def wrapped_driver(self): return self._wrapped
+
+
+def instrument_driver(driver, recorder=None):
+    """Enveloppe `driver` (sans double enveloppe). Retourne l'InstrumentedDriver."""
+    if driver is None or isinstance(driver, InstrumentedDriver): return driver
+    return InstrumentedDriver(driver, recorder or driver_recorder)
+
+
+def format_snapshot(snapshot, top=10):
+    lines = [f"{snapshot['total_commands']} commandes WebDriver, {snapshot['total_ms']:.0f} ms au total "
+             f"(sur {snapshot['duration_sec'] / 60:.1f} min)"]
+    for title, key in (("Par action", "by_action"), ("Par méthode d'origine", "by_call_site"), ("Par commande", "by_command")):
+        lines.append(f"  {title}:")
+        for name, group in list(snapshot[key].items())[:top]:
+            lines.append(f"    {group['count']:>6} cmd {group['total_ms']:>9.1f} ms  {name}")
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    from automation_engine.mock_driver import MockWebDriver, LXML_AVAILABLE
+    if not LXML_AVAILABLE: print("lxml requis pour la démo (MockWebDriver)."); sys.exit(1)
+    recorder = DriverCallRecorder()
+    driver = instrument_driver(MockWebDriver(latency=0.002), recorder)
+    with recorder.action_context("auto_like"):
+        driver.get("https://www.instagram.com/")
+        for article in driver.find_elements("xpath", "//article[@role='presentation']"):
+            owner = article.find_element("xpath", ".//header//a").get_attribute("href")
+            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", article)
+        print(f"Dernier auteur: {owner} | URL: {driver.current_url}")
+    print(format_snapshot(recorder.snapshot()))
+    print(json.dumps(recorder.snapshot(top=3)["top_calls"], indent=2, ensure_ascii=False))
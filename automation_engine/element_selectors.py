@@ -113,7 +113,7 @@ class AppManager:
             # Normalement, l'UI DEVRAIT la fournir. Ceci est un fallback.
             default_gather_limit = self.get_setting("default_gather_run_limit", 1000) # Un nouveau setting potentiel
             task_options['gather_run_limit'] = task_options.get('gather_run_limit', default_gather_limit)
-            self.logger.debug(f"Limite de run pour Gather '{task_name}' mise à {task_options['gather_run_limit']} (utilisant fallback ou valeur UI).")
+            self.logger.debug("Limite de run pour Gather '%s' mise à %s (utilisant fallback ou valeur UI).", task_name, task_options['gather_run_limit'])
 
         if self.task_scheduler:
             success = self.task_scheduler.start_task(task_name, task_options)
@@ -0,0 +1,57 @@
+# mon_bot_social/automation_engine/event_sink.py
+"""
+Interface des notifications émises par AppManager, SessionManager et TaskScheduler vers l'extérieur.
+MainWindow l'implémente pour l'interface Qt; LoggingEventSink sert au mode daemon (daemon.py, sans Qt).
+Toutes les méthodes sont optionnelles: la classe de base ne fait rien.
+run_in_owner_thread(fonction) exécute un traitement venu d'un thread d'arrière-plan (watcher, timers) sur le thread
+propriétaire du sink: thread Qt pour MainWindow, appel direct pour le daemon (sink thread-safe).
+"""
+import threading
+
+from utils.logger import get_logger
+
+
+class EventSink:
+    def update_status(self, message, is_error=False, duration=5000): pass
+    def show_message(self, title, message, level="info"): pass
+    def update_task_status_indicator(self, task_name, is_running): pass
+    def log_follow_action(self, username, success): pass
+    def update_gathered_list_display(self, gathered_list): pass
+    def append_gathered_users(self, usernames): return 0
+    def run_in_owner_thread(self, function): function()
+
+
+class LoggingEventSink(EventSink):
+    """Sink du mode daemon: les statuts vont dans le log, l'état des tâches est gardé pour les rapports périodiques."""
+
+    def __init__(self, logger=None):
+        self.logger = logger or get_logger("Daemon")
+        self.task_states = {} # task_name -> True (active) / False
+        self.gathered_count = 0
+        self._lock = threading.Lock()
+
+    def update_status(self, message, is_error=False, duration=5000):
+        if is_error: self.logger.warning(f"[statut] {message}")
+        else: self.logger.info(f"[statut] {message}")
+
+    def show_message(self, title, message, level="info"):
+        log_method = self.logger.warning if level in ("warning", "error", "critical") else self.logger.info
+        log_method(f"[{title}] {message}")
+
+    def update_task_status_indicator(self, task_name, is_running):
+        with self._lock: self.task_states[task_name] = bool(is_running)
+        self.logger.info(f"Tâche '{task_name}': {'active' if is_running else 'arrêtée'}.")
+
+    def log_follow_action(self, username, success):
+        self.logger.debug("Follow %s: %s", username, 'OK' if success else 'échec')
+
+    def update_gathered_list_display(self, gathered_list):
+        with self._lock: self.gathered_count = len(gathered_list or [])
+        self.logger.info(f"{self.gathered_count} utilisateurs collectés.")
+
+    def append_gathered_users(self, usernames):
+        with self._lock: self.gathered_count += len(usernames)
+        return len(usernames)
+
+    def active_tasks(self):
+        with self._lock: return sorted(name for name, running in self.task_states.items() if running)
@@ -0,0 +1,288 @@
+# mon_bot_social/automation_engine/mock_driver.py
+"""
+Faux WebDriver hors ligne pour mesurer et tester les actions sans navigateur ni compte.
+Les pages sont des fixtures HTML enregistrées (automation_engine/fixtures/), évaluées avec les XPath lxml.
+Chaque commande (get, find_elements, execute_script, get_attribute, text, click...) compte un aller-retour
+et applique une latence configurable, pour simuler le coût du protocole WebDriver.
+
+Attributs de fixture reconnus (simulent le comportement dynamique de la page):
+    data-mock-hidden                 élément absent du DOM jusqu'à un data-mock-click-reveal
+    data-mock-scroll="N"             élément chargé seulement après N défilements (window.scrollBy / scrollTo)
+    data-mock-click-text="..."       au clic: remplace le texte de l'élément (ou de data-mock-click-target="id")
+    data-mock-click-attr="nom=val"   au clic: modifie l'attribut du premier élément (soi ou descendant) qui le porte
+    data-mock-click-reveal="id ..."  au clic: fait apparaître les éléments data-mock-hidden de ces ids
+    data-mock-click-remove="id ..."  au clic: retire ces éléments (ex: fermeture d'un dialogue)
+    data-mock-click-navigate="url"   au clic: charge cette URL (les liens <a href> naviguent aussi)
+"""
+import os
+import re
+import time
+import collections
+from urllib.parse import urljoin
+
+try:
+    from lxml import html as lxml_html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try: # Mêmes classes d'exceptions que Selenium: WebDriverWait ignore NoSuchElementException, les actions les interceptent
+    from selenium.common.exceptions import WebDriverException, NoSuchElementException, StaleElementReferenceException
+except ImportError:
+    class WebDriverException(Exception): pass
+    class NoSuchElementException(WebDriverException): pass
+    class StaleElementReferenceException(WebDriverException): pass
+
+from utils.logger import get_logger
+
+logger = get_logger("MockDriver")
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Routes par défaut (regex sur l'URL -> fichier de fixture), la première qui correspond gagne
+DEFAULT_ROUTES = (
+    (r"/stories/", "story.html"),
+    (r"/explore/tags/", "hashtag.html"),
+    (r"/p/[^/]+/?", "post.html"),
+    (r"instagram\.com/bench_following_[^/]+/?$", "profile_following.html"),
+    (r"instagram\.com/[^/]+/?$", "profile.html"),
+    (r"instagram\.com/?$", "feed.html"),
+)
+NOT_FOUND_FIXTURE = "not_found.html"
+
+# By.* de Selenium (valeurs chaînes) -> XPath équivalent
+_BY_TO_XPATH = {
+    "id": ".//*[@id={}]",
+    "name": ".//*[@name={}]",
+    "tag name": ".//{}",
+    "class name": ".//*[contains(concat(' ', normalize-space(@class), ' '), concat(' ', {}, ' '))]",
+    "link text": ".//a[normalize-space(.)={}]",
+    "partial link text": ".//a[contains(., {})]",
+}
+_CLICK_SCRIPT_RE = re.compile(r"arguments\[0\]\.click\(\)")
+_SCROLL_SCRIPT_RE = re.compile(r"window\.scroll(By|To)\(|scrollTop\s*=")
+
+
+def _xpath_literal(value):
+    if "'" not in value: return f"'{value}'"
+    if '"' not in value: return f'"{value}"'
+    return "concat(" + ", \"'\", ".join(f"'{part}'" for part in value.split("'")) + ")"
+
+
+def _to_xpath(by, value):
+    if by == "xpath": return value
+    if by == "css selector":
+        try: from cssselect import HTMLTranslator # Paquet optionnel (utilisé aussi par lxml.cssselect)
+        except ImportError: raise WebDriverException("Sélecteur CSS non supporté: paquet 'cssselect' absent.")
+        return HTMLTranslator().css_to_xpath(value, prefix="descendant::")
+    if by == "tag name": return _BY_TO_XPATH[by].format(value)
+    if by in _BY_TO_XPATH: return _BY_TO_XPATH[by].format(_xpath_literal(value))
+    raise WebDriverException(f"Stratégie de localisation non supportée: {by}")
+
+
+class MockWebElement:
+    """Sous-ensemble de selenium WebElement sur un élément lxml. Périmé (stale) après un nouveau get()."""
+
+    def __init__(self, driver, node, generation):
+        self._driver = driver; self._node = node; self._generation = generation
+
+    def _live_node(self, command):
+        self._driver._command(command)
+        if self._generation != self._driver._generation: raise StaleElementReferenceException("Élément détaché du DOM (page rechargée).")
+        top_node = self._node
+        for top_node in self._node.iterancestors(): pass
+        if top_node is not self._driver._tree: raise StaleElementReferenceException("Élément retiré du DOM.")
+        return self._node
+
+    def __eq__(self, other): return isinstance(other, MockWebElement) and other._node is self._node
+    def __hash__(self): return id(self._node)
+
+    @property
+    def tag_name(self): return self._live_node("tag_name").tag
+
+    @property
+    def text(self): return " ".join(self._live_node("text").text_content().split())
+
+    def get_attribute(self, name):
+        node = self._live_node("get_attribute")
+        if name in ("textContent", "innerText"): return node.text_content()
+        value = node.get(name)
+        if value is not None and name in ("href", "src"): return urljoin(self._driver.current_page_url, value)
+        return value
+
+    def get_dom_attribute(self, name): return self._live_node("get_dom_attribute").get(name)
+    def is_displayed(self): return self._live_node("is_displayed") is not None and not self._driver._is_node_hidden(self._node, check_style=True)
+    def is_enabled(self): return self._live_node("is_enabled").get("disabled") is None
+    def is_selected(self): return self._live_node("is_selected").get("checked") is not None
+    def send_keys(self, *values): node = self._live_node("send_keys"); node.set("value", (node.get("value") or "") + "".join(str(v) for v in values))
+    def clear(self): self._live_node("clear").set("value", "")
+
+    def click(self):
+        self._driver._apply_click(self._live_node("click"))
+
+    def find_elements(self, by="xpath", value=None):
+        return self._driver._find(self._live_node("find_elements"), by, value)
+
+    def find_element(self, by="xpath", value=None):
+        return self._driver._first(self._driver._find(self._live_node("find_element"), by, value), by, value)
+
+
+class MockWebDriver:
+    """
+    Sous-ensemble de l'API WebDriver utilisée par les actions, servi par des fixtures HTML.
+    `latency`: secondes par commande (float) ou dict {commande: secondes, "default": secondes}.
+    `routes`: séquence de (regex d'URL, fichier de fixture). Les compteurs (round_trips, command_counts)
+    permettent de comparer le nombre d'allers-retours d'une action avant/après optimisation.
+    """
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR, routes=DEFAULT_ROUTES, latency=0.0, sleep=time.sleep):
+        if not LXML_AVAILABLE: raise RuntimeError("MockWebDriver nécessite lxml (pip install lxml).")
+        self.fixtures_dir = fixtures_dir
+        self.routes = [(re.compile(pattern), fixture) for pattern, fixture in routes]
+        self.latency = latency; self._sleep = sleep
+        self.command_counts = collections.Counter()
+        self.round_trips = 0
+        self.history = [] # URLs chargées (pour back())
+        self.current_page_url = "about:blank"
+        self.scroll_count = 0
+        self._parser = lxml_html.HTMLParser(encoding="utf-8") # Fixtures enregistrées en UTF-8
+        self._fixture_cache = {} # Fichier -> octets (re-parsés à chaque get: chaque chargement repart d'un DOM neuf)
+        self._tree = lxml_html.fromstring("<html><head><title></title></head><body></body></html>")
+        self._generation = 0
+
+    # --- Comptage / latence ---
+    def _command(self, name):
+        self.command_counts[name] += 1; self.round_trips += 1
+        delay = self.latency.get(name, self.latency.get("default", 0.0)) if isinstance(self.latency, dict) else self.latency
+        if delay: self._sleep(delay)
+
+    def reset_counters(self):
+        self.command_counts.clear(); self.round_trips = 0
+
+    # --- Chargement des fixtures ---
+    def fixture_for_url(self, url):
+        return next((fixture for pattern, fixture in self.routes if pattern.search(url)), NOT_FOUND_FIXTURE)
+
+    def _load_page(self, url):
+        fixture = self.fixture_for_url(url)
+        if fixture not in self._fixture_cache:
+            with open(os.path.join(self.fixtures_dir, fixture), 'rb') as f: self._fixture_cache[fixture] = f.read()
+        self._tree = lxml_html.fromstring(self._fixture_cache[fixture], parser=self._parser)
+        self.current_page_url = url; self.scroll_count = 0
+        self._generation += 1 # Les éléments obtenus avant deviennent périmés
+        logger.debug("Page mock chargée: %s -> %s", url, fixture)
+
+    # --- API WebDriver ---
+    def get(self, url):
+        self._command("get")
+        self._load_page(url); self.history.append(url)
+
+    @property
+    def current_url(self): self._command("current_url"); return self.current_page_url
+
+    @property
+    def title(self):
+        self._command("title")
+        title_nodes = self._tree.xpath("//title")
+        return title_nodes[0].text_content().strip() if title_nodes else ""
+
+    @property
+    def page_source(self): self._command("page_source"); return lxml_html.tostring(self._tree, encoding="unicode")
+
+    def back(self):
+        self._command("back")
+        if len(self.history) > 1: self.history.pop(); self._load_page(self.history[-1])
+
+    def refresh(self): self._command("refresh"); self._load_page(self.current_page_url)
+
+    def find_elements(self, by="xpath", value=None):
+        self._command("find_elements")
+        return self._find(self._tree, by, value)
+
+    def find_element(self, by="xpath", value=None):
+        self._command("find_element")
+        return self._first(self._find(self._tree, by, value), by, value)
+
+    def execute_script(self, script, *args):
+        self._command("execute_script")
+        if _CLICK_SCRIPT_RE.search(script) and args and isinstance(args[0], MockWebElement):
+            self._apply_click(args[0]._node); return None
+        if _SCROLL_SCRIPT_RE.search(script): self.scroll_count += 1; return None
+        if "document.readyState" in script: return "complete"
+        if "scrollHeight" in script or "innerHeight" in script: return 1000 * (self.scroll_count + 1)
+        return None # scrollIntoView & co: sans effet sur le DOM mock
+
+    def set_page_load_timeout(self, seconds): self._command("set_page_load_timeout")
+    def set_script_timeout(self, seconds): self._command("set_script_timeout")
+    def implicitly_wait(self, seconds): self._command("implicitly_wait")
+    def delete_all_cookies(self): self._command("delete_all_cookies")
+    def get_cookies(self): self._command("get_cookies"); return []
+    def quit(self): self._command("quit")
+    def close(self): self._command("close")
+
+    # --- Évaluation ---
+    def _is_node_hidden(self, node, check_style=False):
+        for ancestor in node.iterancestors(): # Un parent caché cache aussi ses descendants
+            if self._is_single_node_hidden(ancestor, check_style): return True
+        return self._is_single_node_hidden(node, check_style)
+
+    def _is_single_node_hidden(self, node, check_style):
+        if node.get("data-mock-hidden") is not None: return True
+        scroll_level = node.get("data-mock-scroll")
+        if scroll_level is not None and int(scroll_level) > self.scroll_count: return True
+        return check_style and "display:none" in (node.get("style") or "").replace(" ", "")
+
+    def _find(self, context_node, by, value):
+        try: results = context_node.xpath(_to_xpath(by, value))
+        except Exception as e: raise WebDriverException(f"Sélecteur invalide ({by}: {value}): {e}")
+        generation = self._generation
+        return [MockWebElement(self, node, generation) for node in results
+                if isinstance(getattr(node, "tag", None), str) and not self._is_node_hidden(node)]
+
+    @staticmethod
+    def _first(elements, by, value):
+        if not elements: raise NoSuchElementException(f"Aucun élément pour {by}: {value}")
+        return elements[0]
+
+    def _nodes_by_ids(self, ids):
+        return [node for element_id in ids.split() for node in self._tree.xpath(f"//*[@id={_xpath_literal(element_id)}]")]
+
+    def _apply_click(self, node):
+        target_ids = node.get("data-mock-click-target")
+        targets = self._nodes_by_ids(target_ids) if target_ids else [node]
+        new_text = node.get("data-mock-click-text")
+        if new_text is not None:
+            for target in targets:
+                text_holder = next((n for n in target.iter() if isinstance(n.tag, str) and (n.text or "").strip()), target)
+                text_holder.text = new_text
+        attribute_change = node.get("data-mock-click-attr")
+        if attribute_change and "=" in attribute_change:
+            attribute_name, attribute_value = attribute_change.split("=", 1)
+            for target in targets:
+                holder = next((n for n in target.iter() if isinstance(n.tag, str) and n.get(attribute_name) is not None), None)
+                if holder is not None: holder.set(attribute_name, attribute_value)
+        for revealed in self._nodes_by_ids(node.get("data-mock-click-reveal") or ""):
+            revealed.attrib.pop("data-mock-hidden", None)
+        for removed in self._nodes_by_ids(node.get("data-mock-click-remove") or ""):
+            if removed.getparent() is not None: removed.getparent().remove(removed)
+        navigate_url = node.get("data-mock-click-navigate") or (node.get("href") if node.tag == "a" else None)
+        if navigate_url: # Le clic ne compte pas comme un get: c'est le navigateur qui charge, pas une commande
+            self._load_page(urljoin(self.current_page_url, navigate_url)); self.history.append(self.current_page_url)
+        elif node.tag != "a": # Clic sur un enfant de lien (img, span): suivre le lien ancêtre
+            link = next((a for a in node.iterancestors("a") if a.get("href")), None)
+            if link is not None and new_text is None and not attribute_change:
+                self._load_page(urljoin(self.current_page_url, link.get("href"))); self.history.append(self.current_page_url)
+
+
+if __name__ == '__main__':
+    driver = MockWebDriver(latency={"default": 0.001, "get": 0.01})
+    driver.get("https://www.instagram.com/bench_user_1/")
+    print(f"Titre: {driver.title} | URL: {driver.current_url}")
+    follow_buttons = driver.find_elements("xpath", "//div[@role='main']//button[.//div[contains(text(),'Follow')]]")
+    print(f"Boutons Follow: {len(follow_buttons)} ({follow_buttons[0].text if follow_buttons else '-'})")
+    if follow_buttons: follow_buttons[0].click(); print(f"Après clic: {follow_buttons[0].text}")
+    driver.get("https://www.instagram.com/")
+    print(f"Articles visibles: {len(driver.find_elements('xpath', '//article'))}")
+    driver.execute_script("window.scrollBy(0, window.innerHeight*1.5);")
+    print(f"Articles après défilement: {len(driver.find_elements('xpath', '//article'))}")
+    print(f"Allers-retours: {driver.round_trips} {dict(driver.command_counts)}")
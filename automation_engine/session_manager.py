@@ -1,19 +1,28 @@
 # mon_bot_social/core/session_manager.py
-import time
 import random
 import datetime 
-from PyQt6.QtCore import QTime # Nécessaire pour la comparaison des plages horaires
+import bisect
+import pytz
 from utils.logger import get_logger
+from utils.clock import system_clock
 
 class SessionManager:
-    def __init__(self, app_manager):
+    def __init__(self, app_manager, clock=None, rng=None):
         self.app_manager = app_manager
         self.logger = self.app_manager.logger # Utiliser le logger de AppManager
+        # Horloge et générateur aléatoire injectables (simulation accélérée, cf. automation_engine/simulation.py)
+        self.clock = clock or system_clock
+        self.rng = rng or random
 
         self.is_bot_globally_active = False # Indique si une tâche est censée tourner
 
         self.current_session_config = {} # Sera chargé par load_session_config
-        self.activity_time_ranges = [] # Liste de tuples (QTime start, QTime end)
+        self.activity_time_ranges = [] # Liste de tuples (secondes depuis minuit début, fin) dans le fuseau de référence
+        # Plages horaires "compilées" en timestamps Unix (UTC) triés: [ouverture1, fermeture1, ouverture2, ...]
+        # Couvre hier/aujourd'hui/demain, reconstruit une fois par jour (cf. _build_activity_schedule)
+        self._activity_boundaries = []
+        self._activity_schedule_valid_from = None
+        self._activity_schedule_valid_until = None
 
         # Grosses Pauses (Breaks)
         self.actions_since_last_break = 0
@@ -50,10 +59,10 @@ class SessionManager:
         min_act = self.current_session_config.get("distraction_actions_min", 10)
         max_act = self.current_session_config.get("distraction_actions_max", 25)
         if min_act > 0 and max_act >= min_act:
-            self.next_distraction_action_count_target = random.randint(min_act, max_act)
+            self.next_distraction_action_count_target = self.rng.randint(min_act, max_act)
         else:
             self.next_distraction_action_count_target = -1
-        self.logger.debug(f"Prochaine micro-pause possible après {self.next_distraction_action_count_target} actions.")
+        self.logger.debug("Prochaine micro-pause possible après %s actions.", self.next_distraction_action_count_target)
 
     def _set_next_network_sim_trigger(self):
         if not self.current_session_config.get("enable_network_disconnect_sim", False):
@@ -64,53 +73,53 @@ class SessionManager:
         if min_interval <= 0 or max_interval < min_interval:
             self.next_network_sim_trigger_time = None; return
         
-        interval_minutes = random.randint(min_interval, max_interval)
-        self.next_network_sim_trigger_time = time.time() + interval_minutes * 60
+        interval_minutes = self.rng.randint(min_interval, max_interval)
+        self.next_network_sim_trigger_time = self.clock.time() + interval_minutes * 60
         self.logger.info(f"Prochaine simulation de déconnexion réseau possible dans ~{interval_minutes} min.")
 
 
     def load_session_config(self):
-        settings = self.app_manager.current_settings
+        session = self.app_manager.settings.session # Instantané validé (défauts et bornes centralisés dans settings_schema)
         self.logger.info("SessionManager: Rechargement de la configuration de session...")
         self.current_session_config = {
-            "enable_activity_times": settings.get("enable_activity_times", False),
+            "enable_activity_times": session.enable_activity_times,
             "time_slots_str": [ # Stocker les strings pour reconstruction facile
-                (settings.get("time1_start", "08:00"), settings.get("time1_end", "11:00")),
-                (settings.get("time2_start", "13:00"), settings.get("time2_end", "16:00")),
-                (settings.get("time3_start", "19:00"), settings.get("time3_end", "22:30")),
+                (session.time1_start, session.time1_end),
+                (session.time2_start, session.time2_end),
+                (session.time3_start, session.time3_end),
             ],
-            "enable_target_timezone": settings.get("enable_target_timezone", False),
-            "target_timezone_str": settings.get("target_timezone", "UTC"),
+            "enable_target_timezone": session.enable_target_timezone,
+            "target_timezone_str": session.target_timezone,
 
-            "max_actions_per_session": settings.get("max_actions_per_session", 0),
+            "max_actions_per_session": session.max_actions_per_session,
 
-            "actions_before_break": settings.get("actions_before_break", 40),
-            "break_duration_min": settings.get("break_duration_min", 5),
-            "break_duration_max": settings.get("break_duration_max", 15),
+            "actions_before_break": session.actions_before_break,
+            "break_duration_min": session.break_duration_min,
+            "break_duration_max": session.break_duration_max,
 
-            "enable_distractions": settings.get("enable_distractions", False),
-            "distraction_actions_min": settings.get("distraction_actions_min", 10),
-            "distraction_actions_max": settings.get("distraction_actions_max", 25),
-            "distraction_duration_min_sec": settings.get("distraction_duration_min_sec", 60),
-            "distraction_duration_max_sec": settings.get("distraction_duration_max_sec", 180),
+            "enable_distractions": session.enable_distractions,
+            "distraction_actions_min": session.distraction_actions_min,
+            "distraction_actions_max": session.distraction_actions_max,
+            "distraction_duration_min_sec": session.distraction_duration_min_sec,
+            "distraction_duration_max_sec": session.distraction_duration_max_sec,
             
-            "fatigue_threshold": settings.get("fatigue_threshold", 0),
-            "fatigue_pause_multiplier": settings.get("fatigue_pause_multiplier", 1.0),
-
-            "enable_network_disconnect_sim": settings.get("enable_network_disconnect_sim", False),
-            "net_disconnect_interval_min_min": settings.get("net_disconnect_interval_min_min", 30),
-            "net_disconnect_interval_max_min": settings.get("net_disconnect_interval_max_min", 90),
-            "net_disconnect_duration_min_sec": settings.get("net_disconnect_duration_min_sec", 60),
-            "net_disconnect_duration_max_sec": settings.get("net_disconnect_duration_max_sec", 120),
+            "fatigue_threshold": session.fatigue_threshold,
+            "fatigue_pause_multiplier": session.fatigue_pause_multiplier,
+
+            "enable_network_disconnect_sim": session.enable_network_disconnect_sim,
+            "net_disconnect_interval_min_min": session.net_disconnect_interval_min_min,
+            "net_disconnect_interval_max_min": session.net_disconnect_interval_max_min,
+            "net_disconnect_duration_min_sec": session.net_disconnect_duration_min_sec,
+            "net_disconnect_duration_max_sec": session.net_disconnect_duration_max_sec,
         }
         
         self.activity_time_ranges = []
         if self.current_session_config["enable_activity_times"]:
             for start_str, end_str in self.current_session_config["time_slots_str"]:
-                t_start = QTime.fromString(start_str, "HH:mm"); t_end = QTime.fromString(end_str, "HH:mm")
-                if t_start.isValid() and t_end.isValid() and t_start != t_end : 
+                t_start = self._parse_hhmm_to_seconds(start_str); t_end = self._parse_hhmm_to_seconds(end_str)
+                if t_start is not None and t_end is not None and t_start != t_end:
                     self.activity_time_ranges.append((t_start, t_end))
-            self.logger.info(f"Plages horaires configurées: {[(t1.toString(), t2.toString()) for t1,t2 in self.activity_time_ranges]}")
+            self.logger.info(f"Plages horaires configurées: {[(s, e) for s, e in self.current_session_config['time_slots_str']]} ({len(self.activity_time_ranges)} valides)")
 
         self.target_timezone_obj = None
         if self.current_session_config["enable_target_timezone"]:
@@ -121,6 +130,8 @@ class SessionManager:
             except Exception as e_tz:
                  self.logger.error(f"Erreur init fuseau horaire {tz_str}: {e_tz}. Utilisation UTC."); self.target_timezone_obj = pytz.utc
             
+        self._invalidate_activity_schedule() # Sera recompilé au prochain check avec la nouvelle config/TZ
+
         self._set_next_distraction_target()
         if not self.is_on_network_sim_pause: self._set_next_network_sim_trigger() # Ne pas reset si une pause est en cours
 
@@ -133,36 +144,93 @@ class SessionManager:
             self.logger.warning("Limite d'actions/session toujours atteinte après rechargement config.")
 
 
-    def _is_within_activity_time(self):
-        if not self.current_session_config.get("enable_activity_times") or not self.activity_time_ranges:
+    @staticmethod
+    def _parse_hhmm_to_seconds(hhmm_str):
+        """'HH:mm' -> secondes depuis minuit, ou None si invalide."""
+        try:
+            t = datetime.datetime.strptime(str(hhmm_str).strip(), "%H:%M")
+            return t.hour * 3600 + t.minute * 60
+        except (ValueError, TypeError):
+            return None
+
+    def _invalidate_activity_schedule(self):
+        self._activity_boundaries = []
+        self._activity_schedule_valid_from = None
+        self._activity_schedule_valid_until = None
+
+    def _local_day_timestamp(self, day, seconds_of_day):
+        """Timestamp Unix de `day` + `seconds_of_day` dans le fuseau de référence (cible ou heure machine)."""
+        naive_dt = datetime.datetime.combine(day, datetime.time()) + datetime.timedelta(seconds=seconds_of_day)
+        if self.target_timezone_obj:
+            return self.target_timezone_obj.localize(naive_dt).timestamp()
+        return naive_dt.timestamp() # Naïf = heure locale de la machine
+
+    def _build_activity_schedule(self, now_ts):
+        """
+        Compile les plages horaires en une liste triée de bornes UTC pour hier, aujourd'hui et demain
+        (hier pour les plages qui passent minuit, demain pour connaître la prochaine ouverture).
+        Valable jusqu'à minuit (fuseau de référence), puis reconstruite.
+        """
+        if self.target_timezone_obj: today = datetime.datetime.fromtimestamp(now_ts, self.target_timezone_obj).date()
+        else: today = datetime.datetime.fromtimestamp(now_ts).date()
+
+        intervals = []
+        for day_offset in (-1, 0, 1):
+            day = today + datetime.timedelta(days=day_offset)
+            for start_sec, end_sec in self.activity_time_ranges:
+                start_ts = self._local_day_timestamp(day, start_sec)
+                end_day = day if end_sec > start_sec else day + datetime.timedelta(days=1) # Plage qui passe minuit
+                intervals.append((start_ts, self._local_day_timestamp(end_day, end_sec)))
+        intervals.sort()
+
+        boundaries = [] # Fusion des chevauchements -> bornes alternées ouverture/fermeture
+        for start_ts, end_ts in intervals:
+            if boundaries and start_ts <= boundaries[-1]: boundaries[-1] = max(boundaries[-1], end_ts)
+            else: boundaries.extend([start_ts, end_ts])
+
+        self._activity_boundaries = boundaries
+        self._activity_schedule_valid_from = self._local_day_timestamp(today, 0)
+        self._activity_schedule_valid_until = self._local_day_timestamp(today + datetime.timedelta(days=1), 0)
+        self.logger.debug("Planning d'activité compilé (%s plages sur 3 jours).", len(boundaries) // 2)
+
+    def _ensure_activity_schedule(self, now_ts):
+        if self._activity_schedule_valid_until is None or \
+           not (self._activity_schedule_valid_from <= now_ts < self._activity_schedule_valid_until):
+            try: self._build_activity_schedule(now_ts)
+            except Exception as e_sched:
+                self.logger.error(f"Erreur compilation plages horaires: {e_sched}. Plages ignorées.")
+                self._activity_boundaries = []
+                self._activity_schedule_valid_from = now_ts; self._activity_schedule_valid_until = now_ts + 60 # Réessayer plus tard
+
+    def _activity_check_enabled(self):
+        return bool(self.current_session_config.get("enable_activity_times") and self.activity_time_ranges)
+
+    def _is_within_activity_time(self, now_ts=None):
+        if not self._activity_check_enabled():
             return True 
-
-        now_utc = datetime.datetime.now(datetime.timezone.utc)
-        current_qtime_for_comparison = QTime(now_utc.hour, now_utc.minute, now_utc.second) # Par défaut UTC
-
-        if self.target_timezone_obj: # Si adaptation TZ activée
-            try:
-                current_dt_in_target_tz = now_utc.astimezone(self.target_timezone_obj)
-                current_qtime_for_comparison = QTime(current_dt_in_target_tz.hour, current_dt_in_target_tz.minute, current_dt_in_target_tz.second)
-            except Exception as e_tz_conv: # Erreur pendant conversion (rare avec pytz)
-                 self.logger.error(f"Erreur conversion heure vers TZ cible {self.target_timezone_obj}: {e_tz_conv}. Comparaison en UTC.")
-        # else: On utilise l'heure locale de la machine si pas de target_timezone_obj, ce qui n'est pas idéal
-        # Il faudrait un QTime.currentTime() si enable_target_timezone est False, mais la logique de UTC+target est plus propre
-        # Pour l'instant, si enable_target_timezone=False, on compare avec QTime.currentTime() qui est l'heure locale
-        
-        if not self.current_session_config.get("enable_target_timezone"): # Si pas d'adaptation, utiliser l'heure locale de la machine
-            current_qtime_for_comparison = QTime.currentTime()
-        
-        # logger.debug(f"Heure pour comparaison: {current_qtime_for_comparison.toString('HH:mm:ss')}")
-
-        for start_time_q, end_time_q in self.activity_time_ranges:
-            if start_time_q <= end_time_q: 
-                if start_time_q <= current_qtime_for_comparison < end_time_q: return True
-            else: 
-                if start_time_q <= current_qtime_for_comparison or current_qtime_for_comparison < end_time_q: return True
-        
-        # self.logger.debug(f"Hors des plages horaires: {[(s.toString(), e.toString()) for s,e in self.activity_time_ranges]}")
-        return False
+        now_ts = self.clock.time() if now_ts is None else now_ts
+        self._ensure_activity_schedule(now_ts)
+        # Index impair = on est entre une ouverture et une fermeture
+        return bisect.bisect_right(self._activity_boundaries, now_ts) % 2 == 1
+
+    def get_next_activity_transition(self, now_ts=None):
+        """
+        Retourne (dans_une_plage, timestamp_prochaine_transition).
+        Le timestamp est None si les plages horaires sont désactivées (toujours actif).
+        """
+        if not self._activity_check_enabled(): return True, None
+        now_ts = self.clock.time() if now_ts is None else now_ts
+        self._ensure_activity_schedule(now_ts)
+        idx = bisect.bisect_right(self._activity_boundaries, now_ts)
+        next_ts = self._activity_boundaries[idx] if idx < len(self._activity_boundaries) else None
+        return idx % 2 == 1, next_ts
+
+    def get_next_activity_window_start(self, now_ts=None):
+        """Timestamp d'ouverture de la prochaine plage (now_ts si déjà dans une plage)."""
+        now_ts = self.clock.time() if now_ts is None else now_ts
+        is_active, next_ts = self.get_next_activity_transition(now_ts)
+        if is_active: return now_ts
+        return next_ts
 
     def start_logical_session(self): 
         self.logger.info("Démarrage d'une session logique d'activité (Bot START).")
@@ -187,7 +255,7 @@ class SessionManager:
     def can_perform_action(self):
         if not self.is_bot_globally_active: return False 
 
-        now_ts = time.time()
+        now_ts = self.clock.time()
 
         if self.is_on_block_cooldown:
             if self.block_cooldown_end_time and now_ts < self.block_cooldown_end_time: return False
@@ -210,6 +278,38 @@ class SessionManager:
 
         return True
 
+    def get_next_eligible_time(self, now_ts=None):
+        """
+        Timestamp à partir duquel can_perform_action() redeviendra vrai (now_ts si déjà possible).
+        Combine cooldown, pauses (réseau, grosse, micro) et plages horaires. Ne modifie pas l'état de la session
+        (pauses, compteurs); seul le cache des plages horaires peut être (re)construit (_ensure_activity_schedule).
+        Retourne None si aucune reprise n'est prévisible (bot arrêté, limite de session, aucune plage).
+        """
+        if not self.is_bot_globally_active or self.session_action_limit_reached_flag: return None
+        now_ts = self.clock.time() if now_ts is None else now_ts
+        eligible_ts = now_ts
+
+        pending_ends = [
+            (self.is_on_block_cooldown, self.block_cooldown_end_time),
+            (self.is_on_network_sim_pause, self.network_sim_pause_end_time),
+            (self.is_on_break, self.break_end_time),
+            (self.is_on_distraction_pause, self.distraction_pause_end_time),
+        ]
+        for is_active, end_ts in pending_ends:
+            if is_active and end_ts: eligible_ts = max(eligible_ts, end_ts)
+
+        # Les pauses finissent avant/pendant une plage ? Sinon attendre la prochaine ouverture.
+        return self.get_next_activity_window_start(eligible_ts)
+
+    def get_state_snapshot(self):
+        """État courant de la session (compteurs, pauses) pour le journal d'activité structuré."""
+        return {
+            "total_actions": self.current_session_total_actions, "since_break": self.actions_since_last_break,
+            "on_break": self.is_on_break, "on_distraction": self.is_on_distraction_pause,
+            "on_block_cooldown": self.is_on_block_cooldown, "on_network_sim": self.is_on_network_sim_pause,
+            "limit_reached": self.session_action_limit_reached_flag,
+        }
+
     def increment_action_count(self):
         # Cette fonction est appelée APRÈS qu'une action a été tentée et a réussi (ou échoué mais compte quand même comme une tentative)
         if not self.is_bot_globally_active: return # Ne rien faire si le bot est globalement arrêté
@@ -223,14 +323,14 @@ class SessionManager:
         if self.current_session_config.get("enable_distractions"):
              self.actions_since_last_distraction += 1
         
-        self.logger.debug(f"Compteurs actions: Break={self.actions_since_last_break}, Distraction={self.actions_since_last_distraction}/{self.next_distraction_action_count_target}, SessionTotal={self.current_session_total_actions}")
+        self.logger.debug("Compteurs actions: Break=%s, Distraction=%s/%s, SessionTotal=%s", self.actions_since_last_break, self.actions_since_last_distraction, self.next_distraction_action_count_target, self.current_session_total_actions)
 
         session_limit = self.current_session_config.get("max_actions_per_session", 0)
         if session_limit > 0 and self.current_session_total_actions >= session_limit:
              self.logger.warning(f"LIMITE DE {session_limit} ACTIONS/SESSION ATTEINTE. Fin de session logique.")
              self.session_action_limit_reached_flag = True
-             if self.app_manager and self.app_manager.main_window:
-                 self.app_manager.main_window.update_status(f"Limite Actions ({session_limit}) atteinte. Pause session.", is_error=True, duration=300000) # 5 min
+             if self.app_manager:
+                 self.app_manager.event_sink.update_status(f"Limite Actions ({session_limit}) atteinte. Pause session.", is_error=True, duration=300000) # 5 min
              # AppManager doit être notifié pour stopper les tâches actives
              if self.app_manager: self.app_manager.stop_all_active_tasks_due_to_session_limit()
 
@@ -242,10 +342,10 @@ class SessionManager:
 
     def take_break(self): 
         min_d = self.current_session_config.get("break_duration_min", 5); max_d = self.current_session_config.get("break_duration_max", 15);
-        duration_m = random.randint(min_d, max_d); now_ts = time.time(); self.break_end_time = now_ts + duration_m * 60;
+        duration_m = self.rng.randint(min_d, max_d); now_ts = self.clock.time(); self.break_end_time = now_ts + duration_m * 60;
         self.is_on_break = True; self.actions_since_last_break = 0;
         self.logger.info(f"Début GROSSE pause ({duration_m} min). Fin ~ {datetime.datetime.fromtimestamp(self.break_end_time).strftime('%H:%M:%S')}.")
-        if self.app_manager.main_window: self.app_manager.main_window.update_status(f"En pause ({duration_m} min)...", duration=duration_m * 60 * 1000);
+        self.app_manager.event_sink.update_status(f"En pause ({duration_m} min)...", duration=duration_m * 60 * 1000);
 
 
     def should_take_distraction_pause(self):
@@ -258,48 +358,51 @@ class SessionManager:
     def take_distraction_pause(self): 
         min_s = self.current_session_config.get("distraction_duration_min_sec", 60)
         max_s = self.current_session_config.get("distraction_duration_max_sec", 180)
-        duration_s = random.randint(min_s, max_s)
+        duration_s = self.rng.randint(min_s, max_s)
         fatigue_info = ""; fatigue_threshold = self.current_session_config.get("fatigue_threshold",0)
         if fatigue_threshold > 0 and self.current_session_total_actions >= fatigue_threshold:
             multiplier = self.current_session_config.get("fatigue_pause_multiplier",1.0)
             if multiplier > 1.0: original_duration = duration_s; duration_s = int(duration_s * multiplier); fatigue_info = f" (Fatigué: {original_duration}s*{multiplier:.1f})"
         
-        now_ts = time.time(); self.distraction_pause_end_time = now_ts + duration_s;
+        now_ts = self.clock.time(); self.distraction_pause_end_time = now_ts + duration_s;
         self.is_on_distraction_pause = True; self.actions_since_last_distraction = 0 # Reset pour prochaine micro-pause
         # self._set_next_distraction_target() # Est appelé à la FIN de la pause
         
         self.logger.info(f"Début MICRO-pause ({duration_s} sec){fatigue_info}. Fin ~ {datetime.datetime.fromtimestamp(self.distraction_pause_end_time).strftime('%H:%M:%S')}.")
-        if self.app_manager.main_window: self.app_manager.main_window.update_status(f"Micro-pause ({duration_s}s){fatigue_info}...", duration=duration_s*1000)
+        self.app_manager.event_sink.update_status(f"Micro-pause ({duration_s}s){fatigue_info}...", duration=duration_s*1000)
 
     def should_simulate_network_disconnect(self):
         if not self.current_session_config.get("enable_network_disconnect_sim", False) or \
            any([self.is_on_network_sim_pause, self.is_on_block_cooldown, self.is_on_break, self.is_on_distraction_pause]):
             return False
-        return self.next_network_sim_trigger_time and time.time() >= self.next_network_sim_trigger_time
+        return self.next_network_sim_trigger_time and self.clock.time() >= self.next_network_sim_trigger_time
 
     def simulate_network_disconnect(self):
         min_s = self.current_session_config.get("net_disconnect_duration_min_sec", 60)
         max_s = self.current_session_config.get("net_disconnect_duration_max_sec", 120)
-        duration_s = random.randint(min_s, max_s); now_ts = time.time();
+        duration_s = self.rng.randint(min_s, max_s); now_ts = self.clock.time();
         self.network_sim_pause_end_time = now_ts + duration_s
         self.is_on_network_sim_pause = True
         # Prochain trigger sera programmé à la fin de cette pause via can_perform_action
         self.logger.warning(f"SIM. DÉCONNEXION RÉSEAU ({duration_s} sec). Fin ~ {datetime.datetime.fromtimestamp(self.network_sim_pause_end_time).strftime('%H:%M:%S')}.")
-        if self.app_manager.main_window: self.app_manager.main_window.update_status(f"🔌 Sim. Déco. ({duration_s}s)...", duration=duration_s*1000, is_error=True)
+        self.app_manager.event_sink.update_status(f"🔌 Sim. Déco. ({duration_s}s)...", duration=duration_s*1000, is_error=True)
 
 
     def start_block_cooldown(self):
         # ... (comme avant, s'assurer qu'il met is_on_block_cooldown et is_on_break à True)
-        cooldown_minutes = self.app_manager.get_setting("stop_on_block_delay", 10); #...
+        cooldown_minutes = self.app_manager.settings.session.stop_on_block_delay; #...
         if cooldown_minutes <= 0: self.logger.warning("Détection blocage, mais cooldown <=0."); return
-        now_ts = time.time(); self.block_cooldown_end_time = now_ts + cooldown_minutes * 60
+        now_ts = self.clock.time(); self.block_cooldown_end_time = now_ts + cooldown_minutes * 60
         self.is_on_block_cooldown = True; self.is_on_break = True; self.break_end_time = self.block_cooldown_end_time
         self.actions_since_last_break = 0; self.actions_since_last_distraction = 0; self._set_next_distraction_target();
         end_time_str = datetime.datetime.fromtimestamp(self.block_cooldown_end_time).strftime('%H:%M:%S')
         self.logger.critical(f"BLOCAGE DÉTECTÉ! Cooldown ({cooldown_minutes} min). Fin ~ {end_time_str}.")
-        if self.app_manager.main_window: self.app_manager.main_window.update_status(f"🚫 Blocage! Cooldown ({cooldown_minutes} min) ~{end_time_str}", is_error=True, duration=cooldown_minutes*60*1000)
+        self.app_manager.event_sink.update_status(f"🚫 Blocage! Cooldown ({cooldown_minutes} min) ~{end_time_str}", is_error=True, duration=cooldown_minutes*60*1000)
 
 
     def on_settings_updated(self, new_settings=None): # new_settings est optionnel maintenant car AM lit les settings
         self.logger.info("SessionManager: Réception notification MàJ paramètres.")
-        self.load_session_config() # Recharge TOUTE la config
\ No newline at end of file
+        self.load_session_config() # Recharge TOUTE la config
+        # Les plages horaires ont pu changer: réaligner les tâches mises en attente
+        task_scheduler = getattr(self.app_manager, "task_scheduler", None)
+        if task_scheduler: task_scheduler.refresh_deferred_jobs()
\ No newline at end of file
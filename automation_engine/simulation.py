@@ -0,0 +1,231 @@
+# mon_bot_social/automation_engine/simulation.py
+"""
+Simulation accélérée d'une journée de planification (pauses, plages horaires, limites, cooldowns)
+sans navigateur ni attente réelle: SessionManager et TaskScheduler tournent tels quels, avec une
+horloge simulée, un aléatoire déterministe (seed), un backend de planification en mémoire et des actions factices.
+"""
+import heapq
+import random
+import datetime
+import time
+import itertools
+
+from apscheduler.jobstores.base import JobLookupError
+
+from utils.clock import SimulatedClock
+from utils.logger import get_logger
+from utils.activity_log import activity_logger
+from utils.settings_schema import build_settings
+from automation_engine.session_manager import SessionManager
+from automation_engine.task_scheduler import TaskScheduler
+from automation_engine.action_budget import ActionBudgetManager
+from automation_engine.event_sink import EventSink
+
+logger = get_logger("Simulation")
+
+
+class SimulatedJob:
+    def __init__(self, job_id, func, args, interval_sec=None, jitter_sec=0, next_run_time=None, name=""):
+        self.id = job_id; self.func = func; self.args = args or []; self.name = name
+        self.interval_sec = interval_sec; self.jitter_sec = jitter_sec or 0
+        self.next_run_time = next_run_time # datetime naïf (heure locale), comme fourni par TaskScheduler
+        self.version = 0 # Incrémenté à chaque replanification pour invalider les entrées obsolètes du tas
+
+
+class SimulatedScheduler:
+    """Sous-ensemble de l'API BackgroundScheduler utilisée par TaskScheduler, piloté par une SimulatedClock."""
+
+    def __init__(self, clock, rng):
+        self.clock = clock; self.rng = rng
+        self.jobs = {}
+        self._heap = []
+        self._seq = itertools.count()
+        self.running = False
+        self.wakeups = 0 # Nombre de déclenchements de jobs (réveils)
+
+    def start(self): self.running = True
+    def shutdown(self, wait=False): self.running = False
+
+    def _push(self, job):
+        job.version += 1
+        if job.next_run_time is not None:
+            heapq.heappush(self._heap, (job.next_run_time.timestamp(), next(self._seq), job.id, job.version))
+
+    def add_job(self, func, args=None, trigger=None, run_date=None, id=None, name="", replace_existing=False, next_run_time=None, **kwargs):
+        if id in self.jobs and not replace_existing: raise ValueError(f"Job '{id}' existe déjà.")
+        if trigger == 'date':
+            job = SimulatedJob(id, func, args, next_run_time=run_date, name=name)
+        else: # IntervalTrigger APScheduler
+            interval_sec = trigger.interval.total_seconds()
+            job = SimulatedJob(id, func, args, interval_sec=interval_sec, jitter_sec=getattr(trigger, 'jitter', 0),
+                               next_run_time=next_run_time or datetime.datetime.fromtimestamp(self.clock.time() + interval_sec), name=name)
+        self.jobs[id] = job; self._push(job)
+        return job
+
+    def get_job(self, job_id): return self.jobs.get(job_id)
+
+    def modify_job(self, job_id, next_run_time=None, **kwargs):
+        job = self.jobs.get(job_id)
+        if not job: raise JobLookupError(job_id)
+        job.next_run_time = next_run_time; self._push(job)
+        return job
+
+    def remove_job(self, job_id):
+        if self.jobs.pop(job_id, None) is None: raise JobLookupError(job_id)
+
+    def next_event_time(self):
+        while self._heap:
+            run_ts, _, job_id, version = self._heap[0]
+            job = self.jobs.get(job_id)
+            if job and job.version == version: return run_ts
+            heapq.heappop(self._heap) # Entrée obsolète (job retiré ou replanifié)
+        return None
+
+    def run_next(self):
+        """Exécute le prochain job dû (en avançant l'horloge). Retourne False s'il n'y a plus rien à exécuter."""
+        run_ts = self.next_event_time()
+        if run_ts is None: return False
+        _, _, job_id, _ = heapq.heappop(self._heap)
+        job = self.jobs[job_id]
+        self.clock.set_time(run_ts)
+
+        # Comme APScheduler: le job 'date' est consommé avant exécution, l'intervalle est recalculé
+        if job.interval_sec is None: del self.jobs[job_id]
+        else:
+            jitter = self.rng.uniform(-job.jitter_sec, job.jitter_sec) if job.jitter_sec else 0
+            job.next_run_time = datetime.datetime.fromtimestamp(run_ts + job.interval_sec + jitter); self._push(job)
+
+        self.wakeups += 1
+        job.func(*job.args)
+        return True
+
+
+class StubAction:
+    """Action factice: durée simulée, probabilité de blocage configurable, résultat enregistré dans la timeline."""
+
+    def __init__(self, runner, task_name, duration_range=(5, 20), block_probability=0.0):
+        self.runner = runner; self.task_name = task_name
+        self.duration_range = duration_range; self.block_probability = block_probability
+
+    def execute(self, options):
+        start_ts = self.runner.clock.time()
+        self.runner.clock.advance(self.runner.rng.uniform(*self.duration_range))
+        if self.block_probability and self.runner.rng.random() < self.block_probability:
+            outcome = (False, "BLOCKED: action bloquée (simulation)")
+        else:
+            outcome = (True, f"{self.task_name} simulé")
+        self.runner.timeline.append((start_ts, self.task_name, "ok" if outcome[0] else "blocked"))
+        return outcome
+
+
+class _StubBrowserHandler:
+    driver = object() # Un "driver" non nul suffit pour TaskScheduler
+
+
+class SimulationRunner:
+    """Rejoue un planning complet à vitesse accélérée et produit un rapport (timeline, débit/heure, inactivité)."""
+
+    def __init__(self, settings, seed=0, start_ts=None, block_probability=0.0, action_duration_range=(5, 20)):
+        self.current_settings = dict(settings)
+        self.settings = build_settings(self.current_settings, version=1)
+        self.logger = logger
+        self.event_sink = EventSink() # Notifications ignorées
+        self.browser_handler = _StubBrowserHandler()
+        self.clock = SimulatedClock(start_ts)
+        self.rng = random.Random(seed)
+        self.block_probability = block_probability; self.action_duration_range = action_duration_range
+        self.timeline = [] # (timestamp, tâche, résultat)
+        self.recorded_actions = {}
+
+        self.session_manager = SessionManager(self, clock=self.clock, rng=self.rng)
+        self.action_budget = ActionBudgetManager(self, clock=self.clock, state_path=None, stats_provider=dict, hourly_stats_provider=dict) # Pas de persistance ni de DB
+        self.task_scheduler = TaskScheduler(self, clock=self.clock, rng=self.rng,
+                                            scheduler=SimulatedScheduler(self.clock, self.rng),
+                                            action_factory=self._make_stub_action)
+
+    # --- Interface minimale d'AppManager utilisée par SessionManager/TaskScheduler ---
+    def get_setting(self, key, default=None): return self.settings.get(key, default)
+    def record_action(self, action_type): self.recorded_actions[action_type] = self.recorded_actions.get(action_type, 0) + 1
+    def stop_all_active_tasks_due_to_session_limit(self):
+        for task_name in list(self.task_scheduler.active_tasks): self.task_scheduler.stop_task(task_name)
+    def handle_post_like_interaction(self, result_data): pass
+    def handle_post_comment_interaction(self, result_data): pass
+    def handle_post_story_view_interaction(self, username): pass
+    def on_gather_task_completed(self, success, data_or_message): pass
+    def handle_new_followers(self, new_follower_usernames): pass
+
+    def _make_stub_action(self, task_name, task_options):
+        return StubAction(self, task_name, self.action_duration_range, self.block_probability)
+
+    def run(self, task_names, duration_hours=24):
+        """Démarre les tâches répétitives indiquées et simule `duration_hours` heures. Retourne le rapport."""
+        cpu_start = time.process_time()
+        activity_logger_was_disabled = activity_logger.disabled
+        activity_logger.disabled = True # Ne pas mélanger les événements simulés au vrai journal d'activité
+        start_ts = self.clock.time(); end_ts = start_ts + duration_hours * 3600
+        self.session_manager.start_logical_session()
+        for task_name in task_names: self.task_scheduler.start_task(task_name, {})
+
+        scheduler = self.task_scheduler.scheduler
+        idle_sec = 0.0
+        while True:
+            now_ts = self.clock.time()
+            next_ts = scheduler.next_event_time()
+            horizon_ts = min(next_ts, end_ts) if next_ts is not None else end_ts
+            # Inactivité: temps jusqu'à la prochaine éligibilité (pause, hors plage, limite atteinte)
+            eligible_ts = self.session_manager.get_next_eligible_time(now_ts)
+            if eligible_ts is None: idle_sec += max(0.0, horizon_ts - now_ts)
+            elif eligible_ts > now_ts: idle_sec += max(0.0, min(eligible_ts, horizon_ts) - now_ts)
+            if next_ts is None or next_ts >= end_ts: break
+            scheduler.run_next()
+
+        self.clock.set_time(end_ts)
+        activity_logger.disabled = activity_logger_was_disabled
+        return self._build_report(start_ts, end_ts, idle_sec, scheduler.wakeups, time.process_time() - cpu_start)
+
+    def _build_report(self, start_ts, end_ts, idle_sec, wakeups, cpu_sec):
+        per_hour = {}
+        for ts, task_name, outcome in self.timeline:
+            hour_key = datetime.datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:00')
+            per_hour[hour_key] = per_hour.get(hour_key, 0) + 1
+        total_sec = max(1.0, end_ts - start_ts)
+        return {
+            "timeline": [(datetime.datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S'), task_name, outcome) for ts, task_name, outcome in self.timeline],
+            "total_actions": len(self.timeline),
+            "throughput_per_hour": per_hour,
+            "avg_actions_per_hour": len(self.timeline) / (total_sec / 3600),
+            "idle_fraction": min(1.0, idle_sec / total_sec),
+            "scheduler_wakeups": wakeups,
+            "cpu_seconds": cpu_sec,
+        }
+
+
+def run_simulation(settings, task_names, duration_hours=24, seed=0, start_ts=None, block_probability=0.0):
+    """Raccourci: simule `duration_hours` heures des tâches données avec les paramètres fournis."""
+    runner = SimulationRunner(settings, seed=seed, start_ts=start_ts, block_probability=block_probability)
+    return runner.run(task_names, duration_hours=duration_hours)
+
+
+if __name__ == '__main__':
+    import logging
+    logging.getLogger("MonBotSocialApp").setLevel(logging.WARNING) # Simulation silencieuse
+
+    demo_settings = {
+        "enable_activity_times": True,
+        "time1_start": "08:00", "time1_end": "11:00",
+        "time2_start": "13:00", "time2_end": "16:00",
+        "time3_start": "19:00", "time3_end": "22:30",
+        "max_actions_per_session": 0, "actions_before_break": 40, "break_duration_min": 5, "break_duration_max": 15,
+        "enable_distractions": True,
+        "follow_delay_min": 45, "follow_delay_max": 90,
+        "like_delay_min": 30, "like_delay_max": 60,
+        "stop_on_block_delay": 30,
+        "budget_follows_per_hour": 40, "budget_follows_per_day": 200,
+        "budget_likes_per_hour": 60, "budget_likes_per_day": 400,
+    }
+    midnight_ts = datetime.datetime.combine(datetime.date.today(), datetime.time()).timestamp()
+    report = run_simulation(demo_settings, ["auto_follow", "auto_like"], duration_hours=24, seed=42, start_ts=midnight_ts, block_probability=0.002)
+
+    print(f"Actions simulées: {report['total_actions']} (moy. {report['avg_actions_per_hour']:.1f}/h)")
+    print(f"Fraction inactive: {report['idle_fraction']:.1%} | Réveils scheduler: {report['scheduler_wakeups']} | CPU: {report['cpu_seconds']:.2f}s")
+    for hour_key, count in sorted(report["throughput_per_hour"].items()): print(f"  {hour_key}: {count}")
@@ -0,0 +1,77 @@
+# mon_bot_social/automation_engine/stats_cache.py
+import datetime
+import threading
+
+from utils.logger import get_logger
+
+STATS_ACTION_TYPES = ('follows', 'unfollows', 'likes', 'comments', 'story_views', 'dms_sent')
+STATS_CACHE_DAYS = 30 # Couvre les périodes today / yesterday / last7days / last30days
+
+
+def period_bounds(period, today=None):
+    """(date de début, date de fin) d'une période: today, yesterday, last7days, last30days."""
+    today = today or datetime.date.today()
+    if period == "yesterday": return today - datetime.timedelta(days=1), today - datetime.timedelta(days=1)
+    if period == "last7days": return today - datetime.timedelta(days=6), today
+    if period == "last30days": return today - datetime.timedelta(days=STATS_CACHE_DAYS - 1), today
+    return today, today
+
+
+class ActionStatsCache:
+    """
+    Agrégats d'actions par jour gardés en mémoire pour les 30 derniers jours.
+    Chargé une fois depuis les agrégats journaliers (action_rollups), puis mis à jour à chaque action enregistrée (thread-safe):
+    l'onglet Stats n'a plus besoin de la DB pour changer de période. Avant le chargement, record() ne compte rien: l'action est
+    déjà en DB et sera lue par le chargement (sinon comptée deux fois).
+    """
+
+    def __init__(self, loader=None):
+        self.logger = get_logger("StatsCache")
+        self.loader = loader # callable(start_date, end_date) -> {date_iso: {type: n}}
+        self.daily_counts = {}
+        self.is_loaded = False
+        self._lock = threading.Lock()
+
+    def ensure_loaded(self):
+        if self.is_loaded: return
+        today = datetime.date.today(); start = today - datetime.timedelta(days=STATS_CACHE_DAYS - 1)
+        try: loaded = self.loader(start, today) if self.loader else {}
+        except Exception as e:
+            self.logger.error(f"Erreur chargement du cache de stats: {e}"); loaded = {}
+        with self._lock:
+            if self.is_loaded: return # Chargé par un autre thread entre-temps
+            self.daily_counts = {date_iso: {key: counts.get(key, 0) or 0 for key in STATS_ACTION_TYPES} for date_iso, counts in loaded.items()}
+            self.is_loaded = True
+        self.logger.debug("Cache de stats chargé (%s jours).", len(loaded))
+
+    def record(self, action_type, day=None):
+        if action_type not in STATS_ACTION_TYPES: return
+        date_iso = (day or datetime.date.today()).isoformat()
+        with self._lock:
+            if not self.is_loaded: return # Compté par ensure_loaded() depuis la DB
+            self.daily_counts.setdefault(date_iso, dict.fromkeys(STATS_ACTION_TYPES, 0))[action_type] += 1
+
+    def get_period(self, period="today"):
+        self.ensure_loaded()
+        today = datetime.date.today()
+        start, end = period_bounds(period, today)
+
+        totals = dict.fromkeys(STATS_ACTION_TYPES, 0)
+        start_iso, end_iso = start.isoformat(), end.isoformat()
+        window_start_iso = (today - datetime.timedelta(days=STATS_CACHE_DAYS - 1)).isoformat()
+        with self._lock:
+            for date_iso in [d for d in self.daily_counts if d < window_start_iso]:
+                del self.daily_counts[date_iso] # Jours sortis de la fenêtre (passage de minuit)
+            for date_iso, counts in self.daily_counts.items():
+                if start_iso <= date_iso <= end_iso:
+                    for key in STATS_ACTION_TYPES: totals[key] += counts[key]
+        return totals
+
+
+if __name__ == '__main__':
+    today = datetime.date.today()
+    fake_db = {today.isoformat(): {'follows': 5, 'likes': 20}, (today - datetime.timedelta(days=3)).isoformat(): {'follows': 8}}
+    cache = ActionStatsCache(loader=lambda start, end: fake_db)
+    cache.record('follows') # Ignoré: pas encore chargé, l'action est déjà dans fake_db
+    cache.ensure_loaded(); cache.record('likes')
+    for period in ("today", "yesterday", "last7days", "last30days"): print(period, cache.get_period(period))
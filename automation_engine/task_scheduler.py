@@ -1,73 +1,117 @@
 # core/task_scheduler.py
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.interval import IntervalTrigger
-from apscheduler.jobstores.base import JobLookupError
-import time
 import random
 import datetime 
+import importlib
 
-# Importer les classes d'action
-from automation_engine.actions.follow_action import FollowAction
-from automation_engine.actions.unfollow_action import UnfollowAction
-from automation_engine.actions.like_action import LikeAction
-from automation_engine.actions.comment_action import CommentAction
-from automation_engine.actions.view_story_action import ViewStoryAction
-from automation_engine.actions.gather_action import GatherAction
-from automation_engine.actions.accept_follow_request_action import AcceptFollowRequestAction
-from automation_engine.actions.direct_message_action import DirectMessageAction
-from automation_engine.actions.check_new_followers_action import CheckNewFollowersAction
+from utils.clock import system_clock
+from utils.metrics import metrics
+from utils.activity_log import log_activity_event
+from automation_engine.driver_instrumentation import driver_recorder
+
+# Classes d'action importées à la première utilisation (chaque module tire Selenium): démarrage plus rapide
+ACTION_CLASS_MODULES = {
+    "FollowAction": "automation_engine.actions.follow_action",
+    "UnfollowAction": "automation_engine.actions.unfollow_action",
+    "LikeAction": "automation_engine.actions.like_action",
+    "CommentAction": "automation_engine.actions.comment_action",
+    "ViewStoryAction": "automation_engine.actions.view_story_action",
+    "GatherAction": "automation_engine.actions.gather_action",
+    "AcceptFollowRequestAction": "automation_engine.actions.accept_follow_request_action",
+    "DirectMessageAction": "automation_engine.actions.direct_message_action",
+    "CheckNewFollowersAction": "automation_engine.actions.check_new_followers_action",
+}
+_action_classes = {}
+
+ACTION_DURATION = metrics.histogram("bot_action_duration_seconds", "Durée d'exécution des actions par tâche et résultat", ("action", "outcome"))
+ACTIONS_SKIPPED = metrics.counter("bot_actions_skipped", "Exécutions sautées ou reportées avant l'action, par motif", ("action", "reason"))
+TICK_INTERVAL = metrics.histogram("bot_scheduler_tick_interval_seconds", "Intervalle entre deux déclenchements d'une même tâche", ("action",))
+ACTIVE_TASKS = metrics.gauge("bot_scheduler_active_tasks", "Tâches suivies par le TaskScheduler (répétitives et uniques)")
+JSON_MIGRATION_RETRY_SEC = 60 # Tâches retenues tant que les anciens fichiers JSON ne sont pas entièrement en DB
+
+
+def load_action_class(class_name):
+    action_class = _action_classes.get(class_name)
+    if action_class is None:
+        action_class = getattr(importlib.import_module(ACTION_CLASS_MODULES[class_name]), class_name)
+        _action_classes[class_name] = action_class
+    return action_class
 
 
 class TaskScheduler:
-    def __init__(self, app_manager):
+    def __init__(self, app_manager, clock=None, rng=None, scheduler=None, action_factory=None):
         self.app_manager = app_manager
         self.logger = self.app_manager.logger # Utiliser le logger de AppManager
-        self.scheduler = BackgroundScheduler(daemon=True) 
+        # Injectables pour la simulation: horloge, aléatoire, backend de planification, actions factices
+        self.clock = clock or system_clock
+        self.rng = rng or random
+        self.action_factory = action_factory # callable(task_name, task_options) -> instance d'action (ou None)
+        self.scheduler = scheduler # APScheduler créé et démarré à la première tâche (ensure_started), sauf backend injecté
         self.active_tasks = {} # Clé: task_name (pour répétitives) ou job_id (pour uniques), Valeur: job object ou job_id string
-        
+        self.deferred_job_ids = set() # Jobs reportés jusqu'à la prochaine fenêtre d'éligibilité (pause, hors plage...)
+        self.budget_retry_ts = {} # Job reporté pour budget épuisé -> prochain jeton (refresh_deferred_jobs ne l'avance pas)
+        self._last_tick_ts = {} # Tâche -> dernier déclenchement (métrique d'intervalle)
+        ACTIVE_TASKS.set_function(lambda: len(self.active_tasks))
+        if self.scheduler: self.ensure_started()
+
+    def ensure_started(self):
+        """Démarre le backend de planification si besoin (import d'APScheduler inclus). Retourne False si échec."""
+        if self.scheduler and getattr(self.scheduler, "running", True): return True
         try:
+            if not self.scheduler:
+                from apscheduler.schedulers.background import BackgroundScheduler
+                self.scheduler = BackgroundScheduler(daemon=True)
             self.scheduler.start()
             self.logger.info("TaskScheduler: APScheduler démarré avec succès.")
+            return True
         except Exception as e:
             self.logger.critical(f"TaskScheduler: ERREUR FATALE au démarrage de APScheduler: {e}", exc_info=True)
             self.scheduler = None 
+            return False
 
     def _get_random_delay_seconds(self, min_key, max_key, default_min_sec=30, default_max_sec=60, options_override=None):
         """Calcule un délai aléatoire en SECONDES, potentiellement ajusté."""
+        settings = self.app_manager.settings
         if options_override and options_override.get(min_key) is not None and options_override.get(max_key) is not None:
             base_min = options_override.get(min_key)
             base_max = options_override.get(max_key)
-            self.logger.debug(f"Délai pour tâche utilisant override d'options: Min={base_min}, Max={base_max}")
+            self.logger.debug("Délai pour tâche utilisant override d'options: Min=%s, Max=%s", base_min, base_max)
         else:
-            base_min = self.app_manager.get_setting(min_key, default_min_sec)
-            base_max = self.app_manager.get_setting(max_key, default_max_sec)
+            delay_range = settings.delays.for_key(min_key) # Déjà validé et converti en secondes (minutes pour check_followers)
+            if delay_range: base_min, base_max = delay_range.min_sec, delay_range.max_sec
+            else: base_min = settings.get(min_key, default_min_sec); base_max = settings.get(max_key, default_max_sec)
         
         if base_min >= base_max: base_max = base_min + max(10, int(base_min * 0.1)) # Assurer un intervalle
         
-        delay_sec = random.randint(int(base_min), int(base_max))
+        delay_sec = self.rng.randint(int(base_min), int(base_max))
 
         # Ajustement dynamique si activé
-        dynamic_speed_enabled = self.app_manager.get_setting("enable_dynamic_speed", False)
-        if dynamic_speed_enabled:
+        if settings.delays.enable_dynamic_speed:
             # session_manager gère _is_within_activity_time qui inclut la logique TZ
             is_peak_time = self.app_manager.session_manager._is_within_activity_time()
             if not is_peak_time:
-                 multiplier = self.app_manager.get_setting("off_peak_delay_multiplier", 1.0)
+                 multiplier = settings.delays.off_peak_delay_multiplier
                  if multiplier > 1.0:
                      original_delay_sec = delay_sec
                      delay_sec = int(delay_sec * multiplier)
-                     self.logger.debug(f"Vitesse dynamique: Hors pic. Délai {original_delay_sec}s * {multiplier:.1f}x -> {delay_sec}s")
+                     self.logger.debug("Vitesse dynamique: Hors pic. Délai %ss * %.1fx -> %ss", original_delay_sec, multiplier, delay_sec)
         
         return max(1, delay_sec) # Minimum 1 seconde
 
 
     def _execute_action(self, action_instance, action_name, task_options, is_one_time_task=False):
-        self.logger.debug(f"Début _execute_action pour: {action_name}, OneTime: {is_one_time_task}")
+        self.logger.debug("Début _execute_action pour: %s, OneTime: %s", action_name, is_one_time_task)
         
+        current_job_id = task_options.get('_job_id_one_time') if is_one_time_task else action_name
+        self.deferred_job_ids.discard(current_job_id); self.budget_retry_ts.pop(current_job_id, None)
+        tick_ts = self.clock.time(); last_tick_ts = self._last_tick_ts.get(action_name)
+        if last_tick_ts is not None: TICK_INTERVAL.observe(tick_ts - last_tick_ts, action=action_name)
+        self._last_tick_ts[action_name] = tick_ts
+
         # 1. Vérifier simulation déconnexion réseau globale
         if self.app_manager.session_manager.should_simulate_network_disconnect():
              self.app_manager.session_manager.simulate_network_disconnect()
              self.logger.info(f"TaskScheduler: Sim. déconnexion réseau AVANT '{action_name}'. Action non exécutée.")
+             self._postpone_until_eligible(action_instance, action_name, task_options, is_one_time_task, "sim. réseau")
              return
 
         # 2. Vérifier les pauses "planifiées" (grosse pause, micro-pause)
@@ -75,29 +119,52 @@ class TaskScheduler:
         if not is_one_time_task:
             if self.app_manager.session_manager.should_take_break():
                 self.app_manager.session_manager.take_break()
-                self.logger.info(f"TaskScheduler: Grosse pause déclenchée AVANT '{action_name}'. Action non exécutée."); return
+                self.logger.info(f"TaskScheduler: Grosse pause déclenchée AVANT '{action_name}'. Action non exécutée.")
+                self._postpone_until_eligible(action_instance, action_name, task_options, is_one_time_task, "grosse pause"); return
             if self.app_manager.session_manager.should_take_distraction_pause():
                  self.app_manager.session_manager.take_distraction_pause()
-                 self.logger.info(f"TaskScheduler: Micro-pause déclenchée AVANT '{action_name}'. Action non exécutée."); return
+                 self.logger.info(f"TaskScheduler: Micro-pause déclenchée AVANT '{action_name}'. Action non exécutée.")
+                 self._postpone_until_eligible(action_instance, action_name, task_options, is_one_time_task, "micro-pause"); return
 
         # 3. Vérification générale si l'action peut être performée (heure, pauses en cours, limites)
         if not self.app_manager.session_manager.can_perform_action():
-            self.logger.debug(f"TaskScheduler: Action '{action_name}' sautée (can_perform_action() = False).")
+            self.logger.debug("TaskScheduler: Action '%s' sautée (can_perform_action() = False).", action_name)
+            self._postpone_until_eligible(action_instance, action_name, task_options, is_one_time_task, "non éligible")
+            return
+
+        # 4. Anciens fichiers JSON encore en cours de migration: déjà suivis/likés pas encore en DB (doublons, file d'unfollow incomplète)
+        json_migration_running = getattr(self.app_manager, "is_json_migration_running", None) # Absent en simulation
+        if json_migration_running and json_migration_running():
+            ACTIONS_SKIPPED.inc(action=action_name, reason="migration JSON")
+            self.logger.info(f"TaskScheduler: Migration JSON en cours, '{action_name}' reportée de {JSON_MIGRATION_RETRY_SEC} s.")
+            self._retry_job_at(action_instance, action_name, task_options, is_one_time_task, self.clock.time() + JSON_MIGRATION_RETRY_SEC, "migration JSON")
             return
 
+        # 5. Budget par type d'action (follows, likes...): prélever avant d'exécuter
+        if not self._check_action_budget(action_instance, action_name, task_options, is_one_time_task):
+            return
+        action_budget = getattr(self.app_manager, "action_budget", None) # Jeton prélevé: rendu plus bas seulement si rien n'a été envoyé
+
         # Si on arrive ici, l'action peut s'exécuter
         self.logger.info(f"TaskScheduler: Exécution effective de '{action_name}'...")
         action_performed_successfully = False 
         result_data_or_msg_from_action = "Action non initialisée (erreur pré-exécution)."
+        action_start_ts = None; action_outcome = "error"
+        action_attempted = False # execute() lancé: le jeton est consommé (même si l'action échoue ou est bloquée)
 
         try:
             if not self.app_manager.browser_handler.driver and action_name not in ["manual_login_internal_command"]: # Si pas de driver et pas une commande qui l'ouvre
                  self.logger.error(f"Navigateur non disponible pour '{action_name}'.")
+                 ACTIONS_SKIPPED.inc(action=action_name, reason="navigateur absent")
                  if not is_one_time_task: self.stop_task(action_name) # Arrêter la tâche répétitive
                  return
 
-            success, result_data_or_msg_from_action = action_instance.execute(task_options)
+            action_start_ts = self.clock.time(); action_attempted = True
+            action_instance.settings = self.app_manager.settings # Instantané figé pour toute la durée de l'action
+            with driver_recorder.action_context(action_name): # Commandes WebDriver attribuées à cette tâche
+                success, result_data_or_msg_from_action = action_instance.execute(task_options)
             action_performed_successfully = success # True si l'action elle-même a réussi
+            action_outcome = self._log_action_event(action_name, task_options, success, result_data_or_msg_from_action, action_start_ts, is_one_time_task)
             
             if success:
                 self.logger.info(f"TaskScheduler: Action '{action_name}' terminée avec SUCCÈS.")
@@ -117,25 +184,35 @@ class TaskScheduler:
                 if "BLOCK" in result_str or "LIMIT" in result_str or "TRY AGAIN" in result_str:
                      self.logger.critical(f"BLOCAGE/LIMITE détecté pour '{action_name}'. Démarrage Cooldown.")
                      self.app_manager.session_manager.start_block_cooldown()
+                     self._defer_jobs_until_eligible("cooldown blocage")
                 if action_name == "gather_users": self.app_manager.on_gather_task_completed(False, result_data_or_msg_from_action)
 
         except Exception as e_exec:
             self.logger.exception(f"TaskScheduler: Erreur CRITIQUE pendant _execute_action '{action_name}': {e_exec}")
+            record_task_event = getattr(self.app_manager, "record_task_event", None)
+            if record_task_event and action_start_ts is not None and action_outcome == "error": # Exception dans execute()
+                record_task_event(action_name, "error", int((self.clock.time() - action_start_ts) * 1000), task_options.get('target_user'))
             if action_name == "gather_users": self.app_manager.on_gather_task_completed(False, f"Erreur critique: {e_exec}")
 
         finally:
+            if action_start_ts is not None:
+                ACTION_DURATION.observe(self.clock.time() - action_start_ts, action=action_name, outcome=action_outcome)
+            # Rien n'a été envoyé (navigateur absent, exception avant execute(), file vide): rendre le jeton.
+            # Un échec ou un blocage réel garde son jeton: le budget borne les tentatives, pas les succès.
+            queue_was_empty = "File d'attente" in str(result_data_or_msg_from_action) and "vide" in str(result_data_or_msg_from_action)
+            if action_budget and (not action_attempted or queue_was_empty): action_budget.refund(action_name)
             # Pour les tâches uniques, les retirer de la liste active (TaskScheduler les exécute une fois)
             if is_one_time_task:
-                job_id = task_options.get('_job_id_one_time', f"{action_name}_{int(time.time())}") # Fallback
+                job_id = task_options.get('_job_id_one_time', f"{action_name}_{int(self.clock.time())}") # Fallback
                 if job_id in self.active_tasks: del self.active_tasks[job_id]
-                self.logger.debug(f"Tâche unique '{action_name}' (job: {job_id}) terminée et retirée du suivi actif.")
+                self.logger.debug("Tâche unique '%s' (job: %s) terminée et retirée du suivi actif.", action_name, job_id)
 
             # Incrémenter compteur seulement pour tâches répétitives, et si l'action a VRAIMENT été tentée
             # (c-à-d pas skip par une pause ou une limite DANS CE CYCLE DE _execute_action)
             # Et si on n'est pas dans un état "File vide" qui va stopper la tâche
             if not is_one_time_task:
                 # Vérifier si l'action était censée faire qqch (pas juste "file vide")
-                was_productive_attempt = not ("File d'attente" in str(result_data_or_msg_from_action) and "vide" in str(result_data_or_msg_from_action))
+                was_productive_attempt = not queue_was_empty
                 
                 if was_productive_attempt:
                     # Ré-évaluer can_perform_action car une longue action a pu nous faire sortir d'une plage horaire par exemple
@@ -147,43 +224,162 @@ class TaskScheduler:
             # Informer l'UI si une tâche répétitive se termine d'elle-même (ex: file vide)
             if not is_one_time_task and not action_performed_successfully and \
                ("File d'attente" in str(result_data_or_msg_from_action) and "vide" in str(result_data_or_msg_from_action)):
-                if self.app_manager.main_window:
-                    self.app_manager.main_window.update_task_status_indicator(action_name, False) # Indiquer arrêt
-                    self.app_manager.main_window.update_status(f"Tâche '{action_name}' terminée (file vide).")
+                self.app_manager.event_sink.update_task_status_indicator(action_name, False) # Indiquer arrêt
+                self.app_manager.event_sink.update_status(f"Tâche '{action_name}' terminée (file vide).")
                 if action_name in self.active_tasks: del self.active_tasks[action_name] # Retirer du suivi
 
 
+    def _defer_jobs_until_eligible(self, reason=""):
+        """
+        Reporte tous les jobs suivis dont le prochain run tombe avant la prochaine fenêtre d'éligibilité
+        (SessionManager.get_next_eligible_time). Évite les réveils inutiles pendant pauses/hors plage.
+        Retourne le timestamp de reprise, ou None si rien n'a été reporté.
+        """
+        if not self.scheduler: return None
+        resume_ts = self.app_manager.session_manager.get_next_eligible_time()
+        if resume_ts is None or resume_ts <= self.clock.time() + 1: return None
+
+        deferred_count = 0
+        for key, job_ref in list(self.active_tasks.items()):
+            job_id = job_ref if isinstance(job_ref, str) else job_ref.id
+            try:
+                job = self.scheduler.get_job(job_id)
+                if not job or not job.next_run_time or job.next_run_time.timestamp() >= resume_ts: continue
+                # Petit décalage aléatoire pour ne pas relancer toutes les tâches à la même seconde
+                run_time = datetime.datetime.fromtimestamp(resume_ts + self.rng.uniform(1, 20))
+                self.scheduler.modify_job(job_id, next_run_time=run_time)
+                self.deferred_job_ids.add(job_id); deferred_count += 1
+            except Exception as e_defer:
+                self.logger.warning(f"TaskScheduler: Impossible de reporter le job '{job_id}': {e_defer}")
+
+        if deferred_count:
+            resume_str = datetime.datetime.fromtimestamp(resume_ts).strftime('%H:%M:%S')
+            self.logger.info(f"TaskScheduler: {deferred_count} tâche(s) en attente jusqu'à ~{resume_str} ({reason}).")
+        return resume_ts
+
+    def _log_action_event(self, action_name, task_options, success, result_data_or_msg, start_ts, is_one_time_task):
+        """Événement structuré (JSON-lines) pour une action exécutée. Retourne le résultat ('ok', 'failed', 'blocked')."""
+        target = task_options.get('target_user') or task_options.get('target_post_id')
+        if isinstance(result_data_or_msg, dict):
+            target = target or result_data_or_msg.get('target_user') or result_data_or_msg.get('post_id')
+            message = result_data_or_msg.get('message')
+        else: message = result_data_or_msg if isinstance(result_data_or_msg, str) else None
+        result = "ok" if success else ("blocked" if message and any(k in message.upper() for k in ("BLOCK", "LIMIT", "TRY AGAIN")) else "failed")
+        duration_ms = int((self.clock.time() - start_ts) * 1000)
+        record_task_event = getattr(self.app_manager, "record_task_event", None) # Absent en simulation
+        if record_task_event: record_task_event(action_name, result, duration_ms, target)
+        log_activity_event(action_name, target=target, result=result, duration_ms=duration_ms,
+                           task=action_name, one_time=is_one_time_task, message=message if not success else None,
+                           session=self.app_manager.session_manager.get_state_snapshot())
+        return result
+
+    def _postpone_until_eligible(self, action_instance, action_name, task_options, is_one_time_task, reason=""):
+        """Reporte le job courant (et les autres) à la prochaine fenêtre éligible au lieu de le perdre/repoller."""
+        ACTIONS_SKIPPED.inc(action=action_name, reason=reason or "-")
+        resume_ts = self._defer_jobs_until_eligible(reason)
+        log_activity_event("deferred", target=action_name, result=reason, task=action_name, one_time=is_one_time_task,
+                           resume_ts=resume_ts, session=self.app_manager.session_manager.get_state_snapshot())
+        if not is_one_time_task: return
+
+        if resume_ts is None: resume_ts = self.app_manager.session_manager.get_next_eligible_time()
+        self._requeue_one_time_job(action_instance, action_name, task_options, resume_ts, reason)
+
+    def _requeue_one_time_job(self, action_instance, action_name, task_options, resume_ts, reason=""):
+        job_id = task_options.get('_job_id_one_time')
+        if not self.scheduler or not job_id or resume_ts is None:
+            if job_id in self.active_tasks: del self.active_tasks[job_id] # Rien de prévisible: abandon (comportement historique)
+            self.logger.info(f"TaskScheduler: Tâche unique '{action_name}' abandonnée (aucune reprise prévisible).")
+            return
+        # Le job 'date' courant est consommé: le replanifier sous le même ID pour l'heure exacte de reprise
+        run_time = datetime.datetime.fromtimestamp(max(resume_ts, self.clock.time() + 1))
+        try:
+            self.scheduler.add_job(self._execute_action, args=[action_instance, action_name, task_options, True],
+                                   trigger='date', run_date=run_time, id=job_id, name=f"OneTime: {action_name[:15]} (reportée)",
+                                   replace_existing=True)
+            self.active_tasks[job_id] = job_id; self.deferred_job_ids.add(job_id)
+            self.logger.info(f"TaskScheduler: Tâche unique '{action_name}' reportée à {run_time.strftime('%H:%M:%S')} ({reason}).")
+        except Exception as e_requeue:
+            self.logger.error(f"TaskScheduler: Échec report tâche unique '{action_name}': {e_requeue}")
+            if job_id in self.active_tasks: del self.active_tasks[job_id]
+
+    def _check_action_budget(self, action_instance, action_name, task_options, is_one_time_task):
+        """Prélève un jeton du budget du type d'action. Si épuisé, reporte CE job au prochain jeton disponible."""
+        action_budget = getattr(self.app_manager, "action_budget", None)
+        if not action_budget: return True
+        allowed, retry_ts = action_budget.try_consume(action_name)
+        if allowed: return True
+
+        ACTIONS_SKIPPED.inc(action=action_name, reason="budget épuisé")
+        retry_str = datetime.datetime.fromtimestamp(retry_ts).strftime('%H:%M:%S') if retry_ts else "?"
+        self.logger.info(f"TaskScheduler: Budget '{action_budget.action_type_for_task(action_name)}' épuisé, '{action_name}' reportée à ~{retry_str}.")
+        self._retry_job_at(action_instance, action_name, task_options, is_one_time_task, retry_ts, "budget épuisé")
+        if retry_ts: self.budget_retry_ts[task_options.get('_job_id_one_time') if is_one_time_task else action_name] = retry_ts
+        return False
+
+    def _retry_job_at(self, action_instance, action_name, task_options, is_one_time_task, retry_ts, reason):
+        """Reporte CE job seul à retry_ts (les autres tâches ne sont pas concernées, contrairement aux pauses)."""
+        if is_one_time_task:
+            self._requeue_one_time_job(action_instance, action_name, task_options, retry_ts, reason)
+        elif retry_ts and self.scheduler:
+            try:
+                self.scheduler.modify_job(action_name, next_run_time=datetime.datetime.fromtimestamp(retry_ts + self.rng.uniform(1, 20)))
+                self.deferred_job_ids.add(action_name)
+            except Exception as e_defer: self.logger.warning(f"TaskScheduler: Impossible de reporter '{action_name}' ({reason}): {e_defer}")
+
+    def refresh_deferred_jobs(self):
+        """
+        Réaligne les jobs reportés après un changement de config (ex: plages horaires élargies).
+        Un job reporté pour budget épuisé n'est pas avancé avant le prochain jeton de son budget.
+        """
+        if not self.scheduler or not self.deferred_job_ids: return
+        resume_ts = self.app_manager.session_manager.get_next_eligible_time()
+        if resume_ts is None: return
+        for job_id in list(self.deferred_job_ids):
+            try:
+                job = self.scheduler.get_job(job_id)
+                if not job or not job.next_run_time: self.deferred_job_ids.discard(job_id); self.budget_retry_ts.pop(job_id, None); continue
+                if self.budget_retry_ts.get(job_id, 0) > self.clock.time(): continue # Budget pas encore rechargé
+                if job.next_run_time.timestamp() > resume_ts + 30: # Reporté trop loin avec l'ancienne config
+                    self.scheduler.modify_job(job_id, next_run_time=datetime.datetime.fromtimestamp(max(resume_ts, self.clock.time()) + self.rng.uniform(1, 20)))
+            except Exception as e_refresh:
+                self.logger.warning(f"TaskScheduler: Erreur réalignement job '{job_id}': {e_refresh}")
+        self._defer_jobs_until_eligible("config mise à jour")
+
     def start_task(self, task_name, task_options):
-        if not self.scheduler: self.logger.error("TaskScheduler: APScheduler non démarré. Tâche non planifiée."); return False
+        if not self.ensure_started(): self.logger.error("TaskScheduler: APScheduler non démarré. Tâche non planifiée."); return False
         
         is_one_time = False
-        action_instance = None
+        action_class_name = None
         delay_min_key, delay_max_key = None, None
         default_delay_min, default_delay_max = 30, 60 # Secondes par défaut
 
         # Définition des actions et de leurs types
-        if task_name == "auto_follow": action_instance = FollowAction(self.app_manager); delay_min_key, delay_max_key = "follow_delay_min", "follow_delay_max"
-        elif task_name == "auto_unfollow": action_instance = UnfollowAction(self.app_manager); delay_min_key, delay_max_key = "unfollow_delay_min", "unfollow_delay_max"
+        if task_name == "auto_follow": action_class_name = "FollowAction"; delay_min_key, delay_max_key = "follow_delay_min", "follow_delay_max"
+        elif task_name == "auto_unfollow": action_class_name = "UnfollowAction"; delay_min_key, delay_max_key = "unfollow_delay_min", "unfollow_delay_max"
         elif task_name == "auto_like":
-            action_instance = LikeAction(self.app_manager)
+            action_class_name = "LikeAction"
             if task_options.get("like_source") == "location": # Délais spécifiques pour monitoring location
                  default_delay_min = task_options.get('location_monitor_interval_minutes', 30) * 60
                  default_delay_max = default_delay_min + 60 # Ajouter 1min de variabilité
                  delay_min_key = "_loc_like_min_s"; delay_max_key = "_loc_like_max_s" # Clés virtuelles pour options
                  task_options[delay_min_key] = default_delay_min; task_options[delay_max_key] = default_delay_max
             else: delay_min_key, delay_max_key = "like_delay_min", "like_delay_max"
-        elif task_name == "auto_comment": action_instance = CommentAction(self.app_manager); delay_min_key, delay_max_key = "comment_delay_min", "comment_delay_max"
-        elif task_name == "auto_view_stories": action_instance = ViewStoryAction(self.app_manager); delay_min_key, delay_max_key = "view_story_delay_min", "view_story_delay_max"
-        elif task_name == "check_new_followers": action_instance = CheckNewFollowersAction(self.app_manager); delay_min_key, delay_max_key = "check_followers_delay_min_minutes", "check_followers_delay_max_minutes"; default_delay_min = 15*60; default_delay_max = 45*60 # Minutes converties en sec
-        elif task_name == "auto_accept_requests": action_instance = AcceptFollowRequestAction(self.app_manager); delay_min_key, delay_max_key = "accept_request_delay_min", "accept_request_delay_max"
-        elif task_name == "gather_users": action_instance = GatherAction(self.app_manager); is_one_time = True
-        elif task_name == "auto_send_dm": action_instance = DirectMessageAction(self.app_manager); is_one_time = True
-        elif task_name == "like_latest_post": action_instance = LikeAction(self.app_manager); is_one_time = True # options['like_source'] = 'specific_user_latest'
-        elif task_name == "follow_single_user": action_instance = FollowAction(self.app_manager); is_one_time = True # options['source'] = 'post_interaction'
-        elif task_name == "view_single_user_story": action_instance = ViewStoryAction(self.app_manager); is_one_time = True # options['source'] = 'post_interaction'
-        elif task_name == "like_single_post": action_instance = LikeAction(self.app_manager); is_one_time = True # options['like_source'] = 'specific_post'
+        elif task_name == "auto_comment": action_class_name = "CommentAction"; delay_min_key, delay_max_key = "comment_delay_min", "comment_delay_max"
+        elif task_name == "auto_view_stories": action_class_name = "ViewStoryAction"; delay_min_key, delay_max_key = "view_story_delay_min", "view_story_delay_max"
+        elif task_name == "check_new_followers": action_class_name = "CheckNewFollowersAction"; delay_min_key, delay_max_key = "check_followers_delay_min_minutes", "check_followers_delay_max_minutes"; default_delay_min = 15*60; default_delay_max = 45*60 # Minutes converties en sec
+        elif task_name == "auto_accept_requests": action_class_name = "AcceptFollowRequestAction"; delay_min_key, delay_max_key = "accept_request_delay_min", "accept_request_delay_max"
+        elif task_name == "gather_users": action_class_name = "GatherAction"; is_one_time = True
+        elif task_name == "auto_send_dm": action_class_name = "DirectMessageAction"; is_one_time = True
+        elif task_name == "like_latest_post": action_class_name = "LikeAction"; is_one_time = True # options['like_source'] = 'specific_user_latest'
+        elif task_name == "follow_single_user": action_class_name = "FollowAction"; is_one_time = True # options['source'] = 'post_interaction'
+        elif task_name == "view_single_user_story": action_class_name = "ViewStoryAction"; is_one_time = True # options['source'] = 'post_interaction'
+        elif task_name == "like_single_post": action_class_name = "LikeAction"; is_one_time = True # options['like_source'] = 'specific_post'
         else: self.logger.error(f"TaskScheduler: Tâche inconnue '{task_name}'."); return False
         
+        action_instance = self.action_factory(task_name, task_options) if self.action_factory else None
+        if not action_instance:
+            try: action_instance = load_action_class(action_class_name)(self.app_manager)
+            except Exception as e: self.logger.error(f"TaskScheduler: Chargement de {action_class_name} impossible: {e}", exc_info=True)
         if not action_instance: self.logger.error(f"TaskScheduler: Erreur instanciation action pour '{task_name}'."); return False
 
         # Vérifier si une tâche répétitive est déjà active (sauf pour les tâches uniques qui peuvent être empilées)
@@ -193,10 +389,10 @@ class TaskScheduler:
 
         try:
             if is_one_time:
-                delay_seconds = random.uniform(2, 8) # Délai pour les actions uniques
-                if task_name == "auto_send_dm": delay_seconds = random.uniform(5, 15)
-                run_time = datetime.datetime.now() + datetime.timedelta(seconds=delay_seconds)
-                job_id = f"{task_name}_{task_options.get('target_user', task_options.get('target_post_id',''))[:10]}_{int(time.time()*1000)}" # ID unique plus robuste
+                delay_seconds = self.rng.uniform(2, 8) # Délai pour les actions uniques
+                if task_name == "auto_send_dm": delay_seconds = self.rng.uniform(5, 15)
+                run_time = self.clock.now() + datetime.timedelta(seconds=delay_seconds)
+                job_id = f"{task_name}_{task_options.get('target_user', task_options.get('target_post_id',''))[:10]}_{int(self.clock.time()*1000)}" # ID unique plus robuste
                 task_options['_job_id_one_time'] = job_id # Important pour le suivi dans _execute_action
                 
                 self.scheduler.add_job(self._execute_action, args=[action_instance, task_name, task_options, True],
@@ -210,14 +406,15 @@ class TaskScheduler:
                 current_default_min = default_delay_min if '_loc_like' in delay_min_key or 'minutes' in delay_min_key else 30
                 current_default_max = default_delay_max if '_loc_like' in delay_max_key or 'minutes' in delay_max_key else 60
                 
+                from apscheduler.triggers.interval import IntervalTrigger
                 interval_seconds = self._get_random_delay_seconds(delay_min_key, delay_max_key, current_default_min, current_default_max, options_override=task_options)
-                initial_job_delay = random.randint(2, 5) # Délai avant le tout premier run du job
+                initial_job_delay = self.rng.randint(2, 5) # Délai avant le tout premier run du job
                 
                 self.logger.info(f"Planification tâche répétitive '{task_name}' avec intervalle ~{interval_seconds}s (délai initial ~{initial_job_delay}s).")
                 job = self.scheduler.add_job(self._execute_action, args=[action_instance, task_name, task_options, False],
                                            trigger=IntervalTrigger(seconds=interval_seconds, jitter=min(10, int(interval_seconds * 0.1))), # Jitter max 10s ou 10%
                                            id=task_name, name=f"Recurring: {task_name}", replace_existing=True,
-                                           next_run_time=datetime.datetime.now() + datetime.timedelta(seconds=initial_job_delay))
+                                           next_run_time=self.clock.now() + datetime.timedelta(seconds=initial_job_delay))
                 self.active_tasks[task_name] = job # Suivre par nom de tâche
 
             return True
@@ -247,11 +444,13 @@ class TaskScheduler:
             is_one_time_task_stop = True # Marquer qu'on essaie d'arrêter un job unique (peut-être déjà fini)
 
         if job_id_to_remove:
+            from apscheduler.jobstores.base import JobLookupError # Déjà chargé: un job n'existe que si le scheduler a démarré
+            self.deferred_job_ids.discard(job_id_to_remove); self.budget_retry_ts.pop(job_id_to_remove, None)
             try:
                 self.scheduler.remove_job(job_id_to_remove)
                 self.logger.info(f"TaskScheduler: Job '{job_id_to_remove}' retiré du scheduler.")
             except JobLookupError: # Le job n'existe plus (peut-être déjà fini si one-time)
-                self.logger.debug(f"Job '{job_id_to_remove}' non trouvé dans APScheduler (déjà fini ou jamais existé?).")
+                self.logger.debug("Job '%s' non trouvé dans APScheduler (déjà fini ou jamais existé?).", job_id_to_remove)
             except Exception as e_rem: 
                 self.logger.error(f"Erreur APScheduler remove_job '{job_id_to_remove}': {e_rem}"); return False # Problème plus grave
             
@@ -259,7 +458,7 @@ class TaskScheduler:
             key_to_delete_from_active = task_name_or_job_id if is_one_time_task_stop or isinstance(self.active_tasks.get(task_name_or_job_id), str) else task_name_or_job_id
             if key_to_delete_from_active in self.active_tasks:
                  del self.active_tasks[key_to_delete_from_active]
-                 self.logger.debug(f"'{key_to_delete_from_active}' retiré de active_tasks.")
+                 self.logger.debug("'%s' retiré de active_tasks.", key_to_delete_from_active)
             return True
         else:
             self.logger.warning(f"Tâche/Job ID '{task_name_or_job_id}' non trouvé dans active_tasks pour arrêt."); return False
@@ -0,0 +1,170 @@
+# mon_bot_social/daemon.py
+"""
+Mode daemon (serveur, sans interface): AppManager piloté par un plan de tâches JSON, sans PyQt6 ni QApplication.
+Les notifications destinées à l'UI passent par LoggingEventSink (journal) au lieu de MainWindow.
+Usage: python daemon.py plan.json [--duration-hours H] [--status-interval S]
+Profilage à chaud: `kill -USR1 <pid>` démarre/arrête l'échantillonnage (piles écrites dans data_files/profiles/).
+
+Plan (JSON):
+{
+    "settings": {"manual_login": false},        # Surcharges en mémoire (settings.json n'est pas modifié)
+                                                 # ex: "metrics_http_port": 9464 -> métriques sur http://127.0.0.1:9464/metrics
+    "open_browser": true,                        # Navigateur démarré avant les tâches (profil déjà connecté)
+    "login_url": "https://www.instagram.com",
+    "duration_hours": 8,                         # Optionnel: arrêt automatique (sinon SIGINT/SIGTERM)
+    "driver_stats_path": "driver_calls.json",    # Optionnel: export JSON des commandes WebDriver à l'arrêt
+    "profile": false,                            # Optionnel: profilage actif dès le démarrage (sinon via SIGUSR1)
+    "tasks": [
+        {"task": "auto_like", "options": {"like_source": "feed"}, "start_after_sec": 0, "stop_after_sec": 3600},
+        {"task": "check_new_followers", "options": {}}
+    ]
+}
+"""
+import os
+os.environ.setdefault("MON_BOT_HEADLESS", "1") # Avant utils.logger: pas d'import Qt ni de sink de logs UI
+import sys
+import json
+import time
+import signal
+import argparse
+import threading
+
+from utils.logger import get_logger, shutdown_logging
+from automation_engine.event_sink import LoggingEventSink
+
+try:
+    import resource # Unix uniquement: mémoire max du processus dans les rapports
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+logger = get_logger("Daemon")
+
+DEFAULT_STATUS_INTERVAL_SEC = 300
+TICK_SEC = 1.0
+
+
+def load_task_plan(plan_path):
+    """Lit et valide le plan. Retourne le dict normalisé, ou None (erreur journalisée)."""
+    try:
+        with open(plan_path, 'r', encoding='utf-8') as f: plan = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error(f"Plan de tâches illisible '{plan_path}': {e}"); return None
+    if not isinstance(plan, dict) or not isinstance(plan.get("tasks"), list) or not plan["tasks"]:
+        logger.error(f"Plan '{plan_path}': liste 'tasks' manquante ou vide."); return None
+    tasks = []
+    for index, entry in enumerate(plan["tasks"]):
+        if isinstance(entry, str): entry = {"task": entry}
+        if not isinstance(entry, dict) or not isinstance(entry.get("task"), str):
+            logger.error(f"Plan '{plan_path}': tâche #{index} invalide ({entry!r})."); return None
+        tasks.append({"task": entry["task"], "options": dict(entry.get("options") or {}),
+                      "start_after_sec": float(entry.get("start_after_sec", 0) or 0),
+                      "stop_after_sec": float(entry["stop_after_sec"]) if entry.get("stop_after_sec") else None})
+    plan["tasks"] = sorted(tasks, key=lambda t: t["start_after_sec"])
+    plan["settings"] = plan.get("settings") if isinstance(plan.get("settings"), dict) else {}
+    return plan
+
+
+def _max_rss_mb():
+    if not RESOURCE_AVAILABLE: return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024 # Octets sur macOS, Ko ailleurs
+
+
+class DaemonRunner:
+    """Exécute un plan: démarre/arrête les tâches à leurs échéances, rapport périodique, arrêt propre sur signal."""
+
+    def __init__(self, plan, duration_hours=None, status_interval_sec=DEFAULT_STATUS_INTERVAL_SEC):
+        self.plan = plan
+        duration_hours = duration_hours if duration_hours is not None else plan.get("duration_hours")
+        self.duration_sec = float(duration_hours) * 3600 if duration_hours else None
+        self.status_interval_sec = status_interval_sec
+        self.event_sink = LoggingEventSink(logger)
+        self.stop_event = threading.Event()
+        self.profile_toggle_requested = False # Posé par le signal, traité dans la boucle principale (pas de join/écriture dans le handler)
+        self.app_manager = None
+
+    def request_stop(self, signum=None, frame=None):
+        if not self.stop_event.is_set(): logger.info(f"Arrêt demandé{f' (signal {signum})' if signum else ''}.")
+        self.stop_event.set()
+
+    def request_profile_toggle(self, signum=None, frame=None):
+        self.profile_toggle_requested = True
+
+    def _toggle_profiling(self):
+        self.profile_toggle_requested = False
+        if self.app_manager.is_profiling(): self.app_manager.stop_profiling()
+        else: self.app_manager.start_profiling()
+
+    def _start_app_manager(self):
+        from automation_engine.app_manager import AppManager # Import ici: les erreurs de plan sont signalées sans tout charger
+        started_at = time.perf_counter()
+        self.app_manager = AppManager(event_sink=self.event_sink)
+        if self.plan["settings"]: self.app_manager.set_settings_overrides(self.plan["settings"]) # Conservées aux rechargements de settings.json
+        self.app_manager.complete_startup()
+        logger.info(f"AppManager prêt en {(time.perf_counter() - started_at) * 1000:.0f} ms (mode daemon, sans Qt).")
+        if self.plan.get("profile"): self.app_manager.start_profiling()
+        if self.plan.get("open_browser", True):
+            if not self.app_manager.browser_handler.start_browser(): logger.error("Échec démarrage navigateur."); return False
+            login_url = self.plan.get("login_url")
+            if login_url and not self.app_manager.browser_handler.navigate_to(login_url): logger.warning(f"Navigation vers {login_url} échouée.")
+        return True
+
+    def _log_status(self, elapsed_sec):
+        stats = self.app_manager.get_action_stats("today")
+        driver_calls = self.app_manager.get_driver_call_stats(top=1)
+        rss_mb = _max_rss_mb()
+        logger.info(f"[daemon {elapsed_sec / 60:.0f} min] tâches actives: {', '.join(self.event_sink.active_tasks()) or 'aucune'} | "
+                    f"aujourd'hui: {', '.join(f'{k}={v}' for k, v in stats.items() if v) or 'aucune action'} | "
+                    f"WebDriver: {driver_calls['total_commands']} cmd, {driver_calls['total_ms'] / 1000:.1f} s"
+                    f"{f' | mémoire max {rss_mb:.0f} Mo' if rss_mb else ''}")
+
+    def run(self):
+        """Retourne le code de sortie du processus."""
+        if not self._start_app_manager(): self.app_manager.shutdown(); return 1
+        pending_starts = list(self.plan["tasks"]); scheduled_stops = [] # (échéance, task_name)
+        started_at = time.monotonic(); next_status_at = started_at + self.status_interval_sec
+        try:
+            while not self.stop_event.is_set():
+                now = time.monotonic(); elapsed = now - started_at
+                while pending_starts and pending_starts[0]["start_after_sec"] <= elapsed:
+                    entry = pending_starts.pop(0)
+                    if not self.app_manager.start_main_task(entry["task"], entry["options"]):
+                        logger.error(f"Tâche '{entry['task']}' non démarrée.")
+                    elif entry["stop_after_sec"]: scheduled_stops.append((elapsed + entry["stop_after_sec"], entry["task"]))
+                for stop_entry in [s for s in scheduled_stops if s[0] <= elapsed]:
+                    scheduled_stops.remove(stop_entry); self.app_manager.stop_main_task(stop_entry[1])
+                if self.duration_sec and elapsed >= self.duration_sec: logger.info("Durée du plan écoulée."); break
+                if self.profile_toggle_requested: self._toggle_profiling()
+                if now >= next_status_at: self._log_status(elapsed); next_status_at = now + self.status_interval_sec
+                self.stop_event.wait(TICK_SEC)
+        finally:
+            self._log_status(time.monotonic() - started_at)
+            if self.plan.get("driver_stats_path"): self.app_manager.dump_driver_call_stats(self.plan["driver_stats_path"])
+            self.app_manager.shutdown()
+        return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mon Bot Social Pro - mode daemon sans interface.")
+    parser.add_argument("plan", help="Fichier JSON du plan de tâches")
+    parser.add_argument("--duration-hours", type=float, default=None, help="Arrêt automatique (prioritaire sur le plan)")
+    parser.add_argument("--status-interval", type=float, default=DEFAULT_STATUS_INTERVAL_SEC, help="Secondes entre deux rapports")
+    args = parser.parse_args(argv)
+
+    plan = load_task_plan(args.plan)
+    if plan is None: shutdown_logging(); return 2
+    runner = DaemonRunner(plan, duration_hours=args.duration_hours, status_interval_sec=args.status_interval)
+    signal.signal(signal.SIGINT, runner.request_stop)
+    if hasattr(signal, "SIGTERM"): signal.signal(signal.SIGTERM, runner.request_stop)
+    if hasattr(signal, "SIGUSR1"): signal.signal(signal.SIGUSR1, runner.request_profile_toggle) # Absent sous Windows
+    try: return runner.run()
+    except Exception as e:
+        logger.critical(f"Erreur fatale du daemon: {e}", exc_info=True); return 1
+    finally:
+        logger.info("Daemon Mon Bot Social Pro terminé.")
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+# mon_bot_social/data_layer/bulk_io.py
+"""
+Import/export en flux des ensembles user_sets (exclusion, whitelist...).
+Formats: tableau JSON, JSON par ligne (NDJSON), CSV, texte (un élément par ligne).
+Le fichier n'est jamais chargé en entier: lecture par blocs, normalisation + dédoublonnage par lots,
+une transaction par lot (INSERT OR IGNORE), progression rapportée par callback.
+"""
+import os
+import csv
+import json
+import time
+import sqlite3
+
+from utils.logger import get_logger
+from data_layer.database import get_db_connection
+
+logger = get_logger("BulkIO")
+
+IMPORT_CHUNK_SIZE = 5000 # Éléments par transaction
+READ_BLOCK_SIZE = 64 * 1024 # Octets lus à la fois pour le tableau JSON
+EXPORT_FETCH_SIZE = 5000
+CSV_USERNAME_HEADERS = ("username", "user", "login", "item", "nom", "nom_utilisateur")
+JSON_ITEM_KEYS = ("username", "user", "item", "login")
+
+
+def normalize_item(raw):
+    """Nom d'utilisateur normalisé (minuscules, sans @ ni espaces), '' si inexploitable."""
+    if isinstance(raw, dict): raw = next((raw[k] for k in JSON_ITEM_KEYS if raw.get(k)), None)
+    if not isinstance(raw, (str, int)): return ""
+    return str(raw).strip().lstrip("@").strip().lower()
+
+
+def detect_format(file_path):
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == ".csv": return "csv"
+    if ext in (".ndjson", ".jsonl"): return "ndjson"
+    if ext == ".json":
+        with open(file_path, 'r', encoding='utf-8-sig') as f:
+            while True:
+                char = f.read(1)
+                if not char or not char.isspace(): break
+        return "json" if char == "[" else "ndjson"
+    return "lines"
+
+
+class _JsonStreamReader:
+    """Lecture JSON au fil de l'eau: tampon glissant rempli par blocs, valeurs décodées par raw_decode."""
+
+    def __init__(self, f):
+        self.f = f; self.decoder = json.JSONDecoder()
+        self.buffer = ""; self.pos = 0; self.eof = False
+
+    def _fill(self):
+        more = self.f.read(READ_BLOCK_SIZE); self.eof = not more
+        self.buffer = self.buffer[self.pos:] + more; self.pos = 0 # Libère la partie déjà consommée
+
+    def peek(self):
+        """Prochain caractère significatif (espaces sautés), sans le consommer."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace(): self.pos += 1
+            if self.pos < len(self.buffer): return self.buffer[self.pos]
+            if self.eof: raise ValueError("Fin de fichier JSON inattendue.")
+            self._fill()
+
+    def next_char(self):
+        char = self.peek(); self.pos += 1
+        return char
+
+    def expect(self, char):
+        found = self.next_char()
+        if found != char: raise ValueError(f"JSON invalide: '{char}' attendu, '{found}' trouvé.")
+
+    def decode(self):
+        self.peek()
+        while True:
+            try:
+                value, end_pos = self.decoder.raw_decode(self.buffer, self.pos)
+                # Un nombre coupé en fin de bloc se décode sans erreur ("16000." -> 16000): exiger un délimiteur après la valeur
+                if not self.eof and (end_pos >= len(self.buffer) or not (self.buffer[end_pos].isspace() or self.buffer[end_pos] in ",:]}")):
+                    raise ValueError("fin de tampon")
+            except ValueError:
+                if self.eof: raise
+                self._fill(); continue # Élément coupé entre deux blocs: compléter le tampon
+            self.pos = end_pos
+            if self.pos > READ_BLOCK_SIZE: self.buffer = self.buffer[self.pos:]; self.pos = 0
+            return value
+
+
+def iter_json_array(f):
+    """Éléments d'un tableau JSON de premier niveau, sans le charger en entier. ValueError sur un tableau mal formé ([1,,3], [1 2]...)."""
+    reader = _JsonStreamReader(f); reader.expect("[")
+    if reader.peek() == "]": return
+    while True:
+        yield reader.decode()
+        separator = reader.next_char()
+        if separator == "]": return
+        if separator != ",": raise ValueError(f"JSON invalide: ',' ou ']' attendu, '{separator}' trouvé.")
+
+
+def iter_json_object_items(f):
+    """Paires (clé, valeur) d'un objet JSON de premier niveau, sans le charger en entier. ValueError sur un objet mal formé."""
+    reader = _JsonStreamReader(f); reader.expect("{")
+    if reader.peek() == "}": return
+    while True:
+        if reader.peek() != '"': raise ValueError(f"JSON invalide: clé attendue, '{reader.peek()}' trouvé.")
+        key = reader.decode(); reader.expect(":")
+        yield key, reader.decode()
+        separator = reader.next_char()
+        if separator == "}": return
+        if separator != ",": raise ValueError(f"JSON invalide: ',' ou '}}' attendu, '{separator}' trouvé.")
+
+
+def _iter_ndjson(f):
+    for line in f:
+        line = line.strip()
+        if not line: continue
+        if line[0] in '"{':
+            try: yield json.loads(line); continue
+            except ValueError: pass
+        yield line
+
+
+def _iter_csv(f):
+    reader = csv.reader(f); column = 0
+    first_row = next(reader, None)
+    if first_row is None: return
+    header = [cell.strip().lower() for cell in first_row]
+    matching = [i for i, name in enumerate(header) if name in CSV_USERNAME_HEADERS]
+    if matching: column = matching[0] # Ligne d'en-tête: on ne la retourne pas
+    elif first_row: yield first_row[0]
+    for row in reader:
+        if len(row) > column: yield row[column]
+
+
+def _iter_lines(f):
+    for line in f:
+        if line.strip(): yield line
+
+
+def iter_raw_items(f, file_format):
+    if file_format == "json": return iter_json_array(f)
+    if file_format == "ndjson": return _iter_ndjson(f)
+    if file_format == "csv": return _iter_csv(f)
+    return _iter_lines(f)
+
+
+def _flush_chunk(conn, list_name, chunk, known_items):
+    """Écrit un lot en une transaction. Retourne le nombre de lignes réellement ajoutées."""
+    if known_items is not None: chunk = chunk - known_items
+    if not chunk: return 0
+    ts_now = time.time(); changes_before = conn.total_changes
+    with conn: # Transaction du lot (commit/rollback automatique)
+        conn.executemany("INSERT OR IGNORE INTO user_sets (list_name, item, added_at_ts) VALUES (?, ?, ?)", ((list_name, item, ts_now) for item in chunk))
+    if known_items is not None: known_items.update(chunk)
+    return conn.total_changes - changes_before
+
+
+def stream_import_user_set(list_name, file_path, known_items=None, progress_callback=None, chunk_size=IMPORT_CHUNK_SIZE, file_format=None, cancel_check=None):
+    """
+    Importe `file_path` dans user_sets/`list_name`. `known_items` (set mémoire d'AppManager) est complété avec les nouveaux éléments.
+    progress_callback(octets_lus, taille_totale, éléments_lus, éléments_ajoutés) appelé après chaque lot (position réelle;
+    taille_totale atteinte seulement si le fichier a été lu jusqu'au bout).
+    Retourne (ajoutés, lus, terminé): terminé=False si cancel_check() a interrompu l'import (lots déjà validés conservés),
+    ou (-1, lus, False) en cas d'erreur.
+    """
+    processed = added = 0
+    conn = get_db_connection()
+    if conn is None: return -1, 0, False
+    try:
+        total_bytes = os.path.getsize(file_path)
+        file_format = file_format or detect_format(file_path)
+        logger.info(f"Import en flux {file_path} ({file_format}) -> {list_name}...")
+        with open(file_path, 'r', encoding='utf-8-sig', newline='' if file_format == "csv" else None) as f:
+            chunk = set()
+            for raw_item in iter_raw_items(f, file_format):
+                processed += 1
+                item = normalize_item(raw_item)
+                if item: chunk.add(item)
+                if len(chunk) >= chunk_size:
+                    added += _flush_chunk(conn, list_name, chunk, known_items); chunk = set()
+                    if progress_callback: progress_callback(f.buffer.tell(), total_bytes, processed, added)
+                    if cancel_check and cancel_check():
+                        logger.warning(f"Import {list_name} annulé après {processed} éléments ({added} nouveaux conservés)."); return added, processed, False
+            added += _flush_chunk(conn, list_name, chunk, known_items)
+        if progress_callback: progress_callback(total_bytes, total_bytes, processed, added)
+        logger.info(f"Import {list_name} terminé: {processed} lus, {added} nouveaux.")
+        return added, processed, True
+    except (OSError, ValueError, csv.Error, sqlite3.Error) as e:
+        logger.error(f"Erreur import en flux {file_path} ({list_name}) après {processed} éléments: {e}")
+        return -1, processed, False
+    finally: conn.close()
+
+
+def stream_export_user_set(list_name, file_path, file_format=None):
+    """Exporte user_sets/`list_name` trié, lu par lots depuis la DB (curseur), sans matérialiser la liste. Retourne le nb exporté ou -1."""
+    conn = get_db_connection()
+    if conn is None: return -1
+    file_format = file_format or {".json": "json", ".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv"}.get(os.path.splitext(file_path)[1].lower(), "lines")
+    exported = 0
+    try:
+        cursor = conn.execute("SELECT item FROM user_sets WHERE list_name = ? ORDER BY item", (list_name,)) # Ordre de la clé primaire: pas de tri
+        with open(file_path, 'w', encoding='utf-8', newline='' if file_format == "csv" else None) as f:
+            writer = csv.writer(f) if file_format == "csv" else None
+            if writer: writer.writerow(["username"])
+            if file_format == "json": f.write("[")
+            while True:
+                rows = cursor.fetchmany(EXPORT_FETCH_SIZE)
+                if not rows: break
+                for row in rows:
+                    item = row['item']
+                    if writer: writer.writerow([item])
+                    elif file_format == "json": f.write(("," if exported else "") + "\n    " + json.dumps(item))
+                    elif file_format == "ndjson": f.write(json.dumps(item) + "\n")
+                    else: f.write(item + "\n")
+                    exported += 1
+            if file_format == "json": f.write("\n]\n" if exported else "]\n")
+        logger.info(f"Export {list_name}: {exported} éléments -> {file_path}")
+        return exported
+    except (OSError, sqlite3.Error) as e:
+        logger.error(f"Erreur export en flux {list_name} -> {file_path}: {e}"); return -1
+    finally: conn.close()
+
+
+if __name__ == '__main__':
+    import tempfile
+    test_dir = tempfile.mkdtemp()
+    samples = {
+        "a.json": '[\n "Alice", "@bob", {"username": "Carl"}, "alice"\n]',
+        "b.ndjson": '"dave"\n{"user": "Eve"}\nfrank\n',
+        "c.csv": "id,username\n1,Gina\n2,@hank\n",
+        "d.txt": "ivan\n\nJudy\n",
+    }
+    known = set()
+    for name, content in samples.items():
+        path = os.path.join(test_dir, name)
+        with open(path, 'w', encoding='utf-8') as f: f.write(content)
+        print(name, stream_import_user_set("bulk_io_test", path, known_items=known,
+                                           progress_callback=lambda done, total, n, new: print(f"  {done}/{total} octets, {n} lus, {new} nouveaux")))
+    out_path = os.path.join(test_dir, "export.json")
+    print("Exportés:", stream_export_user_set("bulk_io_test", out_path), open(out_path, encoding='utf-8').read())
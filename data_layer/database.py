@@ -4,7 +4,12 @@ import os
 import datetime
 import json 
 import time 
+import re
+import threading
+import functools
 from utils.logger import get_logger 
+from utils.metrics import metrics
+from data_layer.migrations import run_migrations, BackgroundIndexBuilder, STATS_ACTION_TYPES
 
 DATABASE_PATH = os.path.join("data_files", "bot_data.db")
 logger = get_logger("Database") # Logger spécifique pour ce module
@@ -15,18 +20,94 @@ OLD_LIKED_JSON_FILE = os.path.join("data_files", "liked_posts.json")
 OLD_COMMENTED_JSON_FILE = os.path.join("data_files", "commented_posts.json")
 OLD_VIEWED_STORIES_JSON_FILE = os.path.join("data_files", "viewed_stories_users.json")
 
+# Ensembles de noms d'utilisateurs (ex-fichiers JSON réécrits en entier à chaque ajout) -> table user_sets
+USER_SET_EXCLUSION = "exclusion"
+USER_SET_WHITELIST = "whitelist"
+USER_SET_PROCESSED_FOLLOWERS = "processed_followers"
+OLD_USER_SET_JSON_FILES = {
+    USER_SET_EXCLUSION: os.path.join("data_files", "exclusion_list.json"),
+    USER_SET_WHITELIST: os.path.join("data_files", "whitelist.json"),
+    USER_SET_PROCESSED_FOLLOWERS: os.path.join("data_files", "processed_new_followers.json"),
+}
+
+# --- Métriques: durée de chaque requête, par type d'instruction et table (ex: 'INSERT user_sets') ---
+DB_STATEMENT_DURATION = metrics.histogram("bot_db_statement_duration_seconds", "Durée d'exécution SQLite par instruction (verbe + table)", ("statement",))
+DB_STATEMENT_ERRORS = metrics.counter("bot_db_statement_errors", "Instructions SQLite en erreur", ("statement",))
+DB_COMMIT_DURATION = metrics.histogram("bot_db_commit_duration_seconds", "Durée des COMMIT SQLite")
+DB_CONNECT_DURATION = metrics.histogram("bot_db_connect_duration_seconds", "Ouverture de connexion SQLite (PRAGMA inclus)")
+_STATEMENT_TABLE_PATTERN = re.compile(r"\b(?:FROM|INTO|UPDATE|TABLE|INDEX\s+\w+\s+ON)\s+(?:IF\s+(?:NOT\s+)?EXISTS\s+)?[\"'`\[]?(\w+)", re.IGNORECASE)
+
+@functools.lru_cache(maxsize=256)
+def _statement_label(sql):
+    """'SELECT user_sets', 'INSERT action_stats', 'PRAGMA'...: label borné (jamais les valeurs)."""
+    words = sql.lstrip().split(None, 1)
+    if not words: return "-"
+    verb = words[0].upper()
+    if verb in ("PRAGMA", "BEGIN", "COMMIT", "ROLLBACK", "VACUUM", "ANALYZE"): return verb
+    match = _STATEMENT_TABLE_PATTERN.search(sql)
+    return f"{verb} {match.group(1).lower()}" if match else verb
+
+def _timed_statement(method, sql, *args):
+    label = _statement_label(sql); started_at = time.perf_counter()
+    try: return method(sql, *args)
+    except sqlite3.Error: DB_STATEMENT_ERRORS.inc(statement=label); raise
+    finally: DB_STATEMENT_DURATION.observe(time.perf_counter() - started_at, statement=label)
+
+class MeteredCursor(sqlite3.Cursor):
+    """Curseur qui mesure execute/executemany (la lecture des lignes via fetch* n'est pas comptée)."""
+    def execute(self, sql, parameters=()): return _timed_statement(super().execute, sql, parameters)
+    def executemany(self, sql, seq_of_parameters): return _timed_statement(super().executemany, sql, seq_of_parameters)
+
+class MeteredConnection(sqlite3.Connection):
+    """Connexion SQLite instrumentée: conn.execute(), conn.cursor().execute() et commit() alimentent les métriques."""
+    def cursor(self, factory=MeteredCursor): return super().cursor(factory)
+    def execute(self, sql, parameters=()): return _timed_statement(super().execute, sql, parameters)
+    def executemany(self, sql, seq_of_parameters): return _timed_statement(super().executemany, sql, seq_of_parameters)
+    def commit(self):
+        with DB_COMMIT_DURATION.time(): super().commit()
+
+# --- Journal action_events (ajout seul) replié en agrégats horaires/journaliers (action_rollups) ---
+EVENT_TYPE_TASK_RUN = "task_run" # Une exécution de tâche par TaskScheduler (résultat + durée); les autres types = STATS_ACTION_TYPES
+EVENT_OUTCOMES = ("ok", "failed", "blocked", "error") # Code stocké = index
+ROLLUP_GRANULARITIES = (("hour", "%Y-%m-%d %H"), ("day", "%Y-%m-%d")) # Périodes en heure locale (comme l'ancien action_stats.date)
+ROLLUP_WATERMARK_KEY = "action_events_rolled_id" # db_meta: dernier id d'événement replié
+ROLLUP_BATCH_SIZE = 50000 # Événements repliés par transaction
+EVENT_DELETE_BATCH_SIZE = 5000 # Purge par petites transactions (n'empêche pas les écritures concurrentes)
+
+# Initialisation (tables + migrations JSON) différée à la première connexion au lieu de l'import du module
+_db_init_lock = threading.Lock()
+_db_initialized = False
+
+def ensure_database_initialized():
+    """Initialise la DB une seule fois (thread-safe). Appelé par get_db_connection; peut être lancé en avance (préchauffage)."""
+    global _db_initialized
+    if _db_initialized: return True
+    with _db_init_lock:
+        if not _db_initialized: _db_initialized = initialize_database()
+    return _db_initialized
+
 def get_db_connection():
-    """Établit et retourne une connexion à la base de données SQLite."""
+    """Établit et retourne une connexion à la base de données SQLite (initialisée au premier appel)."""
+    if not _db_initialized: ensure_database_initialized()
+    return _open_connection()
+
+def start_background_index_build():
+    """Lance la construction des index en attente (migrations) sur un thread dédié. Retourne le BackgroundIndexBuilder."""
+    builder = BackgroundIndexBuilder(_open_connection); builder.start()
+    return builder
+
+def _open_connection():
     try:
         db_dir = os.path.dirname(DATABASE_PATH)
         if db_dir and not os.path.exists(db_dir):
              os.makedirs(db_dir)
              logger.info(f"Répertoire de base de données créé: {db_dir}")
              
-        conn = sqlite3.connect(DATABASE_PATH, timeout=10) # Ajout timeout
-        conn.row_factory = sqlite3.Row 
-        # Activer WAL mode pour une meilleure concurrence (si plusieurs accès, bien que mono-thread ici)
-        conn.execute("PRAGMA journal_mode=WAL;")
+        with DB_CONNECT_DURATION.time():
+            conn = sqlite3.connect(DATABASE_PATH, timeout=10, factory=MeteredConnection) # Ajout timeout
+            conn.row_factory = sqlite3.Row 
+            # Activer WAL mode pour une meilleure concurrence (si plusieurs accès, bien que mono-thread ici)
+            conn.execute("PRAGMA journal_mode=WAL;")
         logger.debug("Connexion SQLite établie (mode WAL activé).")
         return conn
     except sqlite3.Error as e:
@@ -37,81 +118,29 @@ def get_db_connection():
         return None
 
 def initialize_database():
-    """Crée/vérifie toutes les tables nécessaires et lance les migrations JSON si besoin."""
+    """Crée/vérifie toutes les tables nécessaires et lance les migrations JSON si besoin. Retourne True si succès."""
     logger.info("Vérification et initialisation de la base de données...")
-    conn = get_db_connection()
+    conn = _open_connection()
     if conn is None: 
         logger.error("Impossible d'initialiser la base de données: connexion échouée.")
-        return
+        return False
 
     try:
-        cursor = conn.cursor()
-        
-        # Table action_stats
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS action_stats (
-                date TEXT PRIMARY KEY,
-                follows INTEGER DEFAULT 0,
-                unfollows INTEGER DEFAULT 0,
-                likes INTEGER DEFAULT 0,
-                comments INTEGER DEFAULT 0,
-                story_views INTEGER DEFAULT 0,
-                dms_sent INTEGER DEFAULT 0  -- Ajouté
-            )
-        """)
-        
-        # Table followed_users
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS followed_users (
-                username TEXT PRIMARY KEY,
-                followed_at_ts REAL NOT NULL,
-                status TEXT,
-                is_following_back INTEGER DEFAULT 0 
-            )
-        """)
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_followed_at ON followed_users (followed_at_ts)")
-
-        # Table liked_posts
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS liked_posts (
-                post_id TEXT PRIMARY KEY,
-                liked_at_ts REAL NOT NULL,
-                like_count INTEGER,     
-                comment_count INTEGER   
-            )
-        """)
-        
-        # Table commented_posts
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS commented_posts (
-                post_id TEXT PRIMARY KEY,
-                comment_text TEXT,         
-                commented_at_ts REAL NOT NULL,
-                like_count INTEGER,        
-                comment_count INTEGER      
-            )
-        """)
-
-        # Table viewed_story_users
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS viewed_story_users (
-                username TEXT PRIMARY KEY,
-                last_viewed_at_ts REAL NOT NULL
-            )
-        """)
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_last_viewed_at ON viewed_story_users (last_viewed_at_ts)")
-
-        conn.commit()
-        logger.info("Structure de la base de données vérifiée/initialisée avec succès.")
+        schema_version = run_migrations(conn) # Tables et index versionnés (PRAGMA user_version), cf. migrations.py
+        if schema_version is None: return False
+        logger.info(f"Structure de la base de données vérifiée/initialisée avec succès (schéma v{schema_version}).")
         
         # Exécuter les migrations après s'être assuré que les tables existent
-        _migrate_followed_from_json(conn)
-        _migrate_liked_from_json(conn)
-        _migrate_commented_from_json(conn)
-        _migrate_viewed_stories_from_json(conn)
+        # Follows/likes/commentaires/stories: gros fichiers, migrés en arrière-plan par json_migration.JsonMigrationWorker;
+        # migrer ou ignorer est décidé ici, avant que le bot ne puisse écrire dans ces tables
+        from data_layer.json_migration import prepare_json_migrations # Import tardif: json_migration importe ce module
+        prepare_json_migrations(conn)
+        _migrate_user_sets_from_json(conn)
+        return True
 
     except sqlite3.Error as e:
         logger.error(f"Erreur lors de l'initialisation/vérification de la DB: {e}", exc_info=True)
+        return False
     finally:
         if conn: conn.close()
 
@@ -127,111 +156,145 @@ def _rename_or_delete_old_json(file_path, suffix=".migrated_to_db"):
         logger.info(f"Ancien fichier JSON '{os.path.basename(file_path)}' renommé en '{os.path.basename(new_name)}'.")
     except OSError as e: logger.error(f"Impossible de renommer/supprimer {file_path}: {e}")
 
-def _migrate_followed_from_json(conn):
-    if not os.path.exists(OLD_FOLLOWED_JSON_FILE): return
+
+# --- Journal action_events et agrégats action_rollups ---
+def _insert_action_event(event_type, target=None, task=None, outcome="ok", duration_ms=None, ts=None):
+    conn = get_db_connection()
+    if conn is None: return False
     try:
-        cursor = conn.cursor(); cursor.execute("SELECT COUNT(*) FROM followed_users");
-        if cursor.fetchone()[0] > 0: logger.info("'followed_users' contient déjà des données. Skip migration JSON."); _rename_or_delete_old_json(OLD_FOLLOWED_JSON_FILE); return
-        
-        logger.warning(f"Migration 'followed_users' depuis {OLD_FOLLOWED_JSON_FILE}...")
-        with open(OLD_FOLLOWED_JSON_FILE, 'r', encoding='utf-8') as f: data = json.load(f)
-        migrated = 0
-        if isinstance(data, list):
-            for entry in data:
-                if isinstance(entry, dict) and 'username' in entry and 'followed_at_ts' in entry:
-                    uname = str(entry['username']).lower(); ts = float(entry['followed_at_ts']); status = entry.get('status', 'mig_json'); is_back = int(entry.get('is_following_back',0))
-                    try: cursor.execute("INSERT INTO followed_users VALUES (?, ?, ?, ?)", (uname, ts, status, is_back)); migrated +=1
-                    except sqlite3.IntegrityError: logger.debug(f"Migration Follow: {uname} existe déjà, skip.")
-                    except sqlite3.Error as e: logger.error(f"DB err mig Follow {uname}: {e}")
-        conn.commit(); logger.info(f"Migration Follows terminée. {migrated} ajoutés."); _rename_or_delete_old_json(OLD_FOLLOWED_JSON_FILE)
-    except Exception as e: logger.error(f"Erreur migration {OLD_FOLLOWED_JSON_FILE}: {e}", exc_info=True)
-
-def _migrate_liked_from_json(conn):
-    if not os.path.exists(OLD_LIKED_JSON_FILE): return
+        conn.execute("INSERT INTO action_events (ts, type, target, task, outcome, duration_ms) VALUES (?, ?, ?, ?, ?, ?)",
+                     (ts or time.time(), event_type, target, task or "", EVENT_OUTCOMES.index(outcome), duration_ms))
+        conn.commit(); return True
+    except sqlite3.Error as e: logger.error(f"Erreur DB événement '{event_type}' ({task}): {e}"); return False
+    finally: conn.close()
+
+def record_action(action_type, target=None, task=None):
+    """Une action réussie (follow, like...) -> un événement; `task` = tâche en cours (taux par tâche)."""
+    if action_type not in STATS_ACTION_TYPES: logger.warning(f"Type d'action invalide: {action_type}"); return False
+    logger.debug("Action DB: +1 %s (%s)", action_type, task or 'hors tâche')
+    return _insert_action_event(action_type, target, task)
+
+def record_task_event(task, outcome, duration_ms=None, target=None):
+    """Résultat d'une exécution de tâche (outcome parmi EVENT_OUTCOMES) avec sa durée."""
+    if outcome not in EVENT_OUTCOMES: logger.warning(f"Résultat de tâche invalide: {outcome}"); return False
+    return _insert_action_event(EVENT_TYPE_TASK_RUN, target, task, outcome, duration_ms)
+
+def _get_rollup_watermark(conn):
+    row = conn.execute("SELECT value FROM db_meta WHERE key = ?", (ROLLUP_WATERMARK_KEY,)).fetchone()
+    return int(row['value']) if row else 0
+
+def roll_up_action_events(batch_size=ROLLUP_BATCH_SIZE):
+    """
+    Replie les nouveaux événements (id > filigrane) dans action_rollups, par heure et par jour, une transaction par lot.
+    Retourne le nombre d'événements repliés, -1 si erreur.
+    """
+    conn = get_db_connection()
+    if conn is None: return -1
+    rolled_total = 0
     try:
-        cursor = conn.cursor(); cursor.execute("SELECT COUNT(*) FROM liked_posts");
-        if cursor.fetchone()[0] > 0: logger.info("'liked_posts' contient données. Skip migration JSON."); _rename_or_delete_old_json(OLD_LIKED_JSON_FILE); return
-        logger.warning(f"Migration 'liked_posts' depuis {OLD_LIKED_JSON_FILE}...")
-        with open(OLD_LIKED_JSON_FILE, 'r', encoding='utf-8') as f: data = json.load(f)
-        migrated = 0
-        if isinstance(data, list): # Supposant une liste d'IDs
-            ts_now = time.time()
-            for post_id_str in data:
-                 if isinstance(post_id_str, str) and post_id_str:
-                    try: cursor.execute("INSERT INTO liked_posts (post_id, liked_at_ts) VALUES (?, ?)", (post_id_str, ts_now)); migrated +=1
-                    except sqlite3.IntegrityError: pass
-                    except sqlite3.Error as e: logger.error(f"DB err mig Like {post_id_str}: {e}")
-        conn.commit(); logger.info(f"Migration Likes terminée. {migrated} ajoutés."); _rename_or_delete_old_json(OLD_LIKED_JSON_FILE)
-    except Exception as e: logger.error(f"Erreur migration {OLD_LIKED_JSON_FILE}: {e}", exc_info=True)
-
-def _migrate_commented_from_json(conn): # Similaire à Liked
-    if not os.path.exists(OLD_COMMENTED_JSON_FILE): return
-    try: #... (check si table vide, lire JSON, insérer avec NULL pour counts, renommer)
-        cursor = conn.cursor(); cursor.execute("SELECT COUNT(*) FROM commented_posts");
-        if cursor.fetchone()[0] > 0: logger.info("'commented_posts' contient données. Skip migration JSON."); _rename_or_delete_old_json(OLD_COMMENTED_JSON_FILE); return
-        logger.warning(f"Migration 'commented_posts' depuis {OLD_COMMENTED_JSON_FILE}...")
-        with open(OLD_COMMENTED_JSON_FILE, 'r', encoding='utf-8') as f: data = json.load(f)
-        migrated = 0; ts_now = time.time()
-        if isinstance(data, list):
-             for post_id_str in data:
-                 if isinstance(post_id_str, str) and post_id_str:
-                     try: cursor.execute("INSERT INTO commented_posts (post_id, commented_at_ts) VALUES (?, ?)", (post_id_str, ts_now)); migrated +=1
-                     except sqlite3.IntegrityError: pass
-                     except sqlite3.Error as e: logger.error(f"DB err mig Comment {post_id_str}: {e}")
-        conn.commit(); logger.info(f"Migration Comments terminée. {migrated} ajoutés."); _rename_or_delete_old_json(OLD_COMMENTED_JSON_FILE)
-    except Exception as e: logger.error(f"Erreur migration {OLD_COMMENTED_JSON_FILE}: {e}", exc_info=True)
-
-def _migrate_viewed_stories_from_json(conn):
-    if not os.path.exists(OLD_VIEWED_STORIES_JSON_FILE): return
-    try: #... (check si table vide, lire JSON dict {'user':ts}, insérer, renommer)
-        cursor = conn.cursor(); cursor.execute("SELECT COUNT(*) FROM viewed_story_users");
-        if cursor.fetchone()[0] > 0: logger.info("'viewed_story_users' contient données. Skip migration JSON."); _rename_or_delete_old_json(OLD_VIEWED_STORIES_JSON_FILE); return
-        logger.warning(f"Migration 'viewed_story_users' depuis {OLD_VIEWED_STORIES_JSON_FILE}...")
-        with open(OLD_VIEWED_STORIES_JSON_FILE, 'r', encoding='utf-8') as f: data = json.load(f)
-        migrated = 0
-        if isinstance(data, dict):
-            for username, ts_val in data.items():
-                 if isinstance(username, str) and username and isinstance(ts_val, (int,float)):
-                     try: cursor.execute("INSERT INTO viewed_story_users VALUES (?, ?)", (username.lower(), float(ts_val))); migrated +=1
-                     except sqlite3.IntegrityError: pass
-                     except sqlite3.Error as e: logger.error(f"DB err mig ViewStory {username}: {e}")
-        conn.commit(); logger.info(f"Migration ViewStories terminée. {migrated} ajoutés."); _rename_or_delete_old_json(OLD_VIEWED_STORIES_JSON_FILE)
-    except Exception as e: logger.error(f"Erreur migration {OLD_VIEWED_STORIES_JSON_FILE}: {e}", exc_info=True)
-
-
-# --- Fonctions CRUD pour action_stats ---
-def record_action(action_type):
-    conn = get_db_connection(); #... (check conn)
-    today = datetime.date.today().isoformat()
-    valid_types = ['follows', 'unfollows', 'likes', 'comments', 'story_views', 'dms_sent']
-    if action_type not in valid_types: logger.warning(f"Type d'action invalide: {action_type}"); conn.close(); return
+        while True:
+            conn.execute("BEGIN IMMEDIATE") # Filigrane lu et avancé dans la même transaction (pas de double comptage)
+            watermark = _get_rollup_watermark(conn)
+            upper_id = conn.execute("SELECT MAX(id) FROM (SELECT id FROM action_events WHERE id > ? ORDER BY id LIMIT ?)",
+                                    (watermark, batch_size)).fetchone()[0]
+            if upper_id is None: conn.rollback(); break
+            for granularity, period_format in ROLLUP_GRANULARITIES:
+                conn.execute("""INSERT INTO action_rollups (granularity, period, type, task, outcome, count, total_duration_ms)
+                                SELECT ?, strftime(?, ts, 'unixepoch', 'localtime'), type, task, outcome, COUNT(*), COALESCE(SUM(duration_ms), 0)
+                                FROM action_events WHERE id > ? AND id <= ? GROUP BY 2, type, task, outcome
+                                ON CONFLICT (granularity, period, type, task, outcome)
+                                DO UPDATE SET count = count + excluded.count, total_duration_ms = total_duration_ms + excluded.total_duration_ms""",
+                             (granularity, period_format, watermark, upper_id))
+            rolled_count = conn.execute("SELECT COUNT(*) FROM action_events WHERE id > ? AND id <= ?", (watermark, upper_id)).fetchone()[0]
+            conn.execute("INSERT OR REPLACE INTO db_meta (key, value) VALUES (?, ?)", (ROLLUP_WATERMARK_KEY, str(upper_id)))
+            conn.commit(); rolled_total += rolled_count
+        if rolled_total: logger.debug("%s événement(s) replié(s) dans action_rollups.", rolled_total)
+        return rolled_total
+    except sqlite3.Error as e:
+        conn.rollback(); logger.error(f"Erreur DB repli des événements: {e}"); return -1
+    finally: conn.close()
+
+def prune_action_events(raw_retention_days, hourly_retention_days=None):
+    """
+    Supprime les événements bruts plus vieux que `raw_retention_days` (déjà repliés uniquement) et, si demandé,
+    les agrégats horaires plus vieux que `hourly_retention_days` (les agrégats journaliers sont conservés).
+    Retourne le nombre de lignes supprimées, -1 si erreur.
+    """
+    conn = get_db_connection()
+    if conn is None: return -1
+    deleted_total = 0
     try:
-        cursor = conn.cursor()
-        cursor.execute("INSERT OR IGNORE INTO action_stats (date, {0}) VALUES (?, 0)".format(action_type), (today,)) # Assure que la ligne et colonne existent
-        cursor.execute(f"UPDATE action_stats SET {action_type} = {action_type} + 1 WHERE date = ?", (today,))
-        conn.commit(); logger.debug(f"Action DB: +1 {action_type} pour {today}")
-    except sqlite3.Error as e: logger.error(f"Erreur DB record_action '{action_type}': {e}")
-    finally:
-        if conn: conn.close()
+        watermark = _get_rollup_watermark(conn); cutoff_ts = time.time() - raw_retention_days * 86400
+        while True: # Par lots: chaque transaction reste courte
+            deleted = conn.execute("DELETE FROM action_events WHERE id IN (SELECT id FROM action_events WHERE ts < ? AND id <= ? LIMIT ?)",
+                                   (cutoff_ts, watermark, EVENT_DELETE_BATCH_SIZE)).rowcount
+            conn.commit(); deleted_total += deleted
+            if deleted < EVENT_DELETE_BATCH_SIZE: break
+        if hourly_retention_days:
+            cutoff_period = (datetime.datetime.now() - datetime.timedelta(days=hourly_retention_days)).strftime("%Y-%m-%d %H")
+            deleted_total += conn.execute("DELETE FROM action_rollups WHERE granularity = 'hour' AND period < ?", (cutoff_period,)).rowcount
+            conn.commit()
+        if deleted_total: logger.info(f"Purge action_events/agrégats horaires: {deleted_total} ligne(s) supprimée(s).")
+        return deleted_total
+    except sqlite3.Error as e: logger.error(f"Erreur DB purge des événements: {e}"); return -1
+    finally: conn.close()
 
-def get_stats_for_period(start_date_dt, end_date_dt): # Prend des objets date
-    conn = get_db_connection(); #... (check conn)
-    stats = {'follows': 0, 'unfollows': 0, 'likes': 0, 'comments': 0, 'story_views': 0, 'dms_sent':0}
+def _query_rollups(granularity, start_period, end_period, event_types):
+    """
+    Lignes (period, type, task, outcome, count, total_duration_ms) des agrégats de la période, complétées par les
+    événements pas encore repliés (lus via la clé primaire, id > filigrane): résultat à jour sans attendre le repli.
+    """
+    conn = get_db_connection()
+    if conn is None: return []
+    period_format = dict(ROLLUP_GRANULARITIES)[granularity]
+    type_placeholders = ", ".join("?" for _ in event_types)
     try:
-        start_str = start_date_dt.isoformat(); end_str = end_date_dt.isoformat()
-        cursor = conn.cursor()
-        cursor.execute(f"""SELECT SUM(follows) tf, SUM(unfollows) tu, SUM(likes) tl, SUM(comments) tc, SUM(story_views) tv, SUM(dms_sent) td
-                           FROM action_stats WHERE date BETWEEN ? AND ?""", (start_str, end_str))
-        row = cursor.fetchone()
-        if row:
-            stats['follows']=row['tf'] or 0; stats['unfollows']=row['tu'] or 0; stats['likes']=row['tl'] or 0
-            stats['comments']=row['tc'] or 0; stats['story_views']=row['tv'] or 0; stats['dms_sent']=row['td'] or 0
-        logger.debug(f"Stats récupérées pour {start_str} à {end_str}: {stats}")
-    except sqlite3.Error as e: logger.error(f"Erreur DB get_stats ({start_str}-{end_str}): {e}")
-    finally:
-        if conn: conn.close()
+        return conn.execute(f"""
+            SELECT period, type, task, outcome, SUM(count) AS count, SUM(total_duration_ms) AS total_duration_ms FROM (
+                SELECT period, type, task, outcome, count, total_duration_ms FROM action_rollups
+                WHERE granularity = ? AND period BETWEEN ? AND ? AND type IN ({type_placeholders})
+                UNION ALL
+                SELECT strftime(?, ts, 'unixepoch', 'localtime'), type, task, outcome, 1, COALESCE(duration_ms, 0) FROM action_events
+                WHERE id > COALESCE((SELECT CAST(value AS INTEGER) FROM db_meta WHERE key = ?), 0) AND type IN ({type_placeholders})
+            ) WHERE period BETWEEN ? AND ? GROUP BY period, type, task, outcome""",
+            (granularity, start_period, end_period, *event_types, period_format, ROLLUP_WATERMARK_KEY, *event_types,
+             start_period, end_period)).fetchall()
+    except sqlite3.Error as e: logger.error(f"Erreur DB lecture agrégats {granularity} ({start_period}-{end_period}): {e}"); return []
+    finally: conn.close()
+
+def _counts_by_period(rows):
+    counts = {}
+    for row in rows:
+        if row['outcome'] != 0: continue
+        counts.setdefault(row['period'], dict.fromkeys(STATS_ACTION_TYPES, 0))[row['type']] += row['count']
+    return counts
+
+def get_stats_for_period(start_date_dt, end_date_dt): # Prend des objets date
+    stats = dict.fromkeys(STATS_ACTION_TYPES, 0)
+    for day_counts in get_daily_stats_for_period(start_date_dt, end_date_dt).values():
+        for action_type, count in day_counts.items(): stats[action_type] += count
+    logger.debug("Stats récupérées pour %s à %s: %s", start_date_dt, end_date_dt, stats)
     return stats
 
+def get_daily_stats_for_period(start_date_dt, end_date_dt):
+    """Stats jour par jour {date_iso: {type: n}} depuis les agrégats journaliers (alimente le cache d'agrégats)."""
+    return _counts_by_period(_query_rollups("day", start_date_dt.isoformat(), end_date_dt.isoformat(), STATS_ACTION_TYPES))
+
+def get_hourly_stats_for_period(start_date_dt, end_date_dt):
+    """Stats heure par heure {'AAAA-MM-JJ HH': {type: n}} (débit horaire)."""
+    return _counts_by_period(_query_rollups("hour", f"{start_date_dt.isoformat()} 00", f"{end_date_dt.isoformat()} 23", STATS_ACTION_TYPES))
+
+def get_task_outcome_stats(start_date_dt, end_date_dt):
+    """Par tâche: {'runs', 'ok', 'failed', 'blocked', 'error', 'success_rate', 'avg_ms'} sur la période."""
+    task_stats = {}
+    for row in _query_rollups("day", start_date_dt.isoformat(), end_date_dt.isoformat(), (EVENT_TYPE_TASK_RUN,)):
+        entry = task_stats.setdefault(row['task'], {"runs": 0, **dict.fromkeys(EVENT_OUTCOMES, 0), "total_ms": 0})
+        entry["runs"] += row['count']; entry[EVENT_OUTCOMES[row['outcome']]] += row['count']; entry["total_ms"] += row['total_duration_ms']
+    for entry in task_stats.values():
+        entry["success_rate"] = entry["ok"] / entry["runs"] if entry["runs"] else 0.0
+        entry["avg_ms"] = entry.pop("total_ms") / entry["runs"] if entry["runs"] else 0.0
+    return task_stats
+
 # --- CRUD followed_users (déjà définies dans l'étape précédente) ---
 def add_or_update_followed_user(username, status="followed_by_bot", is_following_back=0): #...
 def remove_followed_user(username): #...
@@ -251,16 +314,70 @@ def has_commented_post_db(post_id): #...
 def add_or_update_viewed_story_user(username): #...
 def get_last_story_view_ts(username): #...
 
+def _migrate_user_sets_from_json(conn):
+    for list_name, json_path in OLD_USER_SET_JSON_FILES.items():
+        if not os.path.exists(json_path): continue
+        try:
+            cursor = conn.cursor(); cursor.execute("SELECT 1 FROM user_sets WHERE list_name = ? LIMIT 1", (list_name,))
+            if cursor.fetchone(): logger.info(f"'user_sets/{list_name}' contient déjà des données. Skip migration JSON."); _rename_or_delete_old_json(json_path); continue
+            logger.warning(f"Migration 'user_sets/{list_name}' depuis {json_path}...")
+            with open(json_path, 'r', encoding='utf-8') as f: data = json.load(f)
+            ts_now = time.time(); changes_before = conn.total_changes
+            if isinstance(data, list):
+                cursor.executemany("INSERT OR IGNORE INTO user_sets (list_name, item, added_at_ts) VALUES (?, ?, ?)",
+                                   ((list_name, item.strip().lower(), ts_now) for item in data if isinstance(item, str) and item.strip()))
+            conn.commit(); logger.info(f"Migration {list_name} terminée. {conn.total_changes - changes_before} ajoutés."); _rename_or_delete_old_json(json_path)
+        except Exception as e: logger.error(f"Erreur migration {json_path}: {e}", exc_info=True)
+
+
+# --- CRUD user_sets (exclusion, whitelist, followers traités) ---
+def get_user_set_items(list_name):
+    conn = get_db_connection()
+    items = set()
+    if conn is None: return items
+    try:
+        cursor = conn.cursor(); cursor.execute("SELECT item FROM user_sets WHERE list_name = ?", (list_name,))
+        items = {row['item'] for row in cursor.fetchall()}
+    except sqlite3.Error as e: logger.error(f"Erreur DB get_user_set_items '{list_name}': {e}")
+    finally: conn.close()
+    return items
+
+def add_user_set_items(list_name, items):
+    """Ajoute des éléments (déjà normalisés) en une transaction. Retourne le nombre de nouveaux éléments, -1 si erreur."""
+    conn = get_db_connection()
+    if conn is None: return -1
+    try:
+        ts_now = time.time(); changes_before = conn.total_changes
+        conn.executemany("INSERT OR IGNORE INTO user_sets (list_name, item, added_at_ts) VALUES (?, ?, ?)", ((list_name, item, ts_now) for item in items))
+        conn.commit(); return conn.total_changes - changes_before
+    except sqlite3.Error as e: logger.error(f"Erreur DB add_user_set_items '{list_name}': {e}"); return -1
+    finally: conn.close()
+
+def remove_user_set_items(list_name, items):
+    conn = get_db_connection()
+    if conn is None: return -1
+    try:
+        changes_before = conn.total_changes
+        conn.executemany("DELETE FROM user_sets WHERE list_name = ? AND item = ?", ((list_name, item) for item in items))
+        conn.commit(); return conn.total_changes - changes_before
+    except sqlite3.Error as e: logger.error(f"Erreur DB remove_user_set_items '{list_name}': {e}"); return -1
+    finally: conn.close()
+
+def clear_user_set(list_name):
+    conn = get_db_connection()
+    if conn is None: return False
+    try:
+        conn.execute("DELETE FROM user_sets WHERE list_name = ?", (list_name,)); conn.commit(); return True
+    except sqlite3.Error as e: logger.error(f"Erreur DB clear_user_set '{list_name}': {e}"); return False
+    finally: conn.close()
 
-# Appel initial pour créer la DB/tables et tenter les migrations si nécessaire
-initialize_database()
 
 if __name__ == '__main__':
     logger.info("--- Test Manuel des Fonctions DB ---")
     # Créer quelques faux fichiers JSON pour tester la migration s'ils n'existent pas
     # ... (code de création de faux JSON si besoin pour test) ...
     
-    # initialize_database() # Est déjà appelé à l'import
+    # initialize_database() # Appelé par la première get_db_connection()
     
     # Test des actions
     logger.info("Test enregistrement actions...")
@@ -0,0 +1,60 @@
+# mon_bot_social/data_layer/event_rollup.py
+"""
+Repli périodique du journal action_events en agrégats horaires/journaliers (action_rollups), en arrière-plan,
+puis purge des événements bruts anciens (déjà repliés) et des agrégats horaires expirés.
+"""
+import time
+import threading
+
+from utils.logger import get_logger
+from data_layer.database import roll_up_action_events, prune_action_events
+
+logger = get_logger("EventRollup")
+
+DEFAULT_ROLLUP_INTERVAL_SEC = 300
+PRUNE_INTERVAL_SEC = 3600
+
+
+class ActionEventRollupWorker:
+    def __init__(self, raw_retention_days=14, hourly_retention_days=90, interval_sec=DEFAULT_ROLLUP_INTERVAL_SEC):
+        self.raw_retention_days = raw_retention_days
+        self.hourly_retention_days = hourly_retention_days
+        self.interval_sec = interval_sec
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._last_prune_ts = 0.0
+
+    def configure(self, raw_retention_days=None, hourly_retention_days=None):
+        if raw_retention_days is not None: self.raw_retention_days = raw_retention_days
+        if hourly_retention_days is not None: self.hourly_retention_days = hourly_retention_days
+
+    def start(self):
+        if self._thread and self._thread.is_alive(): return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="EventRollup", daemon=True); self._thread.start()
+
+    def stop(self):
+        """Arrête le thread et replie les derniers événements (stats complètes au prochain démarrage)."""
+        self._stop_event.set()
+        if self._thread: self._thread.join(timeout=10); self._thread = None
+        roll_up_action_events()
+
+    def run_once(self):
+        rolled = roll_up_action_events()
+        if time.time() - self._last_prune_ts >= PRUNE_INTERVAL_SEC:
+            prune_action_events(self.raw_retention_days, self.hourly_retention_days); self._last_prune_ts = time.time()
+        return rolled
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_sec):
+            try: self.run_once()
+            except Exception as e: logger.error(f"Erreur repli des événements: {e}", exc_info=True)
+
+
+if __name__ == '__main__':
+    from data_layer.database import record_action, record_task_event, get_task_outcome_stats
+    import datetime
+    record_action('likes', task='auto_like'); record_task_event('auto_like', 'ok', duration_ms=1500)
+    worker = ActionEventRollupWorker()
+    print(f"Événements repliés: {worker.run_once()}")
+    print(get_task_outcome_stats(datetime.date.today(), datetime.date.today()))
@@ -0,0 +1,185 @@
+# mon_bot_social/data_layer/json_migration.py
+"""
+Migration des anciens fichiers JSON (follows, likes, commentaires, stories vues) vers bot_data.db, en arrière-plan.
+Lecture en flux (bulk_io), executemany + INSERT OR IGNORE par lots, une transaction par lot avec le point de reprise
+(éléments déjà traités) écrit dans db_meta: une migration interrompue (arrêt, crash) reprend au lot suivant.
+Le fichier est renommé en .migrated_to_db une fois entièrement importé.
+La décision "migrer ou ignorer" (table déjà alimentée par le bot) est prise au démarrage, de façon synchrone, par
+prepare_json_migrations (initialize_database): un point de reprise à 0 est posé pour chaque fichier à migrer, avant que
+la moindre action ne puisse écrire dans les tables. Les tâches attendent la fin du worker (TaskScheduler).
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import namedtuple
+
+from utils.logger import get_logger
+from data_layer.bulk_io import iter_json_array, iter_json_object_items
+from data_layer.database import (
+    get_db_connection, _rename_or_delete_old_json,
+    OLD_FOLLOWED_JSON_FILE, OLD_LIKED_JSON_FILE, OLD_COMMENTED_JSON_FILE, OLD_VIEWED_STORIES_JSON_FILE
+)
+
+logger = get_logger("JsonMigration")
+
+MIGRATION_CHUNK_SIZE = 5000 # Lignes par transaction
+PROGRESS_INTERVAL_SEC = 1.0 # Progression rapportée au plus une fois par seconde (+ fin de fichier)
+CHECKPOINT_KEY_PREFIX = "json_migration:"
+
+
+def _followed_row(entry, ts_now):
+    if not (isinstance(entry, dict) and entry.get('username') and 'followed_at_ts' in entry): return None
+    return (str(entry['username']).lower(), float(entry['followed_at_ts']), entry.get('status', 'mig_json'), int(entry.get('is_following_back', 0)))
+
+def _post_id_row(post_id, ts_now):
+    return (post_id, ts_now) if isinstance(post_id, str) and post_id else None
+
+def _viewed_story_row(item, ts_now):
+    username, ts_val = item
+    if not (isinstance(username, str) and username and isinstance(ts_val, (int, float))): return None
+    return (username.lower(), float(ts_val))
+
+# table: table cible; iter_items(f): éléments du fichier en flux; to_row(élément, ts_migration) -> tuple ou None (ignoré)
+JsonMigrationSource = namedtuple("JsonMigrationSource", ("table", "json_path", "iter_items", "insert_sql", "to_row"))
+JSON_MIGRATION_SOURCES = (
+    JsonMigrationSource("followed_users", OLD_FOLLOWED_JSON_FILE, iter_json_array,
+                        "INSERT OR IGNORE INTO followed_users (username, followed_at_ts, status, is_following_back) VALUES (?, ?, ?, ?)", _followed_row),
+    JsonMigrationSource("liked_posts", OLD_LIKED_JSON_FILE, iter_json_array,
+                        "INSERT OR IGNORE INTO liked_posts (post_id, liked_at_ts) VALUES (?, ?)", _post_id_row),
+    JsonMigrationSource("commented_posts", OLD_COMMENTED_JSON_FILE, iter_json_array,
+                        "INSERT OR IGNORE INTO commented_posts (post_id, commented_at_ts) VALUES (?, ?)", _post_id_row),
+    JsonMigrationSource("viewed_story_users", OLD_VIEWED_STORIES_JSON_FILE, iter_json_object_items,
+                        "INSERT OR IGNORE INTO viewed_story_users (username, last_viewed_at_ts) VALUES (?, ?)", _viewed_story_row),
+)
+
+
+def pending_json_migrations(sources=JSON_MIGRATION_SOURCES):
+    return [source for source in sources if os.path.exists(source.json_path)]
+
+
+def _load_checkpoint(conn, source):
+    """Éléments déjà migrés pour ce fichier (0 si le fichier a changé depuis), None si aucun point de reprise."""
+    row = conn.execute("SELECT value FROM db_meta WHERE key = ?", (CHECKPOINT_KEY_PREFIX + source.table,)).fetchone()
+    if not row: return None
+    checkpoint = json.loads(row[0])
+    return checkpoint["items"] if checkpoint.get("size") == os.path.getsize(source.json_path) else 0
+
+def _save_checkpoint(conn, source, items_done, file_size):
+    conn.execute("INSERT OR REPLACE INTO db_meta (key, value) VALUES (?, ?)",
+                 (CHECKPOINT_KEY_PREFIX + source.table, json.dumps({"items": items_done, "size": file_size})))
+
+def prepare_json_migrations(conn, sources=JSON_MIGRATION_SOURCES):
+    """
+    Au démarrage, avant toute action: pour chaque ancien fichier sans point de reprise, ignore (renomme) celui dont la table
+    contient déjà des données, sinon pose un point de reprise à 0. Retourne les sources à migrer par JsonMigrationWorker.
+    """
+    pending = []
+    for source in pending_json_migrations(sources):
+        try:
+            if _load_checkpoint(conn, source) is None:
+                if conn.execute(f"SELECT 1 FROM {source.table} LIMIT 1").fetchone():
+                    logger.info(f"'{source.table}' contient déjà des données. Skip migration JSON."); _rename_or_delete_old_json(source.json_path); continue
+                with conn: _save_checkpoint(conn, source, 0, os.path.getsize(source.json_path))
+            pending.append(source)
+        except (OSError, ValueError, sqlite3.Error) as e: logger.error(f"Erreur préparation migration {source.json_path}: {e}")
+    if pending: logger.warning(f"Migration JSON en arrière-plan: {', '.join(source.table for source in pending)} (tâches en attente jusqu'à la fin).")
+    return pending
+
+def _flush_chunk(conn, source, rows, items_done, file_size):
+    """Lot + point de reprise dans la même transaction. Retourne le nombre de lignes réellement ajoutées."""
+    changes_before = conn.total_changes
+    with conn:
+        conn.executemany(source.insert_sql, rows)
+        added = conn.total_changes - changes_before
+        _save_checkpoint(conn, source, items_done, file_size)
+    return added
+
+
+def migrate_json_source(conn, source, chunk_size=MIGRATION_CHUNK_SIZE, progress_callback=None, stop_check=None):
+    """
+    Migre un fichier préparé par prepare_json_migrations (reprise au point enregistré). progress_callback(table, octets_lus, taille, éléments_lus, ajoutés).
+    Retourne (ajoutés, lus, terminé), ou None en cas d'erreur (le point de reprise du dernier lot validé est conservé).
+    """
+    if not os.path.exists(source.json_path): return 0, 0, True
+    added = processed = 0
+    try:
+        resume_from = _load_checkpoint(conn, source) or 0 # Migrer ou ignorer: décidé au démarrage (la table a pu recevoir des actions depuis)
+        file_size = os.path.getsize(source.json_path); ts_now = time.time(); last_progress_ts = 0.0
+        logger.warning(f"Migration '{source.table}' depuis {source.json_path} ({file_size / 1024:.0f} Ko"
+                       f"{f', reprise après {resume_from} éléments' if resume_from else ''})...")
+        with open(source.json_path, 'r', encoding='utf-8') as f:
+            rows = []; skipped = 0
+            for item in source.iter_items(f):
+                processed += 1
+                if processed <= resume_from: continue # Déjà validé lors d'un passage précédent (décodé, pas réinséré)
+                try: row = source.to_row(item, ts_now)
+                except (TypeError, ValueError): row = None
+                if row is None: skipped += 1
+                else: rows.append(row)
+                if len(rows) >= chunk_size:
+                    added += _flush_chunk(conn, source, rows, processed, file_size); rows = []
+                    if progress_callback and time.time() - last_progress_ts >= PROGRESS_INTERVAL_SEC:
+                        progress_callback(source.table, f.buffer.tell(), file_size, processed, added); last_progress_ts = time.time()
+                    if stop_check and stop_check():
+                        logger.info(f"Migration '{source.table}' interrompue après {processed} éléments (reprise au prochain démarrage)."); return added, processed, False
+            if rows: added += _flush_chunk(conn, source, rows, processed, file_size)
+        with conn: conn.execute("DELETE FROM db_meta WHERE key = ?", (CHECKPOINT_KEY_PREFIX + source.table,)) # Avant le renommage (cf. reprise)
+        if progress_callback: progress_callback(source.table, file_size, file_size, processed, added)
+        logger.info(f"Migration {source.table} terminée. {processed} lus, {added} ajoutés{f', {skipped} invalides ignorés' if skipped else ''}.")
+        _rename_or_delete_old_json(source.json_path)
+        return added, processed, True
+    except (OSError, ValueError, sqlite3.Error) as e:
+        logger.error(f"Erreur migration {source.json_path} après {processed} éléments: {e}", exc_info=True); return None
+
+
+class JsonMigrationWorker:
+    """Migre les fichiers préparés (point de reprise posé) sur un thread dédié (une connexion à lui), un fichier après l'autre."""
+
+    def __init__(self, sources=JSON_MIGRATION_SOURCES, chunk_size=MIGRATION_CHUNK_SIZE, progress_callback=None):
+        self.sources = sources; self.chunk_size = chunk_size; self.progress_callback = progress_callback
+        self.results = {} # table -> (ajoutés, lus, terminé) ou None si erreur
+        self._stop_event = threading.Event(); self._thread = None
+
+    def start(self):
+        if not self._pending_sources(): return None
+        self._thread = threading.Thread(target=self._run, name="JsonMigration", daemon=True); self._thread.start()
+        return self._thread
+
+    def stop(self, timeout=None):
+        self._stop_event.set() # Le lot en cours est validé, le reste reprend au prochain démarrage
+        if self._thread: self._thread.join(timeout)
+
+    def is_running(self): return bool(self._thread and self._thread.is_alive())
+
+    def _pending_sources(self):
+        """Fichiers présents ET préparés au démarrage (un fichier apparu depuis attend le prochain démarrage)."""
+        conn = get_db_connection()
+        if conn is None: return []
+        try: return [source for source in pending_json_migrations(self.sources) if _load_checkpoint(conn, source) is not None]
+        except (OSError, ValueError, sqlite3.Error) as e: logger.error(f"Lecture des points de reprise JSON impossible: {e}"); return []
+        finally: conn.close()
+
+    def _run(self):
+        conn = get_db_connection()
+        if conn is None: return
+        try:
+            for source in self._pending_sources():
+                if self._stop_event.is_set(): break
+                self.results[source.table] = migrate_json_source(conn, source, self.chunk_size, self.progress_callback, self._stop_event.is_set)
+        finally: conn.close()
+
+
+if __name__ == '__main__':
+    import tempfile
+    from data_layer import database
+    test_dir = tempfile.mkdtemp(); database.DATABASE_PATH = os.path.join(test_dir, "bot_data.db")
+    liked_path = os.path.join(test_dir, "liked_posts.json")
+    with open(liked_path, 'w', encoding='utf-8') as f: json.dump([f"post_{i}" for i in range(12000)] + [None, ""], f)
+    source = JSON_MIGRATION_SOURCES[1]._replace(json_path=liked_path)
+    conn = get_db_connection(); prepare_json_migrations(conn, (source,))
+    print("Passage interrompu:", migrate_json_source(conn, source, chunk_size=5000, stop_check=lambda: True))
+    print("Reprise:", migrate_json_source(conn, source, chunk_size=5000,
+                                          progress_callback=lambda table, done, total, n, new: print(f"  {table}: {done}/{total} octets, {n} lus, {new} ajoutés")))
+    print("Lignes:", conn.execute("SELECT COUNT(*) FROM liked_posts").fetchone()[0]); conn.close()
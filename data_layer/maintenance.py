@@ -0,0 +1,159 @@
+# mon_bot_social/data_layer/maintenance.py
+"""
+Maintenance de bot_data.db, lancée quand le bot est inactif (grosse pause, hors plage horaire, bot arrêté):
+rétention par table, repli/purge du journal action_events, VACUUM incrémental (conversion unique en
+auto_vacuum=INCREMENTAL au premier passage), wal_checkpoint(TRUNCATE) puis ANALYZE borné. Le rapport donne les lignes
+supprimées et les octets récupérés (fichier principal + WAL).
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+
+from utils.logger import get_logger
+from utils.metrics import metrics
+from data_layer.database import DATABASE_PATH, get_db_connection, roll_up_action_events, prune_action_events
+
+logger = get_logger("DbMaintenance")
+
+# Table -> (clé de rétention dans DatabaseSettings, colonne horodatage, condition supplémentaire)
+RETENTION_RULES = {
+    "liked_posts": ("retention_liked_posts_days", "liked_at_ts", ""),
+    "commented_posts": ("retention_commented_posts_days", "commented_at_ts", ""),
+    "viewed_story_users": ("retention_viewed_stories_days", "last_viewed_at_ts", ""),
+    # Seulement les comptes que le bot ne suit plus: les suivis en cours servent au désabonnement
+    "followed_users": ("retention_followed_users_days", "followed_at_ts", "AND COALESCE(status, '') <> 'followed_by_bot'"),
+}
+DELETE_BATCH_SIZE = 5000
+ANALYSIS_LIMIT = 1000 # Lignes échantillonnées par index pour ANALYZE (borne la durée sur une grosse base)
+LAST_RUN_META_KEY = "maintenance_last_run_ts"
+LAST_REPORT_META_KEY = "maintenance_last_report"
+CHECK_INTERVAL_SEC = 300
+
+MAINTENANCE_RECLAIMED_BYTES = metrics.counter("bot_db_maintenance_reclaimed_bytes", "Octets récupérés par la maintenance SQLite")
+MAINTENANCE_DURATION = metrics.histogram("bot_db_maintenance_duration_seconds", "Durée d'un passage de maintenance SQLite")
+
+
+def _storage_bytes(db_path=DATABASE_PATH):
+    return sum(os.path.getsize(path) for path in (db_path, db_path + "-wal") if os.path.exists(path))
+
+
+def _delete_older_than(conn, table, ts_column, extra_condition, cutoff_ts):
+    deleted_total = 0
+    while True: # Petits lots: les écritures des actions ne restent jamais bloquées longtemps
+        deleted = conn.execute(f"DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} WHERE {ts_column} < ? {extra_condition} LIMIT ?)",
+                               (cutoff_ts, DELETE_BATCH_SIZE)).rowcount
+        conn.commit(); deleted_total += deleted
+        if deleted < DELETE_BATCH_SIZE: return deleted_total
+
+
+def run_maintenance(database_settings, db_path=DATABASE_PATH):
+    """Un passage complet. Retourne le rapport (dict), ou None si la base est inaccessible."""
+    conn = get_db_connection()
+    if conn is None: return None
+    started_at = time.perf_counter(); size_before = _storage_bytes(db_path)
+    report = {"started_at": time.time(), "deleted": {}, "steps_ms": {}}
+
+    def step(name, function):
+        step_started_at = time.perf_counter()
+        try: return function()
+        except sqlite3.Error as e: logger.error(f"Maintenance, étape {name} en échec: {e}"); report.setdefault("errors", []).append(f"{name}: {e}")
+        finally: report["steps_ms"][name] = (time.perf_counter() - step_started_at) * 1000
+
+    try:
+        now = time.time()
+        for table, (settings_key, ts_column, extra_condition) in RETENTION_RULES.items():
+            retention_days = getattr(database_settings, settings_key)
+            if not retention_days: continue
+            deleted = step(f"retention:{table}", lambda: _delete_older_than(conn, table, ts_column, extra_condition, now - retention_days * 86400))
+            if deleted: report["deleted"][table] = deleted
+        step("action_events", lambda: (roll_up_action_events(), prune_action_events(database_settings.action_events_retention_days,
+                                                                                   database_settings.hourly_rollup_retention_days)))
+        report["freelist_pages_before"] = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2: # 2 = INCREMENTAL; ne prend effet qu'après un VACUUM complet
+            logger.info("Maintenance: conversion de la base en auto_vacuum=INCREMENTAL (VACUUM complet, une seule fois)...")
+            step("vacuum_full", lambda: (conn.execute("PRAGMA auto_vacuum = INCREMENTAL"), conn.execute("VACUUM")))
+        else:
+            # executescript: via execute(), le module sqlite3 ne libère qu'une page par appel
+            step("incremental_vacuum", lambda: conn.executescript("PRAGMA incremental_vacuum;"))
+            report["freelist_pages_after"] = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        checkpoint = step("wal_checkpoint", lambda: conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone())
+        if checkpoint and checkpoint[0]: logger.warning("Maintenance: checkpoint WAL incomplet (lecteur actif), WAL non tronqué.")
+        step("analyze", lambda: (conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}"), conn.execute("ANALYZE"), conn.commit()))
+
+        size_after = _storage_bytes(db_path)
+        report.update(size_before=size_before, size_after=size_after, reclaimed_bytes=max(0, size_before - size_after),
+                      duration_sec=time.perf_counter() - started_at)
+        conn.execute("INSERT OR REPLACE INTO db_meta (key, value) VALUES (?, ?)", (LAST_RUN_META_KEY, str(report["started_at"])))
+        conn.execute("INSERT OR REPLACE INTO db_meta (key, value) VALUES (?, ?)", (LAST_REPORT_META_KEY, json.dumps(report)))
+        conn.commit()
+    finally: conn.close()
+    MAINTENANCE_RECLAIMED_BYTES.inc(report["reclaimed_bytes"]); MAINTENANCE_DURATION.observe(report["duration_sec"])
+    logger.info(f"Maintenance DB terminée en {report['duration_sec']:.1f} s: {sum(report['deleted'].values())} ligne(s) supprimée(s) "
+                f"{report['deleted'] or ''}, {report['reclaimed_bytes'] / 1024:.0f} Ko récupérés "
+                f"({size_before / 1024:.0f} -> {report['size_after'] / 1024:.0f} Ko).")
+    return report
+
+
+def get_last_maintenance():
+    """(timestamp du dernier passage ou 0, dernier rapport ou None)."""
+    conn = get_db_connection()
+    if conn is None: return 0.0, None
+    try:
+        rows = dict(conn.execute("SELECT key, value FROM db_meta WHERE key IN (?, ?)", (LAST_RUN_META_KEY, LAST_REPORT_META_KEY)).fetchall())
+        return float(rows.get(LAST_RUN_META_KEY, 0)), json.loads(rows[LAST_REPORT_META_KEY]) if LAST_REPORT_META_KEY in rows else None
+    except (sqlite3.Error, ValueError) as e: logger.error(f"Lecture du dernier rapport de maintenance impossible: {e}"); return 0.0, None
+    finally: conn.close()
+
+
+class MaintenanceScheduler:
+    """
+    Vérifie toutes les CHECK_INTERVAL_SEC si une maintenance est due (maintenance_interval_hours écoulées) et si le
+    bot est inactif pour au moins maintenance_min_idle_minutes (`idle_seconds()`), puis la lance sur ce thread.
+    """
+
+    def __init__(self, settings_provider, idle_seconds, on_report=None, check_interval_sec=CHECK_INTERVAL_SEC):
+        self.settings_provider = settings_provider # callable() -> DatabaseSettings courant
+        self.idle_seconds = idle_seconds # callable() -> secondes d'inactivité prévues à partir de maintenant (inf si arrêté)
+        self.on_report = on_report; self.check_interval_sec = check_interval_sec
+        self.last_run_ts = None # Lu dans db_meta au premier contrôle (survit aux redémarrages)
+        self._stop_event = threading.Event(); self._thread = None; self._run_lock = threading.Lock()
+
+    def start(self):
+        if self._thread and self._thread.is_alive(): return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="DbMaintenance", daemon=True); self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread: self._thread.join(timeout=60); self._thread = None # Passage en cours: se termine (lots courts)
+
+    def is_due(self):
+        database_settings = self.settings_provider()
+        if not database_settings.maintenance_enabled: return False
+        if self.last_run_ts is None: self.last_run_ts = get_last_maintenance()[0]
+        if time.time() - self.last_run_ts < database_settings.maintenance_interval_hours * 3600: return False
+        return self.idle_seconds() >= database_settings.maintenance_min_idle_minutes * 60
+
+    def run_now(self):
+        """Passage immédiat (bouton, daemon), sans condition d'inactivité. Retourne le rapport ou None."""
+        if not self._run_lock.acquire(blocking=False): logger.info("Maintenance déjà en cours."); return None
+        try:
+            report = run_maintenance(self.settings_provider())
+            if report:
+                self.last_run_ts = report["started_at"]
+                if self.on_report: self.on_report(report)
+            return report
+        finally: self._run_lock.release()
+
+    def _run(self):
+        while not self._stop_event.wait(self.check_interval_sec):
+            try:
+                if self.is_due(): self.run_now()
+            except Exception as e: logger.error(f"Erreur maintenance planifiée: {e}", exc_info=True)
+
+
+if __name__ == '__main__':
+    from utils.settings_schema import build_settings
+    print(json.dumps(run_maintenance(build_settings({}).database), indent=2))
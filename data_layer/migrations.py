@@ -0,0 +1,281 @@
+# mon_bot_social/data_layer/migrations.py
+"""
+Migrations versionnées de bot_data.db: `PRAGMA user_version` donne la version du schéma, chaque migration manquante
+est appliquée dans l'ordre, dans sa propre transaction (schéma + user_version validés ensemble, ou rien).
+Les index "de performance" d'une migration sont construits ensuite en arrière-plan (un index par transaction),
+pour ne pas bloquer le démarrage sur une grosse base. Le benchmark compare plans et temps des requêtes avant/après index.
+Usage: python -m data_layer.migrations [--rows N] [--runs N] [--json]
+"""
+import time
+import sqlite3
+import argparse
+import statistics
+import threading
+from collections import namedtuple
+
+from utils.logger import get_logger
+
+logger = get_logger("Migrations")
+
+STATS_ACTION_TYPES = ('follows', 'unfollows', 'likes', 'comments', 'story_views', 'dms_sent')
+
+# version: valeur de user_version après application; apply(conn): DDL/DML exécutés dans la transaction de la migration
+# background_indexes: (nom, CREATE INDEX) construits hors transaction de migration, par BackgroundIndexBuilder
+Migration = namedtuple("Migration", ("version", "description", "apply", "background_indexes"))
+
+
+def _apply_base_schema(conn):
+    """Schéma historique (initialize_database avant le versionnage): sans effet sur une base existante."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS action_stats (
+            date TEXT PRIMARY KEY,
+            follows INTEGER DEFAULT 0,
+            unfollows INTEGER DEFAULT 0,
+            likes INTEGER DEFAULT 0,
+            comments INTEGER DEFAULT 0,
+            story_views INTEGER DEFAULT 0,
+            dms_sent INTEGER DEFAULT 0  -- Ajouté
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS followed_users (
+            username TEXT PRIMARY KEY,
+            followed_at_ts REAL NOT NULL,
+            status TEXT,
+            is_following_back INTEGER DEFAULT 0
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_followed_at ON followed_users (followed_at_ts)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS liked_posts (
+            post_id TEXT PRIMARY KEY,
+            liked_at_ts REAL NOT NULL,
+            like_count INTEGER,
+            comment_count INTEGER
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS commented_posts (
+            post_id TEXT PRIMARY KEY,
+            comment_text TEXT,
+            commented_at_ts REAL NOT NULL,
+            like_count INTEGER,
+            comment_count INTEGER
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS viewed_story_users (
+            username TEXT PRIMARY KEY,
+            last_viewed_at_ts REAL NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_last_viewed_at ON viewed_story_users (last_viewed_at_ts)")
+    # Table user_sets (exclusion, whitelist, followers traités): un ajout = une ligne, clé primaire = index
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS user_sets (
+            list_name TEXT NOT NULL,
+            item TEXT NOT NULL,
+            added_at_ts REAL NOT NULL,
+            PRIMARY KEY (list_name, item)
+        ) WITHOUT ROWID
+    """)
+
+
+def _apply_action_events_schema(conn):
+    """Journal action_events (ajout seul), agrégats action_rollups, db_meta; reprise des compteurs de action_stats."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS action_events (
+            id INTEGER PRIMARY KEY,
+            ts REAL NOT NULL,
+            type TEXT NOT NULL,
+            target TEXT,
+            task TEXT NOT NULL DEFAULT '',
+            outcome INTEGER NOT NULL DEFAULT 0, -- index dans EVENT_OUTCOMES (database.py)
+            duration_ms INTEGER
+        )
+    """)
+    # Couvrants: purge par date, lectures par type/tâche sur les événements pas encore repliés
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_action_events_ts ON action_events (ts)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_action_events_type_ts ON action_events (type, ts, task, outcome, duration_ms)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS action_rollups (
+            granularity TEXT NOT NULL, -- 'hour' (période 'AAAA-MM-JJ HH') ou 'day' ('AAAA-MM-JJ')
+            period TEXT NOT NULL,
+            type TEXT NOT NULL,
+            task TEXT NOT NULL,
+            outcome INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            total_duration_ms INTEGER NOT NULL,
+            PRIMARY KEY (granularity, period, type, task, outcome)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE TABLE IF NOT EXISTS db_meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID")
+    if conn.execute("SELECT 1 FROM db_meta WHERE key = 'action_stats_migrated'").fetchone(): return # Déjà repris (base antérieure au versionnage)
+    unpivot_sql = " UNION ALL ".join(f"SELECT date, '{action_type}' AS type, {action_type} AS n FROM action_stats" for action_type in STATS_ACTION_TYPES)
+    conn.execute(f"""INSERT OR IGNORE INTO action_rollups (granularity, period, type, task, outcome, count, total_duration_ms)
+                     SELECT 'day', date, type, '', 0, n, 0 FROM ({unpivot_sql}) WHERE n > 0""")
+    conn.execute("INSERT INTO db_meta (key, value) VALUES ('action_stats_migrated', ?)", (str(time.time()),))
+
+
+def _apply_nothing(conn): pass # Migration composée uniquement d'index construits en arrière-plan
+
+
+MIGRATIONS = (
+    Migration(1, "Schéma de base (tables historiques)", _apply_base_schema, ()),
+    Migration(2, "Journal action_events et agrégats action_rollups", _apply_action_events_schema, ()),
+    Migration(3, "Index de recherche sur followed_users, liked_posts, commented_posts", _apply_nothing, (
+        # Désabonnements: suivis par le bot qui ne suivent pas en retour, les plus anciens d'abord
+        ("idx_followed_back_at", "CREATE INDEX IF NOT EXISTS idx_followed_back_at ON followed_users (is_following_back, followed_at_ts)"),
+        ("idx_followed_status_at", "CREATE INDEX IF NOT EXISTS idx_followed_status_at ON followed_users (status, followed_at_ts)"),
+        # Rétention / historique par date
+        ("idx_liked_at", "CREATE INDEX IF NOT EXISTS idx_liked_at ON liked_posts (liked_at_ts)"),
+        ("idx_commented_at", "CREATE INDEX IF NOT EXISTS idx_commented_at ON commented_posts (commented_at_ts)"),
+    )),
+)
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def get_schema_version(conn): return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations(conn, migrations=MIGRATIONS):
+    """
+    Applique les migrations dont la version dépasse user_version, une transaction chacune.
+    S'arrête à la première erreur (transaction annulée, version inchangée). Retourne la version finale, ou None si échec.
+    """
+    current_version = get_schema_version(conn)
+    for migration in migrations:
+        if migration.version <= current_version: continue
+        started_at = time.perf_counter()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            migration.apply(conn)
+            conn.execute(f"PRAGMA user_version = {int(migration.version)}") # Dans la transaction: validé avec le schéma
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.error(f"Migration v{migration.version} ({migration.description}) échouée, base laissée en v{current_version}: {e}", exc_info=True)
+            return None
+        current_version = migration.version
+        logger.info(f"Migration v{migration.version} appliquée: {migration.description} ({(time.perf_counter() - started_at) * 1000:.0f} ms).")
+    return current_version
+
+
+def pending_background_indexes(conn, migrations=MIGRATIONS):
+    """Index déclarés par les migrations appliquées mais pas encore présents dans sqlite_master: [(nom, sql)]."""
+    current_version = get_schema_version(conn)
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    return [index for migration in migrations if migration.version <= current_version
+            for index in migration.background_indexes if index[0] not in existing]
+
+
+def build_index(conn, name, create_sql):
+    """Construit un index dans sa propre transaction. Retourne la durée en secondes, ou None si échec."""
+    started_at = time.perf_counter()
+    try:
+        conn.execute(create_sql); conn.commit()
+    except sqlite3.Error as e:
+        conn.rollback(); logger.error(f"Construction de l'index {name} échouée: {e}"); return None
+    return time.perf_counter() - started_at
+
+
+class BackgroundIndexBuilder:
+    """Construit les index en attente sur un thread dédié (une connexion à lui), un index à la fois."""
+
+    def __init__(self, connect, migrations=MIGRATIONS, pause_between_sec=1.0):
+        self.connect = connect # callable() -> connexion sqlite3 (ou None)
+        self.migrations = migrations; self.pause_between_sec = pause_between_sec
+        self.built = [] # (nom, secondes)
+        self._stop_event = threading.Event(); self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="IndexBuilder", daemon=True); self._thread.start()
+        return self._thread
+
+    def stop(self, timeout=None):
+        self._stop_event.set() # L'index en cours se termine (CREATE INDEX n'est pas interruptible proprement)
+        if self._thread: self._thread.join(timeout)
+
+    def _run(self):
+        conn = self.connect()
+        if conn is None: return
+        try:
+            for name, create_sql in pending_background_indexes(conn, self.migrations):
+                if self._stop_event.is_set(): break
+                duration_sec = build_index(conn, name, create_sql)
+                if duration_sec is not None:
+                    self.built.append((name, duration_sec)); logger.info(f"Index {name} construit en arrière-plan ({duration_sec * 1000:.0f} ms).")
+                self._stop_event.wait(self.pause_between_sec) # Laisse passer les écritures en attente entre deux index
+        finally: conn.close()
+
+
+# --- Benchmark des plans de requêtes (base temporaire, données synthétiques) ---
+BENCHMARK_QUERIES = {
+    "unfollow_candidates": ("SELECT username FROM followed_users WHERE is_following_back = 0 AND followed_at_ts < ? ORDER BY followed_at_ts LIMIT 50", lambda now: (now - 3 * 86400,)),
+    "followed_by_status": ("SELECT COUNT(*) FROM followed_users WHERE status = ?", lambda now: ("followed_by_bot",)),
+    "likes_last_day": ("SELECT COUNT(*) FROM liked_posts WHERE liked_at_ts >= ?", lambda now: (now - 86400,)),
+    "comments_older_than_90d": ("SELECT COUNT(*) FROM commented_posts WHERE commented_at_ts < ?", lambda now: (now - 90 * 86400,)),
+}
+
+
+def _populate_synthetic(conn, rows, now):
+    import random
+    rng = random.Random(0)
+    statuses = ("followed_by_bot", "unfollowed", "requested")
+    conn.executemany("INSERT INTO followed_users (username, followed_at_ts, status, is_following_back) VALUES (?, ?, ?, ?)",
+                     ((f"user_{i}", now - rng.uniform(0, 180 * 86400), rng.choice(statuses), int(rng.random() < 0.3)) for i in range(rows)))
+    conn.executemany("INSERT INTO liked_posts (post_id, liked_at_ts) VALUES (?, ?)", ((f"post_{i}", now - rng.uniform(0, 180 * 86400)) for i in range(rows)))
+    conn.executemany("INSERT INTO commented_posts (post_id, commented_at_ts) VALUES (?, ?)", ((f"post_{i}", now - rng.uniform(0, 180 * 86400)) for i in range(rows // 10)))
+    conn.commit()
+
+
+def benchmark_queries(conn, runs=5, now=None):
+    """{requête: {'plan': [...], 'median_ms': x}} pour BENCHMARK_QUERIES sur la connexion donnée."""
+    now = now or time.time(); results = {}
+    for name, (sql, make_params) in BENCHMARK_QUERIES.items():
+        params = make_params(now)
+        plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        timings = []
+        for _ in range(runs):
+            started_at = time.perf_counter(); conn.execute(sql, params).fetchall(); timings.append(time.perf_counter() - started_at)
+        results[name] = {"plan": plan, "median_ms": statistics.median(timings) * 1000}
+    return results
+
+
+def run_benchmark(rows=50000, runs=5):
+    """Base en mémoire: migrations (sans index d'arrière-plan), données synthétiques, mesures avant et après index."""
+    conn = sqlite3.connect(":memory:"); now = time.time()
+    run_migrations(conn)
+    _populate_synthetic(conn, rows, now)
+    before = benchmark_queries(conn, runs, now)
+    index_build_ms = {}
+    for name, create_sql in pending_background_indexes(conn):
+        duration_sec = build_index(conn, name, create_sql)
+        index_build_ms[name] = duration_sec * 1000 if duration_sec is not None else None
+    conn.execute("ANALYZE"); conn.commit()
+    after = benchmark_queries(conn, runs, now)
+    conn.close()
+    return {"rows": rows, "index_build_ms": index_build_ms, "before": before, "after": after}
+
+
+def format_report(results):
+    lines = [f"== {results['rows']} lignes synthétiques par table | index: " +
+             ", ".join(f"{name}={ms:.0f} ms" if ms is not None else f"{name}=ÉCHEC" for name, ms in results["index_build_ms"].items())]
+    for name in results["before"]:
+        before, after = results["before"][name], results["after"][name]
+        speedup = before["median_ms"] / after["median_ms"] if after["median_ms"] else float("inf")
+        lines.append(f"-- {name}: {before['median_ms']:.2f} ms -> {after['median_ms']:.2f} ms (x{speedup:.1f})")
+        lines.append(f"   avant: {' | '.join(before['plan'])}")
+        lines.append(f"   après: {' | '.join(after['plan'])}")
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    import json
+    parser = argparse.ArgumentParser(description="Plans et temps des requêtes avant/après les index des migrations.")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Sortie JSON brute")
+    args = parser.parse_args()
+    benchmark_results = run_benchmark(args.rows, args.runs)
+    print(json.dumps(benchmark_results, indent=2, ensure_ascii=False) if args.json else format_report(benchmark_results))
@@ -2,11 +2,13 @@
 import json
 import os
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem,
+    QWidget, QVBoxLayout, QHBoxLayout, QListView, QGroupBox,
     QPushButton, QLineEdit, QLabel, QMessageBox, QFileDialog, QAbstractItemView
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import QThreadPool
 from utils.logger import get_logger
+from .list_models import SortedSetListModel
+from .import_worker import ListImportWorker, IMPORT_FILE_FILTER
 
 logger = get_logger()
 
@@ -14,6 +16,7 @@ class WhitelistWidget(QWidget):
     def __init__(self, app_manager, parent=None):
         super().__init__(parent)
         self.app_manager = app_manager
+        self.import_worker = None
         self.setWindowTitle("Gestion de la Whitelist (Protection Unfollow)")
         self.setMinimumSize(450, 350) # Légèrement plus grand
         self.init_ui()
@@ -24,7 +27,10 @@ class WhitelistWidget(QWidget):
         main_layout.addWidget(QLabel("Les utilisateurs dans cette liste NE seront JAMAIS désabonnés par le bot."))
 
         # Liste
-        self.list_widget = QListWidget()
+        self.list_model = SortedSetListModel(parent=self)
+        self.list_widget = QListView()
+        self.list_widget.setModel(self.list_model)
+        self.list_widget.setUniformItemSizes(True) # Pas de mesure ligne par ligne
         self.list_widget.setAlternatingRowColors(True)
         self.list_widget.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
         main_layout.addWidget(QLabel("Utilisateurs protégés :"))
@@ -55,11 +61,11 @@ class WhitelistWidget(QWidget):
         
         # Import/Export
         file_buttons_layout = QHBoxLayout()
-        self.import_button = QPushButton("📂 Importer Whitelist (.txt)")
+        self.import_button = QPushButton("📂 Importer Whitelist (.txt, .json, .csv)")
         self.import_button.clicked.connect(self.import_from_file)
         file_buttons_layout.addWidget(self.import_button)
 
-        self.export_button = QPushButton("💾 Exporter Whitelist (.txt)")
+        self.export_button = QPushButton("💾 Exporter Whitelist")
         self.export_button.clicked.connect(self.export_to_file)
         file_buttons_layout.addWidget(self.export_button)
         main_layout.addLayout(file_buttons_layout)
@@ -67,15 +73,14 @@ class WhitelistWidget(QWidget):
         self.setLayout(main_layout)
 
     def _populate_list_widget(self):
-        self.list_widget.clear()
+        """Recharge complète du modèle (ouverture, import, vidage). Les ajouts/suppressions passent par le modèle."""
         if self.app_manager and hasattr(self.app_manager, 'whitelist'):
-            sorted_list = sorted(list(self.app_manager.whitelist))
-            self.list_widget.addItems(sorted_list)
-            self.list_widget.sortItems(Qt.SortOrder.AscendingOrder)
+            self.list_model.set_items(self.app_manager.whitelist)
+        else: self.list_model.set_items([])
         self.update_status_label()
 
     def update_status_label(self):
-        count = self.list_widget.count()
+        count = self.list_model.total_count()
         self.setWindowTitle(f"Whitelist ({count} éléments)")
 
     def _load_whitelist_from_appmanager(self):
@@ -98,14 +103,13 @@ class WhitelistWidget(QWidget):
         if not items_to_add:
             QMessageBox.warning(self, "Entrée Vide", "Aucun nom valide détecté."); return
 
-        added_count = 0; already_exist_count = 0
         if self.app_manager:
-            for item_text in items_to_add:
-                if self.app_manager.add_to_whitelist(item_text): added_count +=1
-                else: already_exist_count +=1
+            added_items = self.app_manager.add_items_to_whitelist(items_to_add) # Une transaction pour tout le lot
+            if added_items is None: QMessageBox.critical(self, "Erreur", "Échec de l'enregistrement en base, whitelist inchangée."); return
+            added_count = len(added_items); already_exist_count = len(items_to_add) - added_count
             
             if added_count > 0:
-                self._populate_list_widget(); self.add_input.clear()
+                self.list_model.insert_items(added_items); self.update_status_label(); self.add_input.clear()
                 logger.info(f"{added_count} utilisateur(s) ajouté(s) à la whitelist.")
             
             message = ""
@@ -115,19 +119,19 @@ class WhitelistWidget(QWidget):
             QMessageBox.information(self, "Ajout Whitelist", message.strip())
              
     def delete_selected_items(self):
-        selected_items_widgets = self.list_widget.selectedItems()
-        if not selected_items_widgets: QMessageBox.warning(self, "Sélection", "Sélectionnez élément(s)."); return
+        selected_rows = self.list_widget.selectionModel().selectedRows()
+        if not selected_rows: QMessageBox.warning(self, "Sélection", "Sélectionnez élément(s)."); return
             
-        items_to_delete = [item.text() for item in selected_items_widgets]
+        items_to_delete = [self.list_model.item_at(index.row()) for index in selected_rows]
         
         if self.app_manager:
             reply = QMessageBox.question(self, "Confirmation", f"Retirer {len(items_to_delete)} élément(s) de la whitelist ?",
                                          QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
             if reply == QMessageBox.StandardButton.Yes:
-                deleted_count = 0
-                for item_text in items_to_delete:
-                    if self.app_manager.remove_from_whitelist(item_text): deleted_count +=1
-                if deleted_count > 0: self._populate_list_widget()
+                deleted_items = self.app_manager.remove_items_from_whitelist(items_to_delete)
+                if deleted_items is None: QMessageBox.critical(self, "Erreur", "Échec de la suppression en base, whitelist inchangée."); return
+                deleted_count = len(deleted_items)
+                if deleted_count > 0: self.list_model.remove_items(deleted_items); self.update_status_label()
                 QMessageBox.information(self, "Suppression", f"{deleted_count} élément(s) retiré(s).")
 
     def clear_list(self):
@@ -141,28 +145,38 @@ class WhitelistWidget(QWidget):
 
     def import_from_file(self):
         options = QFileDialog.Options()
-        file_path, _ = QFileDialog.getOpenFileName(self, "Importer Whitelist (.txt)", "",
-                                                   "Fichiers Texte (*.txt);;Tous les Fichiers (*)", options=options)
-        if file_path and self.app_manager:
-            added_count = self.app_manager.import_whitelist(file_path)
-            if added_count >= 0:
-                 QMessageBox.information(self, "Importation", f"{added_count} nouveaux éléments uniques ajoutés.")
-                 self._populate_list_widget()
-            else: QMessageBox.critical(self, "Erreur Importation", "Erreur lecture/traitement fichier.")
+        file_path, _ = QFileDialog.getOpenFileName(self, "Importer Whitelist", "", IMPORT_FILE_FILTER, options=options)
+        if file_path and self.app_manager and not self.import_worker:
+            self.import_worker = ListImportWorker(self.app_manager.import_whitelist, file_path)
+            self.import_worker.signals.progress.connect(lambda percent, processed, added: self.setWindowTitle(f"Import Whitelist: {percent}% ({added} nouveaux)"))
+            self.import_worker.signals.finished.connect(self.on_import_finished)
+            self.import_button.setEnabled(False)
+            QThreadPool.globalInstance().start(self.import_worker)
+
+    def on_import_finished(self, added_count, completed):
+        self.import_worker = None; self.import_button.setEnabled(True)
+        self._populate_list_widget()
+        if added_count < 0: QMessageBox.critical(self, "Erreur Importation", "Erreur lecture/traitement fichier.")
+        elif completed: QMessageBox.information(self, "Importation", f"{added_count} nouveaux éléments uniques ajoutés.")
+        else: QMessageBox.information(self, "Importation annulée", f"Import interrompu: {added_count} nouveaux éléments ajoutés avant l'annulation.")
 
     def export_to_file(self):
         if not self.app_manager or not self.app_manager.whitelist:
             QMessageBox.information(self, "Exportation", "Whitelist vide."); return
             
         options = QFileDialog.Options(); default_filename = "ma_whitelist.txt"
-        file_path, _ = QFileDialog.getSaveFileName(self, "Exporter Whitelist (.txt)", default_filename,
-                                                  "Fichiers Texte (*.txt);;Tous les Fichiers (*)", options=options)
+        file_path, _ = QFileDialog.getSaveFileName(self, "Exporter Whitelist", default_filename,
+                                                  "Fichiers Texte (*.txt);;JSON (*.json);;NDJSON (*.ndjson);;CSV (*.csv)", options=options)
         if file_path and self.app_manager:
-             if not file_path.lower().endswith(".txt"): file_path += ".txt"
+             if not file_path.lower().endswith((".txt", ".json", ".ndjson", ".jsonl", ".csv")): file_path += ".txt"
              if self.app_manager.export_whitelist(file_path):
                   QMessageBox.information(self, "Exportation", f"Whitelist ({len(self.app_manager.whitelist)}) exportée.")
              else: QMessageBox.critical(self, "Erreur Exportation", "Erreur écriture fichier.")
 
     def showEvent(self, event):
         self._load_whitelist_from_appmanager()
-        super().showEvent(event)
\ No newline at end of file
+        super().showEvent(event)
+
+    def closeEvent(self, event):
+        if self.import_worker: self.import_worker.cancel() # Lots déjà importés conservés
+        super().closeEvent(event)
\ No newline at end of file
@@ -0,0 +1,32 @@
+# mon_bot_social/gui/import_worker.py
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+from utils.logger import get_logger
+
+IMPORT_FILE_FILTER = "Listes (*.txt *.json *.ndjson *.jsonl *.csv);;Tous les Fichiers (*)"
+
+
+class ListImportSignals(QObject):
+    progress = pyqtSignal(int, int, int) # (pourcentage lu du fichier, éléments lus, éléments ajoutés)
+    finished = pyqtSignal(int, bool)     # (nb de nouveaux éléments ou -1 si erreur, terminé: False si annulé)
+
+
+class ListImportWorker(QRunnable):
+    """Exécute un import en flux d'AppManager (import_exclusion_list / import_whitelist) hors du thread UI. cancel() l'interrompt après le lot en cours."""
+
+    def __init__(self, import_function, file_path):
+        super().__init__()
+        self.import_function = import_function; self.file_path = file_path
+        self.cancel_requested = False
+        self.signals = ListImportSignals()
+
+    def cancel(self): self.cancel_requested = True
+
+    def _on_progress(self, bytes_done, total_bytes, processed, added):
+        percent = int(bytes_done * 100 / total_bytes) if total_bytes else 100 # 100 seulement en fin de fichier (pas après une annulation)
+        self.signals.progress.emit(min(percent, 100), processed, added)
+
+    def run(self):
+        try: added_count, completed = self.import_function(self.file_path, progress_callback=self._on_progress, cancel_check=lambda: self.cancel_requested)
+        except Exception as e:
+            get_logger().error(f"Erreur import de {self.file_path}: {e}", exc_info=True); added_count, completed = -1, False
+        self.signals.finished.emit(added_count, completed)
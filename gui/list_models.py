@@ -0,0 +1,149 @@
+# mon_bot_social/gui/list_models.py
+"""
+Modèles Qt (model/view) pour les grandes listes: utilisateurs collectés, exclusions, whitelist.
+Les vues ne créent plus un item par ligne: les lignes sont exposées par lots (canFetchMore/fetchMore)
+et les ajouts/suppressions sont notifiés ligne par ligne (beginInsertRows/beginRemoveRows) au lieu de tout reconstruire.
+"""
+import bisect
+
+from PyQt6.QtCore import Qt, QAbstractListModel, QAbstractTableModel, QModelIndex
+
+FETCH_BATCH_SIZE = 500 # Lignes exposées à la vue par appel à fetchMore (défilement)
+
+
+class SortedSetListModel(QAbstractListModel):
+    """
+    Liste triée d'éléments uniques (miroir d'un set d'AppManager: exclusion_list, whitelist).
+    Insertion/suppression en O(log n) + notification d'une seule ligne; seules les `loaded_count`
+    premières lignes sont visibles par la vue, le reste est chargé à la demande.
+    """
+
+    def __init__(self, items=None, parent=None):
+        super().__init__(parent)
+        self.items = []
+        self.loaded_count = 0
+        if items: self.set_items(items)
+
+    # --- API Qt ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded_count
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= self.loaded_count: return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole): return self.items[index.row()]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.loaded_count < len(self.items)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid(): return
+        batch_end = min(len(self.items), self.loaded_count + FETCH_BATCH_SIZE)
+        if batch_end <= self.loaded_count: return
+        self.beginInsertRows(QModelIndex(), self.loaded_count, batch_end - 1)
+        self.loaded_count = batch_end
+        self.endInsertRows()
+
+    # --- API métier ---
+    def set_items(self, items):
+        """Remplace tout le contenu (chargement initial, import, vidage): un seul reset, tri unique."""
+        self.beginResetModel()
+        self.items = sorted(set(items))
+        self.loaded_count = min(len(self.items), FETCH_BATCH_SIZE)
+        self.endResetModel()
+
+    def insert_items(self, items):
+        inserted = 0
+        for item in items:
+            row = bisect.bisect_left(self.items, item)
+            if row < len(self.items) and self.items[row] == item: continue # Déjà présent
+            if row <= self.loaded_count: # Ligne dans la partie visible: notifier la vue
+                self.beginInsertRows(QModelIndex(), row, row)
+                self.items.insert(row, item); self.loaded_count += 1
+                self.endInsertRows()
+            else: self.items.insert(row, item) # Sera exposée par un prochain fetchMore
+            inserted += 1
+        return inserted
+
+    def remove_items(self, items):
+        removed = 0
+        for item in items:
+            row = bisect.bisect_left(self.items, item)
+            if row >= len(self.items) or self.items[row] != item: continue
+            if row < self.loaded_count:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.items[row]; self.loaded_count -= 1
+                self.endRemoveRows()
+            else: del self.items[row]
+            removed += 1
+        return removed
+
+    def item_at(self, row): return self.items[row] if 0 <= row < len(self.items) else None
+    def total_count(self): return len(self.items)
+
+
+class GatheredUsersTableModel(QAbstractTableModel):
+    """Utilisateurs collectés (ordre de collecte conservé), exposés par lots; les doublons sont ignorés."""
+
+    HEADERS = ["Nom d'utilisateur"]
+
+    def __init__(self, usernames=None, parent=None):
+        super().__init__(parent)
+        self.usernames = []
+        self._known = set() # Déduplication O(1) lors des ajouts incrémentaux
+        self.loaded_count = 0
+        if usernames: self.set_users(usernames)
+
+    # --- API Qt ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= self.loaded_count: return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole): return self.usernames[index.row()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole: return None
+        if orientation == Qt.Orientation.Horizontal: return self.HEADERS[section] if section < len(self.HEADERS) else None
+        return section + 1
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.loaded_count < len(self.usernames)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid(): return
+        batch_end = min(len(self.usernames), self.loaded_count + FETCH_BATCH_SIZE)
+        if batch_end <= self.loaded_count: return
+        self.beginInsertRows(QModelIndex(), self.loaded_count, batch_end - 1)
+        self.loaded_count = batch_end
+        self.endInsertRows()
+
+    # --- API métier ---
+    def set_users(self, usernames):
+        self.beginResetModel()
+        self.usernames = []; self._known = set()
+        for username in usernames:
+            if username and username not in self._known: self._known.add(username); self.usernames.append(username)
+        self.loaded_count = min(len(self.usernames), FETCH_BATCH_SIZE)
+        self.endResetModel()
+
+    def append_users(self, usernames):
+        """Ajoute en fin de liste (collecte en cours). Notifie la vue seulement si tout était déjà chargé."""
+        new_users = [u for u in dict.fromkeys(usernames) if u and u not in self._known]
+        if not new_users: return 0
+        if self.loaded_count == len(self.usernames): # Fin de liste visible: les nouvelles lignes apparaissent
+            first_row = len(self.usernames); last_row = first_row + min(len(new_users), FETCH_BATCH_SIZE) - 1
+            self.beginInsertRows(QModelIndex(), first_row, last_row)
+            self.usernames.extend(new_users); self._known.update(new_users); self.loaded_count = last_row + 1
+            self.endInsertRows()
+        else:
+            self.usernames.extend(new_users); self._known.update(new_users)
+        return len(new_users)
+
+    def clear(self): self.set_users([])
+    def username_at(self, row): return self.usernames[row] if 0 <= row < len(self.usernames) else None
+    def total_count(self): return len(self.usernames)
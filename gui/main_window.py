@@ -5,22 +5,29 @@ from PyQt6.QtWidgets import (
     QPushButton, QMessageBox, QLineEdit, QFormLayout, 
     QTextEdit, QHBoxLayout, QSpinBox, QComboBox,  
     QPlainTextEdit, QCheckBox, QStatusBar, 
-    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView, 
+    QTableView, QHeaderView, QAbstractItemView, QApplication, 
     QFileDialog, QGroupBox
 )
-from PyQt6.QtCore import pyqtSlot, Qt, QCoreApplication # Qt pour AlignmentFlag, QCoreApplication pour clipboard
+from PyQt6.QtCore import pyqtSlot, pyqtSignal, Qt, QCoreApplication # Qt pour AlignmentFlag, QCoreApplication pour clipboard
 from PyQt6.QtGui import QIcon # Optionnel pour icônes
 
 # Importer les widgets personnalisés et le logger
-from utils.logger import get_logger, qt_log_handler
+from utils.logger import get_logger, qt_log_handler, QtLogBatcher
 from .settings_widget import SettingsWidget
 from .exclusion_widget import ExclusionWidget
 from .whitelist_widget import WhitelistWidget
 from .stats_widget import StatsWidget
+from .list_models import GatheredUsersTableModel
+from automation_engine.event_sink import EventSink
+
+LOG_DISPLAY_MAX_BLOCKS = 5000 # Lignes max conservées dans l'onglet Logs (les plus anciennes sont retirées)
+
+class MainWindow(QMainWindow, EventSink): # Sink des notifications d'AppManager (statut, tâches, collecte)
+    owner_thread_call_signal = pyqtSignal(object) # Émis depuis un autre thread: connexion en file, exécuté sur le thread Qt
 
-class MainWindow(QMainWindow):
     def __init__(self, app_manager, parent=None):
         super().__init__(parent)
+        self.owner_thread_call_signal.connect(lambda function: function())
         self.app_manager = app_manager
         self.logger = get_logger()
         
@@ -39,8 +46,12 @@ class MainWindow(QMainWindow):
         self.setStatusBar(self.status_bar)
         self.update_status("Prêt.") 
 
+        self.log_batcher = None
         if qt_log_handler:
-             qt_log_handler.log_message_signal.connect(self.append_log_message)
+             # Logs regroupés par lots (~100 ms) au lieu d'un appendPlainText par message
+             self.log_batcher = QtLogBatcher(qt_log_handler, parent=self)
+             self.log_batcher.log_batch_signal.connect(self.append_log_batch)
+             self.log_batcher.start()
              self.logger.info("Interface principale initialisée et connectée au logger.")
         else:
              self.logger.error("Handler de log Qt non trouvé. Logs UI désactivés.")
@@ -81,7 +92,7 @@ class MainWindow(QMainWindow):
         # Onglet Logs
         self.logs_tab = QWidget(); self.tab_widget.addTab(self.logs_tab, "📜 Logs")
         logs_layout = QVBoxLayout(self.logs_tab)
-        self.log_display_area = QPlainTextEdit(); self.log_display_area.setReadOnly(True); self.log_display_area.setMaximumBlockCount(5000)
+        self.log_display_area = QPlainTextEdit(); self.log_display_area.setReadOnly(True); self.log_display_area.setMaximumBlockCount(LOG_DISPLAY_MAX_BLOCKS)
         logs_layout.addWidget(self.log_display_area)
         clear_log_button = QPushButton("Vider l'Affichage des Logs"); clear_log_button.clicked.connect(self.log_display_area.clear)
         logs_layout.addWidget(clear_log_button)
@@ -117,7 +128,8 @@ class MainWindow(QMainWindow):
         gather_status_label = QLabel("Prêt."); gather_control_layout = QHBoxLayout(); gather_control_layout.addWidget(self.start_gather_button); gather_control_layout.addWidget(gather_status_label); gather_control_layout.addStretch()
         gather_layout.addLayout(gather_control_layout); self.task_widgets['gather_users'] = {'start_btn': self.start_gather_button, 'stop_btn': None, 'status_label': gather_status_label}
         gather_layout.addWidget(QLabel("Utilisateurs collectés:"))
-        self.gathered_table_widget = QTableWidget(); self.gathered_table_widget.setColumnCount(1); self.gathered_table_widget.setHorizontalHeaderLabels(["Nom d'utilisateur"]); self.gathered_table_widget.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch); self.gathered_table_widget.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers); self.gathered_table_widget.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows); self.gathered_table_widget.setAlternatingRowColors(True);
+        self.gathered_model = GatheredUsersTableModel(parent=self) # Lignes chargées par lots (fetchMore), ajouts incrémentaux
+        self.gathered_table_widget = QTableView(); self.gathered_table_widget.setModel(self.gathered_model); self.gathered_table_widget.verticalHeader().setDefaultSectionSize(22); self.gathered_table_widget.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch); self.gathered_table_widget.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers); self.gathered_table_widget.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows); self.gathered_table_widget.setAlternatingRowColors(True);
         gather_layout.addWidget(self.gathered_table_widget)
         list_manage_layout = QGridLayout(); save_g = QPushButton("💾 Sauver"); save_g.clicked.connect(self.save_gathered_list); load_g = QPushButton("📂 Charger"); load_g.clicked.connect(self.load_gathered_list); clear_g = QPushButton("🗑️ Vider"); clear_g.clicked.connect(self.clear_gathered_display_and_memory); copy_g = QPushButton("📋 Copier"); copy_g.clicked.connect(self.copy_gathered_list); send_f = QPushButton("➡️ Vers Follow"); send_f.clicked.connect(self.send_gathered_to_follow)
         list_manage_layout.addWidget(save_g,0,0); list_manage_layout.addWidget(load_g,0,1); list_manage_layout.addWidget(clear_g,0,2); list_manage_layout.addWidget(copy_g,1,0); list_manage_layout.addWidget(send_f,1,1,1,2);
@@ -206,6 +218,14 @@ class MainWindow(QMainWindow):
     @pyqtSlot(str) 
     def append_log_message(self, message): self.log_display_area.appendPlainText(message.strip())
 
+    @pyqtSlot(list, int)
+    def append_log_batch(self, lines, suppressed_count):
+        # Un lot plus long que la zone d'affichage serait de toute façon tronqué: ne garder que la fin
+        if len(lines) > LOG_DISPLAY_MAX_BLOCKS:
+            suppressed_count += len(lines) - LOG_DISPLAY_MAX_BLOCKS; lines = lines[-LOG_DISPLAY_MAX_BLOCKS:]
+        if suppressed_count: lines = [f"... {suppressed_count} lignes supprimées (affichage saturé, voir app_activity.log) ..."] + lines
+        if lines: self.log_display_area.appendPlainText("\n".join(line.rstrip() for line in lines)) # Un seul ajout par lot
+
     def update_task_status_indicator(self, task_name, is_running):
         widgets = self.task_widgets.get(task_name)
         if widgets:
@@ -216,11 +236,21 @@ class MainWindow(QMainWindow):
             widgets['status_label'].setText(status_text); widgets['status_label'].setStyleSheet(f"font-style: italic; color: {status_color};")
 
     # --- Méthodes de mise à jour UI spécifiques ---
-    def update_gathered_list_display(self, gathered_list): # ... (logique pour QTableWidget comme avant)
-    def copy_gathered_list(self): # ... (logique pour QTableWidget comme avant)
+    def update_gathered_list_display(self, gathered_list):
+        self.gathered_model.set_users(gathered_list or []) # Un seul reset; la vue ne matérialise que les lignes visibles
+        self.update_status(f"{self.gathered_model.total_count()} utilisateurs collectés.")
+    def run_in_owner_thread(self, function): self.owner_thread_call_signal.emit(function)
+    def append_gathered_users(self, usernames): # Ajout incrémental pendant la collecte (pas de reconstruction)
+        return self.gathered_model.append_users(usernames)
+    def copy_gathered_list(self):
+        if not self.gathered_model.total_count(): self.update_status("Liste collectée vide.", is_error=True); return
+        QApplication.clipboard().setText("\n".join(self.gathered_model.usernames))
+        self.update_status(f"{self.gathered_model.total_count()} utilisateurs copiés dans le presse-papiers.")
     def save_gathered_list(self): # ... (logique QFileDialog, app_manager.save_list_to_file)
     def load_gathered_list(self): # ... (logique QFileDialog, app_manager.load_list_from_file)
-    def clear_gathered_display_and_memory(self): # ... (vider table et app_manager.last_gathered_users)
+    def clear_gathered_display_and_memory(self):
+        self.gathered_model.clear()
+        if self.app_manager: self.app_manager.last_gathered_users = []
     def send_gathered_to_follow(self): # ... (copier vers onglet Follow)
 
     # --- Handlers de démarrage ---
@@ -2,11 +2,13 @@
 import json
 import os
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem,
-    QPushButton, QLineEdit, QLabel, QMessageBox, QFileDialog
+    QWidget, QVBoxLayout, QHBoxLayout, QListView, QGroupBox,
+    QPushButton, QLineEdit, QLabel, QMessageBox, QFileDialog, QAbstractItemView
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import QThreadPool
 from utils.logger import get_logger
+from .list_models import SortedSetListModel
+from .import_worker import ListImportWorker, IMPORT_FILE_FILTER
 
 logger = get_logger()
 
@@ -14,6 +16,7 @@ class ExclusionWidget(QWidget):
     def __init__(self, app_manager, parent=None):
         super().__init__(parent)
         self.app_manager = app_manager
+        self.import_worker = None # Import en flux en cours (QThreadPool)
         self.setWindowTitle("Gestion de la Liste d'Exclusion")
         self.setMinimumSize(450, 350) # Légèrement plus grand
         self.init_ui()
@@ -24,7 +27,10 @@ class ExclusionWidget(QWidget):
         main_layout.addWidget(QLabel("Les utilisateurs/IDs dans cette liste ne seront JAMAIS ciblés par AUCUNE action."))
 
         # Liste des exclus
-        self.list_widget = QListWidget()
+        self.list_model = SortedSetListModel(parent=self)
+        self.list_widget = QListView()
+        self.list_widget.setModel(self.list_model)
+        self.list_widget.setUniformItemSizes(True) # Pas de mesure ligne par ligne
         self.list_widget.setAlternatingRowColors(True)
         self.list_widget.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection) # Permettre multi-selection pour suppression
         main_layout.addWidget(QLabel("Utilisateurs/IDs exclus :"))
@@ -55,11 +61,11 @@ class ExclusionWidget(QWidget):
         
         # Boutons Import/Export
         file_buttons_layout = QHBoxLayout()
-        self.import_button = QPushButton("📂 Importer depuis Fichier Texte (.txt)")
+        self.import_button = QPushButton("📂 Importer depuis Fichier (.txt, .json, .csv)")
         self.import_button.clicked.connect(self.import_from_file)
         file_buttons_layout.addWidget(self.import_button)
 
-        self.export_button = QPushButton("💾 Exporter vers Fichier Texte (.txt)")
+        self.export_button = QPushButton("💾 Exporter vers Fichier")
         self.export_button.clicked.connect(self.export_to_file)
         file_buttons_layout.addWidget(self.export_button)
         main_layout.addLayout(file_buttons_layout)
@@ -68,16 +74,15 @@ class ExclusionWidget(QWidget):
 
 
     def _populate_list_widget(self):
-        self.list_widget.clear()
+        """Recharge complète du modèle (ouverture, import, vidage). Les ajouts/suppressions passent par le modèle."""
         if self.app_manager and hasattr(self.app_manager, 'exclusion_list'):
-            sorted_list = sorted(list(self.app_manager.exclusion_list))
-            self.list_widget.addItems(sorted_list)
-            self.list_widget.sortItems(Qt.SortOrder.AscendingOrder)
+            self.list_model.set_items(self.app_manager.exclusion_list)
+        else: self.list_model.set_items([])
         self.update_status_label()
 
 
     def update_status_label(self):
-        count = self.list_widget.count()
+        count = self.list_model.total_count()
         # Ce widget n'a pas de label de statut propre pour l'instant,
         # mais on pourrait l'ajouter ou mettre à jour le titre de la fenêtre
         self.setWindowTitle(f"Liste d'Exclusion ({count} éléments)")
@@ -107,17 +112,17 @@ class ExclusionWidget(QWidget):
             QMessageBox.warning(self, "Entrée Vide", "Aucun nom d'utilisateur ou ID valide détecté après nettoyage.")
             return
 
-        added_count = 0
-        already_exist_count = 0
         if self.app_manager:
-            for item_text in items_to_add:
-                if self.app_manager.add_to_exclusion_list(item_text):
-                    added_count +=1
-                else:
-                    already_exist_count +=1
+            added_items = self.app_manager.add_items_to_exclusion_list(items_to_add) # Une transaction pour tout le lot
+            if added_items is None:
+                QMessageBox.critical(self, "Erreur", "Échec de l'enregistrement en base, liste d'exclusion inchangée.")
+                return
+            added_count = len(added_items)
+            already_exist_count = len(items_to_add) - added_count
             
             if added_count > 0:
-                self._populate_list_widget() # Met à jour l'affichage
+                self.list_model.insert_items(added_items) # Insertion incrémentale (pas de reconstruction)
+                self.update_status_label()
                 self.add_input.clear()
                 logger.info(f"{added_count} utilisateur(s) ajouté(s) à la liste d'exclusion.")
             
@@ -133,12 +138,12 @@ class ExclusionWidget(QWidget):
 
 
     def delete_selected_items(self): # Modifié pour gérer multiples
-        selected_items_widgets = self.list_widget.selectedItems()
-        if not selected_items_widgets:
+        selected_rows = self.list_widget.selectionModel().selectedRows()
+        if not selected_rows:
             QMessageBox.warning(self, "Aucune Sélection", "Veuillez sélectionner le(s) élément(s) à supprimer.")
             return
             
-        items_to_delete = [item.text() for item in selected_items_widgets]
+        items_to_delete = [self.list_model.item_at(index.row()) for index in selected_rows]
         
         if self.app_manager:
             reply = QMessageBox.question(self, "Confirmation de Suppression", 
@@ -146,13 +151,14 @@ class ExclusionWidget(QWidget):
                                          QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
                                          QMessageBox.StandardButton.No)
             if reply == QMessageBox.StandardButton.Yes:
-                deleted_count = 0
-                for item_text in items_to_delete:
-                    if self.app_manager.remove_from_exclusion_list(item_text):
-                        deleted_count +=1
+                deleted_items = self.app_manager.remove_items_from_exclusion_list(items_to_delete)
+                if deleted_items is None:
+                    QMessageBox.critical(self, "Erreur", "Échec de la suppression en base, liste d'exclusion inchangée.")
+                    return
+                deleted_count = len(deleted_items)
                 
                 if deleted_count > 0:
-                    self._populate_list_widget()
+                    self.list_model.remove_items(deleted_items); self.update_status_label()
                     logger.info(f"{deleted_count} utilisateur(s) retiré(s) de la liste d'exclusion.")
                 QMessageBox.information(self, "Suppression", f"{deleted_count} élément(s) supprimé(s).")
 
@@ -174,16 +180,29 @@ class ExclusionWidget(QWidget):
 
     def import_from_file(self):
         options = QFileDialog.Options()
-        file_path, _ = QFileDialog.getOpenFileName(self, "Importer Liste d'Exclusion (.txt)", "",
-                                                   "Fichiers Texte (*.txt);;Tous les Fichiers (*)", options=options)
-        if file_path and self.app_manager:
-            # Confirmer avant d'écraser/fusionner ? Pour l'instant, fusionne.
-            added_count = self.app_manager.import_exclusion_list(file_path) # Appelle la méthode de AM
-            if added_count >= 0: # 0 est un succès si le fichier était vide ou que tout était doublon
-                 QMessageBox.information(self, "Importation Réussie", f"{added_count} nouveaux éléments uniques ajoutés depuis '{os.path.basename(file_path)}'.")
-                 self._populate_list_widget()
-            else: # Erreur pendant import (-1)
-                 QMessageBox.critical(self, "Erreur d'Importation", "Erreur lors de la lecture ou du traitement du fichier. Vérifiez la console.")
+        file_path, _ = QFileDialog.getOpenFileName(self, "Importer Liste d'Exclusion (.txt, .json, .ndjson, .csv)", "",
+                                                   IMPORT_FILE_FILTER, options=options)
+        if file_path and self.app_manager and not self.import_worker:
+            # Fusionne avec la liste existante; lecture en flux dans un worker (l'UI reste réactive)
+            self.import_file_name = os.path.basename(file_path)
+            self.import_worker = ListImportWorker(self.app_manager.import_exclusion_list, file_path)
+            self.import_worker.signals.progress.connect(self.on_import_progress)
+            self.import_worker.signals.finished.connect(self.on_import_finished)
+            self.import_button.setEnabled(False)
+            QThreadPool.globalInstance().start(self.import_worker)
+
+    def on_import_progress(self, percent, processed_count, added_count):
+        self.setWindowTitle(f"Import '{self.import_file_name}': {percent}% ({processed_count} lus, {added_count} nouveaux)")
+
+    def on_import_finished(self, added_count, completed):
+        self.import_worker = None; self.import_button.setEnabled(True)
+        self._populate_list_widget()
+        if added_count < 0: # Erreur pendant import (-1)
+             QMessageBox.critical(self, "Erreur d'Importation", "Erreur lors de la lecture ou du traitement du fichier. Vérifiez la console.")
+        elif completed: # 0 est un succès si le fichier était vide ou que tout était doublon
+             QMessageBox.information(self, "Importation Réussie", f"{added_count} nouveaux éléments uniques ajoutés depuis '{self.import_file_name}'.")
+        else: # Annulé (fenêtre fermée): les lots déjà validés restent
+             QMessageBox.information(self, "Importation Annulée", f"Import de '{self.import_file_name}' interrompu: {added_count} nouveaux éléments ajoutés avant l'annulation.")
 
     def export_to_file(self):
         if not self.app_manager or not self.app_manager.exclusion_list:
@@ -192,10 +211,10 @@ class ExclusionWidget(QWidget):
             
         options = QFileDialog.Options()
         default_filename = "ma_liste_exclusion.txt"
-        file_path, _ = QFileDialog.getSaveFileName(self, "Exporter Liste d'Exclusion (.txt)", default_filename,
-                                                  "Fichiers Texte (*.txt);;Tous les Fichiers (*)", options=options)
+        file_path, _ = QFileDialog.getSaveFileName(self, "Exporter Liste d'Exclusion", default_filename,
+                                                  "Fichiers Texte (*.txt);;JSON (*.json);;NDJSON (*.ndjson);;CSV (*.csv)", options=options)
         if file_path and self.app_manager:
-             if not file_path.lower().endswith(".txt"): file_path += ".txt" # Assurer extension
+             if not file_path.lower().endswith((".txt", ".json", ".ndjson", ".jsonl", ".csv")): file_path += ".txt" # Assurer extension (détermine le format)
              if self.app_manager.export_exclusion_list(file_path): # Appelle la méthode de AM
                   QMessageBox.information(self, "Exportation Réussie", f"Liste ({len(self.app_manager.exclusion_list)} éléments) exportée vers '{os.path.basename(file_path)}'.")
              else:
@@ -204,4 +223,8 @@ class ExclusionWidget(QWidget):
     # S'assurer que la liste est rafraîchie si la fenêtre est montrée à nouveau
     def showEvent(self, event):
         self._load_exclusion_list_from_appmanager()
-        super().showEvent(event)
\ No newline at end of file
+        super().showEvent(event)
+
+    def closeEvent(self, event):
+        if self.import_worker: self.import_worker.cancel() # Lots déjà importés conservés
+        super().closeEvent(event)
\ No newline at end of file
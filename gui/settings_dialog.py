@@ -209,6 +209,7 @@ class SettingsWidget(QWidget):
             ("auto_launch_on_windows_startup", "Lancer automatiquement au démarrage de Windows", False),
             ("disable_browser_images", "Désactiver images navigateur (perf+)", False),
             ("always_clear_cookies_on_startup", "Toujours vider cookies/cache au démarrage nav.", True),
+            ("instrument_webdriver", "Mesurer les commandes WebDriver par action (onglet Stats)", True),
         ]
         self.general_checkboxes = {}
         for key, label, default in checkbox_options_gen:
@@ -365,10 +366,13 @@ class SettingsWidget(QWidget):
             # Proxy (juste l'état enabled ici, la liste est gérée par AppManager via son propre JSON)
             "proxy_enabled": self.proxy_enable_cb.isChecked(),
         }
-        if self.config_manager.save_settings(settings_data):
+        if self.app_manager: # Appliqués immédiatement, écriture atomique différée (AppManager.settings_saver)
+            self.app_manager.save_settings(settings_data)
+            self.logger.info("Paramètres appliqués, sauvegarde en cours.")
+            QMessageBox.information(self, "Sauvegarde", "Paramètres sauvegardés.")
+        elif self.config_manager.save_settings(settings_data):
             self.logger.info("Paramètres sauvegardés avec succès.")
             QMessageBox.information(self, "Sauvegarde", "Paramètres sauvegardés.")
-            if self.app_manager: self.app_manager.update_settings() # Notifier AM
         else:
             self.logger.error("Erreur lors de la sauvegarde des paramètres.")
             QMessageBox.warning(self, "Erreur Sauvegarde", "Erreur lors de la sauvegarde.")
@@ -1,15 +1,50 @@
 # gui/stats_widget.py
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QGridLayout, QLabel, QGroupBox, 
-                             QPushButton, QComboBox, QApplication) # QApplication pour le test
-from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QGroupBox,
+                             QPushButton, QComboBox, QTableWidget, QTableWidgetItem, QHeaderView,
+                             QFileDialog, QApplication) # QApplication pour le test
+from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal
 from utils.logger import get_logger # Import get_logger
 import datetime # Nécessaire pour le mock dans __main__
 
+PERIOD_KEYS = {"Aujourd'hui": "today", "Hier": "yesterday", "7 derniers jours": "last7days", "30 derniers jours": "last30days"}
+DRIVER_CALLS_TOP = 15 # Lignes affichées dans le tableau des commandes WebDriver
+DRIVER_CALL_COLUMNS = (("Action", "action"), ("Méthode", "call_site"), ("Commande", "command"), ("Sélecteur", "selector"),
+                       ("Nb", "count"), ("Total ms", "total_ms"), ("Moy. ms", "avg_ms"))
+TASK_OUTCOME_COLUMNS = (("Tâche", "task"), ("Exécutions", "runs"), ("Réussies", "ok"), ("Échecs", "failed"),
+                        ("Bloquées", "blocked"), ("Erreurs", "error"), ("Réussite %", "success_rate"), ("Durée moy. s", "avg_ms"))
+
+
+class StatsWorkerSignals(QObject):
+    stats_ready = pyqtSignal(str, object) # (période, dict de stats ou None si erreur)
+    task_stats_ready = pyqtSignal(str, object) # (période, {tâche: résultats} depuis les agrégats, ou None)
+
+
+class StatsWorker(QRunnable):
+    """Calcule les stats d'une période hors du thread UI (QThreadPool), résultat livré par signal."""
+    def __init__(self, app_manager, period_key):
+        super().__init__()
+        self.app_manager = app_manager; self.period_key = period_key
+        self.signals = StatsWorkerSignals()
+
+    def run(self):
+        try: stats = self.app_manager.get_action_stats(period=self.period_key)
+        except Exception as e:
+            get_logger().error(f"Erreur calcul des stats ({self.period_key}): {e}"); stats = None
+        self.signals.stats_ready.emit(self.period_key, stats)
+        if not hasattr(self.app_manager, "get_task_outcome_stats"): return
+        try: task_stats = self.app_manager.get_task_outcome_stats(period=self.period_key)
+        except Exception as e:
+            get_logger().error(f"Erreur calcul des résultats par tâche ({self.period_key}): {e}"); task_stats = None
+        self.signals.task_stats_ready.emit(self.period_key, task_stats)
+
+
 class StatsWidget(QWidget):
     def __init__(self, app_manager, parent=None):
         super().__init__(parent)
         self.app_manager = app_manager
         self.logger = get_logger() # Initialiser le logger
+        self.thread_pool = QThreadPool.globalInstance()
+        self.pending_workers = {} # période -> StatsWorker en cours (garde les signaux en vie, évite les doublons)
         self.init_ui()
         self.refresh_stats() # Charger les stats initiales
 
@@ -61,6 +96,53 @@ class StatsWidget(QWidget):
              row += 1
              
         main_layout.addWidget(stats_group)
+
+        # Budgets restants (seaux à jetons horaires/journaliers, cf. ActionBudgetManager)
+        self.budget_group = QGroupBox("Budgets Restants (heure / jour)")
+        budget_grid = QGridLayout(self.budget_group)
+        self.budget_labels = {}
+        for row, (key, label_text) in enumerate(action_types_labels):
+             budget_grid.addWidget(QLabel(f"{label_text} :"), row, 0)
+             value_label = QLabel("Illimité")
+             value_label.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+             budget_grid.addWidget(value_label, row, 1)
+             self.budget_labels[key] = value_label
+        main_layout.addWidget(self.budget_group)
+
+        # Réussite par tâche (agrégats journaliers de action_events, période sélectionnée)
+        self.task_outcomes_group = QGroupBox("Résultats par tâche")
+        task_outcomes_layout = QVBoxLayout(self.task_outcomes_group)
+        self.task_outcomes_table = QTableWidget(0, len(TASK_OUTCOME_COLUMNS))
+        self.task_outcomes_table.setHorizontalHeaderLabels([title for title, _ in TASK_OUTCOME_COLUMNS])
+        self.task_outcomes_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.task_outcomes_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        task_outcomes_layout.addWidget(self.task_outcomes_table)
+        main_layout.addWidget(self.task_outcomes_group)
+
+        # Allers-retours WebDriver (cf. driver_instrumentation): appels les plus coûteux par action/méthode/sélecteur
+        self.driver_calls_group = QGroupBox("Commandes WebDriver (appels les plus coûteux)")
+        driver_calls_layout = QVBoxLayout(self.driver_calls_group)
+        driver_calls_header = QHBoxLayout()
+        self.driver_calls_summary_label = QLabel("Aucune commande enregistrée.")
+        driver_calls_header.addWidget(self.driver_calls_summary_label); driver_calls_header.addStretch()
+        self.export_driver_calls_button = QPushButton("💾 Exporter JSON..."); self.export_driver_calls_button.clicked.connect(self.export_driver_calls)
+        self.reset_driver_calls_button = QPushButton("Réinitialiser"); self.reset_driver_calls_button.clicked.connect(self.reset_driver_calls)
+        driver_calls_header.addWidget(self.export_driver_calls_button); driver_calls_header.addWidget(self.reset_driver_calls_button)
+        driver_calls_layout.addLayout(driver_calls_header)
+        self.driver_calls_table = QTableWidget(0, len(DRIVER_CALL_COLUMNS))
+        self.driver_calls_table.setHorizontalHeaderLabels([title for title, _ in DRIVER_CALL_COLUMNS])
+        self.driver_calls_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch) # Sélecteur
+        self.driver_calls_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        driver_calls_layout.addWidget(self.driver_calls_table)
+        main_layout.addWidget(self.driver_calls_group)
+
+        # Profilage par échantillonnage (cf. utils/sampling_profiler): activable pendant une session
+        self.profiling_group = QGroupBox("Profilage (échantillonnage de tous les threads)")
+        profiling_layout = QHBoxLayout(self.profiling_group)
+        self.profiling_status_label = QLabel("Inactif.")
+        self.profiling_button = QPushButton("▶ Démarrer le profilage"); self.profiling_button.clicked.connect(self.toggle_profiling)
+        profiling_layout.addWidget(self.profiling_status_label); profiling_layout.addStretch(); profiling_layout.addWidget(self.profiling_button)
+        main_layout.addWidget(self.profiling_group)
         main_layout.addStretch()
         self.setLayout(main_layout)
 
@@ -71,15 +153,25 @@ class StatsWidget(QWidget):
                 label_widget.setText("N/A")
             return
             
-        period_text = self.period_combo.currentText()
-        period_key = "today" 
-        if period_text == "Hier": period_key = "yesterday"
-        elif period_text == "7 derniers jours": period_key = "last7days"
-        elif period_text == "30 derniers jours": period_key = "last30days" # Nouvelle période
-             
-        self.logger.info(f"Rafraîchissement des stats pour la période: {period_key}")
-        stats = self.app_manager.get_action_stats(period=period_key) # Doit être créé dans AppManager
-        
+        period_key = self.current_period_key()
+        self.refresh_budgets()
+        self.refresh_driver_calls()
+        self.refresh_profiling_state()
+        if period_key in self.pending_workers: return # Calcul déjà en cours pour cette période
+
+        self.logger.debug("Rafraîchissement des stats pour la période: %s", period_key)
+        worker = StatsWorker(self.app_manager, period_key)
+        worker.signals.stats_ready.connect(self.on_stats_ready)
+        worker.signals.task_stats_ready.connect(self.on_task_stats_ready)
+        self.pending_workers[period_key] = worker
+        self.thread_pool.start(worker)
+
+    def current_period_key(self):
+        return PERIOD_KEYS.get(self.period_combo.currentText(), "today")
+
+    def on_stats_ready(self, period_key, stats):
+        self.pending_workers.pop(period_key, None)
+        if period_key != self.current_period_key(): return # Période changée entre-temps: résultat obsolète
         if stats:
             for key, label_widget in self.stat_labels.items():
                 label_widget.setText(str(stats.get(key, 0)))
@@ -87,7 +179,62 @@ class StatsWidget(QWidget):
             self.logger.error("Impossible de récupérer les statistiques depuis AppManager ou DB.")
             for label_widget in self.stat_labels.values():
                 label_widget.setText("Erreur")
+
+    def on_task_stats_ready(self, period_key, task_stats):
+        if period_key != self.current_period_key() or task_stats is None: return
+        rows = sorted(task_stats.items(), key=lambda kv: kv[1]["runs"], reverse=True)
+        self.task_outcomes_table.setRowCount(len(rows))
+        for row_index, (task_name, entry) in enumerate(rows):
+            values = {**entry, "task": task_name, "success_rate": entry["success_rate"] * 100, "avg_ms": entry["avg_ms"] / 1000}
+            for column_index, (_, key) in enumerate(TASK_OUTCOME_COLUMNS):
+                value = values[key]
+                item = QTableWidgetItem(f"{value:.1f}" if isinstance(value, float) else str(value))
+                if not isinstance(value, str): item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.task_outcomes_table.setItem(row_index, column_index, item)
+
+    def refresh_budgets(self):
+        if not hasattr(self.app_manager, "get_action_budget_remaining"): self.budget_group.setVisible(False); return
+        remaining = self.app_manager.get_action_budget_remaining() or {}
+        for key, label_widget in self.budget_labels.items():
+            periods = remaining.get(key)
+            if not periods: label_widget.setText("Illimité"); continue
+            parts = []
+            for period, suffix in (("hour", "h"), ("day", "j")):
+                if period in periods: left, limit = periods[period]; parts.append(f"{left}/{limit} ({suffix})")
+            label_widget.setText("  ".join(parts))
                 
+    def refresh_driver_calls(self):
+        if not hasattr(self.app_manager, "get_driver_call_stats"): self.driver_calls_group.setVisible(False); return
+        snapshot = self.app_manager.get_driver_call_stats(top=DRIVER_CALLS_TOP)
+        self.driver_calls_summary_label.setText(f"{snapshot['total_commands']} commandes, {snapshot['total_ms'] / 1000:.1f} s cumulées "
+                                                f"depuis {snapshot['duration_sec'] / 60:.0f} min")
+        rows = snapshot["top_calls"]
+        self.driver_calls_table.setRowCount(len(rows))
+        for row_index, row in enumerate(rows):
+            for column_index, (_, key) in enumerate(DRIVER_CALL_COLUMNS):
+                value = row[key]
+                item = QTableWidgetItem(f"{value:.1f}" if isinstance(value, float) else str(value))
+                if not isinstance(value, str): item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.driver_calls_table.setItem(row_index, column_index, item)
+
+    def export_driver_calls(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "Exporter les commandes WebDriver", "driver_calls.json", "JSON (*.json)")
+        if file_path: self.app_manager.dump_driver_call_stats(file_path)
+
+    def reset_driver_calls(self):
+        self.app_manager.reset_driver_call_stats(); self.refresh_driver_calls()
+
+    def refresh_profiling_state(self, last_profile_path=None):
+        if not hasattr(self.app_manager, "is_profiling"): self.profiling_group.setVisible(False); return
+        running = self.app_manager.is_profiling()
+        self.profiling_button.setText("⏹ Arrêter et enregistrer" if running else "▶ Démarrer le profilage")
+        if running: self.profiling_status_label.setText(f"En cours: {self.app_manager.profiler.sample_count} échantillons.")
+        elif last_profile_path: self.profiling_status_label.setText(f"Profil enregistré: {last_profile_path}")
+
+    def toggle_profiling(self):
+        if self.app_manager.is_profiling(): self.refresh_profiling_state(self.app_manager.stop_profiling() or "aucun échantillon")
+        else: self.app_manager.start_profiling(); self.refresh_profiling_state()
+
     # Rafraîchir quand l'onglet devient visible
     def showEvent(self, event):
         self.refresh_stats()
@@ -113,6 +260,8 @@ if __name__ == '__main__':
             elif period == "last7days": return {'follows': 50, 'unfollows': 15, 'likes': 200, 'comments': 15, 'story_views': 400, 'dms_sent': 5}
             elif period == "last30days": return {'follows': 200, 'unfollows': 60, 'likes': 800, 'comments': 50, 'story_views': 1500, 'dms_sent': 20}
             return {'follows': 0, 'unfollows': 0, 'likes': 0, 'comments': 0, 'story_views': 0, 'dms_sent': 0} # Default
+        def get_action_budget_remaining(self):
+            return {'follows': {'hour': (12, 20), 'day': (95, 150)}, 'likes': {'day': (310, 500)}}
             
     app = QApplication(sys.argv)
     mock_manager = MockAppManager()
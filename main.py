@@ -1,12 +1,12 @@
 # mon_bot_social/main.py
 import sys
 from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import Qt, QCoreApplication
+from PyQt6.QtCore import Qt, QCoreApplication, QTimer
 
 
 from gui.main_window import MainWindow
-from core.app_manager import AppManager
-from utils.logger import get_logger # Importer le logger
+from automation_engine.app_manager import AppManager # Léger: DB, actions, Selenium et APScheduler sont chargés plus tard
+from utils.logger import get_logger, shutdown_logging # Importer le logger
 
 logger = get_logger() # Obtenir l'instance du logger global
 
@@ -30,12 +30,15 @@ def main():
     app_manager.set_main_window(window)
     
     window.show()
+    # Fenêtre affichée d'abord; DB/migrations et listes persistées au premier tour de boucle d'événements
+    QTimer.singleShot(0, app_manager.complete_startup)
 
     exit_code = app.exec()
     
     logger.info("Tentative d'arrêt propre de l'application...")
     app_manager.shutdown() # Appeler la méthode shutdown de AppManager
     logger.info("Application Mon Bot Social Pro terminée.")
+    shutdown_logging() # Vider la file de logs avant de quitter
     sys.exit(exit_code)
 
 if __name__ == "__main__":
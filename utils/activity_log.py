@@ -0,0 +1,165 @@
+# mon_bot_social/utils/activity_log.py
+"""
+Journal d'activité structuré: un objet JSON par ligne (action, cible, résultat, durées, tâche, état de session).
+Segments tournants compressés en gzip, rétention configurable en taille (nb x taille) et en âge.
+Le helper iter_activity_events() relit les segments en flux, ligne à ligne, sans tout décompresser en mémoire.
+"""
+import os
+import gzip
+import json
+import time
+import shutil
+import logging
+from logging.handlers import RotatingFileHandler
+
+try:
+    BASE_PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+except NameError:
+    BASE_PROJECT_DIR = os.getcwd()
+
+ACTIVITY_LOG_DIR = os.path.join(BASE_PROJECT_DIR, "data_files", "logs")
+ACTIVITY_LOG_FILE_NAME = "activity_events.jsonl"
+ACTIVITY_LOG_FILE_PATH = os.path.join(ACTIVITY_LOG_DIR, ACTIVITY_LOG_FILE_NAME)
+
+DEFAULT_ACTIVITY_LOG_MAX_MB = 10
+DEFAULT_ACTIVITY_LOG_BACKUP_COUNT = 30
+DEFAULT_ACTIVITY_LOG_MAX_AGE_DAYS = 90
+
+ACTIVITY_LOGGER_NAME = "MonBotSocialApp.Activity"
+activity_logger = logging.getLogger(ACTIVITY_LOGGER_NAME)
+
+
+class ActivityRecordFilter(logging.Filter):
+    """Laisse passer (ou exclut, si exclude=True) les records portant un événement d'activité."""
+    def __init__(self, exclude=False):
+        super().__init__(); self.exclude = exclude
+
+    def filter(self, record):
+        return (getattr(record, "activity", None) is not None) != self.exclude
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record):
+        event = {"ts": round(record.created, 3), "level": record.levelname}
+        event.update(getattr(record, "activity", None) or {"message": record.getMessage()})
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+
+class CompressedRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler dont les segments tournés sont gzippés, avec purge des segments trop vieux."""
+
+    def __init__(self, filename, max_bytes, backup_count, max_age_days=0, encoding='utf-8'):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding=encoding, delay=True)
+        self.max_age_days = max_age_days
+        self.namer = lambda name: name + ".gz"
+        self.rotator = self._gzip_rotator
+
+    @staticmethod
+    def _gzip_rotator(source, dest):
+        with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out: shutil.copyfileobj(f_in, f_out)
+        os.remove(source)
+
+    def doRollover(self):
+        super().doRollover()
+        self.purge_old_segments()
+
+    def purge_old_segments(self):
+        if not self.max_age_days or self.max_age_days <= 0: return 0
+        cutoff_ts = time.time() - self.max_age_days * 86400; removed = 0
+        for segment_path in list_activity_segments(os.path.dirname(self.baseFilename), os.path.basename(self.baseFilename), include_current=False):
+            try:
+                if os.path.getmtime(segment_path) < cutoff_ts: os.remove(segment_path); removed += 1
+            except OSError: pass
+        return removed
+
+    def purge_surplus_segments(self):
+        """Supprime les segments au-delà de backupCount (base.N.gz, N > backupCount), ex: après une baisse de la limite."""
+        removed = 0; prefix = os.path.basename(self.baseFilename) + "."
+        for segment_path in list_activity_segments(os.path.dirname(self.baseFilename), os.path.basename(self.baseFilename), include_current=False):
+            if int(os.path.basename(segment_path)[len(prefix):-3]) <= self.backupCount: continue
+            try: os.remove(segment_path); removed += 1
+            except OSError: pass
+        return removed
+
+    def reconfigure(self, max_bytes=None, backup_count=None, max_age_days=None):
+        self.acquire()
+        try:
+            if max_bytes is not None: self.maxBytes = max_bytes
+            if backup_count is not None: self.backupCount = backup_count
+            if max_age_days is not None: self.max_age_days = max_age_days
+            self.purge_surplus_segments() # Sous le verrou: pas de rotation concurrente qui renumérote les segments
+        finally: self.release()
+        self.purge_old_segments()
+
+
+def create_activity_log_handler(max_mb=DEFAULT_ACTIVITY_LOG_MAX_MB, backup_count=DEFAULT_ACTIVITY_LOG_BACKUP_COUNT,
+                                max_age_days=DEFAULT_ACTIVITY_LOG_MAX_AGE_DAYS, file_path=ACTIVITY_LOG_FILE_PATH):
+    handler = CompressedRotatingFileHandler(file_path, int(max_mb * 1024 * 1024), backup_count, max_age_days)
+    handler.setLevel(logging.INFO) # Les événements sont émis en INFO: ne pas forcer le logger principal en DEBUG
+    handler.setFormatter(JsonLinesFormatter())
+    handler.addFilter(ActivityRecordFilter())
+    return handler
+
+
+def log_activity_event(action, target=None, result=None, duration_ms=None, task=None, session=None, level=logging.INFO, **fields):
+    """Émet un événement d'activité structuré (écrit par le sink JSON-lines, exclu de la console et de l'UI)."""
+    event = {"action": action, "target": target, "result": result, "duration_ms": duration_ms, "task": task}
+    if session: event["session"] = session
+    event.update(fields)
+    activity_logger.log(level, "activity %s %s -> %s", action, target or "-", result, extra={"activity": event})
+
+
+def list_activity_segments(log_dir=ACTIVITY_LOG_DIR, base_name=ACTIVITY_LOG_FILE_NAME, include_current=True):
+    """Segments du plus ancien au plus récent: base.N.gz ... base.1.gz, puis le fichier courant."""
+    segments = []
+    if os.path.isdir(log_dir):
+        prefix = base_name + "."
+        for file_name in os.listdir(log_dir):
+            if file_name.startswith(prefix) and file_name.endswith(".gz"):
+                index_str = file_name[len(prefix):-3]
+                if index_str.isdigit(): segments.append((int(index_str), os.path.join(log_dir, file_name)))
+    ordered = [path for _, path in sorted(segments, reverse=True)]
+    current_path = os.path.join(log_dir, base_name)
+    if include_current and os.path.exists(current_path): ordered.append(current_path)
+    return ordered
+
+
+def iter_activity_events(start_ts=None, end_ts=None, action=None, result=None, task=None, predicate=None,
+                         log_dir=ACTIVITY_LOG_DIR, base_name=ACTIVITY_LOG_FILE_NAME):
+    """
+    Générateur d'événements filtrés, lus en flux segment par segment (gzip décompressé à la volée).
+    Les segments dont la dernière écriture précède start_ts sont ignorés sans être ouverts.
+    """
+    for segment_path in list_activity_segments(log_dir, base_name):
+        try:
+            if start_ts is not None and os.path.getmtime(segment_path) < start_ts: continue
+            opener = gzip.open if segment_path.endswith(".gz") else open
+            with opener(segment_path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip(): continue
+                    try: event = json.loads(line)
+                    except ValueError: continue # Ligne tronquée (arrêt brutal)
+                    ts = event.get("ts", 0)
+                    if start_ts is not None and ts < start_ts: continue
+                    if end_ts is not None and ts > end_ts: continue
+                    if action is not None and event.get("action") != action: continue
+                    if result is not None and event.get("result") != result: continue
+                    if task is not None and event.get("task") != task: continue
+                    if predicate is not None and not predicate(event): continue
+                    yield event
+        except OSError as e:
+            logging.getLogger("MonBotSocialApp.ActivityLog").warning(f"Lecture segment d'activité impossible {segment_path}: {e}")
+
+
+if __name__ == '__main__':
+    import tempfile
+    test_dir = tempfile.mkdtemp()
+    test_handler = create_activity_log_handler(max_mb=0.001, backup_count=5, file_path=os.path.join(test_dir, ACTIVITY_LOG_FILE_NAME))
+    activity_logger.addHandler(test_handler); activity_logger.setLevel(logging.DEBUG); activity_logger.propagate = False
+    for i in range(60):
+        log_activity_event("auto_like", target=f"post_{i}", result="ok" if i % 7 else "blocked", duration_ms=1200 + i, task="auto_like")
+    test_handler.close()
+    print(f"Segments: {[os.path.basename(p) for p in list_activity_segments(test_dir)]}")
+    blocked = list(iter_activity_events(result="blocked", log_dir=test_dir))
+    print(f"Événements 'blocked' retrouvés (segments compressés inclus): {len(blocked)} -> {[e['target'] for e in blocked]}")
+    shutil.rmtree(test_dir)
@@ -0,0 +1,51 @@
+# mon_bot_social/utils/clock.py
+import time
+import datetime
+
+
+class SystemClock:
+    """Horloge réelle (comportement par défaut de SessionManager / TaskScheduler)."""
+
+    def time(self):
+        return time.time()
+
+    def now(self):
+        return datetime.datetime.now()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class SimulatedClock:
+    """Horloge contrôlée manuellement, pour rejouer une journée de planification sans attendre."""
+
+    def __init__(self, start_ts=None):
+        self._now_ts = float(start_ts if start_ts is not None else time.time())
+
+    def time(self):
+        return self._now_ts
+
+    def now(self):
+        return datetime.datetime.fromtimestamp(self._now_ts)
+
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+    def advance(self, seconds):
+        if seconds > 0: self._now_ts += seconds
+        return self._now_ts
+
+    def set_time(self, ts):
+        if ts > self._now_ts: self._now_ts = float(ts) # L'horloge ne recule jamais
+        return self._now_ts
+
+
+# Instance partagée par défaut
+system_clock = SystemClock()
+
+
+if __name__ == '__main__':
+    clock = SimulatedClock(start_ts=0)
+    clock.advance(3600)
+    print(f"Horloge simulée: {clock.time()} -> {clock.now()}")
+    print(f"Horloge système: {system_clock.now()}")
@@ -1,6 +1,10 @@
 # mon_bot_social/utils/config_manager.py
 import json
 import os
+import stat
+import hashlib
+import tempfile
+import threading
 from utils.logger import get_logger # Utiliser notre logger
 
 logger = get_logger("ConfigManager") # Logger spécifique pour ce module
@@ -15,12 +19,16 @@ except NameError: # Au cas où __file__ n'est pas défini (ex: exécution intera
     BASE_PROJECT_DIR = os.getcwd() # Fallback (moins robuste)
 
 DEFAULT_SETTINGS_PATH = os.path.join(BASE_PROJECT_DIR, "data_files", "settings.json")
+SAVE_DEBOUNCE_SEC = 1.0 # Délai de regroupement des sauvegardes rapprochées
+WATCH_INTERVAL_SEC = 2.0 # Période de vérification de settings.json (un simple stat)
 
 class ConfigManager:
     def __init__(self, settings_path=None):
         self.settings_path = settings_path or DEFAULT_SETTINGS_PATH
+        self.last_digest = None # Empreinte du dernier contenu lu/écrit par nous: le watcher ignore nos propres écritures
+        self._digest_lock = threading.Lock() # Rename + last_digest atomiques vis-à-vis du watcher
         self._ensure_data_files_directory_exists()
-        logger.debug(f"ConfigManager initialisé avec le chemin: {self.settings_path}")
+        logger.debug("ConfigManager initialisé avec le chemin: %s", self.settings_path)
 
     def _ensure_data_files_directory_exists(self):
         """Crée le répertoire data_files à la racine du projet s'il n'existe pas."""
@@ -45,8 +53,7 @@ class ConfigManager:
             return {} 
             
         try:
-            with open(self.settings_path, 'r', encoding='utf-8') as f:
-                settings = json.load(f)
+            settings, self.last_digest = self._read_settings_file()
             logger.info(f"Paramètres chargés avec succès depuis '{os.path.basename(self.settings_path)}'.")
             return settings if isinstance(settings, dict) else {} # S'assurer que c'est un dict
         except json.JSONDecodeError:
@@ -57,25 +64,156 @@ class ConfigManager:
             logger.error(f"Erreur inattendue lors du chargement des paramètres '{os.path.basename(self.settings_path)}': {e}", exc_info=True)
             return {}
 
+    def _read_settings_file(self):
+        """(dict, empreinte) du fichier. Lève OSError / json.JSONDecodeError."""
+        with open(self.settings_path, 'rb') as f:
+            content = f.read()
+        return json.loads(content.decode('utf-8')), hashlib.sha1(content).hexdigest()
+
+    def get_file_state(self):
+        """(mtime_ns, taille) de settings.json, None s'il n'existe pas. Coût: un stat."""
+        try: stat_result = os.stat(self.settings_path)
+        except OSError: return None
+        return stat_result.st_mtime_ns, stat_result.st_size
+
+    def load_settings_if_changed(self):
+        """Relit settings.json et retourne le dict seulement si son contenu diffère du dernier lu/écrit, sinon None."""
+        with self._digest_lock: # Pas de lecture entre le rename d'une sauvegarde et la mise à jour de last_digest
+            try: settings, digest = self._read_settings_file()
+            except FileNotFoundError: return None
+            except (OSError, ValueError) as e: # Écriture externe en cours (éditeur non atomique): on réessaiera au prochain changement
+                logger.warning(f"'{os.path.basename(self.settings_path)}' illisible pour le moment ({e}), rechargement ignoré.")
+                return None
+            if digest == self.last_digest: return None # Simple touch ou notre propre écriture
+            if not isinstance(settings, dict):
+                logger.error(f"'{os.path.basename(self.settings_path)}' ne contient pas un objet JSON, rechargement ignoré."); return None
+            self.last_digest = digest
+            return settings
+
     def save_settings(self, settings_data):
-        """Sauvegarde le dictionnaire de paramètres dans le fichier JSON. Retourne True si succès."""
+        """
+        Sauvegarde le dictionnaire de paramètres dans le fichier JSON. Retourne True si succès.
+        Écriture atomique: fichier temporaire dans le même dossier, fsync, puis os.replace (jamais de fichier tronqué après un crash).
+        """
         if not isinstance(settings_data, dict):
             logger.error("Tentative de sauvegarde de données non-dictionnaire. Opération annulée.")
             return False
             
         self._ensure_data_files_directory_exists() # Assurer que le dossier est là avant d'écrire
-        
+        dir_name = os.path.dirname(self.settings_path) or "."
+        tmp_path = None
         try:
-            # Créer une copie pour éviter de modifier l'original si on filtre plus tard
-            # data_to_save = dict(settings_data) 
-            
-            with open(self.settings_path, 'w', encoding='utf-8') as f:
-                json.dump(settings_data, f, indent=4, ensure_ascii=False) # ensure_ascii=False pour accents
+            content = json.dumps(settings_data, indent=4, ensure_ascii=False).encode('utf-8') # ensure_ascii=False pour accents
+            fd, tmp_path = tempfile.mkstemp(prefix=".settings_", suffix=".tmp", dir=dir_name)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content); f.flush(); os.fsync(f.fileno())
+            if os.path.exists(self.settings_path): # mkstemp crée en 0600: garder les droits du fichier remplacé
+                os.chmod(tmp_path, stat.S_IMODE(os.stat(self.settings_path).st_mode))
+            with self._digest_lock: # Le watcher ne relit pas entre le rename et l'empreinte: il ne recharge pas notre écriture
+                os.replace(tmp_path, self.settings_path); tmp_path = None
+                self.last_digest = hashlib.sha1(content).hexdigest() # Seulement une fois le fichier réellement remplacé
+            self._fsync_directory(dir_name)
             logger.info(f"Paramètres sauvegardés avec succès dans '{os.path.basename(self.settings_path)}'.")
             return True
         except Exception as e:
             logger.error(f"Erreur lors de la sauvegarde des paramètres dans '{os.path.basename(self.settings_path)}': {e}", exc_info=True)
             return False
+        finally:
+            if tmp_path and os.path.exists(tmp_path):
+                try: os.remove(tmp_path)
+                except OSError: pass
+
+    @staticmethod
+    def _fsync_directory(dir_name):
+        """Rend le rename durable (POSIX). Sans effet là où un dossier ne peut pas être ouvert (Windows)."""
+        try: dir_fd = os.open(dir_name, os.O_RDONLY)
+        except OSError: return
+        try: os.fsync(dir_fd)
+        except OSError: pass
+        finally: os.close(dir_fd)
+
+
+class DebouncedSettingsSaver:
+    """
+    Regroupe les sauvegardes rapprochées (éditions UI en rafale): seule la dernière version demandée est écrite,
+    `delay_sec` après la dernière demande. flush() écrit immédiatement ce qui est en attente (arrêt de l'application).
+    """
+
+    def __init__(self, config_manager, delay_sec=SAVE_DEBOUNCE_SEC, on_saved=None):
+        self.config_manager = config_manager
+        self.delay_sec = delay_sec
+        self.on_saved = on_saved # callable(succès) appelé après chaque écriture (thread du timer)
+        self._pending = None
+        self._timer = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock() # Les écritures restent dans l'ordre des demandes
+
+    def schedule(self, settings_data):
+        with self._lock:
+            self._pending = dict(settings_data)
+            if self._timer: self._timer.cancel()
+            self._timer = threading.Timer(self.delay_sec, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def has_pending(self):
+        with self._lock: return self._pending is not None
+
+    def flush(self):
+        """Écrit la version en attente. Retourne True si rien à écrire ou écriture réussie."""
+        with self._write_lock:
+            with self._lock:
+                settings_data, self._pending = self._pending, None
+                if self._timer: self._timer.cancel(); self._timer = None
+            if settings_data is None: return True
+            success = self.config_manager.save_settings(settings_data)
+        if self.on_saved: self.on_saved(success)
+        return success
+
+
+class SettingsFileWatcher:
+    """
+    Surveille settings.json depuis un thread démon (stat périodique: mtime + taille, stdlib seulement).
+    Quand l'état change, le contenu est relu et comparé à l'empreinte connue: `on_change(settings_dict)`
+    n'est appelé que si le contenu a réellement changé (pas pour un touch ni pour nos propres sauvegardes).
+    on_change est appelé sur le thread du watcher: à l'appelant de repasser sur son thread (EventSink.run_in_owner_thread).
+    """
+
+    def __init__(self, config_manager, on_change, interval_sec=WATCH_INTERVAL_SEC):
+        self.config_manager = config_manager
+        self.on_change = on_change
+        self.interval_sec = interval_sec
+        self._last_state = config_manager.get_file_state()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive(): return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="SettingsFileWatcher", daemon=True)
+        self._thread.start()
+        logger.debug("Surveillance de '%s' démarrée (toutes les %ss).", os.path.basename(self.config_manager.settings_path), self.interval_sec)
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread(): self._thread.join(timeout=self.interval_sec + 1)
+        self._thread = None
+
+    def check_now(self):
+        """Une vérification. Retourne True si un nouveau contenu a été transmis à on_change."""
+        state = self.config_manager.get_file_state()
+        if state is None or state == self._last_state: return False
+        self._last_state = state
+        settings = self.config_manager.load_settings_if_changed()
+        if settings is None: return False
+        logger.info(f"'{os.path.basename(self.config_manager.settings_path)}' modifié sur disque: rechargement à chaud.")
+        try: self.on_change(settings)
+        except Exception as e: logger.error(f"Erreur lors du rechargement à chaud des paramètres: {e}", exc_info=True)
+        return True
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_sec):
+            self.check_now()
 
 # Test isolé
 if __name__ == '__main__':
@@ -130,6 +268,18 @@ if __name__ == '__main__':
     assert not save_fail, "Sauvegarde de non-dict devrait échouer."
     main_test_logger_instance.info(f"Résultat Test 4 - Succès sauvegarde non-dict: {save_fail} (Attendu: False)")
 
+    main_test_logger_instance.info("\nTest 5: Sauvegardes différées regroupées + détection des changements externes")
+    saver = DebouncedSettingsSaver(manager, delay_sec=0.2, on_saved=lambda ok: main_test_logger_instance.info(f"Écriture différée: {ok}"))
+    for i in range(5): saver.schedule({"burst_value": i}) # Une seule écriture attendue (burst_value=4)
+    saver.flush()
+    changes = []
+    watcher = SettingsFileWatcher(manager, on_change=changes.append)
+    assert not watcher.check_now(), "Notre propre écriture ne doit pas déclencher de rechargement."
+    with open(test_settings_file, 'w', encoding='utf-8') as f: json.dump({"burst_value": 99}, f)
+    os.utime(test_settings_file, ns=(0, 1)) # mtime forcé: le test ne dépend pas de la résolution du système de fichiers
+    assert watcher.check_now() and changes == [{"burst_value": 99}], f"Changement externe non détecté: {changes}"
+    main_test_logger_instance.info(f"Résultat Test 5 - Changements externes reçus: {changes}")
+
     if os.path.exists(test_settings_file):
         try: os.remove(test_settings_file)
         except OSError as e_rem_fin: main_test_logger_instance.warning(f"Impossible de supprimer test_settings.json après test: {e_rem_fin}")
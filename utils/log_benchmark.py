@@ -0,0 +1,118 @@
+# mon_bot_social/utils/log_benchmark.py
+"""
+Mesure le coût CPU des logger.debug(...) d'une action quand le niveau DEBUG est filtré:
+f-string construite à chaque appel (ancien style) vs façade LazyLogger (%-style différé, argument callable).
+Résultat en µs CPU par appel et par action (DEBUG_CALLS_PER_ACTION appels).
+En plus (--scenarios): coût des logs d'une vraie action sur MockWebDriver, logger principal à INFO vs DEBUG.
+Usage: python -m utils.log_benchmark [nb_actions] [--scenarios [Follow Like ...]] [--runs N]
+"""
+import time
+import logging
+import argparse
+
+from utils.logger import LazyLogger
+
+# Nombre de logger.debug(...) typiquement traversés par une action Follow (scraping profil + filtres + scheduler)
+DEBUG_CALLS_PER_ACTION = 25
+
+
+class _FakeElement:
+    """Simule un WebElement: get_attribute coûte un aller-retour (ici du travail CPU local)."""
+    def get_attribute(self, name): return "".join(reversed(f"{name}-value-" * 8))
+
+
+def _run_eager(logger, profile_info, element, n_actions):
+    for i in range(n_actions):
+        username = f"user_{i}"
+        for _ in range(DEBUG_CALLS_PER_ACTION):
+            logger.debug(f"Followers {username}: {profile_info['follower_count']} | href={element.get_attribute('href')} | keys={[k for k in profile_info]}")
+
+
+def _run_percent(logger, profile_info, element, n_actions):
+    for i in range(n_actions):
+        username = f"user_{i}"
+        for _ in range(DEBUG_CALLS_PER_ACTION):
+            logger.debug("Followers %s: %s | keys=%s", username, profile_info['follower_count'], profile_info)
+
+
+def _run_percent_callable(logger, profile_info, element, n_actions):
+    for i in range(n_actions):
+        username = f"user_{i}"
+        for _ in range(DEBUG_CALLS_PER_ACTION):
+            logger.debug("Followers %s: %s | href=%s", username, profile_info['follower_count'], lambda: element.get_attribute('href'))
+
+
+RUNNERS = (("f-string (eager)", _run_eager), ("%-style (LazyLogger)", _run_percent),
+           ("%-style + arg callable", _run_percent_callable))
+
+
+def run_benchmark(n_actions=2000):
+    """{libellé: (µs CPU par appel, µs CPU par action)} avec DEBUG filtré (logger à INFO, comme log_file_level=INFO)."""
+    bench_logger = logging.getLogger("LogBenchmark")
+    bench_logger.propagate = False; bench_logger.addHandler(logging.NullHandler())
+    bench_logger.setLevel(logging.INFO)
+    lazy_logger = LazyLogger(bench_logger, {})
+    profile_info = {"follower_count": 1234, "following_count": 321, "post_count": 42, "is_private": False}
+    element = _FakeElement()
+
+    results = {}
+    for label, runner in RUNNERS:
+        cpu_start = time.process_time()
+        runner(lazy_logger, profile_info, element, n_actions)
+        us_per_action = (time.process_time() - cpu_start) / n_actions * 1e6
+        results[label] = (us_per_action / DEBUG_CALLS_PER_ACTION, us_per_action)
+    return results
+
+
+def format_report(results, n_actions):
+    baseline_us = results[RUNNERS[0][0]][1]
+    lines = [f"{n_actions} actions simulées, {DEBUG_CALLS_PER_ACTION} logger.debug par action, niveau DEBUG filtré:"]
+    for label, (us_per_call, us_per_action) in results.items():
+        lines.append(f"  {label:<24} {us_per_call:7.2f} µs/appel {us_per_action:9.1f} µs CPU/action  (économie: {baseline_us - us_per_action:8.1f} µs/action)")
+    return "\n".join(lines)
+
+
+def run_scenario_benchmark(scenarios=None, runs=5):
+    """
+    Variante sur une vraie action (scénarios d'action_benchmark): {scénario: {niveau: ms CPU/exécution}} ou {"error": ...}.
+    Les sinks sont relevés à WARNING: seul le coût côté action (filtrage, formatage dans prepare() de la file) est compté.
+    """
+    from utils import logger as logger_module
+    from automation_engine.action_benchmark import SCENARIOS, run_scenario # Import tardif: sélecteurs, lxml, actions
+    listener = logger_module.log_queue_listener
+    saved_handler_levels = [(handler, handler.level) for handler in (listener.handlers if listener else ())]
+    saved_level = logger_module.app_logger.level
+    results = {}
+    try:
+        for handler, _ in saved_handler_levels: handler.setLevel(logging.WARNING)
+        for name in scenarios or SCENARIOS:
+            run_scenario(name, 1) # Échauffement (imports, parsing des fixtures)
+            results[name] = {}
+            for label, level in (("DEBUG filtré (INFO)", logging.INFO), ("DEBUG actif", logging.DEBUG)):
+                logger_module.app_logger.setLevel(level)
+                cpu_start = time.process_time()
+                result = run_scenario(name, runs)
+                if result["error"]: results[name] = {"error": result["error"]}; break
+                results[name][label] = (time.process_time() - cpu_start) / max(1, result["runs"]) * 1000
+    finally:
+        logger_module.app_logger.setLevel(saved_level)
+        for handler, level in saved_handler_levels: handler.setLevel(level)
+    return results
+
+
+def format_scenario_report(results):
+    lines = []
+    for name, by_level in results.items():
+        if "error" in by_level: lines.append(f"== {name}: ÉCHEC - {by_level['error']}"); continue
+        lines.append(f"== {name}: " + " | ".join(f"{label}: {cpu_ms:.2f} ms CPU/exécution" for label, cpu_ms in by_level.items()))
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Coût des logger.debug quand DEBUG est filtré.")
+    parser.add_argument("n_actions", nargs="?", type=int, default=2000)
+    parser.add_argument("--scenarios", nargs="*", default=None, help="En plus: actions réelles sur MockWebDriver (toutes si vide)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    print(format_report(run_benchmark(args.n_actions), args.n_actions))
+    if args.scenarios is not None: print(format_scenario_report(run_scenario_benchmark(args.scenarios, args.runs)))
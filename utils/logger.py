@@ -2,8 +2,14 @@
 import logging
 import os
 import sys # Pour sys.excepthook
-from logging.handlers import RotatingFileHandler
-from PyQt6.QtCore import QObject, pyqtSignal
+import copy
+import queue
+import atexit
+import threading
+import itertools
+from collections import deque
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from utils.activity_log import ActivityRecordFilter, create_activity_log_handler
 
 # --- Configuration du Path de Log ---
 try:
@@ -16,6 +22,16 @@ LOG_DIR = os.path.join(BASE_PROJECT_DIR, "data_files", "logs") # Mettre les logs
 LOG_FILE_NAME = "app_activity.log"
 LOG_FILE_PATH = os.path.join(LOG_DIR, LOG_FILE_NAME)
 
+# --- Qt optionnel: le mode daemon (daemon.py, MON_BOT_HEADLESS=1) n'importe pas PyQt6 et n'a pas de sink de logs UI ---
+HEADLESS = os.environ.get("MON_BOT_HEADLESS") == "1"
+QT_AVAILABLE = False
+if not HEADLESS:
+    try:
+        from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+        QT_AVAILABLE = True
+    except ImportError:
+        pass
+
 # --- Niveaux de Log ---
 # DEBUG: Informations détaillées, typiquement utiles seulement lors du débogage.
 # INFO: Confirmation que les choses fonctionnent comme prévu.
@@ -27,21 +43,114 @@ DEFAULT_CONSOLE_LEVEL = logging.INFO
 DEFAULT_FILE_LEVEL = logging.DEBUG
 DEFAULT_QT_HANDLER_LEVEL = logging.INFO
 
+# Affichage des logs dans l'UI: lignes en attente max entre deux rafraîchissements, période de rafraîchissement
+QT_LOG_MAX_PENDING_LINES = 1000
+QT_LOG_FLUSH_INTERVAL_MS = 100
+
+# Taille max de la file entre les threads qui loggent et le thread d'écriture (QueueListener)
+LOG_QUEUE_MAX_SIZE = 10000
+
+# --- File bornée: sous pression, on sacrifie d'abord les DEBUG les plus anciens ---
+class DropOldestDebugQueue(queue.Queue):
+    """
+    Queue bornée qui ne bloque jamais l'appelant:
+    - file pleine: retire le plus ancien DEBUG pour faire de la place;
+    - aucun DEBUG à retirer: un DEBUG entrant est abandonné, un INFO+ est ajouté malgré tout (jamais perdu).
+    Les DEBUG sont rangés dans leur propre deque (éviction O(1)); un numéro d'ordre garde l'ordre global à la lecture.
+    """
+    def __init__(self, maxsize=LOG_QUEUE_MAX_SIZE):
+        super().__init__(maxsize)
+        self.dropped_count = 0 # Nombre total de records DEBUG abandonnés
+
+    def _init(self, maxsize):
+        self.queue = deque(); self.debug_queue = deque() # (numéro d'ordre, record)
+        self._sequence = itertools.count()
+
+    def _qsize(self): return len(self.queue) + len(self.debug_queue)
+
+    def _put(self, record):
+        is_debug = record is not None and record.levelno <= logging.DEBUG # None = sentinelle d'arrêt du QueueListener
+        (self.debug_queue if is_debug else self.queue).append((next(self._sequence), record))
+
+    def _get(self):
+        if not self.debug_queue or (self.queue and self.queue[0][0] < self.debug_queue[0][0]): return self.queue.popleft()[1]
+        return self.debug_queue.popleft()[1]
+
+    def put_nowait(self, record):
+        with self.not_full:
+            if 0 < self.maxsize <= self._qsize():
+                if self.debug_queue:
+                    self.debug_queue.popleft(); self.dropped_count += 1
+                    self.unfinished_tasks -= 1 # Record retiré: jamais lu, donc jamais de task_done() (sinon join() bloque)
+                elif record is not None and record.levelno <= logging.DEBUG: self.dropped_count += 1; return
+            self._put(record) # Pas de check maxsize ici: INFO+ passe toujours
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def put(self, record, block=True, timeout=None):
+        self.put_nowait(record) # Jamais bloquant, quelle que soit la demande
+
+# --- Handler de file: ne formate que le message (msg % args), le reste est fait par le thread d'écriture ---
+class NonBlockingQueueHandler(QueueHandler):
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage(); record.args = None # Figer le message: les args peuvent muter côté appelant
+        if record.exc_info:
+            record.exc_text = log_formatter.formatException(record.exc_info); record.exc_info = None # Traceback non picklable/partageable
+        return record
+
 # --- Handler Qt Personnalisé ---
-class QtLogHandler(logging.Handler, QObject):
-    # Définir le signal dans __init__ pour une meilleure compatibilité avec QObject
-    def __init__(self, parent=None):
-        QObject.__init__(self, parent) # Initialiser QObject
-        logging.Handler.__init__(self) # Initialiser Handler
-        self.log_message_signal = pyqtSignal(str) # Maintenant, définir le signal
+class QtLogHandler(logging.Handler):
+    """
+    Accumule les lignes formatées (thread d'écriture des logs) sans toucher à Qt.
+    L'UI les récupère par lots via QtLogBatcher; au-delà de max_pending, les plus anciennes sont supprimées et comptées.
+    """
+    def __init__(self, max_pending=QT_LOG_MAX_PENDING_LINES):
+        super().__init__()
+        self.pending_lines = deque()
+        self.max_pending = max_pending
+        self.suppressed_count = 0
+        self._pending_lock = threading.Lock()
 
     def emit(self, record):
         try:
             msg = self.format(record)
-            self.log_message_signal.emit(msg)
+            with self._pending_lock:
+                self.pending_lines.append(msg)
+                if len(self.pending_lines) > self.max_pending:
+                    self.pending_lines.popleft(); self.suppressed_count += 1
         except Exception:
             self.handleError(record)
 
+    def take_batch(self):
+        """Retourne (lignes en attente, nb de lignes supprimées depuis le dernier lot) et vide le tampon."""
+        with self._pending_lock:
+            if not self.pending_lines and not self.suppressed_count: return [], 0
+            lines = list(self.pending_lines); self.pending_lines.clear()
+            suppressed, self.suppressed_count = self.suppressed_count, 0
+        return lines, suppressed
+
+if QT_AVAILABLE:
+    class QtLogBatcher(QObject):
+        """Côté UI: vide le QtLogHandler toutes les ~100 ms et émet un seul signal par lot."""
+        log_batch_signal = pyqtSignal(list, int) # (lignes, nb supprimées)
+
+        def __init__(self, handler, interval_ms=QT_LOG_FLUSH_INTERVAL_MS, parent=None):
+            super().__init__(parent)
+            self.handler = handler
+            self.timer = QTimer(self)
+            self.timer.setInterval(interval_ms)
+            self.timer.timeout.connect(self.flush)
+
+        def start(self): self.timer.start()
+        def stop(self): self.timer.stop(); self.flush()
+
+        def flush(self):
+            lines, suppressed = self.handler.take_batch()
+            if lines or suppressed: self.log_batch_signal.emit(lines, suppressed)
+else:
+    QtLogBatcher = None
+
 # --- Formateur ---
 log_formatter = logging.Formatter(
     '%(asctime)s - %(levelname)-8s - %(name)-15s - %(module)-15s:%(lineno)d - %(message)s',
@@ -56,8 +165,13 @@ app_logger.propagate = False # Important pour éviter la duplication avec le roo
 # Variable globale pour le handler Qt, pour y accéder depuis l'UI
 qt_log_handler = None
 
+# File et thread d'écriture uniques (console, fichier, Qt): les threads d'action ne font qu'enfiler
+log_queue = None
+log_queue_listener = None
+activity_log_handler = None # Sink JSON-lines (événements d'activité), cf. utils/activity_log.py
+
 def setup_logger():
-    global qt_log_handler # Utiliser la variable globale
+    global qt_log_handler, log_queue, log_queue_listener, activity_log_handler # Utiliser les variables globales
 
     # Si le logger a déjà des handlers, ne pas les rajouter (utile si cette fonction est appelée plusieurs fois)
     if app_logger.hasHandlers():
@@ -74,11 +188,13 @@ def setup_logger():
         print(f"ERREUR CRITIQUE: Impossible de créer le répertoire de logs {LOG_DIR}: {e}. Les logs fichiers seront désactivés.")
         # Optionnel: sortie ou mode dégradé
 
+    sink_handlers = [] # Tous les "puits" sont possédés par le QueueListener, pas par le logger
+
     # 1. Handler Console
     console_handler = logging.StreamHandler(sys.stdout) # Sortie standard
     console_handler.setLevel(DEFAULT_CONSOLE_LEVEL)
     console_handler.setFormatter(log_formatter)
-    app_logger.addHandler(console_handler)
+    sink_handlers.append(console_handler)
 
     # 2. Handler Fichier (Rotatif)
     try:
@@ -86,35 +202,102 @@ def setup_logger():
         file_handler = RotatingFileHandler(LOG_FILE_PATH, maxBytes=2*1024*1024, backupCount=4, encoding='utf-8')
         file_handler.setLevel(DEFAULT_FILE_LEVEL)
         file_handler.setFormatter(log_formatter)
-        app_logger.addHandler(file_handler)
+        sink_handlers.append(file_handler)
     except Exception as e:
-        app_logger.error(f"Impossible de configurer le file handler pour les logs: {e}. Logs fichiers désactivés.", exc_info=True)
+        print(f"ERREUR: Impossible de configurer le file handler pour les logs: {e}. Logs fichiers désactivés.")
 
 
-    # 3. Handler Qt (pour l'UI)
+    # 3. Handler Qt (pour l'UI), absent en mode daemon
     # L'instance est créée au niveau du module pour être accessible
-    if qt_log_handler is None:
+    if QT_AVAILABLE and qt_log_handler is None:
         qt_log_handler = QtLogHandler()
         qt_log_handler.setLevel(DEFAULT_QT_HANDLER_LEVEL)
         qt_log_handler.setFormatter(log_formatter)
-        app_logger.addHandler(qt_log_handler)
+    if qt_log_handler is not None: sink_handlers.append(qt_log_handler)
+
+    # 4. Journal d'activité structuré (JSON-lines, segments gzippés). Les événements n'encombrent pas les autres sinks.
+    try:
+        activity_log_handler = create_activity_log_handler()
+        sink_handlers.append(activity_log_handler)
+    except Exception as e:
+        print(f"ERREUR: Impossible de configurer le journal d'activité JSON: {e}.")
+    for handler in sink_handlers:
+        if handler is not activity_log_handler: handler.addFilter(ActivityRecordFilter(exclude=True))
+
+    # 5. File + thread d'écriture unique
+    log_queue = DropOldestDebugQueue(LOG_QUEUE_MAX_SIZE)
+    log_queue_listener = QueueListener(log_queue, *sink_handlers, respect_handler_level=True)
+    log_queue_listener.start()
+    app_logger.addHandler(NonBlockingQueueHandler(log_queue))
+    atexit.register(shutdown_logging) # Vider la file à la sortie, même sans appel explicite
     
-    app_logger.info("Logger principal 'MonBotSocialApp' configuré avec les handlers Console, Fichier et Qt.")
+    app_logger.info(f"Logger principal 'MonBotSocialApp' configuré (file asynchrone -> Console, Fichier{' et Qt' if qt_log_handler else ''}).")
     return app_logger
 
+def configure_activity_log(max_mb=None, backup_count=None, max_age_days=None):
+    """Applique la rétention (taille/nb de segments/âge) du journal d'activité, ex: depuis les paramètres."""
+    if activity_log_handler is None: return
+    activity_log_handler.reconfigure(max_bytes=int(max_mb * 1024 * 1024) if max_mb else None,
+                                     backup_count=backup_count, max_age_days=max_age_days)
+
+def shutdown_logging():
+    """Vide la file de logs et arrête le thread d'écriture (idempotent)."""
+    global log_queue_listener
+    if log_queue_listener is None: return
+    listener, log_queue_listener = log_queue_listener, None
+    if log_queue is not None and log_queue.dropped_count:
+        app_logger.warning(f"Logger: {log_queue.dropped_count} messages DEBUG abandonnés (file saturée).")
+    try: listener.stop() # Traite les records restants puis joint le thread
+    except Exception as e: print(f"Erreur arrêt du thread de logs: {e}")
+    for handler in listener.handlers:
+        try: handler.flush(); handler.close()
+        except Exception: pass
+
+def apply_log_levels(console_level=None, file_level=None):
+    """
+    Ajuste les niveaux des sinks console/fichier et aligne le niveau du logger principal sur le plus bas,
+    pour que les messages qu'aucun sink n'écrira soient écartés AVANT d'être construits (cf. LazyLogger).
+    """
+    if log_queue_listener is None: return
+    for handler in log_queue_listener.handlers:
+        if isinstance(handler, RotatingFileHandler) and handler is not activity_log_handler:
+            if file_level is not None: handler.setLevel(file_level)
+        elif isinstance(handler, logging.StreamHandler) and not isinstance(handler, RotatingFileHandler):
+            if console_level is not None: handler.setLevel(console_level)
+    app_logger.setLevel(min(handler.level or logging.DEBUG for handler in log_queue_listener.handlers))
+
+# --- Façade de log à formatage différé ---
+class LazyLogger(logging.LoggerAdapter):
+    """
+    Style attendu: chaîne simple, ou %-style `logger.debug("... %s ...", valeur)` (formatage différé, fait dans
+    prepare() de la file, jamais si le niveau est filtré). Une valeur coûteuse à obtenir (aller-retour WebDriver...)
+    se garde par `if logger.isEnabledFor(logging.DEBUG): ...`.
+    Compatibilité: un message ou un argument callable n'est évalué que si le niveau est actif.
+    """
+    def process(self, msg, kwargs): return msg, kwargs
+
+    def log(self, level, msg, *args, **kwargs):
+        if not self.isEnabledFor(level): return
+        if callable(msg): msg = msg()
+        if args: args = tuple(arg() if callable(arg) else arg for arg in args)
+        kwargs["stacklevel"] = kwargs.get("stacklevel", 1) + 1 # %(module)s/%(lineno)d = appelant, pas cette façade
+        self.logger.log(level, msg, *args, **kwargs)
+
 # --- Fonction d'Accès au Logger ---
 _initialized_logger = None
+_lazy_loggers = {}
 def get_logger(name="Default"): # Donner un nom par défaut
-    """Retourne une instance du logger principal ou un logger enfant."""
+    """Retourne le logger principal ou un logger enfant, enveloppé dans la façade LazyLogger."""
     global _initialized_logger
     if _initialized_logger is None:
         _initialized_logger = setup_logger()
 
     # Optionnel: Si 'name' est fourni et différent du logger principal, créer un logger enfant
     # Cela aide à identifier la source du log plus facilement
-    if name and name != "MonBotSocialApp" and name != "Default":
-        return logging.getLogger(f"MonBotSocialApp.{name}")
-    return _initialized_logger
+    logger_name = f"MonBotSocialApp.{name}" if name and name != "MonBotSocialApp" and name != "Default" else "MonBotSocialApp"
+    if logger_name not in _lazy_loggers:
+        _lazy_loggers[logger_name] = LazyLogger(logging.getLogger(logger_name), {})
+    return _lazy_loggers[logger_name]
 
 
 # Appel initial pour configurer le logger principal dès l'import du module
@@ -149,20 +332,18 @@ if __name__ == '__main__':
     print("\n--- Simulation de la connexion au signal Qt ---")
     if qt_log_handler: # Vérifier que le handler a été créé
         test_slot_messages = []
-        def my_test_slot(message_from_signal):
-            print(f"[SLOT QT SIMULÉ REÇU] {message_from_signal.strip()}")
-            test_slot_messages.append(message_from_signal)
+        def my_test_slot(lines_from_signal, suppressed_count):
+            for line in lines_from_signal: print(f"[SLOT QT SIMULÉ REÇU] {line.strip()}")
+            test_slot_messages.extend(lines_from_signal)
 
-        # Connecter
-        qt_log_handler.log_message_signal.connect(my_test_slot)
+        # Connecter (sans boucle Qt, le lot est vidé manuellement au lieu du QTimer)
+        batcher = QtLogBatcher(qt_log_handler)
+        batcher.log_batch_signal.connect(my_test_slot)
         
         test_logger_setup.info("Ce message devrait apparaître dans le slot Qt simulé.")
         child_logger.error("Cette erreur devrait aussi apparaître dans le slot.")
-        
-        # Déconnecter pour éviter des problèmes si ce script est ré-exécuté
-        try:
-            qt_log_handler.log_message_signal.disconnect(my_test_slot)
-        except TypeError: pass # Peut arriver si déjà déconnecté ou si le slot n'était pas valide
+        shutdown_logging() # Les sinks sont alimentés par le thread d'écriture: vider la file avant de vérifier
+        batcher.flush()
 
         print(f"Messages reçus par le slot simulé: {len(test_slot_messages)}")
         assert len(test_slot_messages) >= 2, "Le signal Qt n'a pas émis correctement."
@@ -0,0 +1,305 @@
+# mon_bot_social/utils/metrics.py
+"""
+Registre de métriques en mémoire (compteurs, jauges, histogrammes à la HDR) et export au format texte Prometheus:
+fichier écrit périodiquement (collecteur "textfile" de node_exporter) et/ou endpoint HTTP local (127.0.0.1/metrics).
+Les histogrammes utilisent des seaux log-linéaires (erreur relative bornée, ~1/HISTOGRAM_SUB_BUCKETS) pour donner
+des percentiles précis sans stocker les valeurs; l'export Prometheus les regroupe sur des bornes `le` fixes.
+"""
+import os
+import math
+import time
+import tempfile
+import threading
+
+from utils.logger import get_logger
+
+logger = get_logger("Metrics")
+
+HISTOGRAM_MIN_VALUE = 0.0005 # 0,5 ms: en dessous, tout tombe dans le premier seau
+HISTOGRAM_SUB_BUCKETS = 16   # Seaux par puissance de 2 -> erreur relative <= 1/16 (~6 %)
+# Bornes `le` exportées (secondes): de 1 ms à 30 min
+PROMETHEUS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+DEFAULT_EXPORT_INTERVAL_SEC = 15
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _label_key(labelnames, labels):
+    if set(labels) != set(labelnames): raise ValueError(f"Labels attendus {labelnames}, reçus {tuple(labels)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+def _escape_label_value(value): return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames, key, extra=()):
+    pairs = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(labelnames, key)] + [f'{name}="{value}"' for name, value in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == math.inf: return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    metric_type = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name; self.documentation = documentation; self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {} # clé de labels -> valeur (ou état d'histogramme)
+
+    def _header(self): return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+
+    def clear(self):
+        with self._lock: self._values.clear()
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock: self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels): return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def render(self):
+        with self._lock: items = sorted(self._values.items())
+        return self._header() + [f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    metric_type = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._functions = {} # clé de labels -> callable évalué à l'export (ex: nb de tâches actives)
+
+    def set(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock: self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock: self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels): self.inc(-amount, **labels)
+
+    def set_function(self, function, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock: self._functions[key] = function
+
+    def value(self, **labels):
+        key = _label_key(self.labelnames, labels)
+        function = self._functions.get(key)
+        return function() if function else self._values.get(key, 0)
+
+    def render(self):
+        with self._lock: items = dict(self._values); functions = dict(self._functions)
+        for key, function in functions.items():
+            try: items[key] = function()
+            except Exception as e: logger.debug("Jauge %s: fonction en erreur (%s).", self.name, e)
+        return self._header() + [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in sorted(items.items())]
+
+
+class _HistogramState:
+    __slots__ = ("buckets", "count", "sum", "min", "max")
+
+    def __init__(self):
+        self.buckets = {} # index de seau log-linéaire -> nombre d'observations
+        self.count = 0; self.sum = 0.0; self.min = math.inf; self.max = 0.0
+
+
+def _bucket_index(value):
+    if value <= HISTOGRAM_MIN_VALUE: return 0
+    mantissa, exponent = math.frexp(value / HISTOGRAM_MIN_VALUE) # value/min = mantissa * 2**exponent, mantissa dans [0.5, 1)
+    return (exponent - 1) * HISTOGRAM_SUB_BUCKETS + int((mantissa * 2 - 1) * HISTOGRAM_SUB_BUCKETS) + 1
+
+
+def _bucket_upper_bound(index):
+    if index == 0: return HISTOGRAM_MIN_VALUE
+    exponent, sub_bucket = divmod(index - 1, HISTOGRAM_SUB_BUCKETS)
+    return HISTOGRAM_MIN_VALUE * (2 ** exponent) * (1 + (sub_bucket + 1) / HISTOGRAM_SUB_BUCKETS)
+
+
+class Histogram(_Metric):
+    """Histogramme à seaux log-linéaires: percentiles avec erreur relative bornée, mémoire proportionnelle à l'étendue."""
+    metric_type = "histogram"
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        index = _bucket_index(max(0.0, value))
+        with self._lock:
+            state = self._values.get(key)
+            if state is None: state = self._values[key] = _HistogramState()
+            state.buckets[index] = state.buckets.get(index, 0) + 1
+            state.count += 1; state.sum += value
+            if value < state.min: state.min = value
+            if value > state.max: state.max = value
+
+    def time(self, **labels):
+        """Context manager: observe la durée du bloc (secondes, horloge monotone)."""
+        return _Timer(self, labels)
+
+    def percentiles(self, quantiles=(0.5, 0.9, 0.99), **labels):
+        """{quantile: valeur} (borne haute du seau, plafonnée au max observé), ou {} si aucune observation."""
+        with self._lock:
+            state = self._values.get(_label_key(self.labelnames, labels))
+            if not state or not state.count: return {}
+            buckets = sorted(state.buckets.items()); count = state.count; max_value = state.max
+        results = {}
+        for quantile in quantiles:
+            rank = max(1, math.ceil(quantile * count)); seen = 0
+            for index, bucket_count in buckets:
+                seen += bucket_count
+                if seen >= rank: results[quantile] = min(_bucket_upper_bound(index), max_value); break
+        return results
+
+    def summary(self, **labels):
+        with self._lock:
+            state = self._values.get(_label_key(self.labelnames, labels))
+            if not state or not state.count: return None
+            count, total, min_value, max_value = state.count, state.sum, state.min, state.max
+        return {"count": count, "sum": total, "min": min_value, "max": max_value, "mean": total / count,
+                **{f"p{int(q * 100)}": value for q, value in self.percentiles(**labels).items()}}
+
+    def label_keys(self):
+        with self._lock: return sorted(self._values)
+
+    def render(self):
+        lines = self._header()
+        with self._lock:
+            items = sorted((key, sorted(state.buckets.items()), state.count, state.sum) for key, state in self._values.items())
+        for key, buckets, count, total in items:
+            cumulative = 0; bucket_iter = iter(buckets); pending = next(bucket_iter, None)
+            for bound in PROMETHEUS_BUCKETS + (math.inf,):
+                while pending is not None and _bucket_upper_bound(pending[0]) <= bound * (1 + 1e-9):
+                    cumulative += pending[1]; pending = next(bucket_iter, None)
+                if bound == math.inf: cumulative = count
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, (('le', _format_value(float(bound)) if bound != math.inf else '+Inf'),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(float(total))}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started_at")
+
+    def __init__(self, histogram, labels): self.histogram = histogram; self.labels = labels
+
+    def __enter__(self): self.started_at = time.perf_counter(); return self
+    def __exit__(self, exc_type, exc, tb): self.histogram.observe(time.perf_counter() - self.started_at, **self.labels); return False
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {} # nom -> métrique (ordre d'enregistrement conservé)
+
+    def _get_or_create(self, metric_class, name, documentation, labelnames):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None: metric = self._metrics[name] = metric_class(name, documentation, labelnames)
+            elif not isinstance(metric, metric_class) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Métrique '{name}' déjà déclarée avec un autre type ou d'autres labels.")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()): return self._get_or_create(Counter, name, documentation, labelnames)
+    def gauge(self, name, documentation, labelnames=()): return self._get_or_create(Gauge, name, documentation, labelnames)
+    def histogram(self, name, documentation, labelnames=()): return self._get_or_create(Histogram, name, documentation, labelnames)
+
+    def get(self, name): return self._metrics.get(name)
+
+    def clear(self):
+        """Remet toutes les valeurs à zéro (les déclarations restent)."""
+        with self._lock: metrics = list(self._metrics.values())
+        for metric in metrics: metric.clear()
+
+    def render_prometheus(self):
+        with self._lock: metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics: lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, file_path):
+        """Écriture atomique (fichier temporaire + rename): le collecteur ne lit jamais un fichier à moitié écrit."""
+        directory = os.path.dirname(os.path.abspath(file_path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix=".metrics-", suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f: f.write(self.render_prometheus())
+                os.replace(temp_path, file_path)
+            except BaseException:
+                if os.path.exists(temp_path): os.remove(temp_path)
+                raise
+            return True
+        except OSError as e:
+            logger.error(f"Écriture des métriques dans {file_path} impossible: {e}"); return False
+
+
+metrics = MetricsRegistry() # Registre partagé (TaskScheduler, BrowserHandler, couche DB)
+
+
+class MetricsExporter:
+    """Export périodique vers un fichier texte et/ou serveur HTTP local. Chaque sortie est optionnelle (None/0 = désactivée)."""
+
+    def __init__(self, registry=metrics, textfile_path=None, http_port=0, http_host="127.0.0.1", interval_sec=DEFAULT_EXPORT_INTERVAL_SEC):
+        self.registry = registry; self.textfile_path = textfile_path
+        self.http_port = http_port; self.http_host = http_host; self.interval_sec = interval_sec
+        self._stop_event = threading.Event()
+        self._thread = None; self._http_server = None
+
+    def start(self):
+        if self.http_port:
+            from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer # Import tardif: http.server/ssl seulement si exposé
+            registry = self.registry
+
+            class MetricsRequestHandler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?", 1)[0] not in ("/metrics", "/"): self.send_error(404); return
+                    body = registry.render_prometheus().encode("utf-8")
+                    self.send_response(200); self.send_header("Content-Type", CONTENT_TYPE); self.send_header("Content-Length", str(len(body)))
+                    self.end_headers(); self.wfile.write(body)
+
+                def log_message(self, format, *args): pass # Pas de log par requête de scrape
+
+            try:
+                self._http_server = ThreadingHTTPServer((self.http_host, self.http_port), MetricsRequestHandler)
+                threading.Thread(target=self._http_server.serve_forever, name="MetricsHTTP", daemon=True).start()
+                logger.info(f"Métriques exposées sur http://{self.http_host}:{self._http_server.server_address[1]}/metrics")
+            except OSError as e:
+                logger.error(f"Serveur de métriques sur le port {self.http_port} impossible: {e}"); self._http_server = None
+        if self.textfile_path:
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="MetricsTextfile", daemon=True); self._thread.start()
+            logger.info(f"Métriques écrites toutes les {self.interval_sec}s dans {self.textfile_path}")
+        return bool(self._http_server or self._thread)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self.registry.write_textfile(self.textfile_path)
+            self._stop_event.wait(self.interval_sec)
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread: self._thread.join(timeout=5); self._thread = None
+        if self.textfile_path: self.registry.write_textfile(self.textfile_path) # Dernières valeurs
+        if self._http_server: self._http_server.shutdown(); self._http_server.server_close(); self._http_server = None
+
+
+if __name__ == '__main__':
+    import random
+    import urllib.request
+    demo_registry = MetricsRegistry()
+    durations = demo_registry.histogram("demo_action_duration_seconds", "Durée des actions", ("action",))
+    skipped = demo_registry.counter("demo_actions_skipped", "Actions sautées", ("reason",))
+    active = demo_registry.gauge("demo_active_tasks", "Tâches actives")
+    for _ in range(5000): durations.observe(random.lognormvariate(1.5, 0.6), action="follow")
+    skipped.inc(reason="pause"); skipped.inc(3, reason="budget"); active.set_function(lambda: 2)
+    print(f"Percentiles follow: { {q: round(v, 2) for q, v in durations.percentiles(action='follow').items()} }")
+    print(f"Résumé: {durations.summary(action='follow')}")
+    exporter = MetricsExporter(demo_registry, http_port=18999); exporter.start()
+    try: print(urllib.request.urlopen("http://127.0.0.1:18999/metrics", timeout=2).read().decode()[:900])
+    finally: exporter.stop()
@@ -0,0 +1,125 @@
+# mon_bot_social/utils/sampling_profiler.py
+"""
+Profileur par échantillonnage activable à chaud (onglet Stats, daemon): un thread lit périodiquement la pile de TOUS
+les threads (sys._current_frames: workers APScheduler, thread Qt principal, writer DB, logs...) sans rien instrumenter.
+Chaque échantillon est préfixé par le nom du thread et, si un `tagger` est fourni, par l'action/tâche en cours sur ce
+thread. Sortie au format "collapsed stacks" (une pile par ligne, frames séparées par ';', puis le nombre d'échantillons),
+lisible par flamegraph.pl, speedscope ou inferno.
+"""
+import os
+import sys
+import time
+import datetime
+import threading
+
+from utils.logger import get_logger
+
+logger = get_logger("Profiler")
+
+PROFILES_DIR = os.path.join("data_files", "profiles")
+DEFAULT_INTERVAL_SEC = 0.02 # 50 échantillons/s: coût négligeable, assez pour des sessions de plusieurs minutes
+MAX_STACK_DEPTH = 128
+
+
+class SamplingProfiler:
+    def __init__(self, interval_sec=DEFAULT_INTERVAL_SEC, output_dir=PROFILES_DIR, tagger=None):
+        self.interval_sec = interval_sec
+        self.output_dir = output_dir
+        self.tagger = tagger # callable(thread_ident) -> nom d'action/tâche en cours, ou None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._code_labels = {} # code -> "module:Classe.méthode" (évite de reformater à chaque échantillon)
+        self._reset()
+
+    def _reset(self):
+        self.stacks = {} # pile "collapsed" -> nombre d'échantillons
+        self.sample_count = 0; self.sampling_time_sec = 0.0; self.started_at = None
+
+    def is_running(self): return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval_sec=None):
+        """Démarre l'échantillonnage (remet les compteurs à zéro). Retourne False si déjà actif."""
+        with self._lock:
+            if self.is_running(): return False
+            if interval_sec: self.interval_sec = interval_sec
+            self._reset(); self.started_at = time.time(); self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="SamplingProfiler", daemon=True); self._thread.start()
+        logger.info(f"Profilage démarré ({1 / self.interval_sec:.0f} échantillons/s, tous les threads).")
+        return True
+
+    def stop(self, write=True):
+        """Arrête l'échantillonnage. Retourne le chemin du fichier écrit (ou None si rien à écrire / write=False)."""
+        with self._lock:
+            if not self._thread: return None
+            self._stop_event.set(); self._thread.join(timeout=5); self._thread = None
+        elapsed_sec = time.time() - self.started_at
+        overhead_pct = self.sampling_time_sec / elapsed_sec * 100 if elapsed_sec else 0
+        logger.info(f"Profilage arrêté: {self.sample_count} échantillons en {elapsed_sec:.0f} s (coût ~{overhead_pct:.1f} % d'un cœur).")
+        return self.write_collapsed() if write else None
+
+    def toggle(self):
+        """Démarre ou arrête (commande unique pour l'UI / un signal). Retourne (actif, chemin écrit ou None)."""
+        if self.is_running(): return False, self.stop()
+        return self.start(), None
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        while not self._stop_event.wait(self.interval_sec):
+            started_at = time.perf_counter()
+            self._sample(own_ident)
+            self.sampling_time_sec += time.perf_counter() - started_at
+
+    def _frame_label(self, frame):
+        code = frame.f_code
+        label = self._code_labels.get(code)
+        if label is None:
+            module = frame.f_globals.get("__name__", "?")
+            label = self._code_labels[code] = f"{module}:{getattr(code, 'co_qualname', code.co_name)}".replace(";", ",")
+        return label
+
+    def _sample(self, own_ident):
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident: continue
+            labels = []
+            while frame is not None and len(labels) < MAX_STACK_DEPTH:
+                labels.append(self._frame_label(frame)); frame = frame.f_back
+            labels.append(f"thread:{thread_names.get(ident, ident)}".replace(";", ","))
+            action = self.tagger(ident) if self.tagger else None
+            if action: labels.append(f"action:{action}")
+            stack = ";".join(reversed(labels)) # Racine d'abord (action, thread, puis frames)
+            self.stacks[stack] = self.stacks.get(stack, 0) + 1
+        self.sample_count += 1
+
+    def write_collapsed(self, file_path=None):
+        if not self.stacks: logger.info("Profilage: aucun échantillon à écrire."); return None
+        if file_path is None:
+            stamp = datetime.datetime.fromtimestamp(self.started_at).strftime("%Y%m%d-%H%M%S")
+            file_path = os.path.join(self.output_dir, f"profile-{stamp}.folded")
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+            with open(file_path, 'w', encoding='utf-8') as f:
+                for stack, count in sorted(self.stacks.items(), key=lambda kv: kv[1], reverse=True): f.write(f"{stack} {count}\n")
+            logger.info(f"Profil écrit: {file_path} ({len(self.stacks)} piles distinctes)."); return file_path
+        except OSError as e:
+            logger.error(f"Écriture du profil {file_path} impossible: {e}"); return None
+
+    def top_frames(self, top=10):
+        """Frames les plus présentes en feuille de pile (temps propre): [(frame, échantillons)]."""
+        leaves = {}
+        for stack, count in list(self.stacks.items()):
+            leaf = stack.rsplit(";", 1)[-1]; leaves[leaf] = leaves.get(leaf, 0) + count
+        return sorted(leaves.items(), key=lambda kv: kv[1], reverse=True)[:top]
+
+
+if __name__ == '__main__':
+    def busy_loop(stop_at):
+        total = 0
+        while time.time() < stop_at: total += sum(i * i for i in range(1000))
+    profiler = SamplingProfiler(interval_sec=0.005, output_dir=os.path.join(PROFILES_DIR, "demo"),
+                                tagger=lambda ident: "demo_task" if ident == worker.ident else None)
+    worker = threading.Thread(target=busy_loop, args=(time.time() + 1.5,), name="DemoWorker")
+    profiler.start(); worker.start(); worker.join()
+    print(f"Fichier: {profiler.stop()}")
+    print("Top frames (feuilles):", profiler.top_frames(5))
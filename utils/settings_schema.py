@@ -0,0 +1,303 @@
+# mon_bot_social/utils/settings_schema.py
+"""
+Schéma typé des paramètres: une dataclass figée (slots) par sous-système, construite UNE fois par
+update_settings() à partir du dict settings.json. Défauts et bornes sont définis ici seulement
+(ils divergeaient entre l'UI, le scheduler et les actions), les valeurs hors bornes sont corrigées et signalées.
+Chaque instantané porte un numéro de version: les caches peuvent s'y indexer.
+"""
+import re
+import dataclasses
+from dataclasses import dataclass, field
+from types import MappingProxyType
+
+from utils.logger import get_logger
+
+logger = get_logger("Settings")
+
+
+def _setting(key, default, min_value=None, max_value=None, choices=None):
+    """Champ relié à une clé de settings.json, avec défaut et bornes (appliqués par _build_section)."""
+    return field(default=default, metadata={"key": key, "min": min_value, "max": max_value, "choices": choices})
+
+
+def _compile_keywords(keywords_str):
+    """'a, b' -> motifs compilés (mots entiers, insensibles à la casse). Compilés une fois par version des settings."""
+    keywords = [kw.strip().lower() for kw in (keywords_str or "").split(',') if kw.strip()]
+    return tuple(re.compile(r'\b' + re.escape(kw) + r'\b', re.IGNORECASE) for kw in keywords)
+
+
+@dataclass(frozen=True, slots=True)
+class DelayRange:
+    min_sec: int
+    max_sec: int
+
+
+# Tâche -> (clé min, clé max, défaut min, défaut max, unité en secondes). Mêmes défauts que l'onglet Paramètres.
+DELAY_SPECS = {
+    "follow": ("follow_delay_min", "follow_delay_max", 30, 120, 1),
+    "unfollow": ("unfollow_delay_min", "unfollow_delay_max", 30, 120, 1),
+    "like": ("like_delay_min", "like_delay_max", 20, 100, 1),
+    "comment": ("comment_delay_min", "comment_delay_max", 60, 180, 1),
+    "view_story": ("view_story_delay_min", "view_story_delay_max", 10, 30, 1),
+    "check_followers": ("check_followers_delay_min_minutes", "check_followers_delay_max_minutes", 15, 45, 60), # Saisi en minutes
+    "accept_request": ("accept_request_delay_min", "accept_request_delay_max", 20, 90, 1),
+    "dm_after_follow": ("dm_after_follow_delay_min", "dm_after_follow_delay_max", 5, 20, 1),
+    "post_interaction_like": ("post_interaction_like_delay_min", "post_interaction_like_delay_max", 3, 10, 1),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class DelaySettings:
+    ranges: MappingProxyType = field(default_factory=lambda: MappingProxyType({})) # nom -> DelayRange (secondes)
+    enable_dynamic_speed: bool = _setting("enable_dynamic_speed", False)
+    off_peak_delay_multiplier: float = _setting("off_peak_delay_multiplier", 1.5, 1.0, 5.0)
+    delay_between_users_like: int = _setting("delay_between_users_like", 15, 0, 3600)
+    delay_between_user_story_view: int = _setting("delay_between_user_story_view", 5, 0, 3600)
+    delay_between_accepts: int = _setting("delay_between_accepts", 3, 0, 600)
+
+    def for_key(self, min_key):
+        """DelayRange correspondant à une clé *_delay_min (compatibilité avec les clés de TaskScheduler)."""
+        for name, spec in DELAY_SPECS.items():
+            if spec[0] == min_key: return self.ranges.get(name)
+        return None
+
+
+@dataclass(frozen=True, slots=True)
+class SessionSettings:
+    enable_activity_times: bool = _setting("enable_activity_times", False)
+    time1_start: str = _setting("time1_start", "08:00"); time1_end: str = _setting("time1_end", "11:00")
+    time2_start: str = _setting("time2_start", "13:00"); time2_end: str = _setting("time2_end", "16:00")
+    time3_start: str = _setting("time3_start", "19:00"); time3_end: str = _setting("time3_end", "22:30")
+    enable_target_timezone: bool = _setting("enable_target_timezone", False)
+    target_timezone: str = _setting("target_timezone", "UTC")
+    max_actions_per_session: int = _setting("max_actions_per_session", 150, 0, 100000)
+    actions_before_break: int = _setting("actions_before_break", 40, 1, 10000)
+    break_duration_min: int = _setting("break_duration_min", 5, 1, 600)
+    break_duration_max: int = _setting("break_duration_max", 15, 1, 1200)
+    enable_distractions: bool = _setting("enable_distractions", False)
+    distraction_actions_min: int = _setting("distraction_actions_min", 10, 1, 1000)
+    distraction_actions_max: int = _setting("distraction_actions_max", 25, 1, 1000)
+    distraction_duration_min_sec: int = _setting("distraction_duration_min_sec", 60, 1, 3600)
+    distraction_duration_max_sec: int = _setting("distraction_duration_max_sec", 180, 1, 7200)
+    fatigue_threshold: int = _setting("fatigue_threshold", 100, 0, 100000)
+    fatigue_pause_multiplier: float = _setting("fatigue_pause_multiplier", 1.8, 1.0, 10.0)
+    enable_network_disconnect_sim: bool = _setting("enable_network_disconnect_sim", False)
+    net_disconnect_interval_min_min: int = _setting("net_disconnect_interval_min_min", 30, 1, 1440)
+    net_disconnect_interval_max_min: int = _setting("net_disconnect_interval_max_min", 90, 1, 2880)
+    net_disconnect_duration_min_sec: int = _setting("net_disconnect_duration_min_sec", 60, 1, 3600)
+    net_disconnect_duration_max_sec: int = _setting("net_disconnect_duration_max_sec", 120, 1, 7200)
+    stop_on_block_delay: int = _setting("stop_on_block_delay", 10, 1, 1440) # Minutes
+
+
+@dataclass(frozen=True, slots=True)
+class FollowFilterSettings:
+    skip_followers: bool = _setting("filter_skip_followers", False)
+    skip_following: bool = _setting("filter_skip_following", True)
+    skip_no_profile_pic: bool = _setting("filter_skip_no_profile_pic", True)
+    skip_private: bool = _setting("filter_skip_private", False)
+    only_private: bool = _setting("filter_only_private", False)
+    profile_type: str = _setting("filter_profile_type", "Tous types")
+    must_have_story: bool = _setting("filter_must_have_story", False)
+    min_posts: int = _setting("filter_min_posts", 0, 0); max_posts: int = _setting("filter_max_posts", 0, 0)
+    min_followers: int = _setting("filter_min_followers", 0, 0); max_followers: int = _setting("filter_max_followers", 0, 0)
+    min_following: int = _setting("filter_min_following", 0, 0); max_following: int = _setting("filter_max_following", 0, 0)
+    min_ratio: float = _setting("filter_min_ratio", 0.0, 0.0); max_ratio: float = _setting("filter_max_ratio", 0.0, 0.0)
+    max_days_last_post: int = _setting("filter_max_days_last_post", 0, 0)
+    bio_keywords_include: str = _setting("filter_bio_keywords_include", "")
+    bio_keywords_exclude: str = _setting("filter_bio_keywords_exclude", "")
+    bio_include_patterns: tuple = () # Dérivés de bio_keywords_* à la construction
+    bio_exclude_patterns: tuple = ()
+
+
+@dataclass(frozen=True, slots=True)
+class LikeFilterSettings:
+    skip_sponsored: bool = _setting("like_filter_skip_sponsored", True)
+    caption_include: str = _setting("like_filter_caption_include", "")
+    caption_exclude: str = _setting("like_filter_caption_exclude", "")
+    photo_max_age_days: int = _setting("photo_filter_max_age_days", 14, 0, 3650)
+    caption_include_patterns: tuple = ()
+    caption_exclude_patterns: tuple = ()
+
+
+@dataclass(frozen=True, slots=True)
+class UnfollowFilterSettings:
+    min_days_before: int = _setting("unfollow_min_days_before", 7, 0, 3650)
+    only_non_followers: bool = _setting("unfollow_only_non_followers", True)
+    inactive_days_threshold: int = _setting("unfollow_inactive_days_threshold", 0, 0, 3650)
+    ratio_min: float = _setting("unfollow_filter_ratio_min", 0.0, 0.0)
+    ratio_max: float = _setting("unfollow_filter_ratio_max", 0.0, 0.0)
+    protect_min_followers: int = _setting("unfollow_protect_min_followers", 10000, 0)
+
+
+@dataclass(frozen=True, slots=True)
+class BrowserSettings:
+    manual_login: bool = _setting("manual_login", True)
+    always_clear_cookies_on_startup: bool = _setting("always_clear_cookies_on_startup", True)
+    use_webdriver_manager: bool = _setting("use_webdriver_manager", True)
+    disable_browser_images: bool = _setting("disable_browser_images", False)
+    page_load_timeout_sec: int = _setting("page_load_timeout_sec", 30, 5, 600)
+    script_timeout_sec: int = _setting("script_timeout_sec", 20, 5, 600)
+    custom_user_agent_input: str = _setting("custom_user_agent_input", "")
+    proxy_enabled: bool = _setting("proxy_enabled", False)
+    instrument_webdriver: bool = _setting("instrument_webdriver", True) # Comptage des commandes WebDriver (onglet Stats)
+
+
+@dataclass(frozen=True, slots=True)
+class LoggingSettings:
+    log_console_level: str = _setting("log_console_level", "INFO", choices=("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"))
+    log_file_level: str = _setting("log_file_level", "DEBUG", choices=("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"))
+    activity_log_max_mb: float = _setting("activity_log_max_mb", 10.0, 0.1, 1024)
+    activity_log_backup_count: int = _setting("activity_log_backup_count", 30, 1, 1000)
+    activity_log_max_age_days: int = _setting("activity_log_max_age_days", 90, 0, 3650)
+    # Export des métriques (utils/metrics.py): fichier texte Prometheus ("" = désactivé), port HTTP local (0 = désactivé)
+    metrics_textfile_path: str = _setting("metrics_textfile_path", "")
+    metrics_http_port: int = _setting("metrics_http_port", 0, 0, 65535)
+    metrics_export_interval_sec: int = _setting("metrics_export_interval_sec", 15, 1, 3600)
+    profiler_interval_ms: int = _setting("profiler_interval_ms", 20, 1, 1000) # Profilage à chaud (utils/sampling_profiler.py)
+
+
+@dataclass(frozen=True, slots=True)
+class DatabaseSettings:
+    # Journal action_events: événements bruts gardés N jours (après repli), agrégats horaires N jours (journaliers: conservés)
+    action_events_retention_days: int = _setting("action_events_retention_days", 14, 1, 3650)
+    hourly_rollup_retention_days: int = _setting("hourly_rollup_retention_days", 90, 1, 3650)
+    # Rétention par table (jours, 0 = conserver, par défaut: purge sur option uniquement), appliquée par data_layer/maintenance.py
+    retention_liked_posts_days: int = _setting("retention_liked_posts_days", 0, 0, 3650)
+    retention_commented_posts_days: int = _setting("retention_commented_posts_days", 0, 0, 3650)
+    retention_viewed_stories_days: int = _setting("retention_viewed_stories_days", 0, 0, 3650)
+    retention_followed_users_days: int = _setting("retention_followed_users_days", 0, 0, 3650) # Lignes qui ne sont plus suivies (historique utilisé par unfollow/dédoublonnage)
+    maintenance_enabled: bool = _setting("maintenance_enabled", True)
+    maintenance_interval_hours: int = _setting("maintenance_interval_hours", 24, 1, 24 * 30)
+    maintenance_min_idle_minutes: int = _setting("maintenance_min_idle_minutes", 15, 1, 24 * 60) # Pause/hors plage assez longue
+
+
+@dataclass(frozen=True, slots=True)
+class BotSettings:
+    """Instantané immuable des paramètres. `get(key, default)` reste disponible pour les clés hors schéma."""
+    version: int
+    delays: DelaySettings
+    session: SessionSettings
+    follow_filters: FollowFilterSettings
+    like_filters: LikeFilterSettings
+    unfollow_filters: UnfollowFilterSettings
+    browser: BrowserSettings
+    logging: LoggingSettings
+    database: DatabaseSettings
+    values: MappingProxyType # clé settings.json -> valeur validée (schéma) ou brute (hors schéma)
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+
+SECTION_CLASSES = (DelaySettings, SessionSettings, FollowFilterSettings, LikeFilterSettings, UnfollowFilterSettings, BrowserSettings,
+                   LoggingSettings, DatabaseSettings)
+SECTION_NAMES = ("delays", "session", "follow_filters", "like_filters", "unfollow_filters", "browser", "logging", "database") # Attributs de BotSettings
+_MISSING = object()
+
+
+def _coerce(raw_value, spec_field, problems):
+    meta = spec_field.metadata; key = meta["key"]; default = spec_field.default
+    if raw_value is None: return default
+    value_type = spec_field.type if isinstance(spec_field.type, type) else type(default) # Type annoté (float: 10 accepte 0.5)
+    try:
+        if value_type is bool: value = raw_value if isinstance(raw_value, bool) else str(raw_value).strip().lower() in ("1", "true", "yes", "oui")
+        elif value_type is int: value = int(raw_value)
+        elif value_type is float: value = float(raw_value)
+        else: value = str(raw_value)
+    except (TypeError, ValueError):
+        problems.append(f"{key}={raw_value!r} invalide -> {default!r}"); return default
+    if meta["choices"] and value not in meta["choices"]:
+        problems.append(f"{key}={value!r} hors choix {meta['choices']} -> {default!r}"); return default
+    if meta["min"] is not None and value < meta["min"]: problems.append(f"{key}={value} < {meta['min']}"); value = value_type(meta["min"])
+    if meta["max"] is not None and value > meta["max"]: problems.append(f"{key}={value} > {meta['max']}"); value = value_type(meta["max"])
+    return value
+
+
+def _build_section(section_class, raw_settings, validated_values, problems, **extra):
+    kwargs = {}
+    for spec_field in dataclasses.fields(section_class):
+        if "key" not in spec_field.metadata: continue
+        value = _coerce(raw_settings.get(spec_field.metadata["key"]), spec_field, problems)
+        kwargs[spec_field.name] = value; validated_values[spec_field.metadata["key"]] = value
+    kwargs.update(extra)
+    return section_class(**kwargs)
+
+
+def _ordered_pair(min_value, max_value, label, problems):
+    if min_value > max_value: problems.append(f"{label}: min {min_value} > max {max_value} (inversés)"); return max_value, min_value
+    return min_value, max_value
+
+
+def build_settings(raw_settings, version=0):
+    """Valide le dict brut et retourne un BotSettings figé. Les corrections sont journalisées en WARNING."""
+    raw_settings = raw_settings if isinstance(raw_settings, dict) else {}
+    validated_values = dict(raw_settings); problems = []
+
+    delay_ranges = {}
+    for name, (min_key, max_key, default_min, default_max, unit_sec) in DELAY_SPECS.items():
+        min_value = _coerce(raw_settings.get(min_key), _Spec(min_key, default_min, 0), problems)
+        max_value = _coerce(raw_settings.get(max_key), _Spec(max_key, default_max, 0), problems)
+        min_value, max_value = _ordered_pair(min_value, max_value, name, problems)
+        validated_values[min_key] = min_value; validated_values[max_key] = max_value
+        delay_ranges[name] = DelayRange(min_value * unit_sec, max_value * unit_sec)
+    delays = _build_section(DelaySettings, raw_settings, validated_values, problems, ranges=MappingProxyType(delay_ranges))
+
+    session = _build_section(SessionSettings, raw_settings, validated_values, problems)
+    for prefix in ("break_duration", "distraction_actions", "distraction_duration", "net_disconnect_interval", "net_disconnect_duration"):
+        min_name = next(f.name for f in dataclasses.fields(SessionSettings) if f.name.startswith(prefix + "_min"))
+        max_name = next(f.name for f in dataclasses.fields(SessionSettings) if f.name.startswith(prefix + "_max"))
+        low, high = _ordered_pair(getattr(session, min_name), getattr(session, max_name), prefix, problems)
+        if (low, high) != (getattr(session, min_name), getattr(session, max_name)):
+            session = dataclasses.replace(session, **{min_name: low, max_name: high})
+            validated_values[min_name] = low; validated_values[max_name] = high # Les noms de champs = clés pour la session
+
+    follow_filters = _build_section(FollowFilterSettings, raw_settings, validated_values, problems)
+    follow_filters = dataclasses.replace(follow_filters, bio_include_patterns=_compile_keywords(follow_filters.bio_keywords_include),
+                                         bio_exclude_patterns=_compile_keywords(follow_filters.bio_keywords_exclude))
+    like_filters = _build_section(LikeFilterSettings, raw_settings, validated_values, problems)
+    like_filters = dataclasses.replace(like_filters, caption_include_patterns=_compile_keywords(like_filters.caption_include),
+                                       caption_exclude_patterns=_compile_keywords(like_filters.caption_exclude))
+
+    settings = BotSettings(
+        version=version, delays=delays, session=session, follow_filters=follow_filters, like_filters=like_filters,
+        unfollow_filters=_build_section(UnfollowFilterSettings, raw_settings, validated_values, problems),
+        browser=_build_section(BrowserSettings, raw_settings, validated_values, problems),
+        logging=_build_section(LoggingSettings, raw_settings, validated_values, problems),
+        database=_build_section(DatabaseSettings, raw_settings, validated_values, problems),
+        values=MappingProxyType(validated_values),
+    )
+    for problem in problems: logger.warning(f"Paramètre corrigé: {problem}")
+    return settings
+
+
+def diff_settings(old_settings, new_settings):
+    """
+    (sections, clés) dont la valeur validée diffère entre deux instantanés: sections = noms d'attributs de BotSettings,
+    clés = clés settings.json (schéma et hors schéma). Sans ancien instantané, tout est considéré comme modifié.
+    """
+    if old_settings is None: return frozenset(SECTION_NAMES), frozenset(new_settings.values)
+    sections = frozenset(name for name in SECTION_NAMES if getattr(old_settings, name) != getattr(new_settings, name))
+    old_values, new_values = old_settings.values, new_settings.values
+    keys = frozenset(key for key in old_values.keys() | new_values.keys() if old_values.get(key, _MISSING) != new_values.get(key, _MISSING))
+    return sections, keys
+
+
+class _Spec:
+    """Champ ad hoc (délais) compatible avec _coerce."""
+    __slots__ = ("metadata", "default", "type")
+    def __init__(self, key, default, min_value=None, max_value=None):
+        self.default = default; self.type = type(default); self.metadata = {"key": key, "min": min_value, "max": max_value, "choices": None}
+
+
+if __name__ == '__main__':
+    snapshot = build_settings({"follow_delay_min": 90, "follow_delay_max": 45, "check_followers_delay_min_minutes": 10,
+                               "break_duration_min": "7", "fatigue_pause_multiplier": 12, "filter_bio_keywords_include": "photo, voyage",
+                               "log_file_level": "VERBOSE", "custom_key": 42}, version=3)
+    print(f"v{snapshot.version} follow={snapshot.delays.ranges['follow']} check_followers={snapshot.delays.ranges['check_followers']}")
+    print(f"break {snapshot.session.break_duration_min}-{snapshot.session.break_duration_max} min, fatigue x{snapshot.session.fatigue_pause_multiplier}")
+    print(f"bio include: {[p.pattern for p in snapshot.follow_filters.bio_include_patterns]}, log_file_level={snapshot.logging.log_file_level}")
+    print(f"get('like_delay_min')={snapshot.get('like_delay_min')} get('custom_key')={snapshot.get('custom_key')}")
+    edited = build_settings({**snapshot.values, "log_console_level": "DEBUG", "budget_likes_per_hour": 30}, version=4)
+    print("diff v3 -> v4:", diff_settings(snapshot, edited))
+    try: snapshot.session.actions_before_break = 1
+    except dataclasses.FrozenInstanceError: print("Instantané immuable: OK")
@@ -0,0 +1,101 @@
+# mon_bot_social/utils/startup_benchmark.py
+"""
+Mesure le coût d'import au démarrage: chaque module cible est importé dans un interpréteur neuf lancé avec
+`-X importtime`; le rapport donne le temps total, les modules les plus coûteux (cumulé / propre) et vérifie que
+les dépendances lourdes différées (actions, Selenium, APScheduler) ne sont PAS chargées par l'import.
+Usage: python -m utils.startup_benchmark [module ...] [--runs N] [--top N] [--output profil.txt]
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+BASE_PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# main = fenêtre Qt, daemon = mode serveur sans Qt; les autres = chaîne importée avant l'affichage de la fenêtre
+DEFAULT_TARGETS = ("main", "daemon", "automation_engine.app_manager", "automation_engine.task_scheduler", "data_layer.database")
+# Préfixes de modules qui ne doivent être chargés qu'à la première tâche / au premier accès
+DEFERRED_MODULE_PREFIXES = ("automation_engine.actions.", "selenium", "webdriver_manager", "apscheduler")
+RESULT_MARKER = "__STARTUP_BENCHMARK__"
+IMPORT_START_MARKER = "__STARTUP_BENCHMARK_IMPORT__" # Sur stderr: les lignes importtime entre les deux marqueurs concernent la cible seule
+IMPORT_END_MARKER = "__STARTUP_BENCHMARK_IMPORT_END__"
+
+_CHILD_CODE = f"""
+import sys, time, importlib
+sys.stderr.write("{IMPORT_START_MARKER}\\n"); sys.stderr.flush()
+started_at = time.perf_counter(); error = None
+try: importlib.import_module(sys.argv[1])
+except BaseException as e: error = f"{{type(e).__name__}}: {{e}}"
+elapsed = time.perf_counter() - started_at
+sys.stderr.write("{IMPORT_END_MARKER}\\n"); sys.stderr.flush()
+import json
+print("{RESULT_MARKER}" + json.dumps({{"elapsed": elapsed, "error": error, "modules": sorted(sys.modules)}}))
+"""
+
+
+def parse_importtime(stderr_text):
+    """Lignes 'import time: self [us] | cumulative | module' -> liste de (module, self_us, cumulative_us)."""
+    entries = []
+    if IMPORT_START_MARKER in stderr_text: stderr_text = stderr_text.split(IMPORT_START_MARKER + "\n", 1)[1] # Ignore le démarrage de l'interpréteur
+    stderr_text = stderr_text.split(IMPORT_END_MARKER, 1)[0]
+    for line in stderr_text.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line: continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3: continue
+        try: entries.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+        except ValueError: continue
+    return entries
+
+
+def profile_import(target, cwd=BASE_PROJECT_DIR):
+    """Importe `target` dans un sous-processus -X importtime. Retourne un dict (elapsed, error, entries, deferred_loaded, raw)."""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", _CHILD_CODE, target],
+                               cwd=cwd, capture_output=True, text=True)
+    result_line = next((line for line in reversed(completed.stdout.splitlines()) if line.startswith(RESULT_MARKER)), None)
+    result = json.loads(result_line[len(RESULT_MARKER):]) if result_line else {"elapsed": None, "error": f"code retour {completed.returncode}", "modules": []}
+    deferred_loaded = sorted(m for m in result["modules"] if m.startswith(DEFERRED_MODULE_PREFIXES))
+    return {"elapsed": result["elapsed"], "error": result["error"], "entries": parse_importtime(completed.stderr),
+            "deferred_loaded": deferred_loaded, "raw": completed.stderr}
+
+
+def run_benchmark(targets=DEFAULT_TARGETS, runs=3):
+    results = {}
+    for target in targets:
+        profiles = [profile_import(target) for _ in range(runs)]
+        timings = [p["elapsed"] for p in profiles if p["elapsed"] is not None]
+        results[target] = dict(profiles[-1], median_ms=statistics.median(timings) * 1000 if timings else None)
+    return results
+
+
+def format_report(results, top=10):
+    lines = []
+    for target, result in results.items():
+        median_ms = f"{result['median_ms']:.1f} ms" if result["median_ms"] is not None else "n/d"
+        lines.append(f"== import {target}: {median_ms} (médiane), {len(result['entries'])} modules importés")
+        if result["error"]: lines.append(f"   ÉCHEC import: {result['error']}")
+        if result["error"] and not result["entries"]: continue
+        if result["deferred_loaded"]: lines.append(f"   ATTENTION, modules différés chargés: {', '.join(result['deferred_loaded'][:10])}")
+        else: lines.append("   OK: aucun module différé (actions, Selenium, APScheduler) chargé.")
+        for label, column in (("cumulé", 2), ("propre", 1)):
+            lines.append(f"   Top {top} ({label}, µs):")
+            for entry in sorted(result["entries"], key=lambda e: e[column], reverse=True)[:top]:
+                lines.append(f"     {entry[column]:>9}  {entry[0]}")
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Profil d'import au démarrage (-X importtime).")
+    parser.add_argument("targets", nargs="*", default=list(DEFAULT_TARGETS))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--output", help="Écrit le profil -X importtime brut de chaque cible dans ce fichier")
+    args = parser.parse_args()
+
+    benchmark_results = run_benchmark(args.targets, args.runs)
+    print(format_report(benchmark_results, args.top))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            for target, result in benchmark_results.items(): f.write(f"# import {target}\n{result['raw']}\n")
+        print(f"Profil brut écrit dans {args.output}")